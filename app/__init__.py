@@ -10,14 +10,16 @@ from __future__ import annotations
 
 from datetime import timedelta
 import secrets
+import time
 
-from flask import Flask
+from flask import Flask, current_app
 from flask_wtf import CSRFProtect  # type: ignore[import-untyped]
 from flask_login import LoginManager  # type: ignore[import-untyped]
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 import click
 import os
+import stripe
 from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.security import generate_password_hash
 
@@ -32,7 +34,33 @@ from .util.db_models import (
     db,
     get_current_utc_time,
 )
-from .util.event_settings import create_or_update_active_event_from_config
+from .util.booking_export import (
+    EXPORT_MIMETYPES,
+    iter_booking_export_chunks,
+)
+from .util.event_archive import archive_event_bookings
+from .util.event_booking_stats import rebuild_all_event_booking_stats
+from .util.event_settings import (
+    create_or_update_active_event_from_config,
+    get_active_event,
+)
+from .util.outbound_http import start_outbound_http_warmup
+from .util.query_metrics import init_query_metrics
+from .util.seed_bookings import (
+    SeedBookingOptions,
+    clear_seed_bookings,
+    seed_bookings,
+)
+from .util.stripe_helpers import start_checkout_product_image_refresh
+from .util.stripe_reconciliation import reconcile_pending_orders_with_stripe
+from .util.stripe_webhook_inbox import (
+    drain_stripe_webhook_inbox,
+    start_stripe_webhook_inbox_worker,
+)
+from .util.weather_forecast import (
+    refresh_active_event_weather_caches,
+    start_weather_refresh_scheduler,
+)
 
 # Flask extension instances -------------------------------------------------
 csrf_protect = CSRFProtect()
@@ -40,13 +68,33 @@ login_manager = LoginManager()
 rate_limiter = Limiter(key_func=get_remote_address)
 
 
-def create_app() -> Flask:
+def is_flask_run_command() -> bool:
+    """Return whether the app is being built by ``flask run``.
+
+    The development server serves requests like a web process. Every other
+    ``flask`` command, such as ``seed-test-bookings`` or ``export-bookings``,
+    is a one-off job.
+    """
+
+    click_context = click.get_current_context(silent=True)
+    return click_context is not None and click_context.info_name == "run"
+
+
+def create_app(*, start_background_workers: bool | None = None) -> Flask:
     """Create and configure a :class:`~flask.Flask` application instance.
 
         The factory pattern keeps application creation explicit and makes
     testing very easy.  Every caller gets a brand new app configured with
     our extensions and routes.
 
+        Args:
+            start_background_workers: Whether to start the webhook inbox
+                worker and the weather scheduler, when they are enabled in
+                the config. Only web processes should run them: ``wsgi.py``
+                passes ``True``. The default ``None`` starts them for
+                ``flask run`` only, so Alembic, ``init_db.py``, scripts, and
+                other ``flask`` commands never handle live webhooks.
+
         Returns:
             Flask: A fully configured Flask application.
     """
@@ -76,6 +124,7 @@ def create_app() -> Flask:
     login_manager.login_message = "Du måste logga in för att öppna den här sidan."
     login_manager.login_message_category = "error"
     rate_limiter.init_app(flask_application)
+    init_query_metrics(flask_application)
 
     # Import and register blueprints containing route definitions.
     from .routes import main_blueprint
@@ -97,6 +146,40 @@ def create_app() -> Flask:
     flask_application.cli.add_command(reset_public_site_password_command)
     flask_application.cli.add_command(seed_test_bookings_command)
     flask_application.cli.add_command(clear_test_bookings_command)
+    flask_application.cli.add_command(refresh_weather_command)
+    flask_application.cli.add_command(process_stripe_webhooks_command)
+    flask_application.cli.add_command(reconcile_stripe_command)
+    flask_application.cli.add_command(archive_event_command)
+    flask_application.cli.add_command(rebuild_event_stats_command)
+    flask_application.cli.add_command(export_bookings_command)
+
+    if start_background_workers is None:
+        start_background_workers = is_flask_run_command()
+
+    # The weather scheduler fills and refreshes the stored forecast without a
+    # separate cron job. Only web processes run it.
+    if (
+        flask_application.config.get("WEATHER_REFRESH_SCHEDULER_ENABLED")
+        and start_background_workers
+    ):
+        start_weather_refresh_scheduler(flask_application)
+
+    # Stored webhook events are drained by a worker thread in each web
+    # process. Starting it here, instead of on the first webhook, picks up
+    # retries and rows left in ``processing`` after a deploy or restart.
+    if (
+        flask_application.config.get("STRIPE_WEBHOOK_INBOX_WORKER_ENABLED")
+        and start_background_workers
+    ):
+        start_stripe_webhook_inbox_worker(flask_application)
+
+    # Each Gunicorn worker runs the app factory, so warming here opens the
+    # pooled Stripe and MET connections once per worker.
+    if flask_application.config.get("OUTBOUND_HTTP_WARM_ON_START"):
+        start_outbound_http_warmup(flask_application)
+        checkout_product_id = flask_application.config.get("STRIPE_CHECKOUT_PRODUCT_ID")
+        if checkout_product_id:
+            start_checkout_product_image_refresh(flask_application, checkout_product_id)
 
     return flask_application
 
@@ -272,87 +355,288 @@ def reset_public_site_password_command(password: str | None, length: int) -> Non
     click.echo(f"New password: {new_password}")
 
 
-def clear_seed_test_bookings() -> int:
-    """Delete all development seed bookings and return the deleted order count.
-
-    Returns:
-        int: Number of seeded booking orders removed.
-    """
-
-    seeded_booking_orders = BookingOrder.query.filter_by(
-        payment_provider="dev_seed"
-    ).all()
-    deleted_order_count = len(seeded_booking_orders)
-
-    for seeded_booking_order in seeded_booking_orders:
-        db.session.delete(seeded_booking_order)
-
-    db.session.commit()
-    return deleted_order_count
-
-
 @click.command("seed-test-bookings")
 @click.option(
     "--count",
     default=1,
     type=click.IntRange(min=1),
     show_default=True,
-    help="How many confirmed test canoes to create.",
+    help="How many test booking orders to create.",
+)
+@click.option(
+    "--canoes-per-order",
+    default=1,
+    type=click.IntRange(min=1),
+    show_default=True,
+    help="Canoe rows in each test booking order.",
 )
-def seed_test_bookings_command(count: int) -> None:
-    """Create a repeatable set of confirmed development-only test bookings.
+@click.option(
+    "--events",
+    "event_count",
+    default=1,
+    type=click.IntRange(min=1),
+    show_default=True,
+    help="Spread the orders over the active event and earlier inactive events.",
+)
+@click.option(
+    "--pending-share",
+    default=0.0,
+    type=click.FloatRange(min=0, max=1),
+    show_default=True,
+    help="Share of orders left as active unpaid checkout holds.",
+)
+@click.option(
+    "--expired-share",
+    default=0.0,
+    type=click.FloatRange(min=0, max=1),
+    show_default=True,
+    help="Share of orders left as unpaid holds that have already expired.",
+)
+@click.option(
+    "--with-passengers",
+    is_flag=True,
+    help="Fill in a second rider for every canoe and a third for some.",
+)
+@click.option(
+    "--random-seed",
+    default=2026,
+    type=int,
+    show_default=True,
+    help="Seed for names and statuses, so the same options give the same data.",
+)
+def seed_test_bookings_command(
+    count: int,
+    canoes_per_order: int,
+    event_count: int,
+    pending_share: float,
+    expired_share: float,
+    with_passengers: bool,
+    random_seed: int,
+) -> None:
+    """Create a repeatable set of development-only test bookings.
 
     The command first removes any older seeded test bookings marked with
-    ``payment_provider='dev_seed'``. It then creates one paid order and one
-    confirmed canoe row per requested test booking so the booking UI can be
-    tested near capacity without creating manual bookings one by one.
+    ``payment_provider='dev_seed'``. By default it then creates one paid order
+    with one confirmed canoe per requested booking, so the booking UI can be
+    tested near capacity. The options build larger, mixed data sets for scale
+    testing; rows are written with batched inserts, so 50,000 bookings take
+    seconds.
     """
 
-    deleted_order_count = clear_seed_test_bookings()
+    if pending_share + expired_share > 1:
+        raise click.BadParameter(
+            "--pending-share and --expired-share must add up to at most 1."
+        )
+
+    deleted_order_count = clear_seed_bookings()
     if deleted_order_count:
         click.echo(f"Removed {deleted_order_count} old seeded booking order(s).")
 
     active_event, _ = create_or_update_active_event_from_config()
-
-    for booking_number in range(1, count + 1):
-        booking_order = BookingOrder(
-            event_id=active_event.id,
-            public_booking_reference="TEMP",
-            status="paid",
-            canoe_count=1,
-            total_amount=float(active_event.price_per_canoe_sek),
-            currency="sek",
-            payment_provider="dev_seed",
-            payer_full_name=f"Testbokning {booking_number:03d}",
-            payer_email=f"testbokning{booking_number:03d}@example.invalid",
-            paid_at=get_current_utc_time(),
-            expires_at=get_current_utc_time() + timedelta(minutes=15),
-        )
-        db.session.add(booking_order)
-        db.session.flush()
-
-        booking_order.public_booking_reference = f"TEST-{booking_order.id:05d}"
-        db.session.add(
-            BookedCanoe(
-                booking_order_id=booking_order.id,
-                participant_first_name="Test",
-                participant_last_name=f"Booking {booking_number:03d}",
-                status="confirmed",
-            )
+    seed_result = seed_bookings(
+        active_event,
+        SeedBookingOptions(
+            order_count=count,
+            canoes_per_order=canoes_per_order,
+            event_count=event_count,
+            pending_share=pending_share,
+            expired_share=expired_share,
+            with_passengers=with_passengers,
+            random_seed=random_seed,
+        ),
+    )
+    click.echo(f"Created {seed_result.order_count} seeded test booking(s).")
+    click.echo(
+        "{canoe_count} canoe(s) across {event_count} event(s): {paid} paid, "
+        "{pending} pending, {expired} expired.".format(
+            canoe_count=seed_result.canoe_count,
+            event_count=len(seed_result.event_ids),
+            **seed_result.order_counts,
         )
-
-    db.session.commit()
-    click.echo(f"Created {count} seeded test booking(s).")
+    )
 
 
 @click.command("clear-test-bookings")
 def clear_test_bookings_command() -> None:
     """Remove all development-only seeded bookings from the database."""
 
-    deleted_order_count = clear_seed_test_bookings()
+    deleted_order_count = clear_seed_bookings()
     click.echo(f"Removed {deleted_order_count} seeded test booking order(s).")
 
 
+@click.command("refresh-weather")
+@click.option(
+    "--force",
+    is_flag=True,
+    help="Refresh even when the stored forecast was fetched recently.",
+)
+def refresh_weather_command(force: bool) -> None:
+    """Prefetch and store the MET forecast for every active event.
+
+    Events outside their ``weather_forecast_days_before_event`` window are
+    skipped. Run this from cron or a platform scheduled task when the
+    in-process scheduler is disabled.
+    """
+
+    refresh_results = refresh_active_event_weather_caches(force=force)
+    if not refresh_results:
+        click.echo("No active events found.")
+        return
+
+    for event_id, refresh_result in refresh_results.items():
+        click.echo(f"Event {event_id}: {refresh_result}")
+
+
+@click.command("process-stripe-webhooks")
+@click.option(
+    "--once",
+    is_flag=True,
+    help="Drain the due events once and exit instead of polling.",
+)
+@click.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Events read per batch. Defaults to STRIPE_WEBHOOK_INBOX_BATCH_SIZE.",
+)
+def process_stripe_webhooks_command(once: bool, batch_size: int | None) -> None:
+    """Apply stored Stripe webhook events from the inbox table.
+
+    Run this as a separate worker process when
+    ``STRIPE_WEBHOOK_INBOX_WORKER_ENABLED`` is off, or with ``--once`` to
+    retry events by hand. Without ``--once`` the command keeps polling every
+    ``STRIPE_WEBHOOK_INBOX_POLL_SECONDS``.
+    """
+
+    poll_seconds = float(
+        current_app.config.get("STRIPE_WEBHOOK_INBOX_POLL_SECONDS", 30)
+    )
+    while True:
+        outcome_counts = drain_stripe_webhook_inbox(batch_size=batch_size)
+        click.echo(
+            "Processed {processed}, scheduled {retry_scheduled} for retry, "
+            "gave up on {failed} Stripe webhook event(s).".format(**outcome_counts)
+        )
+        if once:
+            return
+        time.sleep(poll_seconds)
+
+
+@click.command("reconcile-stripe")
+@click.option(
+    "--since-hours",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="List sessions from this many hours back. Defaults to the oldest pending order.",
+)
+def reconcile_stripe_command(since_hours: float | None) -> None:
+    """Confirm or release pending orders from Stripe's Checkout Session list.
+
+    Use this after a webhook outage. Sessions are listed page by page, so a
+    few Stripe calls cover every pending order instead of one call per order.
+    """
+
+    created_after = None
+    if since_hours is not None:
+        created_after = get_current_utc_time() - timedelta(hours=since_hours)
+
+    try:
+        reconciliation_counts = reconcile_pending_orders_with_stripe(created_after)
+    except stripe.StripeError as error:
+        raise click.ClickException(f"Stripe reconciliation failed: {error}") from error
+    click.echo(
+        "Confirmed {confirmed}, released {released}, left {pending} pending "
+        "after {stripe_pages} Stripe list call(s).".format(**reconciliation_counts)
+    )
+
+
+@click.command("archive-event")
+@click.argument("event_date", type=click.DateTime(formats=["%Y-%m-%d"]))
+def archive_event_command(event_date) -> None:
+    """Move a finished event's orders and canoes to the archive tables.
+
+    Pass the event date as ``YYYY-MM-DD``. The event must be inactive and in
+    the past. Its bookings stay visible read-only in the admin dashboard's
+    event panel, while the booking tables used by every request shrink back
+    to the current season.
+    """
+
+    event = Event.query.filter_by(event_date=event_date.date()).first()
+    if event is None:
+        raise click.ClickException(f"No event found on {event_date:%Y-%m-%d}.")
+
+    try:
+        archive_result = archive_event_bookings(event)
+    except ValueError as error:
+        raise click.ClickException(str(error)) from error
+    click.echo(
+        f"Archived {archive_result.order_count} order(s) and "
+        f"{archive_result.canoe_count} canoe(s) for {event_date:%Y-%m-%d}."
+    )
+
+
+@click.command("rebuild-event-stats")
+def rebuild_event_stats_command() -> None:
+    """Recompute every event's booking totals from the booking tables.
+
+    The totals are kept up to date on every booking change. Run this after
+    editing bookings directly in the database, or to check for drift.
+    Archived events are counted from the archive tables.
+    """
+
+    rebuilt_event_count = rebuild_all_event_booking_stats()
+    click.echo(f"Rebuilt booking totals for {rebuilt_event_count} event(s).")
+
+
+@click.command("export-bookings")
+@click.option(
+    "--event-date",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    help="Event to export as YYYY-MM-DD. Defaults to the active event.",
+)
+@click.option(
+    "--format",
+    "export_format",
+    type=click.Choice(sorted(EXPORT_MIMETYPES)),
+    default="csv",
+    show_default=True,
+    help="File format to write.",
+)
+@click.option(
+    "--output",
+    default="-",
+    show_default=True,
+    help="File to write, or '-' for standard output.",
+)
+def export_bookings_command(event_date, export_format: str, output: str) -> None:
+    """Write one event's confirmed bookings as a CSV or XLSX file.
+
+    Rows use the same grouped pickup-person layout as ``/admin/export`` and
+    are written while they are read, so exporting a large archived season
+    uses no more memory than a small one.
+    """
+
+    if event_date is None:
+        event = get_active_event()
+        if event is None:
+            raise click.ClickException("No active event to export.")
+    else:
+        event = Event.query.filter_by(event_date=event_date.date()).first()
+        if event is None:
+            raise click.ClickException(f"No event found on {event_date:%Y-%m-%d}.")
+
+    with click.open_file(output, "wb") as output_file:
+        for export_chunk in iter_booking_export_chunks(
+            event.id, event.archived_at is not None, export_format
+        ):
+            output_file.write(export_chunk)
+    # Keep standard output clean for the exported file itself.
+    click.echo(
+        f"Exported bookings for {event.event_date:%Y-%m-%d} as {export_format}.",
+        err=True,
+    )
+
+
 @login_manager.user_loader
 def load_user(user_id: str) -> User | None:
     """Return the :class:`User` instance for the given ``user_id``.
@@ -382,4 +666,10 @@ __all__ = [
     "generate_public_site_password_hash_command",
     "seed_test_bookings_command",
     "clear_test_bookings_command",
+    "refresh_weather_command",
+    "process_stripe_webhooks_command",
+    "reconcile_stripe_command",
+    "archive_event_command",
+    "rebuild_event_stats_command",
+    "export_bookings_command",
 ]
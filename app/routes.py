@@ -6,18 +6,20 @@ registered by the application factory.
 """
 
 import logging
+import re
+import time
 from collections import Counter
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from decimal import Decimal, InvalidOperation
 from functools import wraps
-import re
 from urllib.parse import urlsplit
 from zoneinfo import ZoneInfo
-import requests
+
 import stripe
 from flask import (
-    abort,
     Blueprint,
+    Response,
+    abort,
     current_app,
     flash,
     jsonify,
@@ -27,6 +29,7 @@ from flask import (
     request,
     send_from_directory,
     session,
+    stream_with_context,
     url_for,
 )
 from flask_login import (  # type: ignore[import-untyped]
@@ -36,57 +39,97 @@ from flask_login import (  # type: ignore[import-untyped]
     logout_user,
 )
 from sqlalchemy import inspect
-from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
 from werkzeug.security import check_password_hash, generate_password_hash
 
+from . import csrf_protect, rate_limiter
+from .util.admin_booking_search import (
+    ADMIN_BOOKINGS_PAGE_SIZE,
+    MAX_ADMIN_BOOKINGS_PAGE_SIZE,
+    load_admin_booking_page,
+)
+from .util.booking_export import (
+    EXPORT_MIMETYPES,
+    build_export_filename,
+    iter_booking_export_chunks,
+)
+from .util.booking_groups import (
+    ChecklistPage,
+    load_admin_checklist_page,
+    load_checklist_row_counts,
+)
+from .util.booking_status_notifications import get_booking_status_notifier
+from .util.checkout_preparation import (
+    prepare_server_side_checkout_booking,
+)
+from .util.checkout_session_worker import (
+    CHECKOUT_SESSION_CREATING_STATUS,
+    create_checkout_session_for_booking_order,
+    queue_checkout_session_creation,
+    wait_for_checkout_session,
+)
+from .util.db_models import (
+    BookedCanoe,
+    BookingOrder,
+    Event,
+    PublicSiteAccessSetting,
+    User,
+    db,
+    get_current_utc_time,
+    normalize_pickup_name,
+)
+from .util.event_archive import load_archived_booking_history
+from .util.event_booking_stats import (
+    EventBookingStatsChange,
+    apply_event_booking_stats_change,
+    build_confirmed_canoe_stats_change,
+    build_paid_order_stats_change,
+    ensure_event_booking_stats,
+    get_event_booking_stats,
+)
 from .util.event_settings import (
     apply_event_template_values,
-    build_event_template_values,
     build_event_settings_with_fallback,
+    build_event_template_values,
+    bump_event_booking_version,
+    claim_next_checklist_version,
     format_swedish_date_display,
     get_active_event,
     get_available_canoes_total_with_fallback,
     get_event_year_with_fallback,
     get_max_canoes_per_booking_with_fallback,
     get_price_per_canoe_with_fallback,
-    get_weather_coordinates_with_fallback,
     normalize_money_decimal,
 )
 from .util.helper_functions import (
     get_previous_year_image_metadata,
-    get_previous_year_variant_folder,
     get_previous_year_variant_filename,
+    get_previous_year_variant_folder,
     get_project_root_from_static_folder,
 )
-from .util.checkout_preparation import (
-    build_stripe_receipt_description,
-    prepare_server_side_checkout_booking,
-)
+from .util.public_overview_cache import get_public_overview_snapshot
 from .util.stripe_helpers import (
     construct_stripe_webhook_event,
-    create_stripe_checkout_session,
     expire_stripe_checkout_session,
+    get_checkout_product_image_cache,
+    get_stripe_checkout_configuration,
+    refresh_checkout_product_image_cache,
     retrieve_stripe_checkout_session,
 )
+from .util.stripe_webhook_inbox import (
+    notify_stripe_webhook_inbox_worker,
+    store_stripe_webhook_event,
+)
 from .util.stripe_webhooks import (
     confirm_paid_booking_from_checkout_session,
     process_stripe_webhook_event,
     release_expired_booking_from_checkout_session,
 )
-from .util.db_models import (
-    BookedCanoe,
-    BookingOrder,
-    Event,
-    PublicSiteAccessSetting,
-    User,
-    db,
-    get_current_utc_time,
-)
-from .util.booking_groups import (
-    build_admin_checklist_rows,
-    build_grouped_booking_overview_rows,
+from .util.weather_forecast import (
+    build_forecast_response,
+    get_stored_forecast_for_date,
+    is_weather_cache_stale,
 )
-from . import csrf_protect, rate_limiter
 
 # -----------------------------------------------------------------------------
 # LOGGING SETUP
@@ -110,12 +153,20 @@ PROTECTED_PREVIOUS_YEAR_STATIC_PREFIXES = (
 )
 PENDING_CHECKOUT_ORDER_STATUSES = {
     "pending_payment",
+    CHECKOUT_SESSION_CREATING_STATUS,
     "checkout_session_created",
 }
+# booking.js sends a random UUID per reservation attempt. Anything else is
+# ignored rather than rejected so older cached pages can still book.
+CHECKOUT_IDEMPOTENCY_KEY_PATTERN = re.compile(r"[A-Za-z0-9_-]{16,64}")
 SOLD_OUT_RELOAD_MESSAGE = (
     "Tyvärr, alla kanoter hann bli reserverade innan din reservation sparades. "
     "Sidan har uppdaterats så att du ser det senaste läget."
 )
+CHECKOUT_REPLAY_RELEASED_MESSAGE = (
+    "Din tidigare reservation har redan släppts. "
+    "Sidan har uppdaterats så att du kan göra en ny bokning."
+)
 STRIPE_PAYMENT_RESERVATION_EXPIRED_MESSAGE = (
     "Reservationstiden gick ut medan betalningen var öppen. "
     "Gör en ny bokning om du vill fortsätta."
@@ -321,14 +372,14 @@ def get_confirmed_booked_canoes_query():
     """
 
     active_event = get_active_event()
-    confirmed_query = BookedCanoe.query.filter_by(status="confirmed")
+    # Joining the parent order even without an active event lets callers
+    # load ``booked_canoe.booking_order`` from the same query.
+    confirmed_query = BookedCanoe.query.filter_by(status="confirmed").join(BookingOrder)
 
     if active_event is None:
         return confirmed_query
 
-    return confirmed_query.join(BookingOrder).filter(
-        BookingOrder.event_id == active_event.id
-    )
+    return confirmed_query.filter(BookingOrder.event_id == active_event.id)
 
 
 def count_confirmed_booked_canoes() -> int:
@@ -402,39 +453,6 @@ def cleanup_expired_pending_checkout_orders(event_id: int | None = None) -> int:
     return released_order_count
 
 
-def get_active_reserved_booked_canoes_for_event_id(
-    event_id: int | None,
-    *,
-    cleanup_expired_orders: bool = True,
-) -> list[BookedCanoe]:
-    """Return reserved canoe rows from still-active unpaid checkout orders.
-
-    Args:
-        event_id: Optional event primary key used to scope the count.
-        cleanup_expired_orders: Whether expired pending orders should be
-            released first.
-
-    Returns:
-        list[BookedCanoe]: Reserved canoe rows that still block availability.
-    """
-
-    if cleanup_expired_orders:
-        cleanup_expired_pending_checkout_orders(event_id)
-
-    reserved_canoes: list[BookedCanoe] = []
-    for pending_order in get_pending_checkout_orders_query(event_id).all():
-        if is_booking_order_expired(pending_order):
-            continue
-
-        reserved_canoes.extend(
-            booked_canoe
-            for booked_canoe in pending_order.booked_canoes
-            if booked_canoe.status == "reserved"
-        )
-
-    return reserved_canoes
-
-
 def count_active_reserved_canoes_for_event_id(
     event_id: int | None,
     *,
@@ -442,12 +460,28 @@ def count_active_reserved_canoes_for_event_id(
 ) -> int:
     """Return how many canoes are held by still-active unpaid reservations."""
 
-    return len(
-        get_active_reserved_booked_canoes_for_event_id(
-            event_id,
-            cleanup_expired_orders=cleanup_expired_orders,
+    if cleanup_expired_orders:
+        cleanup_expired_pending_checkout_orders(event_id)
+
+    # One COUNT in SQL, so availability checks do no work per reservation.
+    reserved_count_query = (
+        db.session.query(db.func.count(BookedCanoe.id))
+        .join(BookingOrder)
+        .filter(
+            BookedCanoe.status == "reserved",
+            BookingOrder.status.in_(PENDING_CHECKOUT_ORDER_STATUSES),
+            db.or_(
+                BookingOrder.expires_at.is_(None),
+                BookingOrder.expires_at > get_current_utc_time(),
+            ),
         )
     )
+    if event_id is not None:
+        reserved_count_query = reserved_count_query.filter(
+            BookingOrder.event_id == event_id
+        )
+
+    return int(reserved_count_query.scalar() or 0)
 
 
 def count_currently_unavailable_canoes_for_event_id(
@@ -795,6 +829,7 @@ def cancel_pending_checkout_order(booking_order: BookingOrder) -> str:
                 )
                 return "stripe_error"
 
+    bump_event_booking_version(booking_order.event_id)
     db.session.delete(booking_order)
     db.session.commit()
     return "released"
@@ -901,7 +936,7 @@ def build_canoe_rider_data_from_form(
 def normalize_participant_full_name(first_name: str, last_name: str) -> str:
     """Return a normalized full name used for booking-limit comparisons."""
 
-    return f"{first_name.strip()} {last_name.strip()}".strip().casefold()
+    return normalize_pickup_name(first_name, last_name)
 
 
 def validate_total_canoes_per_name(
@@ -911,6 +946,11 @@ def validate_total_canoes_per_name(
 ) -> str | None:
     """Reject bookings that would push one exact name above the total limit.
 
+    Existing bookings are counted with one grouped query over the indexed
+    ``normalized_pickup_name`` column, limited to the names in this booking.
+    The cost therefore does not grow with the event's total booking count,
+    which matters because checkout runs this while holding the event row lock.
+
     Args:
         participant_names: Parsed participant rows from the current booking form.
         max_canoes_per_name: Maximum allowed total for one exact participant name.
@@ -929,20 +969,47 @@ def validate_total_canoes_per_name(
         )
         for participant in participant_names
     )
-    excluded_booking_ids = excluded_booking_ids or set()
+    if not requested_name_counts:
+        return None
+
+    # Confirmed canoes and canoes held by unexpired unpaid checkouts both
+    # count towards the limit.
+    existing_name_count_query = (
+        db.session.query(
+            BookedCanoe.normalized_pickup_name,
+            db.func.count(BookedCanoe.id),
+        )
+        .join(BookingOrder)
+        .filter(
+            BookedCanoe.normalized_pickup_name.in_(list(requested_name_counts)),
+            db.or_(
+                BookedCanoe.status == "confirmed",
+                db.and_(
+                    BookedCanoe.status == "reserved",
+                    BookingOrder.status.in_(PENDING_CHECKOUT_ORDER_STATUSES),
+                    db.or_(
+                        BookingOrder.expires_at.is_(None),
+                        BookingOrder.expires_at > get_current_utc_time(),
+                    ),
+                ),
+            ),
+        )
+        .group_by(BookedCanoe.normalized_pickup_name)
+    )
     active_event = get_active_event()
-    active_event_id = active_event.id if active_event is not None else None
-    existing_canoe_rows = [
-        *get_confirmed_booked_canoes_query().all(),
-        *get_active_reserved_booked_canoes_for_event_id(active_event_id),
-    ]
-    existing_name_counts = Counter(
-        normalize_participant_full_name(
-            booking.participant_first_name,
-            booking.participant_last_name,
+    if active_event is not None:
+        existing_name_count_query = existing_name_count_query.filter(
+            BookingOrder.event_id == active_event.id
+        )
+    if excluded_booking_ids:
+        existing_name_count_query = existing_name_count_query.filter(
+            BookedCanoe.id.not_in(excluded_booking_ids)
         )
-        for booking in existing_canoe_rows
-        if booking.id not in excluded_booking_ids
+    existing_name_counts = Counter(
+        {
+            normalized_name: int(name_count)
+            for normalized_name, name_count in existing_name_count_query.all()
+        }
     )
 
     for participant in participant_names:
@@ -1108,17 +1175,6 @@ def serve_previous_year_image(variant_name: str, image_id: str):
     )
 
 
-def get_event_coordinates() -> tuple[float, float]:
-    """Return the configured latitude and longitude for the event location.
-
-    Returns:
-        tuple[float, float]: Event latitude and longitude used by the weather
-        forecast integration.
-    """
-
-    return get_weather_coordinates_with_fallback()
-
-
 def get_selected_admin_event(selected_event_id: int | None) -> Event | None:
     """Return the event row selected in the admin dashboard.
 
@@ -1417,15 +1473,23 @@ def index():
         elif pending_order is None:
             session.pop("pending_booking_order_id", None)
 
-    # fetch all bookings for your overview panel
-    alla_bokningar = get_confirmed_booked_canoes_query().order_by(BookedCanoe.id).all()
+    active_event = get_active_event()
+    active_event_id = active_event.id if active_event is not None else None
+    # The grouped participant list and its HTML are reused until the event's
+    # booking version changes, so most renders do no per-booking work.
+    public_overview_snapshot = get_public_overview_snapshot(active_event)
 
     total_available_canoes = int(event_settings["available_canoes_total"])
 
     # Read-only homepage rendering should not trigger Stripe reconciliation for
     # old pending orders. Expired holds are ignored in the count, and checkout
     # routes still perform the active cleanup when needed.
-    current = count_currently_unavailable_canoes(cleanup_expired_orders=False)
+    current = (
+        public_overview_snapshot.confirmed_canoe_count
+        + count_active_reserved_canoes_for_event_id(
+            active_event_id, cleanup_expired_orders=False
+        )
+    )
     available_canoes = max(0, total_available_canoes - current)
     booking_progress = build_booking_progress_display_data(
         current,
@@ -1435,12 +1499,10 @@ def index():
         previous_year_ribbon_image_urls,
         previous_year_gallery_image_urls,
     ) = build_previous_year_gallery_data()
-    grouped_booking_overview_rows = build_grouped_booking_overview_rows(alla_bokningar)
 
     return render_template(
         "index.html",
-        bokningar=alla_bokningar,
-        grouped_booking_overview_rows=grouped_booking_overview_rows,
+        participant_overview_html=public_overview_snapshot.overview_html,
         available_canoes=available_canoes,
         current_booked_canoes=current,
         booking_progress=booking_progress,
@@ -1538,7 +1600,8 @@ def payment():
     4) Reject requests that break booking or availability rules.
     5) Build server-approved order and Stripe-ready line-item data.
     6) Create a temporary local booking order.
-    7) Create a real Stripe Checkout Session in the background.
+    7) Queue the real Stripe Checkout Session creation on the background
+       worker instead of waiting on Stripe in this request.
     8) Return the pending booking data so the browser can move the modal into
        Step 3 without a full page reload.
 
@@ -1552,6 +1615,7 @@ def payment():
     except (ValueError, KeyError):
         return build_checkout_error_response("Ogiltigt antal kanoter.")
 
+    checkout_idempotency_key = get_checkout_idempotency_key()
     active_event = get_active_event()
     if active_event is None:
         current_app.logger.warning(
@@ -1571,6 +1635,16 @@ def payment():
             status_code=503,
         )
 
+    # A double-click or network retry sends the same idempotency key again.
+    # Checking it after the event lock means a concurrent duplicate waits for
+    # the first request and then finds its order here.
+    replayed_order = find_checkout_order_by_idempotency_key(checkout_idempotency_key)
+    if replayed_order is not None:
+        replay_response = build_checkout_replay_response(replayed_order)
+        if replay_response is not None:
+            db.session.commit()
+            return replay_response
+
     # 2) count confirmed bookings plus active temporary reservation holds
     current = count_currently_unavailable_canoes_for_event_id(
         locked_active_event.id,
@@ -1623,10 +1697,30 @@ def payment():
         total_amount=prepared_checkout_booking.total_amount,
         currency=prepared_checkout_booking.currency,
         payment_provider="stripe_checkout",
+        checkout_idempotency_key=checkout_idempotency_key,
         expires_at=get_current_utc_time() + timedelta(minutes=15),
     )
     db.session.add(pending_order)
-    db.session.flush()
+    try:
+        db.session.flush()
+    except IntegrityError:
+        # Databases without row locks (SQLite) can let two duplicates this
+        # far. The unique index stops the second one; answer with the first.
+        db.session.rollback()
+        replayed_order = find_checkout_order_by_idempotency_key(
+            checkout_idempotency_key
+        )
+        if replayed_order is None:
+            raise
+        replay_response = build_checkout_replay_response(replayed_order)
+        if replay_response is not None:
+            return replay_response
+        # The earlier order was released, so its key cannot start a new hold.
+        return build_checkout_error_response(
+            CHECKOUT_REPLAY_RELEASED_MESSAGE,
+            status_code=409,
+            reload_page=True,
+        )
     pending_order.public_booking_reference = build_public_booking_reference(
         pending_order.id
     )
@@ -1647,38 +1741,72 @@ def payment():
 
     db.session.commit()
 
-    try:
-        checkout_session = create_stripe_checkout_session(
-            public_booking_reference=pending_order.public_booking_reference,
-            stripe_line_items=prepared_checkout_booking.stripe_line_items,
-            payment_intent_description=build_stripe_receipt_description(
-                active_event=prepared_checkout_booking.active_event,
-                canoe_count=prepared_checkout_booking.canoe_count,
-                public_booking_reference=pending_order.public_booking_reference,
-            ),
-            metadata={
-                "booking_order_id": str(pending_order.id),
-                "public_booking_reference": pending_order.public_booking_reference,
-                "event_id": str(prepared_checkout_booking.active_event.id),
-                "canoe_count": str(prepared_checkout_booking.canoe_count),
-            },
-        )
-    except stripe.StripeError:
-        current_app.logger.exception(
-            "Stripe Checkout Session creation failed for booking reference %s.",
-            pending_order.public_booking_reference,
-        )
-        db.session.delete(pending_order)
-        db.session.commit()
+    # The hold is committed, so the visitor can move on to Step 3 right away.
+    # The Stripe Checkout Session is created by the background worker and the
+    # pay step waits for it.
+    queue_checkout_session_creation(pending_order.id)
+
+    return build_pending_checkout_response(pending_order)
+
+
+def get_checkout_idempotency_key() -> str | None:
+    """Return the idempotency key sent by ``booking.js`` when it looks valid.
+
+    Requests without a usable key still work; they just cannot be matched to
+    an earlier attempt.
+    """
+
+    checkout_idempotency_key = request.form.get("checkout_idempotency_key", "")
+    checkout_idempotency_key = checkout_idempotency_key.strip()
+    if CHECKOUT_IDEMPOTENCY_KEY_PATTERN.fullmatch(checkout_idempotency_key):
+        return checkout_idempotency_key
+
+    return None
+
+
+def find_checkout_order_by_idempotency_key(
+    checkout_idempotency_key: str | None,
+) -> BookingOrder | None:
+    """Return the order created earlier with the same idempotency key."""
+
+    if checkout_idempotency_key is None:
+        return None
+
+    return BookingOrder.query.filter_by(
+        checkout_idempotency_key=checkout_idempotency_key
+    ).first()
+
+
+def build_checkout_replay_response(replayed_order: BookingOrder):
+    """Return the response for a repeated request with a known idempotency key.
+
+    Returns:
+        The Step 3 response while the earlier order is still a live hold, an
+        error when it is already paid, or ``None`` when it was released and the
+        caller has to decide what happens next.
+    """
+
+    if is_pending_checkout_order(replayed_order) and not is_booking_order_expired(
+        replayed_order
+    ):
+        return build_pending_checkout_response(replayed_order)
+
+    if replayed_order.status == "paid":
         return build_checkout_error_response(
-            "Det gick inte att starta betalningen just nu. Försök igen om en stund.",
-            status_code=502,
+            "Den här bokningen är redan betald.",
+            status_code=409,
+            reload_page=True,
         )
 
-    pending_order.status = "checkout_session_created"
-    pending_order.payment_provider = "stripe_checkout"
-    pending_order.payment_provider_session_id = checkout_session.id
-    db.session.commit()
+    return None
+
+
+def build_pending_checkout_response(pending_order: BookingOrder):
+    """Return the Step 3 response for one pending order.
+
+    Both a new reservation and a replayed request with the same idempotency
+    key use this, so the browser sees the same booking either way.
+    """
 
     session["pending_booking_order_id"] = pending_order.id
     pending_booking_modal_data = build_pending_checkout_modal_data(
@@ -1696,6 +1824,46 @@ def payment():
     return redirect(url_for("main.index", pending_checkout="1"))
 
 
+def get_checkout_session_for_pay_step(booking_order_id: int) -> str:
+    """Wait for the background Checkout Session or create it in this request.
+
+    Returns:
+        str: ``ready``, ``stripe_error``, ``not_pending``, or ``timeout``.
+    """
+
+    wait_result = wait_for_checkout_session(
+        booking_order_id,
+        float(current_app.config.get("CHECKOUT_SESSION_WAIT_SECONDS", 10)),
+    )
+    if wait_result != "unclaimed":
+        return wait_result
+
+    # No worker has started on this order, for example because the process
+    # that queued it restarted. Create the session here instead.
+    creation_result = create_checkout_session_for_booking_order(booking_order_id)
+    if creation_result == "created":
+        return "ready"
+    if creation_result == "stripe_error":
+        return "stripe_error"
+
+    return wait_for_checkout_session(
+        booking_order_id,
+        float(current_app.config.get("CHECKOUT_SESSION_WAIT_SECONDS", 10)),
+    )
+
+
+def release_booking_order_after_failed_checkout(booking_order_id: int) -> None:
+    """Delete one unpaid order whose Stripe Checkout Session could not be made."""
+
+    booking_order = db.session.get(BookingOrder, booking_order_id)
+    if booking_order is None or booking_order.payment_provider_session_id:
+        return
+
+    bump_event_booking_version(booking_order.event_id)
+    db.session.delete(booking_order)
+    db.session.commit()
+
+
 @main_blueprint.route("/checkout/<public_booking_reference>/pay")
 @public_site_access_required
 def start_stripe_checkout(public_booking_reference: str):
@@ -1723,13 +1891,32 @@ def start_stripe_checkout(public_booking_reference: str):
             )
         return redirect(url_for("main.index"))
 
+    if not pending_order.payment_provider_session_id:
+        checkout_session_result = get_checkout_session_for_pay_step(pending_order.id)
+        if checkout_session_result == "stripe_error":
+            release_booking_order_after_failed_checkout(pending_order.id)
+            session.pop("pending_booking_order_id", None)
+            flash(
+                "Det gick inte att starta betalningen just nu. Försök igen om en stund.",
+                "error",
+            )
+            return redirect(url_for("main.index"))
+
+        if checkout_session_result == "not_pending":
+            session.pop("pending_booking_order_id", None)
+            flash("Ordern kunde inte hittas längre. Börja om från startsidan.", "error")
+            return redirect(url_for("main.index"))
+
+        if checkout_session_result != "ready":
+            flash(
+                "Betalningen förbereds fortfarande. Försök igen om några sekunder.",
+                "error",
+            )
+            return redirect(url_for("main.index", pending_checkout="1"))
+
+        pending_order = db.session.get(BookingOrder, pending_order.id)
+
     checkout_session_id = pending_order.payment_provider_session_id
-    if not checkout_session_id:
-        flash(
-            "Betalningen kunde inte startas eftersom Stripe-sessionen saknas.",
-            "error",
-        )
-        return redirect(url_for("main.index", pending_checkout="1"))
 
     try:
         checkout_session = retrieve_stripe_checkout_session(checkout_session_id)
@@ -1966,6 +2153,85 @@ def payment_cancel():
     return redirect(url_for("main.index"))
 
 
+def wait_for_checkout_status_change(
+    public_booking_reference: str,
+    checkout_session_id: str,
+    wait_seconds: int,
+) -> None:
+    """Hold a status request open until its pending booking changes.
+
+    The webhook wakes this request through the booking status notifier as soon
+    as it commits. A short database re-check also runs on every
+    ``BOOKING_STATUS_DB_POLL_SECONDS`` so a change made by a process without a
+    shared Redis channel is still seen. The wait never runs past the local
+    checkout hold, because the normal status code must release expired holds.
+    When ``CHECKOUT_STATUS_MAX_WAITERS`` requests already wait in this
+    process, it returns at once instead.
+
+    Args:
+        public_booking_reference: Booking reference from the return URL.
+        checkout_session_id: Stripe Checkout Session ID from the return URL.
+        wait_seconds: Longest time to hold the request open.
+    """
+
+    booking_order = BookingOrder.query.filter_by(
+        public_booking_reference=public_booking_reference
+    ).first()
+    if (
+        booking_order is None
+        or booking_order.payment_provider_session_id != checkout_session_id
+        or not is_pending_checkout_order(booking_order)
+        or is_booking_order_expired(booking_order)
+    ):
+        return
+
+    booking_order_id = booking_order.id
+    wait_deadline = time.monotonic() + wait_seconds
+    if booking_order.expires_at is not None:
+        expires_at = booking_order.expires_at
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=get_current_utc_time().tzinfo)
+        seconds_until_hold_expires = (
+            expires_at - get_current_utc_time()
+        ).total_seconds()
+        wait_deadline = min(
+            wait_deadline, time.monotonic() + seconds_until_hold_expires
+        )
+
+    database_poll_seconds = max(
+        float(current_app.config.get("BOOKING_STATUS_DB_POLL_SECONDS", 2)), 0.1
+    )
+    booking_status_notifier = get_booking_status_notifier()
+    with booking_status_notifier.watch(booking_order_id) as is_admitted:
+        # Enough requests already hold threads in this process; answer now
+        # and let the page poll again.
+        if not is_admitted:
+            return
+
+        while True:
+            remaining_seconds = wait_deadline - time.monotonic()
+            if remaining_seconds <= 0:
+                return
+
+            # Read the version before the database so a change committed
+            # between the two reads still ends the wait below right away.
+            seen_version = booking_status_notifier.current_version(booking_order_id)
+            # Ending the transaction both shows commits from other requests
+            # and hands the database connection back to the pool while we
+            # sleep.
+            db.session.rollback()
+            booking_order = db.session.get(BookingOrder, booking_order_id)
+            if booking_order is None or not is_pending_checkout_order(booking_order):
+                return
+            db.session.rollback()
+
+            booking_status_notifier.wait_for_change(
+                booking_order_id,
+                seen_version,
+                min(remaining_seconds, database_poll_seconds),
+            )
+
+
 @main_blueprint.route("/api/checkout-status")
 @public_site_access_required
 def stripe_checkout_status():
@@ -1985,6 +2251,16 @@ def stripe_checkout_status():
         )
 
     finalize_failed_confirmation = request.args.get("finalize_failed") == "1"
+    # ``wait`` asks the server to long-poll instead of answering "pending"
+    # straight away. Final reconciliation requests never wait.
+    wait_seconds = min(
+        max(request.args.get("wait", 0, type=int), 0),
+        int(current_app.config.get("CHECKOUT_STATUS_LONG_POLL_MAX_SECONDS", 0)),
+    )
+    if wait_seconds and not finalize_failed_confirmation:
+        wait_for_checkout_status_change(
+            public_booking_reference, checkout_session_id, wait_seconds
+        )
 
     booking_order = BookingOrder.query.filter_by(
         public_booking_reference=public_booking_reference
@@ -2161,12 +2437,24 @@ def stripe_webhook():
         )
         return make_response("Invalid signature.", 400)
 
-    event_type, processing_result = process_stripe_webhook_event(stripe_event)
-    current_app.logger.info(
-        "Processed Stripe webhook event %s with result %s.",
-        event_type,
-        processing_result,
-    )
+    # Store the verified event and answer Stripe right away. The booking
+    # changes happen later in the inbox worker, and a repeated delivery of the
+    # same event ID is dropped by the inbox primary key.
+    inbox_result = store_stripe_webhook_event(stripe_event)
+    if inbox_result == "ignored_missing_event_id":
+        # Real Stripe events always carry an ID. Process anything else inline
+        # so it is not lost, since it cannot be deduplicated in the inbox.
+        event_type, processing_result = process_stripe_webhook_event(stripe_event)
+        current_app.logger.info(
+            "Processed Stripe webhook event %s without event ID with result %s.",
+            event_type,
+            processing_result,
+        )
+        return make_response("", 200)
+
+    current_app.logger.info("Stripe webhook event %s.", inbox_result)
+    if inbox_result == "stored":
+        notify_stripe_webhook_inbox_worker()
     return make_response("", 200)
 
 
@@ -2228,43 +2516,30 @@ def logout():
     return redirect(url_for("main.login"))
 
 
-# MET Norway Weather API endpoint
-MET_API_URL = "https://api.met.no/weatherapi/locationforecast/2.0/compact"
-
-# === Simple weather code to emoji mapping ===
-# You can expand or improve this later to match actual weather symbols from MET Norway
-WEATHER_EMOJIS = {
-    "clearsky": "☀️",
-    "cloudy": "☁️",
-    "fair": "🌤️",
-    "fog": "🌫️",
-    "heavyrain": "🌧️",
-    "lightrain": "🌦️",
-    "rain": "🌧️",
-    "snow": "❄️",
-    "heavysnow": "🌨️",
-    "partlycloudy": "⛅",
-    "thunderstorm": "⛈️",
-}
+MAX_FORECAST_BATCH_DATES = 10
+
+
+def is_iso_date_string(value: str) -> bool:
+    """Return whether one query value is a ``YYYY-MM-DD`` date string."""
+
+    try:
+        return date.fromisoformat(value).isoformat() == value
+    except ValueError:
+        return False
 
 
 @main_blueprint.route("/api/forecast")
 @public_site_access_required
 def get_forecast():
-    """Fetch weather forecast for a specific date.
-
-    Tries to get data starting at 10:00 UTC, using the next 6 hours
-    forecast. If 10:00 is unavailable, uses 12:00 UTC as a fallback.
-    Returns temperature, rain amount and weather icon. The request to the
-    MET Norway API times out after five seconds and network failures
-    produce a ``503`` JSON response.
+    """Return the stored weather forecast for a specific date.
+
+    The forecast is prefetched by the in-process scheduler of each web
+    process (or ``flask refresh-weather``) and stored in
+    ``EventWeatherCache``. This route only reads that local row, so a visitor request never waits on MET Norway.
+    Any date covered by the stored forecast index can be requested.
+    The response includes temperature, rain amount, weather icon, and a
+    ``stale`` flag when the stored forecast is older than its fresh window.
     """
-    headers = {
-        "User-Agent": "PaddlingenEventApp/1.0 (contact@example.com)"  # Required by MET API
-    }
-    latitude, longitude = get_event_coordinates()
-    params = {"lat": latitude, "lon": longitude}
-
     target_date = request.args.get("date")
     if not target_date:
         return (
@@ -2272,65 +2547,82 @@ def get_forecast():
             400,
         )
 
-    try:
-        # A short timeout prevents the API call from hanging indefinitely
-        response = requests.get(MET_API_URL, headers=headers, params=params, timeout=5)
-        response.raise_for_status()
-        data = response.json()
-
-        # Define desired forecast times in UTC (10:00 and fallback 12:00)
-        preferred_times = ["10:00:00Z", "12:00:00Z"]
-
-        selected_entry = None
-        for time_option in preferred_times:
-            target_timestamp = f"{target_date}T{time_option}"
-            for entry in data["properties"]["timeseries"]:
-                if entry["time"] == target_timestamp:
-                    selected_entry = entry
-                    break
-            if selected_entry:
-                break
-
-        if not selected_entry:
-            return (
-                jsonify(
-                    {
-                        "error": "No forecast available at 10:00 or 12:00 UTC for this date."
-                    }
-                ),
-                404,
-            )
+    active_event = get_active_event()
+    weather_cache = active_event.weather_cache if active_event is not None else None
+    if weather_cache is None:
+        return (
+            jsonify({"error": "No forecast has been fetched for the event yet."}),
+            503,
+        )
 
-        # Extract details
-        temp = selected_entry["data"]["instant"]["details"].get("air_temperature")
-        rain = (
-            selected_entry["data"]
-            .get("next_6_hours", {})
-            .get("details", {})
-            .get("precipitation_amount", 0)
-        )
-        symbol_code = (
-            selected_entry["data"]
-            .get("next_6_hours", {})
-            .get("summary", {})
-            .get("symbol_code", "cloudy")
-        )
-        base_symbol = symbol_code.split("_")[0]
-
-        forecast = {
-            "temperature": round(temp) if temp is not None else "N/A",
-            "rainChance": str(rain).replace(".", ","),  # simple approximation
-            "icon": WEATHER_EMOJIS.get(base_symbol, "☁️"),
-        }
-        return jsonify(forecast)
+    parsed_entry = get_stored_forecast_for_date(weather_cache, target_date)
+    if parsed_entry is None:
+        return (
+            jsonify(
+                {"error": "No forecast available at 10:00 or 12:00 UTC for this date."}
+            ),
+            404,
+        )
 
-    except requests.RequestException:
-        # Return a clear message to the client on upstream failures/timeouts
+    forecast_response = build_forecast_response(parsed_entry)
+    forecast_response["stale"] = is_weather_cache_stale(weather_cache)
+    return jsonify(forecast_response)
+
+
+@main_blueprint.route("/api/forecast/batch")
+@public_site_access_required
+def get_forecast_batch():
+    """Return stored forecasts for several dates in one response.
+
+    The home page weather strip asks for the days around the event with
+    ``?dates=YYYY-MM-DD,YYYY-MM-DD``. Dates outside the stored forecast window
+    map to ``null`` so the client can still render the dates it did get.
+    """
+    raw_dates = request.args.get("dates", "")
+    target_dates = [
+        date_value.strip() for date_value in raw_dates.split(",") if date_value.strip()
+    ]
+    if not target_dates:
         return (
-            jsonify({"error": "Weather service unreachable."}),
+            jsonify({"error": "Missing required 'dates' parameter (YYYY-MM-DD,...)."}),
+            400,
+        )
+
+    if len(target_dates) > MAX_FORECAST_BATCH_DATES:
+        return (
+            jsonify(
+                {
+                    "error": (
+                        f"At most {MAX_FORECAST_BATCH_DATES} dates can be requested "
+                        "at once."
+                    )
+                }
+            ),
+            400,
+        )
+
+    if not all(is_iso_date_string(date_value) for date_value in target_dates):
+        return jsonify({"error": "Dates must use the format YYYY-MM-DD."}), 400
+
+    active_event = get_active_event()
+    weather_cache = active_event.weather_cache if active_event is not None else None
+    if weather_cache is None:
+        return (
+            jsonify({"error": "No forecast has been fetched for the event yet."}),
             503,
         )
 
+    forecasts: dict[str, dict[str, object] | None] = {}
+    for date_value in target_dates:
+        parsed_entry = get_stored_forecast_for_date(weather_cache, date_value)
+        forecasts[date_value] = (
+            build_forecast_response(parsed_entry) if parsed_entry is not None else None
+        )
+
+    return jsonify(
+        {"forecasts": forecasts, "stale": is_weather_cache_stale(weather_cache)}
+    )
+
 
 @main_blueprint.route("/admin")
 @login_required
@@ -2339,27 +2631,54 @@ def admin_dashboard():
 
     The page is organized around two primary admin actions: booking management
     and event management. The current active event is used for the summary
-    cards and for the booking list.
+    cards and for the booking list. Summary figures come from each event's
+    ``EventBookingStats`` row instead of counting booking rows. The booking
+    list itself is fetched page by page from ``/admin/api/bookings``, and the
+    event-day checklist only loads the active event's current page of pickup
+    people (``checklist_page``).
     """
-    bookings = get_confirmed_booked_canoes_query().order_by(BookedCanoe.id).all()
     events = Event.query.order_by(Event.event_date.desc()).all()
     active_event = get_active_event()
     selected_event = get_selected_admin_event(request.args.get("event_id", type=int))
-    confirmed_booking_count = len(bookings)
+    active_event_stats = get_event_booking_stats(
+        active_event.id if active_event is not None else None
+    )
+    selected_event_stats = (
+        active_event_stats
+        if selected_event is None or selected_event.id == active_event_stats.event_id
+        else get_event_booking_stats(selected_event.id)
+    )
+    confirmed_booking_count = active_event_stats.confirmed_canoe_count
     available_canoes_total = get_total_available_canoes()
     public_site_access_setting = get_public_site_access_setting()
-    checklist_rows = build_admin_checklist_rows(bookings) if active_event else []
+    checklist_page = (
+        load_admin_checklist_page(
+            active_event.id, request.args.get("checklist_page", 1, type=int)
+        )
+        if active_event is not None
+        else ChecklistPage(rows=[], page_number=1, page_count=1)
+    )
+    # Archived events keep their bookings in the archive tables; show them
+    # read-only so past seasons can still be looked up.
+    archived_booking_rows = (
+        load_archived_booking_history(selected_event.id)
+        if selected_event is not None and selected_event.archived_at is not None
+        else []
+    )
 
     return render_template(
         "admin.html",
-        bookings=bookings,
         events=events,
         active_event=active_event,
         format_swedish_date_display=format_swedish_date_display,
         selected_event=selected_event,
         confirmed_booking_count=confirmed_booking_count,
+        active_event_stats=active_event_stats,
+        selected_event_stats=selected_event_stats,
         available_canoes_total=available_canoes_total,
-        checklist_rows=checklist_rows,
+        checklist_rows=checklist_page.rows,
+        checklist_page=checklist_page,
+        archived_booking_rows=archived_booking_rows,
         create_event_defaults=build_admin_event_copy_defaults(selected_event),
         public_site_password_managed_in_database=public_site_access_setting is not None,
         public_site_password_updated_at=(
@@ -2371,38 +2690,381 @@ def admin_dashboard():
     )
 
 
+@main_blueprint.route("/admin/api/bookings")
+@login_required
+def admin_api_bookings():
+    """Return one page of the active event's confirmed bookings as JSON.
+
+    Query parameters: ``q`` searches pickup names and booking references,
+    ``sort`` is ``id``, ``name``, or ``reference``, ``direction`` is ``asc``
+    or ``desc``, ``limit`` is the page size, and ``cursor`` is the
+    ``next_cursor`` of the previous page. See
+    ``app/util/admin_booking_search.py`` for how pages and search work.
+    """
+
+    page_size = request.args.get("limit", ADMIN_BOOKINGS_PAGE_SIZE, type=int)
+    page_size = min(max(page_size, 1), MAX_ADMIN_BOOKINGS_PAGE_SIZE)
+    active_event = get_active_event()
+    try:
+        booking_page = load_admin_booking_page(
+            active_event.id if active_event is not None else None,
+            search_text=request.args.get("q", ""),
+            sort=request.args.get("sort", "id"),
+            direction=request.args.get("direction", "asc"),
+            cursor=request.args.get("cursor") or None,
+            page_size=page_size,
+        )
+    except ValueError:
+        return jsonify({"error": "Ogiltig sortering eller sidmarkör."}), 400
+
+    return jsonify(
+        {
+            "bookings": [
+                {
+                    "id": booking_row.id,
+                    "public_booking_reference": booking_row.public_booking_reference,
+                    "participant_first_name": booking_row.participant_first_name,
+                    "participant_last_name": booking_row.participant_last_name,
+                    "passenger_two_first_name": booking_row.passenger_two_first_name,
+                    "passenger_two_last_name": booking_row.passenger_two_last_name,
+                    "passenger_three_first_name": (
+                        booking_row.passenger_three_first_name
+                    ),
+                    "passenger_three_last_name": booking_row.passenger_three_last_name,
+                    "payment_method_label": booking_row.payment_method_label,
+                    "booking_source_label": booking_row.booking_source_label,
+                    "update_url": url_for("main.admin_update", id=booking_row.id),
+                    "delete_url": url_for("main.admin_delete", id=booking_row.id),
+                }
+                for booking_row in booking_page.rows
+            ],
+            "next_cursor": booking_page.next_cursor,
+        }
+    )
+
+
+@main_blueprint.route("/admin/export")
+@login_required
+def admin_export_bookings():
+    """Download one event's confirmed bookings as a CSV or XLSX file.
+
+    Query parameters: ``format`` is ``csv`` (default) or ``xlsx`` and
+    ``event_id`` picks the event, defaulting to the active one. Archived
+    events are exported from the archive tables. The file is streamed while
+    rows are read, so large events never sit in memory; see
+    ``app/util/booking_export.py``.
+    """
+
+    export_format = request.args.get("format", "csv")
+    if export_format not in EXPORT_MIMETYPES:
+        abort(400)
+
+    export_event_id = request.args.get("event_id", type=int)
+    export_event = (
+        db.session.get(Event, export_event_id)
+        if export_event_id is not None
+        else get_active_event()
+    )
+    if export_event is None:
+        abort(404)
+
+    export_chunks = iter_booking_export_chunks(
+        export_event.id, export_event.archived_at is not None, export_format
+    )
+    export_filename = build_export_filename(export_event, export_format)
+    return Response(
+        stream_with_context(export_chunks),
+        mimetype=EXPORT_MIMETYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename}"'},
+    )
+
+
+def get_checklist_canoes_query(event_id: int):
+    """Return a query for the confirmed canoes on one event's checklist.
+
+    The event filter is a subquery instead of a join so the query can be used
+    for bulk ``UPDATE`` statements as well as for reads.
+    """
+
+    return BookedCanoe.query.filter(
+        BookedCanoe.status == "confirmed",
+        BookedCanoe.booking_order_id.in_(
+            db.select(BookingOrder.id).where(BookingOrder.event_id == event_id)
+        ),
+    )
+
+
+def set_checklist_picked_up(
+    event_id: int,
+    booked_canoe_ids: set[int],
+    picked_up: bool,
+    checklist_version: int,
+) -> int:
+    """Set ``picked_up`` for the given checklist canoes in one bulk UPDATE.
+
+    Rows that already have the requested value are skipped, so the returned
+    count only includes canoes that really changed. Changed rows are stamped
+    with ``checklist_version`` for the live checklist feed, and the event's
+    picked-up total is adjusted in the same transaction.
+
+    Args:
+        event_id: Event whose checklist is being updated.
+        booked_canoe_ids: Canoe row IDs that should get the new value.
+        picked_up: New checklist state for those canoes.
+        checklist_version: Version from :func:`claim_next_checklist_version`.
+
+    Returns:
+        int: Number of canoe rows that changed.
+    """
+
+    if not booked_canoe_ids:
+        return 0
+
+    updated_count = int(
+        get_checklist_canoes_query(event_id)
+        .filter(
+            BookedCanoe.id.in_(booked_canoe_ids),
+            BookedCanoe.picked_up != picked_up,
+        )
+        .update(
+            {
+                BookedCanoe.picked_up: picked_up,
+                BookedCanoe.checklist_version: checklist_version,
+            },
+            synchronize_session=False,
+        )
+    )
+    apply_event_booking_stats_change(
+        event_id,
+        EventBookingStatsChange(
+            picked_up_count=updated_count if picked_up else -updated_count
+        ),
+    )
+    return updated_count
+
+
+def finish_checklist_update(event_id: int, updated_count: int) -> None:
+    """Commit a checklist save.
+
+    A save that changed nothing is rolled back, so the version bump does not
+    make every open checklist fetch an empty change list.
+    """
+
+    if updated_count == 0:
+        db.session.rollback()
+        return
+
+    db.session.commit()
+
+
+def build_checklist_row_count_payload(
+    event_id: int, booked_canoe_ids: set[int]
+) -> list[dict[str, object]]:
+    """Return JSON-ready counts for the checklist rows of the given canoes."""
+
+    return [
+        {
+            "name": row_count.name,
+            "total_canoes": row_count.total_canoes,
+            "picked_up_count": row_count.picked_up_count,
+        }
+        for row_count in load_checklist_row_counts(event_id, booked_canoe_ids)
+    ]
+
+
 @main_blueprint.route("/admin/checklist", methods=["POST"])
 @login_required
 def admin_update_checklist():
-    """Save the event-day pickup checklist for the active event."""
+    """Save the event-day pickup checklist for the active event.
+
+    This is the no-JavaScript fallback that posts one page of the list. The
+    form lists every canoe shown on that page in ``checklist_booking_ids``, so
+    only those canoes are changed; canoes on other pages keep their state. It
+    still only writes the rows whose checkbox state differs from the database.
+    """
 
     active_event = get_active_event()
     if active_event is None:
         flash("Det finns inget aktivt event att checka av ännu.", "error")
         return redirect(url_for("main.admin_dashboard", panel="checklist"))
 
-    checked_booking_ids: set[int] = set()
-    for booking_id_raw in request.form.getlist("picked_up_booking_ids"):
-        try:
-            checked_booking_ids.add(int(booking_id_raw))
-        except ValueError:
-            flash("Checklistan innehöll ett ogiltigt boknings-id.", "error")
-            return redirect(url_for("main.admin_dashboard", panel="checklist"))
+    checklist_redirect_url = url_for(
+        "main.admin_dashboard",
+        panel="checklist",
+        checklist_page=request.form.get("checklist_page", 1, type=int),
+    )
+    try:
+        shown_booking_ids = {
+            int(booking_id_raw)
+            for booking_id_raw in request.form.getlist("checklist_booking_ids")
+        }
+        checked_booking_ids = {
+            int(booking_id_raw)
+            for booking_id_raw in request.form.getlist("picked_up_booking_ids")
+        }
+    except ValueError:
+        flash("Checklistan innehöll ett ogiltigt boknings-id.", "error")
+        return redirect(checklist_redirect_url)
+    checked_booking_ids &= shown_booking_ids
+
+    active_event_id = active_event.id
+    checklist_version = claim_next_checklist_version(active_event_id)
+    updated_count = set_checklist_picked_up(
+        active_event_id, checked_booking_ids, True, checklist_version
+    )
+    # Everything on the posted page that was not ticked is not picked up.
+    updated_count += set_checklist_picked_up(
+        active_event_id,
+        shown_booking_ids - checked_booking_ids,
+        False,
+        checklist_version,
+    )
 
-    active_event_bookings = (
-        BookedCanoe.query.filter_by(status="confirmed")
-        .join(BookingOrder)
-        .filter(BookingOrder.event_id == active_event.id)
+    finish_checklist_update(active_event_id, updated_count)
+    flash("Checklistan uppdaterades.", "success")
+    return redirect(checklist_redirect_url)
+
+
+MAX_CHECKLIST_CHANGES_PER_REQUEST = 500
+
+
+def parse_checklist_changes(payload: object) -> tuple[set[int], set[int]]:
+    """Split a JSON checklist payload into picked-up and not-picked-up IDs.
+
+    The payload looks like ``{"changes": [{"id": 12, "picked_up": true}]}``.
+    When one ID appears more than once, the last entry wins.
+
+    Args:
+        payload: Decoded JSON request body.
+
+    Returns:
+        tuple[set[int], set[int]]: IDs to tick and IDs to untick.
+
+    Raises:
+        ValueError: If the payload is malformed. The message is Swedish and
+            safe to show in the admin UI.
+    """
+
+    changes = payload.get("changes") if isinstance(payload, dict) else None
+    if not isinstance(changes, list) or not changes:
+        raise ValueError("Inga ändringar i checklistan skickades.")
+    if len(changes) > MAX_CHECKLIST_CHANGES_PER_REQUEST:
+        raise ValueError("För många ändringar i checklistan på en gång.")
+
+    requested_states: dict[int, bool] = {}
+    for change in changes:
+        booking_id = change.get("id") if isinstance(change, dict) else None
+        picked_up = change.get("picked_up") if isinstance(change, dict) else None
+        # ``bool`` is a subclass of ``int``, so compare exact types.
+        if type(booking_id) is not int or type(picked_up) is not bool:
+            raise ValueError("Checklistan innehöll ett ogiltigt boknings-id.")
+        requested_states[booking_id] = picked_up
+
+    picked_up_ids = {
+        booking_id for booking_id, picked_up in requested_states.items() if picked_up
+    }
+    return picked_up_ids, set(requested_states) - picked_up_ids
+
+
+@main_blueprint.route("/admin/api/checklist", methods=["POST"])
+@login_required
+def admin_api_update_checklist():
+    """Apply a batch of checklist ticks sent by the admin dashboard script.
+
+    Only the changed canoe IDs are sent. They are written with at most two
+    bulk UPDATE statements, and the response carries fresh counts for the
+    affected checklist rows so the page can update without reloading.
+    """
+
+    active_event = get_active_event()
+    if active_event is None:
+        return (
+            jsonify({"error": "Det finns inget aktivt event att checka av ännu."}),
+            409,
+        )
+
+    try:
+        picked_up_ids, not_picked_up_ids = parse_checklist_changes(
+            request.get_json(silent=True)
+        )
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+    active_event_id = active_event.id
+    checklist_version = claim_next_checklist_version(active_event_id)
+    updated_count = set_checklist_picked_up(
+        active_event_id, picked_up_ids, True, checklist_version
+    ) + set_checklist_picked_up(
+        active_event_id, not_picked_up_ids, False, checklist_version
+    )
+    finish_checklist_update(active_event_id, updated_count)
+
+    return jsonify(
+        {
+            "updated_count": updated_count,
+            "rows": build_checklist_row_count_payload(
+                active_event_id, picked_up_ids | not_picked_up_ids
+            ),
+        }
+    )
+
+
+@main_blueprint.route("/admin/api/checklist/changes")
+@login_required
+def admin_api_checklist_changes():
+    """Return checklist changes made after the browser's ``since`` version.
+
+    Open checklists poll this every few seconds and answer immediately, so no
+    request ever holds a server thread while it waits for a tick. The ETag
+    holds the checklist and booking versions; a browser that sends it back in
+    ``If-None-Match`` gets an empty ``304`` after one query while nothing has
+    changed. Otherwise only the canoes changed after ``since`` are returned,
+    found through the indexed ``booked_canoes.checklist_version`` column,
+    together with fresh counts for their checklist rows. ``booking_version``
+    tells the page when bookings were added or removed, which needs a full
+    reload to show.
+    """
+
+    active_event = get_active_event()
+    if active_event is None:
+        return (
+            jsonify({"error": "Det finns inget aktivt event att checka av ännu."}),
+            409,
+        )
+
+    active_event_id = active_event.id
+    checklist_version = active_event.checklist_version
+    booking_version = active_event.booking_version
+    feed_etag = f"checklist-{checklist_version}-{booking_version}"
+    if request.if_none_match.contains(feed_etag):
+        not_modified_response = make_response("", 304)
+        not_modified_response.set_etag(feed_etag)
+        return not_modified_response
+
+    since_version = max(request.args.get("since", 0, type=int), 0)
+    changed_canoe_rows = (
+        get_checklist_canoes_query(active_event_id)
+        .filter(BookedCanoe.checklist_version > since_version)
+        .with_entities(BookedCanoe.id, BookedCanoe.picked_up)
         .order_by(BookedCanoe.id)
         .all()
     )
 
-    for booked_canoe in active_event_bookings:
-        booked_canoe.picked_up = booked_canoe.id in checked_booking_ids
-
-    db.session.commit()
-    flash("Checklistan uppdaterades.", "success")
-    return redirect(url_for("main.admin_dashboard", panel="checklist"))
+    feed_response = jsonify(
+        {
+            "version": checklist_version,
+            "booking_version": booking_version,
+            "changes": [
+                {"id": canoe_id, "picked_up": bool(picked_up)}
+                for canoe_id, picked_up in changed_canoe_rows
+            ],
+            "rows": build_checklist_row_count_payload(
+                active_event_id, {canoe_id for canoe_id, _ in changed_canoe_rows}
+            ),
+        }
+    )
+    feed_response.set_etag(feed_etag)
+    return feed_response
 
 
 @main_blueprint.route("/admin/public-site-password", methods=["POST"])
@@ -2519,6 +3181,12 @@ def admin_add():
         status="confirmed",
     )
     db.session.add(booked_canoe)
+    bump_event_booking_version(booking_order.event_id)
+    apply_event_booking_stats_change(
+        booking_order.event_id,
+        build_paid_order_stats_change(booking_order)
+        + build_confirmed_canoe_stats_change(booked_canoe),
+    )
     db.session.commit()
 
     return redirect(url_for("main.admin_dashboard", panel="bookings"))
@@ -2558,6 +3226,7 @@ def admin_update(id):
     booking.passenger_two_last_name = canoe_rider_data["passenger_two_last_name"]
     booking.passenger_three_first_name = canoe_rider_data["passenger_three_first_name"]
     booking.passenger_three_last_name = canoe_rider_data["passenger_three_last_name"]
+    bump_event_booking_version(booking.booking_order.event_id)
     db.session.commit()
     return redirect(url_for("main.admin_dashboard", panel="bookings"))
 
@@ -2575,13 +3244,24 @@ def admin_delete(id):
     if booking is None:
         abort(404)
     parent_order = booking.booking_order
+    stats_change = (
+        build_confirmed_canoe_stats_change(booking, sign=-1)
+        if booking.status == "confirmed"
+        else EventBookingStatsChange()
+    )
+    if parent_order is not None:
+        bump_event_booking_version(parent_order.event_id)
     db.session.delete(booking)
     db.session.flush()
     if (
         parent_order
         and not BookedCanoe.query.filter_by(booking_order_id=parent_order.id).count()
     ):
+        if parent_order.status == "paid":
+            stats_change += build_paid_order_stats_change(parent_order, sign=-1)
         db.session.delete(parent_order)
+    if parent_order is not None:
+        apply_event_booking_stats_change(parent_order.event_id, stats_change)
     db.session.commit()
     return redirect(url_for("main.admin_dashboard", panel="bookings"))
 
@@ -2620,6 +3300,8 @@ def admin_create_event():
         template_values["subtitle"]
     )
     db.session.add(created_event)
+    db.session.flush()
+    ensure_event_booking_stats(created_event.id)
     db.session.commit()
 
     flash("Nytt event skapades från den valda mallen.", "success")
@@ -2676,6 +3358,19 @@ def admin_activate_event(event_id: int):
     if event_to_activate is None:
         abort(404)
 
+    if event_to_activate.archived_at is not None:
+        flash(
+            "Eventet är arkiverat och kan inte göras aktivt igen.",
+            "error",
+        )
+        return redirect(
+            url_for(
+                "main.admin_dashboard",
+                panel="events",
+                event_id=event_to_activate.id,
+            )
+        )
+
     for existing_event in Event.query.all():
         existing_event.is_active = existing_event.id == event_to_activate.id
 
@@ -2693,6 +3388,38 @@ def admin_activate_event(event_id: int):
     )
 
 
+@main_blueprint.route("/admin/stripe-product-images/refresh", methods=["POST"])
+@login_required
+def admin_refresh_stripe_product_images():
+    """Reload the cached Stripe Checkout product image right away.
+
+    The image list is cached per app process. This clears the cache in the
+    process that handles the request and loads the Dashboard product again;
+    other Gunicorn workers pick up the change when their cache entry expires.
+    """
+
+    try:
+        checkout_product_id = get_stripe_checkout_configuration().checkout_product_id
+    except RuntimeError:
+        checkout_product_id = None
+
+    if not checkout_product_id:
+        flash("Ingen Stripe-produkt är konfigurerad för Checkout-bilden.", "error")
+        return redirect(url_for("main.admin_dashboard", panel="events"))
+
+    get_checkout_product_image_cache().clear()
+    if refresh_checkout_product_image_cache(checkout_product_id) is None:
+        flash(
+            "Det gick inte att hämta produktbilden från Stripe just nu. "
+            "Försök igen om en stund.",
+            "error",
+        )
+        return redirect(url_for("main.admin_dashboard", panel="events"))
+
+    flash("Checkout-bilden har hämtats på nytt från Stripe.", "success")
+    return redirect(url_for("main.admin_dashboard", panel="events"))
+
+
 @main_blueprint.app_errorhandler(429)
 def ratelimit_handler(e):
     """Custom handler for rate limit errors (HTTP 429).
@@ -0,0 +1,272 @@
+"""Load the admin bookings list one page at a time.
+
+The admin dashboard used to render every confirmed canoe into the page. The
+bookings panel now asks ``/admin/api/bookings`` for one page at a time, and
+this module builds those pages:
+
+- **Keyset pagination.** Each page ends with a cursor that holds the last
+  row's sort values. The next page continues with ``WHERE (sort, id) > cursor``
+  instead of ``OFFSET``, so page 40 costs the same as page 1 and rows added
+  meanwhile never shift a page.
+- **Search.** Pickup names and booking references are matched by substring.
+  On SQLite the FTS5 trigram table from :mod:`app.util.db_models` answers the
+  search; elsewhere, or for terms shorter than one trigram, a plain ``LIKE``
+  is used, which Postgres speeds up with its trigram indexes.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+
+from .db_models import (
+    BOOKING_SEARCH_TABLE_NAME,
+    BookedCanoe,
+    BookingOrder,
+    db,
+    get_booking_source_label,
+    get_payment_method_label,
+)
+
+ADMIN_BOOKINGS_PAGE_SIZE = 25
+MAX_ADMIN_BOOKINGS_PAGE_SIZE = 100
+# The trigram tokenizer cannot match terms shorter than three characters.
+MIN_INDEXED_SEARCH_LENGTH = 3
+# Sort columns before the canoe ID, which breaks ties so every row has a
+# unique position and the cursor never skips or repeats a row.
+ADMIN_BOOKING_SORT_COLUMNS = {
+    "id": (),
+    "name": (BookedCanoe.normalized_pickup_name,),
+    "reference": (BookingOrder.public_booking_reference,),
+}
+ADMIN_BOOKING_SORT_DIRECTIONS = ("asc", "desc")
+
+
+@dataclass(frozen=True, slots=True)
+class AdminBookingRow:
+    """One confirmed canoe as shown in the admin bookings list."""
+
+    id: int
+    public_booking_reference: str
+    participant_first_name: str
+    participant_last_name: str
+    passenger_two_first_name: str | None
+    passenger_two_last_name: str | None
+    passenger_three_first_name: str | None
+    passenger_three_last_name: str | None
+    payment_method_label: str
+    booking_source_label: str
+
+
+@dataclass(frozen=True, slots=True)
+class AdminBookingPage:
+    """One page of booking rows and the cursor for the next page.
+
+    ``next_cursor`` is ``None`` on the last page.
+    """
+
+    rows: list[AdminBookingRow]
+    next_cursor: str | None
+
+
+def encode_booking_cursor(sort: str, direction: str, sort_values: list) -> str:
+    """Return an opaque, URL-safe cursor for the row after ``sort_values``."""
+
+    cursor_json = json.dumps(
+        {"sort": sort, "direction": direction, "after": sort_values}
+    )
+    return base64.urlsafe_b64encode(cursor_json.encode("utf-8")).decode("ascii")
+
+
+def decode_booking_cursor(cursor: str, sort: str, direction: str) -> list:
+    """Return the sort values stored in a cursor from :func:`encode_booking_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed or was made for another sort.
+    """
+
+    try:
+        cursor_data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (UnicodeError, binascii.Error, json.JSONDecodeError) as error:
+        raise ValueError("The page cursor is not valid.") from error
+
+    if type(cursor_data) is not dict:
+        raise ValueError("The page cursor is not valid.")
+
+    sort_columns = ADMIN_BOOKING_SORT_COLUMNS[sort]
+    sort_values = cursor_data.get("after")
+    if (
+        cursor_data.get("sort") != sort
+        or cursor_data.get("direction") != direction
+        or type(sort_values) is not list
+        or len(sort_values) != len(sort_columns) + 1
+        or type(sort_values[-1]) is not int
+    ):
+        raise ValueError("The page cursor does not match the requested sort.")
+
+    # Every sort column is text. Anything else would reach the row comparison
+    # in SQL and fail there instead of answering 400.
+    for column, sort_value in zip(sort_columns, sort_values, strict=False):
+        if type(sort_value) is not str and not (sort_value is None and column.nullable):
+            raise ValueError("The page cursor is not valid.")
+    return sort_values
+
+
+def has_booking_search_table() -> bool:
+    """Return whether this database has the SQLite FTS5 booking search table."""
+
+    if db.session.get_bind().dialect.name != "sqlite":
+        return False
+
+    return (
+        db.session.execute(
+            db.text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"
+            ),
+            {"name": BOOKING_SEARCH_TABLE_NAME},
+        ).first()
+        is not None
+    )
+
+
+def apply_booking_search(page_query, search_text: str):
+    """Limit ``page_query`` to canoes whose pickup name or reference matches.
+
+    Args:
+        page_query: Select over ``booked_canoes`` joined to ``booking_orders``.
+        search_text: Text typed by the admin. Matching ignores case and
+            surrounding whitespace; empty text leaves the query unchanged.
+    """
+
+    search_term = search_text.strip().casefold()
+    if not search_term:
+        return page_query
+
+    if len(search_term) >= MIN_INDEXED_SEARCH_LENGTH and has_booking_search_table():
+        # Joining (instead of ``id IN (...)``) lets SQLite start from the FTS
+        # matches. With ``IN``, it looped over every order of the event and
+        # checked each match list, which grew quadratically with bookings.
+        search_table = db.table(BOOKING_SEARCH_TABLE_NAME, db.column("rowid"))
+        # A double-quoted FTS5 string is matched as one substring, so the
+        # admin's text is never read as FTS query syntax.
+        fts_phrase = '"' + search_term.replace('"', '""') + '"'
+        return page_query.join(
+            search_table, search_table.c.rowid == BookedCanoe.id
+        ).where(
+            db.text(f"{BOOKING_SEARCH_TABLE_NAME} MATCH :search_phrase").bindparams(
+                search_phrase=fts_phrase
+            )
+        )
+
+    return page_query.where(
+        db.or_(
+            # The stored pickup name is already case-folded.
+            BookedCanoe.normalized_pickup_name.contains(search_term, autoescape=True),
+            BookingOrder.public_booking_reference.icontains(
+                search_term, autoescape=True
+            ),
+        )
+    )
+
+
+def load_admin_booking_page(
+    event_id: int | None,
+    *,
+    search_text: str = "",
+    sort: str = "id",
+    direction: str = "asc",
+    cursor: str | None = None,
+    page_size: int = ADMIN_BOOKINGS_PAGE_SIZE,
+) -> AdminBookingPage:
+    """Return one page of confirmed canoes with one column-only query.
+
+    Args:
+        event_id: Event whose bookings are listed. ``None`` lists every
+            confirmed canoe, like the rest of the admin page before an event
+            exists.
+        search_text: Optional pickup-name or booking-reference search.
+        sort: Key of :data:`ADMIN_BOOKING_SORT_COLUMNS`.
+        direction: ``"asc"`` or ``"desc"``.
+        cursor: ``next_cursor`` of the previous page, or ``None`` for the
+            first page.
+        page_size: Number of rows per page.
+
+    Returns:
+        AdminBookingPage: The rows and the cursor for the next page.
+
+    Raises:
+        ValueError: If the sort, direction, or cursor is not valid.
+    """
+
+    if sort not in ADMIN_BOOKING_SORT_COLUMNS:
+        raise ValueError(f"Unknown sort {sort!r}.")
+    if direction not in ADMIN_BOOKING_SORT_DIRECTIONS:
+        raise ValueError(f"Unknown sort direction {direction!r}.")
+
+    sort_columns = (*ADMIN_BOOKING_SORT_COLUMNS[sort], BookedCanoe.id)
+    is_descending = direction == "desc"
+    page_query = (
+        db.select(
+            BookedCanoe.id,
+            BookingOrder.public_booking_reference,
+            BookingOrder.payment_provider,
+            BookedCanoe.participant_first_name,
+            BookedCanoe.participant_last_name,
+            BookedCanoe.passenger_two_first_name,
+            BookedCanoe.passenger_two_last_name,
+            BookedCanoe.passenger_three_first_name,
+            BookedCanoe.passenger_three_last_name,
+            BookedCanoe.normalized_pickup_name,
+        )
+        .select_from(BookedCanoe)
+        .join(BookingOrder, BookedCanoe.booking_order_id == BookingOrder.id)
+        .where(BookedCanoe.status == "confirmed")
+        .order_by(
+            *[column.desc() if is_descending else column for column in sort_columns]
+        )
+        # One extra row tells whether another page follows.
+        .limit(page_size + 1)
+    )
+    if event_id is not None:
+        page_query = page_query.where(BookingOrder.event_id == event_id)
+
+    page_query = apply_booking_search(page_query, search_text)
+
+    if cursor:
+        sort_values = decode_booking_cursor(cursor, sort, direction)
+        row_position = db.tuple_(*sort_columns)
+        page_query = page_query.where(
+            row_position < db.tuple_(*sort_values)
+            if is_descending
+            else row_position > db.tuple_(*sort_values)
+        )
+
+    result_rows = db.session.execute(page_query).all()
+    page_rows = result_rows[:page_size]
+    next_cursor = None
+    if len(result_rows) > page_size:
+        last_row = page_rows[-1]
+        next_cursor = encode_booking_cursor(
+            sort, direction, [getattr(last_row, column.key) for column in sort_columns]
+        )
+
+    return AdminBookingPage(
+        rows=[
+            AdminBookingRow(
+                id=row.id,
+                public_booking_reference=row.public_booking_reference,
+                participant_first_name=row.participant_first_name,
+                participant_last_name=row.participant_last_name,
+                passenger_two_first_name=row.passenger_two_first_name,
+                passenger_two_last_name=row.passenger_two_last_name,
+                passenger_three_first_name=row.passenger_three_first_name,
+                passenger_three_last_name=row.passenger_three_last_name,
+                payment_method_label=get_payment_method_label(row.payment_provider),
+                booking_source_label=get_booking_source_label(row.payment_provider),
+            )
+            for row in page_rows
+        ],
+        next_cursor=next_cursor,
+    )
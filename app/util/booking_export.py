@@ -0,0 +1,302 @@
+"""Stream an event's bookings as CSV or XLSX without loading them all.
+
+``/admin/export`` and ``flask export-bookings`` both use
+:func:`iter_booking_export_chunks`. Rows come from one column-only query read
+with ``yield_per``, which uses a server-side cursor on Postgres, and are turned
+into file bytes batch by batch. Memory use therefore stays the same whether an
+event has fifty canoes or a hundred thousand.
+
+The layout follows the grouped pickup-person view from
+:mod:`app.util.booking_groups`: canoes are ordered by the pickup person's
+first booking, each row repeats the person's name and canoe count, and canoes
+are numbered "Kanot 1", "Kanot 2", ... within the person. Window functions
+compute the count and number in SQL, so no group has to be held in memory.
+
+XLSX files are written with the standard library: the workbook is a ZIP
+archive whose worksheet XML is compressed into a write-only sink while rows
+arrive. Cells use inline strings instead of a shared-strings table, which
+would need every distinct name in memory before the first byte is sent.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import re
+import zipfile
+from collections.abc import Iterator
+from typing import Any
+from xml.sax.saxutils import escape
+
+from .booking_groups import build_pickup_person_name_expression
+from .db_models import (
+    ArchivedBookedCanoe,
+    ArchivedBookingOrder,
+    BookedCanoe,
+    BookingOrder,
+    Event,
+    db,
+    get_payment_method_label,
+)
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_MIMETYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+EXPORT_COLUMN_TITLES = (
+    "Ansvarig vid uthämtning",
+    "Antal kanoter",
+    "Kanot",
+    "Paddlare",
+    "Bokningsreferens",
+    "Betalsätt",
+    "Hämtad",
+)
+# Swedish Excel expects semicolons between CSV columns and a byte order mark
+# to read the file as UTF-8 (å, ä, ö).
+CSV_DELIMITER = ";"
+CSV_BYTE_ORDER_MARK = "\ufeff"
+# Cells starting with these characters run as formulas in spreadsheet apps.
+# Names come from the public booking form, so they are prefixed with ``'``.
+SPREADSHEET_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+# XML 1.0 cannot contain most control characters, even escaped.
+INVALID_XML_CHARACTERS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" '
+    'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    "</Types>"
+)
+XLSX_ROOT_RELATIONSHIPS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+    'relationships"><Relationship Id="rId1" Type="http://schemas.openxmlformats'
+    '.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/></Relationships>'
+)
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/'
+    'relationships"><sheets><sheet name="Bokningar" sheetId="1" r:id="rId1"/>'
+    "</sheets></workbook>"
+)
+XLSX_WORKBOOK_RELATIONSHIPS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+    'relationships"><Relationship Id="rId1" Type="http://schemas.openxmlformats'
+    '.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/></Relationships>'
+)
+XLSX_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    "<sheetData>"
+)
+XLSX_SHEET_END = "</sheetData></worksheet>"
+
+
+def build_export_filename(event: Event, export_format: str) -> str:
+    """Return the download file name for one event's export."""
+
+    return f"paddlingen-bokningar-{event.event_date.isoformat()}.{export_format}"
+
+
+def iter_booking_export_rows(event_id: int, archived: bool) -> Iterator[tuple]:
+    """Yield one spreadsheet row per confirmed canoe of an event.
+
+    Args:
+        event_id: Event to export.
+        archived: Read from the archive tables, for events moved there by
+            ``flask archive-event``.
+
+    Yields:
+        tuple: Values in the order of :data:`EXPORT_COLUMN_TITLES`.
+    """
+
+    order_model = ArchivedBookingOrder if archived else BookingOrder
+    canoe_model = ArchivedBookedCanoe if archived else BookedCanoe
+    pickup_person_name = build_pickup_person_name_expression(canoe_model)
+    export_query = (
+        db.select(
+            pickup_person_name.label("pickup_person_name"),
+            db.func.count()
+            .over(partition_by=pickup_person_name)
+            .label("group_canoe_count"),
+            db.func.row_number()
+            .over(partition_by=pickup_person_name, order_by=canoe_model.id)
+            .label("canoe_number"),
+            canoe_model.participant_first_name,
+            canoe_model.participant_last_name,
+            canoe_model.passenger_two_first_name,
+            canoe_model.passenger_two_last_name,
+            canoe_model.passenger_three_first_name,
+            canoe_model.passenger_three_last_name,
+            canoe_model.picked_up,
+            order_model.public_booking_reference,
+            order_model.payment_provider,
+        )
+        .select_from(canoe_model)
+        .join(order_model, canoe_model.booking_order_id == order_model.id)
+        .where(order_model.event_id == event_id, canoe_model.status == "confirmed")
+        # Same group order as the public participant overview.
+        .order_by(
+            db.func.min(canoe_model.id).over(partition_by=pickup_person_name),
+            canoe_model.id,
+        )
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+    for export_row in db.session.execute(export_query):
+        yield (
+            export_row.pickup_person_name or "Unnamed participant",
+            int(export_row.group_canoe_count),
+            f"Kanot {export_row.canoe_number}",
+            BookedCanoe.build_display_rider_names(
+                export_row.participant_first_name,
+                export_row.participant_last_name,
+                export_row.passenger_two_first_name,
+                export_row.passenger_two_last_name,
+                export_row.passenger_three_first_name,
+                export_row.passenger_three_last_name,
+            ),
+            export_row.public_booking_reference,
+            get_payment_method_label(export_row.payment_provider),
+            "Ja" if export_row.picked_up else "Nej",
+        )
+
+
+def iter_in_batches(rows: Iterator[tuple]) -> Iterator[list[tuple]]:
+    """Yield lists of up to :data:`EXPORT_BATCH_SIZE` rows."""
+
+    batch: list[tuple] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == EXPORT_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def neutralize_spreadsheet_formula(value: Any) -> Any:
+    """Return ``value`` so a spreadsheet shows it as text, never as a formula."""
+
+    if isinstance(value, str) and value.startswith(SPREADSHEET_FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def iter_csv_chunks(rows: Iterator[tuple]) -> Iterator[bytes]:
+    """Yield a UTF-8 CSV file, one encoded chunk per batch of rows."""
+
+    text_buffer = io.StringIO()
+    csv_writer = csv.writer(text_buffer, delimiter=CSV_DELIMITER)
+    text_buffer.write(CSV_BYTE_ORDER_MARK)
+    csv_writer.writerow(EXPORT_COLUMN_TITLES)
+    for batch in iter_in_batches(rows):
+        csv_writer.writerows(
+            [neutralize_spreadsheet_formula(value) for value in row] for row in batch
+        )
+        yield text_buffer.getvalue().encode("utf-8")
+        text_buffer.seek(0)
+        text_buffer.truncate()
+
+    if text_buffer.tell():
+        yield text_buffer.getvalue().encode("utf-8")
+
+
+class StreamingZipSink:
+    """Write-only file object that collects bytes until they are drained.
+
+    ``zipfile`` writes to objects without ``seek``/``tell`` by adding a data
+    descriptor after each member, so the archive can be sent while it is
+    still being written.
+    """
+
+    def __init__(self) -> None:
+        self.pending_chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        """Keep one written chunk until the next :meth:`drain`."""
+
+        self.pending_chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        """Do nothing; bytes are handed on by :meth:`drain`."""
+
+    def drain(self) -> bytes:
+        """Return and forget every chunk written since the last call."""
+
+        drained_bytes = b"".join(self.pending_chunks)
+        self.pending_chunks.clear()
+        return drained_bytes
+
+
+def build_xlsx_row(values: tuple) -> str:
+    """Return one ``<row>`` element with inline-string or number cells."""
+
+    cells = []
+    for value in values:
+        if isinstance(value, int) and not isinstance(value, bool):
+            cells.append(f"<c><v>{value}</v></c>")
+        else:
+            cell_text = escape(INVALID_XML_CHARACTERS.sub("", str(value)))
+            cells.append(
+                f'<c t="inlineStr"><is><t xml:space="preserve">{cell_text}</t></is></c>'
+            )
+    return f"<row>{''.join(cells)}</row>"
+
+
+def iter_xlsx_chunks(rows: Iterator[tuple]) -> Iterator[bytes]:
+    """Yield a one-sheet XLSX workbook, one chunk per batch of rows."""
+
+    zip_sink = StreamingZipSink()
+    with zipfile.ZipFile(zip_sink, "w", compression=zipfile.ZIP_DEFLATED) as workbook:
+        workbook.writestr("[Content_Types].xml", XLSX_CONTENT_TYPES)
+        workbook.writestr("_rels/.rels", XLSX_ROOT_RELATIONSHIPS)
+        workbook.writestr("xl/workbook.xml", XLSX_WORKBOOK)
+        workbook.writestr("xl/_rels/workbook.xml.rels", XLSX_WORKBOOK_RELATIONSHIPS)
+        with workbook.open("xl/worksheets/sheet1.xml", "w") as sheet_file:
+            sheet_file.write(XLSX_SHEET_START.encode("utf-8"))
+            sheet_file.write(build_xlsx_row(EXPORT_COLUMN_TITLES).encode("utf-8"))
+            for batch in iter_in_batches(rows):
+                sheet_file.write(
+                    "".join(build_xlsx_row(row) for row in batch).encode("utf-8")
+                )
+                yield zip_sink.drain()
+            sheet_file.write(XLSX_SHEET_END.encode("utf-8"))
+    # Closing the archive writes the central directory.
+    yield zip_sink.drain()
+
+
+def iter_booking_export_chunks(
+    event_id: int, archived: bool, export_format: str
+) -> Iterator[bytes]:
+    """Yield one event's export file as bytes, ready to stream.
+
+    Args:
+        event_id: Event to export.
+        archived: Whether the event's bookings are in the archive tables.
+        export_format: ``"csv"`` or ``"xlsx"``.
+
+    Raises:
+        ValueError: If ``export_format`` is not supported.
+    """
+
+    if export_format not in EXPORT_MIMETYPES:
+        raise ValueError(f"Unknown export format {export_format!r}.")
+
+    export_rows = iter_booking_export_rows(event_id, archived)
+    if export_format == "csv":
+        return iter_csv_chunks(export_rows)
+    return iter_xlsx_chunks(export_rows)
@@ -7,10 +7,12 @@ rows in a clearer way.
 
 from __future__ import annotations
 
+import math
+from collections.abc import Iterable
 from dataclasses import dataclass
-from typing import Iterable
+from itertools import groupby
 
-from .db_models import BookedCanoe
+from .db_models import BookedCanoe, BookingOrder, db
 
 
 @dataclass(frozen=True)
@@ -31,19 +33,25 @@ class GroupedCanoeDetail:
     picked_up: bool
 
 
-@dataclass(frozen=True)
-class GroupedBookingOverviewRow:
-    """One grouped row in the public participant overview."""
+@dataclass(frozen=True, slots=True)
+class OverviewCanoeLine:
+    """One canoe line under a row in the public participant overview."""
 
-    name: str
-    canoe_count: int
-    canoe_details: tuple[GroupedCanoeDetail, ...]
+    canoe_label: str
+    display_rider_names: str
 
-    @property
-    def pickup_person_name(self) -> str:
-        """Return the group's pickup-person name with a clearer label."""
 
-        return self.name
+@dataclass(frozen=True, slots=True)
+class OverviewGroupRow:
+    """One pickup person in the public participant overview.
+
+    Built straight from a narrow column query, so large events do not need one
+    full ``BookedCanoe`` object per canoe just to show names.
+    """
+
+    name: str
+    canoe_count: int
+    canoe_details: tuple[OverviewCanoeLine, ...]
 
 
 @dataclass(frozen=True)
@@ -77,6 +85,28 @@ class ChecklistRow:
         return self.total_canoes > 0 and self.picked_up_count == self.total_canoes
 
 
+@dataclass(frozen=True, slots=True)
+class ChecklistRowCount:
+    """Fresh pickup counts for one checklist row after a checklist update."""
+
+    name: str
+    total_canoes: int
+    picked_up_count: int
+
+
+@dataclass(frozen=True, slots=True)
+class ChecklistPage:
+    """One page of the admin event-day checklist.
+
+    Pages hold whole pickup people, so a person's canoes are never split
+    across two pages.
+    """
+
+    rows: list[ChecklistRow]
+    page_number: int
+    page_count: int
+
+
 @dataclass
 class GroupedRowState:
     """Mutable row state used while grouping overview and checklist rows."""
@@ -147,20 +177,88 @@ def group_bookings_by_pickup_person(
     return list(grouped_rows.values())
 
 
-def build_grouped_booking_overview_rows(
-    bookings: Iterable[BookedCanoe],
-) -> list[GroupedBookingOverviewRow]:
-    """Group confirmed canoe rows by pickup person for the public overview."""
+def build_pickup_person_name_expression(canoe_model=BookedCanoe):
+    """Return an SQL expression matching ``BookedCanoe.pickup_person_name``.
 
-    overview_rows: list[GroupedBookingOverviewRow] = []
+    Grouping by this expression in the database gives the same groups as
+    :func:`group_bookings_by_pickup_person` does in Python.
 
-    for row_state in group_bookings_by_pickup_person(bookings):
-        assert row_state.bookings is not None
+    Args:
+        canoe_model: ``BookedCanoe`` or ``ArchivedBookedCanoe``, which share
+            the name columns.
+    """
+
+    text_type = db.String()
+    return db.func.trim(
+        db.func.trim(canoe_model.participant_first_name, type_=text_type)
+        + " "
+        + db.func.trim(canoe_model.participant_last_name, type_=text_type),
+        type_=text_type,
+    )
+
+
+def load_public_booking_overview_rows(
+    event_id: int | None,
+) -> list[OverviewGroupRow]:
+    """Load the public participant overview with one narrow, pre-sorted query.
+
+    The database groups canoes by pickup-person name and orders the groups by
+    their first booked canoe, which matches the first-seen order used by
+    :func:`group_bookings_by_pickup_person`. Only the name and ID columns are
+    selected.
+
+    Args:
+        event_id: Event whose confirmed canoes should be listed, or ``None``
+            to list confirmed canoes from every event.
+
+    Returns:
+        list[OverviewGroupRow]: One compact row per pickup person.
+    """
+
+    pickup_person_name = build_pickup_person_name_expression()
+    overview_query = (
+        db.session.query(
+            pickup_person_name.label("pickup_person_name"),
+            BookedCanoe.participant_first_name,
+            BookedCanoe.participant_last_name,
+            BookedCanoe.passenger_two_first_name,
+            BookedCanoe.passenger_two_last_name,
+            BookedCanoe.passenger_three_first_name,
+            BookedCanoe.passenger_three_last_name,
+        )
+        .join(BookingOrder, BookedCanoe.booking_order_id == BookingOrder.id)
+        .filter(BookedCanoe.status == "confirmed")
+    )
+    if event_id is not None:
+        overview_query = overview_query.filter(BookingOrder.event_id == event_id)
+
+    overview_rows: list[OverviewGroupRow] = []
+    ordered_canoe_rows = overview_query.order_by(
+        db.func.min(BookedCanoe.id).over(partition_by=pickup_person_name),
+        BookedCanoe.id,
+    )
+    for group_name, group_canoe_rows in groupby(
+        ordered_canoe_rows, key=lambda canoe_row: canoe_row.pickup_person_name
+    ):
+        canoe_lines = tuple(
+            OverviewCanoeLine(
+                canoe_label=f"Kanot {canoe_number}",
+                display_rider_names=BookedCanoe.build_display_rider_names(
+                    canoe_row.participant_first_name,
+                    canoe_row.participant_last_name,
+                    canoe_row.passenger_two_first_name,
+                    canoe_row.passenger_two_last_name,
+                    canoe_row.passenger_three_first_name,
+                    canoe_row.passenger_three_last_name,
+                ),
+            )
+            for canoe_number, canoe_row in enumerate(group_canoe_rows, start=1)
+        )
         overview_rows.append(
-            GroupedBookingOverviewRow(
-                name=row_state.name,
-                canoe_count=len(row_state.bookings),
-                canoe_details=build_grouped_canoe_details(row_state.bookings),
+            OverviewGroupRow(
+                name=group_name or "Unnamed participant",
+                canoe_count=len(canoe_lines),
+                canoe_details=canoe_lines,
             )
         )
 
@@ -199,3 +297,136 @@ def build_admin_checklist_rows(bookings: Iterable[BookedCanoe]) -> list[Checklis
         )
 
     return checklist_rows
+
+
+ADMIN_CHECKLIST_PAGE_SIZE = 50
+
+
+def load_admin_checklist_page(event_id: int, page_number: int) -> ChecklistPage:
+    """Load one page of an event's checklist, at most a page of pickup people.
+
+    The first query pages over the pickup-person groups in the database, in
+    the same first-booking order as the public overview, and counts the groups
+    with a window function. Only the canoes of the people on the requested
+    page are then loaded, so opening the admin dashboard does not read every
+    canoe of a large event.
+
+    Args:
+        event_id: Event whose confirmed canoes make up the checklist.
+        page_number: 1-based page number. Numbers past the last page show the
+            last page.
+
+    Returns:
+        ChecklistPage: The rows on the page and the total number of pages.
+    """
+
+    pickup_person_name = build_pickup_person_name_expression()
+    page_number = max(page_number, 1)
+
+    def load_group_page(requested_page: int) -> list:
+        return (
+            db.session.query(
+                pickup_person_name.label("pickup_person_name"),
+                db.func.count().over().label("group_count"),
+            )
+            .join(BookingOrder, BookedCanoe.booking_order_id == BookingOrder.id)
+            .filter(
+                BookedCanoe.status == "confirmed",
+                BookingOrder.event_id == event_id,
+            )
+            .group_by(pickup_person_name)
+            .order_by(db.func.min(BookedCanoe.id))
+            .limit(ADMIN_CHECKLIST_PAGE_SIZE)
+            .offset((requested_page - 1) * ADMIN_CHECKLIST_PAGE_SIZE)
+            .all()
+        )
+
+    group_rows = load_group_page(page_number)
+    if not group_rows and page_number > 1:
+        # The offset ran past the end, so there is no count to read. Go back
+        # to the first page to find it, then load the real last page.
+        first_page_rows = load_group_page(1)
+        if not first_page_rows:
+            return ChecklistPage(rows=[], page_number=1, page_count=1)
+        page_number = math.ceil(
+            first_page_rows[0].group_count / ADMIN_CHECKLIST_PAGE_SIZE
+        )
+        group_rows = load_group_page(page_number)
+    if not group_rows:
+        return ChecklistPage(rows=[], page_number=1, page_count=1)
+
+    page_pickup_names = [group_row.pickup_person_name for group_row in group_rows]
+    page_bookings = (
+        BookedCanoe.query.join(
+            BookingOrder, BookedCanoe.booking_order_id == BookingOrder.id
+        )
+        .filter(
+            BookedCanoe.status == "confirmed",
+            BookingOrder.event_id == event_id,
+            pickup_person_name.in_(page_pickup_names),
+        )
+        .order_by(BookedCanoe.id)
+        .all()
+    )
+
+    return ChecklistPage(
+        rows=build_admin_checklist_rows(page_bookings),
+        page_number=page_number,
+        page_count=math.ceil(group_rows[0].group_count / ADMIN_CHECKLIST_PAGE_SIZE),
+    )
+
+
+def load_checklist_row_counts(
+    event_id: int, booked_canoe_ids: Iterable[int]
+) -> list[ChecklistRowCount]:
+    """Return checklist counts for the rows that contain the given canoes.
+
+    Only pickup people who own one of ``booked_canoe_ids`` are counted. The
+    indexed ``normalized_pickup_name`` column narrows the scan to those people
+    before the database groups by the displayed name, so the work follows the
+    number of changed canoes rather than the size of the event.
+
+    Args:
+        event_id: Event whose confirmed canoes make up the checklist.
+        booked_canoe_ids: Canoe row IDs whose checklist rows should be counted.
+
+    Returns:
+        list[ChecklistRowCount]: One entry per affected checklist row.
+    """
+
+    booked_canoe_ids = list(booked_canoe_ids)
+    if not booked_canoe_ids:
+        return []
+
+    pickup_person_name = build_pickup_person_name_expression()
+    changed_normalized_names = db.select(BookedCanoe.normalized_pickup_name).where(
+        BookedCanoe.id.in_(booked_canoe_ids)
+    )
+    changed_pickup_names = db.select(pickup_person_name).where(
+        BookedCanoe.id.in_(booked_canoe_ids)
+    )
+    row_count_query = (
+        db.session.query(
+            pickup_person_name,
+            db.func.count(BookedCanoe.id),
+            db.func.sum(db.case((BookedCanoe.picked_up.is_(True), 1), else_=0)),
+        )
+        .join(BookingOrder, BookedCanoe.booking_order_id == BookingOrder.id)
+        .filter(
+            BookedCanoe.status == "confirmed",
+            BookingOrder.event_id == event_id,
+            BookedCanoe.normalized_pickup_name.in_(changed_normalized_names),
+            pickup_person_name.in_(changed_pickup_names),
+        )
+        .group_by(pickup_person_name)
+        .order_by(pickup_person_name)
+    )
+
+    return [
+        ChecklistRowCount(
+            name=row_name or "Unnamed participant",
+            total_canoes=int(total_canoes),
+            picked_up_count=int(picked_up_count or 0),
+        )
+        for row_name, total_canoes, picked_up_count in row_count_query.all()
+    ]
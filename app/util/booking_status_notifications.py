@@ -0,0 +1,222 @@
+"""Wake waiting payment-return requests as soon as a booking changes.
+
+After Stripe sends the visitor back, ``/api/checkout-status`` can hold the
+request open until the webhook has confirmed the booking. The code that
+commits the change calls :func:`publish_booking_status_change`, which:
+
+1. bumps a per-order version and notifies a ``threading.Condition``, so
+   waiting requests in the same process wake up at once, and
+2. publishes the order ID on a Redis channel when one is configured, so a
+   listener thread in every other Gunicorn worker does step 1 there as well.
+
+Without Redis, waiting requests in other processes still re-read the database
+every ``BOOKING_STATUS_DB_POLL_SECONDS``, so a change is never missed, only
+noticed a little later.
+
+Every waiting request keeps one Gunicorn thread busy, so each process admits
+at most ``CHECKOUT_STATUS_MAX_WAITERS`` of them through
+:meth:`BookingStatusNotifier.watch`. Requests over the cap answer at once and
+the page polls again a moment later. Versions are only kept for orders that
+somebody is waiting on, so the notifier never grows with the number of
+bookings.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+BOOKING_STATUS_NOTIFIER_EXTENSION_KEY = "paddlingen_booking_status_notifier"
+BOOKING_STATUS_REDIS_CHANNEL = "paddlingen:booking-status"
+
+# Pause before the Redis listener reconnects after a connection error.
+BOOKING_STATUS_LISTENER_RETRY_SECONDS = 5
+
+
+class BookingStatusNotifier:
+    """Track booking changes in this process and share them across processes.
+
+    Args:
+        redis_url: Redis URL used for the cross-process channel, or ``None``
+            to notify only requests in this process.
+        channel: Redis channel the changed IDs are published on.
+        max_waiters: Most requests that may wait at once in this process, or
+            ``None`` for no limit.
+    """
+
+    def __init__(
+        self,
+        redis_url: str | None = None,
+        channel: str = BOOKING_STATUS_REDIS_CHANNEL,
+        max_waiters: int | None = None,
+    ) -> None:
+        self.redis_url = redis_url
+        self.channel = channel
+        self.max_waiters = max_waiters
+        self._condition = threading.Condition()
+        self._versions: dict[int, int] = {}
+        self._waiter_counts: dict[int, int] = {}
+        self._redis_client = None
+        self._listener_thread: threading.Thread | None = None
+
+    def current_version(self, booking_order_id: int) -> int:
+        """Return how many changes this process has seen for one order."""
+
+        with self._condition:
+            return self._versions.get(booking_order_id, 0)
+
+    @contextmanager
+    def watch(self, booking_order_id: int) -> Iterator[bool]:
+        """Register one waiting request for an order while the block runs.
+
+        Changes are only counted for watched orders, and an order's version
+        is dropped when its last waiter leaves. Register before reading
+        :meth:`current_version` so no change can slip in between.
+
+        Yields:
+            bool: ``False`` when this process already has ``max_waiters``
+            waiting requests; the caller should answer without waiting.
+        """
+
+        with self._condition:
+            if (
+                self.max_waiters is not None
+                and sum(self._waiter_counts.values()) >= self.max_waiters
+            ):
+                is_admitted = False
+            else:
+                is_admitted = True
+                self._waiter_counts[booking_order_id] = (
+                    self._waiter_counts.get(booking_order_id, 0) + 1
+                )
+
+        if not is_admitted:
+            yield False
+            return
+
+        try:
+            yield True
+        finally:
+            with self._condition:
+                remaining_waiters = self._waiter_counts[booking_order_id] - 1
+                if remaining_waiters:
+                    self._waiter_counts[booking_order_id] = remaining_waiters
+                else:
+                    del self._waiter_counts[booking_order_id]
+                    self._versions.pop(booking_order_id, None)
+
+    def notify_local(self, booking_order_id: int) -> None:
+        """Wake the requests in this process that wait on one order."""
+
+        with self._condition:
+            if booking_order_id not in self._waiter_counts:
+                return
+            self._versions[booking_order_id] = (
+                self._versions.get(booking_order_id, 0) + 1
+            )
+            self._condition.notify_all()
+
+    def wait_for_change(
+        self,
+        booking_order_id: int,
+        since_version: int,
+        timeout_seconds: float,
+    ) -> bool:
+        """Block until the order's version moves past ``since_version``.
+
+        Returns:
+            bool: ``True`` when a change was signalled, ``False`` on timeout.
+        """
+
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._versions.get(booking_order_id, 0) > since_version,
+                timeout=timeout_seconds,
+            )
+
+    def publish(self, booking_order_id: int) -> None:
+        """Notify this process and, when configured, every other process."""
+
+        self.notify_local(booking_order_id)
+        if not self.redis_url:
+            return
+
+        import redis
+
+        try:
+            if self._redis_client is None:
+                self._redis_client = redis.Redis.from_url(self.redis_url)
+            self._redis_client.publish(self.channel, str(booking_order_id))
+        except redis.RedisError:
+            # Other processes fall back to their database checks.
+            logger.warning(
+                "Could not publish booking status change for order id=%s.",
+                booking_order_id,
+                exc_info=True,
+            )
+
+    def start_listener(self) -> None:
+        """Start the Redis listener thread once, when Redis is configured."""
+
+        if not self.redis_url or self._listener_thread is not None:
+            return
+
+        self._listener_thread = threading.Thread(
+            target=self.listen_forever,
+            name=f"{self.channel}-listener",
+            daemon=True,
+        )
+        self._listener_thread.start()
+
+    def listen_forever(self) -> None:
+        """Forward order IDs from the Redis channel to local waiters."""
+
+        import redis
+
+        while True:
+            try:
+                redis_client = redis.Redis.from_url(str(self.redis_url))
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    message_data = message.get("data")
+                    if isinstance(message_data, bytes):
+                        message_data = message_data.decode("utf-8")
+                    if str(message_data).isdigit():
+                        self.notify_local(int(message_data))
+            except redis.RedisError:
+                logger.warning(
+                    "Booking status listener lost its Redis connection.",
+                    exc_info=True,
+                )
+            time.sleep(BOOKING_STATUS_LISTENER_RETRY_SECONDS)
+
+
+def get_booking_status_notifier() -> BookingStatusNotifier:
+    """Return the payment status notifier of the current Flask application."""
+
+    extensions = current_app.extensions
+    notifier = extensions.get(BOOKING_STATUS_NOTIFIER_EXTENSION_KEY)
+    if notifier is None:
+        notifier = BookingStatusNotifier(
+            redis_url=current_app.config.get("BOOKING_STATUS_REDIS_URL") or None,
+            channel=BOOKING_STATUS_REDIS_CHANNEL,
+            max_waiters=current_app.config.get("CHECKOUT_STATUS_MAX_WAITERS"),
+        )
+        extensions[BOOKING_STATUS_NOTIFIER_EXTENSION_KEY] = notifier
+        notifier.start_listener()
+
+    return notifier
+
+
+def publish_booking_status_change(booking_order_id: int) -> None:
+    """Announce that one booking order changed. Call this after the commit."""
+
+    get_booking_status_notifier().publish(booking_order_id)
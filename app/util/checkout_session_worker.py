@@ -0,0 +1,319 @@
+"""Create Stripe Checkout Sessions in the background for pending bookings.
+
+The booking request only needs the local hold to be committed before it can
+answer the visitor. Calling Stripe inside that request would keep a Gunicorn
+thread busy for the whole Stripe round trip, so under a rush the booking
+throughput would be limited by Stripe latency instead of by the database.
+
+``/create-checkout-session`` therefore commits the hold, hands the order ID to
+the per-process :class:`CheckoutSessionWorker`, and returns right away. The
+"pay" step waits briefly for the session and creates it itself if no worker
+has picked the order up, for example after a worker restart.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+
+import stripe
+from flask import Flask, current_app
+
+from .checkout_preparation import (
+    build_stripe_receipt_description,
+    prepare_server_side_checkout_booking,
+)
+from .db_models import BookingOrder, db, get_current_utc_time
+from .stripe_helpers import create_stripe_checkout_session
+
+logger = logging.getLogger(__name__)
+
+CHECKOUT_SESSION_WORKER_EXTENSION_KEY = "paddlingen_checkout_session_worker"
+
+# Status used while one thread owns the Stripe call for an order. The claim is
+# a conditional UPDATE, so the background worker and the pay-step fallback can
+# never create two sessions for the same order at once. The claim carries a
+# timestamp and expires after CHECKOUT_SESSION_CLAIM_TIMEOUT_SECONDS, so an
+# order whose thread died mid-call can be taken over.
+CHECKOUT_SESSION_CREATING_STATUS = "creating_checkout_session"
+
+# Upper bound for one sleep while the pay step waits. Jobs in this process wake
+# the waiter right away; this only limits how late a job finished by another
+# Gunicorn worker is noticed.
+CHECKOUT_SESSION_WAIT_POLL_SECONDS = 0.25
+
+
+def get_stale_checkout_session_claim_cutoff() -> datetime:
+    """Return the time before which a Checkout Session claim has expired."""
+
+    return get_current_utc_time() - timedelta(
+        seconds=float(
+            current_app.config.get("CHECKOUT_SESSION_CLAIM_TIMEOUT_SECONDS", 90)
+        )
+    )
+
+
+def is_checkout_session_claim_stale(booking_order: BookingOrder) -> bool:
+    """Return whether an order's creating claim is old enough to take over."""
+
+    claimed_at = booking_order.checkout_session_claimed_at
+    if claimed_at is None:
+        return True
+    if claimed_at.tzinfo is None:
+        # SQLite returns naive datetimes; every stored timestamp is UTC.
+        claimed_at = claimed_at.replace(tzinfo=UTC)
+    return claimed_at < get_stale_checkout_session_claim_cutoff()
+
+
+def claim_booking_order_for_checkout_session(booking_order_id: int) -> datetime | None:
+    """Atomically move one order to the creating state and stamp the claim.
+
+    A pending order is claimed, and so is an order whose earlier claim has
+    expired.
+
+    Returns:
+        datetime | None: The claim timestamp when this caller now owns the
+        Stripe call, otherwise ``None``.
+    """
+
+    claimed_at = get_current_utc_time()
+    claimed_row_count = BookingOrder.query.filter(
+        BookingOrder.id == booking_order_id,
+        db.or_(
+            BookingOrder.status == "pending_payment",
+            db.and_(
+                BookingOrder.status == CHECKOUT_SESSION_CREATING_STATUS,
+                db.or_(
+                    BookingOrder.checkout_session_claimed_at.is_(None),
+                    BookingOrder.checkout_session_claimed_at
+                    < get_stale_checkout_session_claim_cutoff(),
+                ),
+            ),
+        ),
+    ).update(
+        {
+            BookingOrder.status: CHECKOUT_SESSION_CREATING_STATUS,
+            BookingOrder.checkout_session_claimed_at: claimed_at,
+        },
+        synchronize_session=False,
+    )
+    db.session.commit()
+    return claimed_at if claimed_row_count == 1 else None
+
+
+def release_checkout_session_claim(booking_order_id: int, claimed_at: datetime) -> None:
+    """Put a claimed order back to ``pending_payment`` so it can be retried.
+
+    Only the claim stamped with ``claimed_at`` is released, so a claim that
+    another request has already taken over is left alone.
+    """
+
+    db.session.rollback()
+    BookingOrder.query.filter(
+        BookingOrder.id == booking_order_id,
+        BookingOrder.status == CHECKOUT_SESSION_CREATING_STATUS,
+        BookingOrder.checkout_session_claimed_at == claimed_at,
+    ).update(
+        {
+            BookingOrder.status: "pending_payment",
+            BookingOrder.checkout_session_claimed_at: None,
+        },
+        synchronize_session=False,
+    )
+    db.session.commit()
+
+
+def create_checkout_session_for_booking_order(booking_order_id: int) -> str:
+    """Create and store the Stripe Checkout Session for one pending order.
+
+    Args:
+        booking_order_id: Primary key of the pending booking order.
+
+    Returns:
+        str: Result label such as ``created``, ``not_pending``, or
+        ``stripe_error``. Unless the session was stored, the claim is released
+        and the order goes back to ``pending_payment``, also when an
+        unexpected exception is raised, so the pay step can try once more.
+    """
+
+    claimed_at = claim_booking_order_for_checkout_session(booking_order_id)
+    if claimed_at is None:
+        return "not_pending"
+
+    creation_result = "failed"
+    try:
+        creation_result = create_claimed_checkout_session(booking_order_id)
+        return creation_result
+    finally:
+        if creation_result != "created":
+            release_checkout_session_claim(booking_order_id, claimed_at)
+
+
+def create_claimed_checkout_session(booking_order_id: int) -> str:
+    """Call Stripe for an order this thread has claimed and store the session.
+
+    Returns:
+        str: ``created``, ``not_pending``, or ``stripe_error``.
+    """
+
+    booking_order = db.session.get(BookingOrder, booking_order_id)
+    if booking_order is None or booking_order.event is None:
+        return "not_pending"
+
+    prepared_checkout_booking = prepare_server_side_checkout_booking(
+        active_event=booking_order.event,
+        canoe_count=booking_order.canoe_count,
+    )
+    try:
+        checkout_session = create_stripe_checkout_session(
+            public_booking_reference=booking_order.public_booking_reference,
+            stripe_line_items=prepared_checkout_booking.stripe_line_items,
+            payment_intent_description=build_stripe_receipt_description(
+                active_event=booking_order.event,
+                canoe_count=booking_order.canoe_count,
+                public_booking_reference=booking_order.public_booking_reference,
+            ),
+            metadata={
+                "booking_order_id": str(booking_order.id),
+                "public_booking_reference": booking_order.public_booking_reference,
+                "event_id": str(booking_order.event_id),
+                "canoe_count": str(booking_order.canoe_count),
+            },
+            idempotency_key=booking_order.checkout_idempotency_key,
+            local_hold_expires_at=booking_order.expires_at,
+        )
+    except stripe.StripeError:
+        current_app.logger.exception(
+            "Stripe Checkout Session creation failed for booking reference %s.",
+            booking_order.public_booking_reference,
+        )
+        return "stripe_error"
+
+    booking_order.status = "checkout_session_created"
+    booking_order.payment_provider = "stripe_checkout"
+    booking_order.payment_provider_session_id = checkout_session.id
+    booking_order.checkout_session_claimed_at = None
+    db.session.commit()
+    return "created"
+
+
+class CheckoutSessionWorker:
+    """Run Checkout Session creation jobs on a small thread pool.
+
+    One instance is stored on each Flask application. Finished jobs notify a
+    condition variable so a pay request in the same process wakes up right
+    away; pay requests in other processes notice the change on their next
+    database check.
+    """
+
+    def __init__(self, flask_application: Flask, max_workers: int) -> None:
+        self.flask_application = flask_application
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="checkout-session",
+        )
+        self._finished_condition = threading.Condition()
+
+    def submit(self, booking_order_id: int) -> None:
+        """Queue Checkout Session creation for one committed pending order."""
+
+        self._executor.submit(self.run, booking_order_id)
+
+    def run(self, booking_order_id: int) -> str:
+        """Create the session for one order inside a fresh app context."""
+
+        try:
+            with self.flask_application.app_context():
+                try:
+                    return create_checkout_session_for_booking_order(booking_order_id)
+                except Exception:
+                    db.session.rollback()
+                    logger.exception(
+                        "Checkout Session job failed for booking order id=%s.",
+                        booking_order_id,
+                    )
+                    return "failed"
+        finally:
+            with self._finished_condition:
+                self._finished_condition.notify_all()
+
+    def wait_for_finished_job(self, timeout_seconds: float) -> None:
+        """Block until any job finishes or the timeout passes."""
+
+        with self._finished_condition:
+            self._finished_condition.wait(timeout=timeout_seconds)
+
+
+def get_checkout_session_worker() -> CheckoutSessionWorker:
+    """Return the Checkout Session worker stored on the current Flask app."""
+
+    extensions = current_app.extensions
+    checkout_session_worker = extensions.get(CHECKOUT_SESSION_WORKER_EXTENSION_KEY)
+    if checkout_session_worker is None:
+        checkout_session_worker = CheckoutSessionWorker(
+            flask_application=current_app._get_current_object(),  # type: ignore[attr-defined]
+            max_workers=int(
+                current_app.config.get("CHECKOUT_SESSION_WORKER_THREADS", 4)
+            ),
+        )
+        extensions[CHECKOUT_SESSION_WORKER_EXTENSION_KEY] = checkout_session_worker
+
+    return checkout_session_worker
+
+
+def queue_checkout_session_creation(booking_order_id: int) -> None:
+    """Start Checkout Session creation for one order without waiting on Stripe.
+
+    With ``CHECKOUT_SESSION_CREATE_INLINE`` enabled the session is created in
+    the current request instead. The test suite uses that to keep booking
+    tests deterministic.
+    """
+
+    if current_app.config.get("CHECKOUT_SESSION_CREATE_INLINE"):
+        create_checkout_session_for_booking_order(booking_order_id)
+        return
+
+    get_checkout_session_worker().submit(booking_order_id)
+
+
+def wait_for_checkout_session(booking_order_id: int, timeout_seconds: float) -> str:
+    """Wait until one order has a Checkout Session or is no longer being created.
+
+    Args:
+        booking_order_id: Primary key of the pending booking order.
+        timeout_seconds: Longest time the pay request should wait.
+
+    Returns:
+        str: ``ready`` when the session ID is stored, ``unclaimed`` when no job
+        has started on the order yet or its claim has expired, ``not_pending``
+        when the order is gone or no longer pending, or ``timeout``.
+    """
+
+    checkout_session_worker = get_checkout_session_worker()
+    deadline = time.monotonic() + timeout_seconds
+    while True:
+        booking_order = db.session.get(
+            BookingOrder,
+            booking_order_id,
+            populate_existing=True,
+        )
+        if booking_order is None:
+            return "not_pending"
+        if booking_order.payment_provider_session_id:
+            return "ready"
+        if booking_order.status == "pending_payment":
+            return "unclaimed"
+        if booking_order.status != CHECKOUT_SESSION_CREATING_STATUS:
+            return "not_pending"
+        if is_checkout_session_claim_stale(booking_order):
+            return "unclaimed"
+
+        remaining_seconds = deadline - time.monotonic()
+        if remaining_seconds <= 0:
+            return "timeout"
+        checkout_session_worker.wait_for_finished_job(
+            min(remaining_seconds, CHECKOUT_SESSION_WAIT_POLL_SECONDS)
+        )
@@ -7,11 +7,13 @@ to reuse in tests, migrations, and helper scripts.
 
 from __future__ import annotations
 
-from datetime import datetime, timezone
+from datetime import UTC, datetime
 from typing import Any
 
 from flask_login import UserMixin  # type: ignore[import-untyped]
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import DDL, event
+from sqlalchemy.orm import validates
 from werkzeug.security import check_password_hash, generate_password_hash
 
 db: Any = SQLAlchemy()
@@ -24,7 +26,73 @@ def get_current_utc_time() -> datetime:
         datetime: A timezone-aware UTC timestamp for audit columns.
     """
 
-    return datetime.now(timezone.utc)
+    return datetime.now(UTC)
+
+
+def normalize_pickup_name(first_name: str | None, last_name: str | None) -> str:
+    """Return the case-insensitive full name used for the same-name limit.
+
+    Args:
+        first_name: Pickup person's first name.
+        last_name: Pickup person's last name.
+
+    Returns:
+        str: Trimmed, case-folded ``"first last"`` string.
+    """
+
+    return (
+        f"{(first_name or '').strip()} {(last_name or '').strip()}".strip().casefold()
+    )
+
+
+def get_default_normalized_pickup_name(context) -> str:
+    """Fill ``normalized_pickup_name`` for rows inserted without it.
+
+    ORM objects set the column themselves. This column default covers batched
+    core ``insert()`` statements, such as seed scripts, which bypass the model.
+    """
+
+    parameters = context.get_current_parameters()
+    return normalize_pickup_name(
+        parameters.get("participant_first_name"),
+        parameters.get("participant_last_name"),
+    )
+
+
+PAYMENT_METHOD_LABELS = {
+    "simulated": "Simulerad betalning",
+    "dev_seed": "Testdata",
+    "admin_manual_cash": "Manuell: Kontant",
+    "admin_manual_bank_transfer": "Manuell: Banköverföring",
+    "admin_manual_swish": "Manuell: Swish",
+    "admin_manual_other": "Manuell: Annat",
+    "admin_manual": "Manuell",
+}
+
+
+def get_payment_method_label(payment_provider: str) -> str:
+    """Return a beginner-friendly label for a stored payment-provider value.
+
+    Column-only queries, such as the archived booking history, use this
+    without loading full ``BookingOrder`` objects.
+    """
+
+    return PAYMENT_METHOD_LABELS.get(
+        payment_provider,
+        payment_provider.replace("_", " ").capitalize(),
+    )
+
+
+def get_booking_source_label(payment_provider: str) -> str:
+    """Return whether a booking came from checkout or manual admin entry."""
+
+    if payment_provider == "dev_seed":
+        return "Testdata"
+
+    if payment_provider.startswith("admin_manual"):
+        return "Adminpanelen"
+
+    return "Checkout"
 
 
 class BookingOrder(db.Model):
@@ -51,9 +119,19 @@ class BookingOrder(db.Model):
     payer_full_name = db.Column(db.String(120), nullable=True)
     payer_email = db.Column(db.String(255), nullable=True)
     payment_provider = db.Column(db.String(50), nullable=False, default="simulated")
-    payment_provider_session_id = db.Column(db.String(255), nullable=True)
+    payment_provider_session_id = db.Column(db.String(255), nullable=True, index=True)
+    # Random key generated by booking.js for one reservation attempt. The
+    # unique index makes a double-click or network retry find the first order
+    # instead of creating a second hold.
+    checkout_idempotency_key = db.Column(
+        db.String(64), nullable=True, unique=True, index=True
+    )
     expires_at = db.Column(db.DateTime(timezone=True), nullable=True)
     paid_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    # When a thread claimed the order to create its Stripe Checkout Session.
+    # A claim older than CHECKOUT_SESSION_CLAIM_TIMEOUT_SECONDS belongs to a
+    # thread that died, so another request may take the order over.
+    checkout_session_claimed_at = db.Column(db.DateTime(timezone=True), nullable=True)
     created_at = db.Column(
         db.DateTime(timezone=True), nullable=False, default=get_current_utc_time
     )
@@ -90,31 +168,13 @@ class BookingOrder(db.Model):
     def payment_method_label(self) -> str:
         """Return a beginner-friendly label for the stored payment source."""
 
-        payment_labels = {
-            "simulated": "Simulerad betalning",
-            "dev_seed": "Testdata",
-            "admin_manual_cash": "Manuell: Kontant",
-            "admin_manual_bank_transfer": "Manuell: Banköverföring",
-            "admin_manual_swish": "Manuell: Swish",
-            "admin_manual_other": "Manuell: Annat",
-            "admin_manual": "Manuell",
-        }
-        return payment_labels.get(
-            self.payment_provider,
-            self.payment_provider.replace("_", " ").capitalize(),
-        )
+        return get_payment_method_label(self.payment_provider)
 
     @property
     def booking_source_label(self) -> str:
         """Return whether the canoe came from checkout or manual admin entry."""
 
-        if self.payment_provider == "dev_seed":
-            return "Testdata"
-
-        if self.is_manual_entry:
-            return "Adminpanelen"
-
-        return "Checkout"
+        return get_booking_source_label(self.payment_provider)
 
 
 class Event(db.Model):
@@ -149,6 +209,21 @@ class Event(db.Model):
     contact_email = db.Column(db.String(255), nullable=False)
     contact_phone = db.Column(db.String(50), nullable=True)
     is_active = db.Column(db.Boolean, nullable=False, default=False)
+    # Bumped in the same transaction as every change to the event's bookings.
+    # Cached views such as the public participant overview compare it with
+    # the version they were built from.
+    booking_version = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    # Bumped by every event-day checklist save. Each changed canoe stores the
+    # version it was changed in, so open checklists can ask for "changes
+    # since version N" instead of reloading the whole list.
+    checklist_version = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    # Set by ``flask archive-event`` once the event's orders and canoes have
+    # been moved to the archive tables. Archived events stay read-only.
+    archived_at = db.Column(db.DateTime(timezone=True), nullable=True)
     created_at = db.Column(
         db.DateTime(timezone=True), nullable=False, default=get_current_utc_time
     )
@@ -198,6 +273,9 @@ class EventWeatherCache(db.Model):
     temperature_c = db.Column(db.Float, nullable=True)
     rain_mm = db.Column(db.Float, nullable=True)
     icon = db.Column(db.String(32), nullable=True)
+    # Compact JSON index of the 10:00/12:00 UTC entries keyed by timestamp,
+    # so other dates in the forecast window can be served without MET calls.
+    forecast_index_json = db.Column(db.Text, nullable=True)
     fetched_at = db.Column(
         db.DateTime(timezone=True), nullable=False, default=get_current_utc_time
     )
@@ -214,6 +292,67 @@ class EventWeatherCache(db.Model):
         )
 
 
+class EventBookingStats(db.Model):
+    """Store running booking totals for one event.
+
+    The admin dashboard reads its summary figures from this single row instead
+    of counting booking rows on every page load. Every booking state change
+    adjusts the totals in the same transaction (see
+    ``app/util/event_booking_stats.py``), and ``flask rebuild-event-stats``
+    recomputes them from the booking tables.
+    """
+
+    __tablename__ = "event_booking_stats"
+
+    event_id = db.Column(
+        db.Integer,
+        db.ForeignKey("events.id", ondelete="CASCADE"),
+        primary_key=True,
+        autoincrement=False,
+    )
+    confirmed_canoe_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    paid_order_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    # Whole öre avoid rounding drift when many amounts are added up.
+    revenue_ore = db.Column(
+        db.BigInteger, nullable=False, default=0, server_default="0"
+    )
+    manual_order_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    stripe_order_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    picked_up_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    updated_at = db.Column(
+        db.DateTime(timezone=True),
+        nullable=False,
+        default=get_current_utc_time,
+        onupdate=get_current_utc_time,
+    )
+
+    @property
+    def revenue_sek(self) -> int | float:
+        """Return the revenue in kronor, without decimals when whole."""
+
+        whole_kronor, ore = divmod(int(self.revenue_ore or 0), 100)
+        return whole_kronor if ore == 0 else int(self.revenue_ore) / 100
+
+    def __repr__(self) -> str:
+        """Return a readable representation for debugging."""
+
+        return (
+            f"<EventBookingStats event_id={self.event_id} "
+            f"confirmed_canoes={self.confirmed_canoe_count} "
+            f"revenue_ore={self.revenue_ore}>"
+        )
+
+
 class PublicSiteAccessSetting(db.Model):
     """Store the shared public-site password hash in the database.
 
@@ -241,6 +380,50 @@ class PublicSiteAccessSetting(db.Model):
         return f"<PublicSiteAccessSetting id={self.id}>"
 
 
+class StripeWebhookInboxEvent(db.Model):
+    """Store one verified Stripe webhook event until it has been processed.
+
+    The webhook endpoint only saves the event here and answers Stripe right
+    away. A worker drains the table in batches. Using Stripe's event ID as the
+    primary key means a duplicate delivery fails the insert instead of running
+    the booking update a second time.
+    """
+
+    __tablename__ = "stripe_webhook_inbox"
+    __table_args__ = (
+        db.Index(
+            "ix_stripe_webhook_inbox_status_next_attempt_at",
+            "status",
+            "next_attempt_at",
+        ),
+    )
+
+    stripe_event_id = db.Column(db.String(255), primary_key=True)
+    event_type = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+    # ``pending`` -> ``processing`` -> ``processed``; ``failed`` after the
+    # last retry.
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    attempt_count = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(
+        db.DateTime(timezone=True), nullable=False, default=get_current_utc_time
+    )
+    processing_result = db.Column(db.String(50), nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    received_at = db.Column(
+        db.DateTime(timezone=True), nullable=False, default=get_current_utc_time
+    )
+    processed_at = db.Column(db.DateTime(timezone=True), nullable=True)
+
+    def __repr__(self) -> str:
+        """Return a readable representation for debugging."""
+
+        return (
+            f"<StripeWebhookInboxEvent id={self.stripe_event_id} "
+            f"type={self.event_type} status={self.status}>"
+        )
+
+
 class BookedCanoe(db.Model):
     """Store one canoe booking with up to three named riders.
 
@@ -259,18 +442,42 @@ class BookedCanoe(db.Model):
     )
     participant_first_name = db.Column(db.String(120), nullable=False)
     participant_last_name = db.Column(db.String(120), nullable=False)
+    # Lower-cased pickup name kept in sync with the two columns above, so the
+    # same-name booking limit can count matching rows through an index.
+    normalized_pickup_name = db.Column(
+        db.String(255),
+        nullable=False,
+        index=True,
+        default=get_default_normalized_pickup_name,
+    )
     passenger_two_first_name = db.Column(db.String(120), nullable=True)
     passenger_two_last_name = db.Column(db.String(120), nullable=True)
     passenger_three_first_name = db.Column(db.String(120), nullable=True)
     passenger_three_last_name = db.Column(db.String(120), nullable=True)
     status = db.Column(db.String(30), nullable=False, default="reserved")
     picked_up = db.Column(db.Boolean, nullable=False, default=False)
+    checklist_version = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0", index=True
+    )
     created_at = db.Column(
         db.DateTime(timezone=True), nullable=False, default=get_current_utc_time
     )
 
     booking_order = db.relationship("BookingOrder", back_populates="booked_canoes")
 
+    @validates("participant_first_name", "participant_last_name")
+    def update_normalized_pickup_name(self, key: str, value: str) -> str:
+        """Keep ``normalized_pickup_name`` in sync when a pickup name changes."""
+
+        first_name = (
+            value if key == "participant_first_name" else self.participant_first_name
+        )
+        last_name = (
+            value if key == "participant_last_name" else self.participant_last_name
+        )
+        self.normalized_pickup_name = normalize_pickup_name(first_name, last_name)
+        return value
+
     @staticmethod
     def build_full_name(
         first_name: str | None,
@@ -348,12 +555,48 @@ class BookedCanoe(db.Model):
         when that rider has actually been filled in.
         """
 
+        return self.build_display_rider_names(
+            self.participant_first_name,
+            self.participant_last_name,
+            self.passenger_two_first_name,
+            self.passenger_two_last_name,
+            self.passenger_three_first_name,
+            self.passenger_three_last_name,
+        )
+
+    @classmethod
+    def build_display_rider_names(
+        cls,
+        pickup_first_name: str | None,
+        pickup_last_name: str | None,
+        passenger_two_first_name: str | None,
+        passenger_two_last_name: str | None,
+        passenger_three_first_name: str | None,
+        passenger_three_last_name: str | None,
+    ) -> str:
+        """Return the combined rider string from plain column values.
+
+        Column-only queries, such as the public overview, use this without
+        loading full ``BookedCanoe`` objects.
+        """
+
         rider_names = [
-            self.pickup_person_name,
-            self.passenger_two_name_or_placeholder,
+            cls.build_full_name(
+                pickup_first_name,
+                pickup_last_name,
+                empty_fallback="Unnamed participant",
+            ),
+            cls.build_full_name(
+                passenger_two_first_name,
+                passenger_two_last_name,
+                empty_fallback="?",
+            ),
         ]
-        if self.has_third_rider:
-            rider_names.append(self.passenger_three_name_or_placeholder)
+        third_rider_name = cls.build_full_name(
+            passenger_three_first_name, passenger_three_last_name
+        )
+        if third_rider_name:
+            rider_names.append(third_rider_name)
 
         return " & ".join(rider_names)
 
@@ -392,6 +635,163 @@ class BookedCanoe(db.Model):
         return f"<BookedCanoe id={self.id} name={self.name} status={self.status}>"
 
 
+# The admin booking search matches pickup names and booking references by
+# substring. On SQLite an FTS5 table with the trigram tokenizer indexes both,
+# kept in sync by triggers on ``booked_canoes``. On Postgres, trigram GIN
+# indexes let the plain ``LIKE``/``ILIKE`` search use an index instead.
+# Migration ``c9d6f2a4b8e3`` creates the same objects for existing databases.
+BOOKING_SEARCH_TABLE_NAME = "booked_canoe_search"
+SQLITE_BOOKING_SEARCH_DDL = (
+    (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {BOOKING_SEARCH_TABLE_NAME} "
+        "USING fts5(pickup_name, booking_reference, tokenize='trigram')"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS booked_canoe_search_insert "
+        "AFTER INSERT ON booked_canoes BEGIN "
+        f"INSERT INTO {BOOKING_SEARCH_TABLE_NAME} "
+        "(rowid, pickup_name, booking_reference) "
+        "SELECT new.id, new.normalized_pickup_name, public_booking_reference "
+        "FROM booking_orders WHERE id = new.booking_order_id; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS booked_canoe_search_update "
+        "AFTER UPDATE OF normalized_pickup_name ON booked_canoes BEGIN "
+        f"UPDATE {BOOKING_SEARCH_TABLE_NAME} "
+        "SET pickup_name = new.normalized_pickup_name WHERE rowid = new.id; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS booked_canoe_search_delete "
+        "AFTER DELETE ON booked_canoes BEGIN "
+        f"DELETE FROM {BOOKING_SEARCH_TABLE_NAME} WHERE rowid = old.id; END"
+    ),
+)
+POSTGRES_BOOKING_SEARCH_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    (
+        "CREATE INDEX IF NOT EXISTS ix_booked_canoes_pickup_name_trgm "
+        "ON booked_canoes USING gin (normalized_pickup_name gin_trgm_ops)"
+    ),
+    (
+        "CREATE INDEX IF NOT EXISTS ix_booking_orders_reference_trgm "
+        "ON booking_orders USING gin (public_booking_reference gin_trgm_ops)"
+    ),
+)
+
+
+def sqlite_has_fts5(ddl, target, bind, **kwargs) -> bool:
+    """Return whether the SQLite build can create the FTS5 search table.
+
+    Without FTS5 the admin search falls back to ``LIKE`` on the base tables.
+    """
+
+    return bind.dialect.name == "sqlite" and bool(
+        bind.exec_driver_sql("SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar()
+    )
+
+
+for search_statement in SQLITE_BOOKING_SEARCH_DDL:
+    event.listen(
+        BookedCanoe.__table__,
+        "after_create",
+        DDL(search_statement).execute_if(callable_=sqlite_has_fts5),
+    )
+for search_statement in POSTGRES_BOOKING_SEARCH_DDL:
+    event.listen(
+        BookedCanoe.__table__,
+        "after_create",
+        DDL(search_statement).execute_if(dialect="postgresql"),
+    )
+# Triggers are dropped with ``booked_canoes``; the FTS table is separate.
+event.listen(
+    BookedCanoe.__table__,
+    "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {BOOKING_SEARCH_TABLE_NAME}").execute_if(
+        dialect="sqlite"
+    ),
+)
+
+
+class ArchivedBookingOrder(db.Model):
+    """Store one booking order of a finished, archived event.
+
+    ``flask archive-event`` moves rows here from ``booking_orders`` in bulk, so
+    the hot booking tables only hold the current season. The columns match
+    :class:`BookingOrder` one to one, except the short-lived Checkout Session
+    claim timestamp, and the original IDs are kept. Only the indexes needed by
+    the read-only admin history are created.
+    """
+
+    __tablename__ = "archived_booking_orders"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    event_id = db.Column(
+        db.Integer,
+        db.ForeignKey("events.id", ondelete="RESTRICT"),
+        nullable=True,
+        index=True,
+    )
+    public_booking_reference = db.Column(db.String(40), unique=True, nullable=False)
+    status = db.Column(db.String(30), nullable=False)
+    canoe_count = db.Column(db.Integer, nullable=False)
+    total_amount = db.Column(db.Numeric(10, 2), nullable=False)
+    currency = db.Column(db.String(10), nullable=False)
+    payer_full_name = db.Column(db.String(120), nullable=True)
+    payer_email = db.Column(db.String(255), nullable=True)
+    payment_provider = db.Column(db.String(50), nullable=False)
+    payment_provider_session_id = db.Column(db.String(255), nullable=True)
+    checkout_idempotency_key = db.Column(db.String(64), nullable=True)
+    expires_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    paid_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False)
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=False)
+
+    def __repr__(self) -> str:
+        """Return a readable representation for debugging."""
+
+        return (
+            f"<ArchivedBookingOrder id={self.id} "
+            f"ref={self.public_booking_reference} status={self.status}>"
+        )
+
+
+class ArchivedBookedCanoe(db.Model):
+    """Store one canoe row of a finished, archived event.
+
+    The columns match :class:`BookedCanoe` one to one and the original IDs are
+    kept, so an archived canoe still points at its archived order.
+    """
+
+    __tablename__ = "archived_booked_canoes"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    booking_order_id = db.Column(
+        db.Integer,
+        db.ForeignKey("archived_booking_orders.id"),
+        nullable=False,
+        index=True,
+    )
+    participant_first_name = db.Column(db.String(120), nullable=False)
+    participant_last_name = db.Column(db.String(120), nullable=False)
+    normalized_pickup_name = db.Column(db.String(255), nullable=False)
+    passenger_two_first_name = db.Column(db.String(120), nullable=True)
+    passenger_two_last_name = db.Column(db.String(120), nullable=True)
+    passenger_three_first_name = db.Column(db.String(120), nullable=True)
+    passenger_three_last_name = db.Column(db.String(120), nullable=True)
+    status = db.Column(db.String(30), nullable=False)
+    picked_up = db.Column(db.Boolean, nullable=False)
+    checklist_version = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False)
+
+    def __repr__(self) -> str:
+        """Return a readable representation for debugging."""
+
+        return (
+            f"<ArchivedBookedCanoe id={self.id} "
+            f"order={self.booking_order_id} status={self.status}>"
+        )
+
+
 class User(db.Model, UserMixin):
     """Store administrator login accounts for the protected admin area."""
 
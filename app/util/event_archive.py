@@ -0,0 +1,193 @@
+"""Move finished events' bookings out of the hot booking tables.
+
+Availability checks, the public overview, and the admin dashboard all scan or
+join ``booking_orders`` and ``booked_canoes``. Without archiving, those tables
+grow by one season every year. ``flask archive-event`` uses
+:func:`archive_event_bookings` to copy a finished event's rows into
+``archived_booking_orders`` and ``archived_booked_canoes`` with
+``INSERT ... SELECT`` and then delete them from the hot tables, all in one
+transaction. The admin dashboard still shows archived bookings read-only
+through :func:`load_archived_booking_history`.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+from .db_models import (
+    ArchivedBookedCanoe,
+    ArchivedBookingOrder,
+    BookedCanoe,
+    BookingOrder,
+    Event,
+    db,
+    get_current_utc_time,
+    get_payment_method_label,
+)
+from .event_settings import bump_event_booking_version
+
+EVENT_TIMEZONE = ZoneInfo("Europe/Stockholm")
+# Canoes of unpaid holds that were never released are archived as-is.
+ARCHIVED_CANOE_STATUS_LABELS = {"confirmed": "Bekräftad", "reserved": "Ej betald"}
+
+
+@dataclass(frozen=True, slots=True)
+class EventArchiveResult:
+    """Counts of the rows moved by one :func:`archive_event_bookings` run."""
+
+    event_id: int
+    order_count: int
+    canoe_count: int
+
+
+@dataclass(frozen=True, slots=True)
+class ArchivedBookingHistoryRow:
+    """One read-only canoe row in the admin booking history."""
+
+    public_booking_reference: str
+    rider_names: str
+    status_label: str
+    payment_method_label: str
+    picked_up: bool
+
+
+def get_event_local_today() -> date:
+    """Return today's date in the event's time zone."""
+
+    return datetime.now(EVENT_TIMEZONE).date()
+
+
+def copy_rows_to_archive(source_model, archive_model, source_filter) -> int:
+    """Copy matching rows to the archive table with one ``INSERT ... SELECT``.
+
+    The archive models use the same column names as the hot models, so the
+    column list is read from the archive table.
+
+    Returns:
+        int: Number of copied rows.
+    """
+
+    column_names = [column.name for column in archive_model.__table__.columns]
+    source_table = source_model.__table__
+    copied_row_count = db.session.execute(
+        archive_model.__table__.insert().from_select(
+            column_names,
+            db.select(*[source_table.c[name] for name in column_names]).where(
+                source_filter
+            ),
+        )
+    ).rowcount
+    return int(copied_row_count or 0)
+
+
+def archive_event_bookings(
+    event: Event, today: date | None = None
+) -> EventArchiveResult:
+    """Move every order and canoe of a finished event to the archive tables.
+
+    Both copies and both deletes run in the caller's transaction, which is
+    committed at the end, so a failure leaves the hot tables untouched.
+
+    Args:
+        event: Event whose bookings should be archived.
+        today: Date used to decide whether the event is over. Defaults to
+            today's date in the event's time zone.
+
+    Returns:
+        EventArchiveResult: Counts of the moved rows.
+
+    Raises:
+        ValueError: If the event is active, has not taken place yet, or is
+            already archived.
+    """
+
+    today = today or get_event_local_today()
+    if event.is_active:
+        raise ValueError("The active event cannot be archived.")
+    if event.event_date >= today:
+        raise ValueError("Only events that have already taken place can be archived.")
+    if event.archived_at is not None:
+        raise ValueError("The event is already archived.")
+
+    event_order_ids = db.select(BookingOrder.id).where(
+        BookingOrder.event_id == event.id
+    )
+    # Orders first, because archived canoes point at archived orders.
+    order_count = copy_rows_to_archive(
+        BookingOrder, ArchivedBookingOrder, BookingOrder.event_id == event.id
+    )
+    canoe_count = copy_rows_to_archive(
+        BookedCanoe,
+        ArchivedBookedCanoe,
+        BookedCanoe.booking_order_id.in_(event_order_ids),
+    )
+
+    # Canoes first, because their foreign key points at the orders.
+    db.session.execute(
+        db.delete(BookedCanoe).where(BookedCanoe.booking_order_id.in_(event_order_ids)),
+        execution_options={"synchronize_session": False},
+    )
+    db.session.execute(
+        db.delete(BookingOrder).where(BookingOrder.event_id == event.id),
+        execution_options={"synchronize_session": False},
+    )
+
+    event.archived_at = get_current_utc_time()
+    bump_event_booking_version(event.id)
+    db.session.commit()
+    return EventArchiveResult(
+        event_id=event.id, order_count=order_count, canoe_count=canoe_count
+    )
+
+
+def load_archived_booking_history(event_id: int) -> list[ArchivedBookingHistoryRow]:
+    """Return every archived canoe of one event for the admin history.
+
+    One column-only query joins the archived canoes to their orders, sorted by
+    pickup person like the live booking list.
+    """
+
+    history_rows = db.session.execute(
+        db.select(
+            ArchivedBookingOrder.public_booking_reference,
+            ArchivedBookingOrder.payment_provider,
+            ArchivedBookedCanoe.participant_first_name,
+            ArchivedBookedCanoe.participant_last_name,
+            ArchivedBookedCanoe.passenger_two_first_name,
+            ArchivedBookedCanoe.passenger_two_last_name,
+            ArchivedBookedCanoe.passenger_three_first_name,
+            ArchivedBookedCanoe.passenger_three_last_name,
+            ArchivedBookedCanoe.status,
+            ArchivedBookedCanoe.picked_up,
+        )
+        .select_from(ArchivedBookedCanoe)
+        .join(
+            ArchivedBookingOrder,
+            ArchivedBookedCanoe.booking_order_id == ArchivedBookingOrder.id,
+        )
+        .where(ArchivedBookingOrder.event_id == event_id)
+        .order_by(
+            ArchivedBookedCanoe.normalized_pickup_name,
+            ArchivedBookedCanoe.id,
+        )
+    ).all()
+
+    return [
+        ArchivedBookingHistoryRow(
+            public_booking_reference=row.public_booking_reference,
+            rider_names=BookedCanoe.build_display_rider_names(
+                row.participant_first_name,
+                row.participant_last_name,
+                row.passenger_two_first_name,
+                row.passenger_two_last_name,
+                row.passenger_three_first_name,
+                row.passenger_three_last_name,
+            ),
+            status_label=ARCHIVED_CANOE_STATUS_LABELS.get(row.status, row.status),
+            payment_method_label=get_payment_method_label(row.payment_provider),
+            picked_up=row.picked_up,
+        )
+        for row in history_rows
+    ]
@@ -0,0 +1,274 @@
+"""Keep per-event booking totals up to date for the admin dashboard.
+
+Each event has one :class:`EventBookingStats` row with its confirmed canoes,
+paid orders, revenue in öre, manual versus Stripe orders, and picked-up
+canoes. Code that changes a booking's state calls
+:func:`apply_event_booking_stats_change` before committing, which adds the
+difference with one ``UPDATE ... SET column = column + delta``. Like
+``bump_event_booking_version``, the arithmetic runs in SQL, so concurrent
+workers never overwrite each other's changes.
+
+Bulk writers (test-data seeding, the ``flask rebuild-event-stats`` command)
+call :func:`rebuild_event_booking_stats` instead, which recomputes the row
+from the booking tables, or from the archive tables for archived events.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from decimal import Decimal
+
+from .db_models import (
+    ArchivedBookedCanoe,
+    ArchivedBookingOrder,
+    BookedCanoe,
+    BookingOrder,
+    Event,
+    EventBookingStats,
+    db,
+    get_current_utc_time,
+)
+
+MANUAL_PAYMENT_PROVIDER_PREFIX = "admin_manual"
+STRIPE_PAYMENT_PROVIDER = "stripe_checkout"
+
+
+@dataclass(frozen=True, slots=True)
+class EventBookingStatsChange:
+    """Differences to add to one event's booking totals.
+
+    Attributes mirror the :class:`EventBookingStats` columns. Negative values
+    subtract, for example when an admin deletes a booking.
+    """
+
+    confirmed_canoe_count: int = 0
+    paid_order_count: int = 0
+    revenue_ore: int = 0
+    manual_order_count: int = 0
+    stripe_order_count: int = 0
+    picked_up_count: int = 0
+
+    def __add__(self, other: EventBookingStatsChange) -> EventBookingStatsChange:
+        """Return the sum of two changes."""
+
+        return EventBookingStatsChange(
+            confirmed_canoe_count=self.confirmed_canoe_count
+            + other.confirmed_canoe_count,
+            paid_order_count=self.paid_order_count + other.paid_order_count,
+            revenue_ore=self.revenue_ore + other.revenue_ore,
+            manual_order_count=self.manual_order_count + other.manual_order_count,
+            stripe_order_count=self.stripe_order_count + other.stripe_order_count,
+            picked_up_count=self.picked_up_count + other.picked_up_count,
+        )
+
+    def is_empty(self) -> bool:
+        """Return whether the change would leave every total as it is."""
+
+        return self == EventBookingStatsChange()
+
+
+def convert_amount_to_ore(amount: object) -> int:
+    """Return a kronor amount as whole öre."""
+
+    return int(Decimal(str(amount or 0)) * 100)
+
+
+def is_manual_payment_provider(payment_provider: str | None) -> bool:
+    """Return whether an order was entered by an admin."""
+
+    return (payment_provider or "").startswith(MANUAL_PAYMENT_PROVIDER_PREFIX)
+
+
+def build_paid_order_stats_change(
+    booking_order: BookingOrder, sign: int = 1
+) -> EventBookingStatsChange:
+    """Return the order-level totals one paid order adds (or removes).
+
+    Args:
+        booking_order: Order that became paid, or a paid order being removed.
+        sign: ``1`` to add the order, ``-1`` to remove it.
+    """
+
+    return EventBookingStatsChange(
+        paid_order_count=sign,
+        revenue_ore=sign * convert_amount_to_ore(booking_order.total_amount),
+        manual_order_count=(
+            sign if is_manual_payment_provider(booking_order.payment_provider) else 0
+        ),
+        stripe_order_count=(
+            sign if booking_order.payment_provider == STRIPE_PAYMENT_PROVIDER else 0
+        ),
+    )
+
+
+def build_confirmed_canoe_stats_change(
+    booked_canoe: BookedCanoe, sign: int = 1
+) -> EventBookingStatsChange:
+    """Return the canoe-level totals one confirmed canoe adds (or removes)."""
+
+    return EventBookingStatsChange(
+        confirmed_canoe_count=sign,
+        picked_up_count=sign if booked_canoe.picked_up else 0,
+    )
+
+
+def apply_event_booking_stats_change(
+    event_id: int | None, change: EventBookingStatsChange
+) -> None:
+    """Add ``change`` to one event's totals, without committing.
+
+    Call this after the booking rows have been changed in the session. When
+    the event has no totals row yet, it is built from the (flushed) booking
+    rows instead, which already include the change.
+
+    Args:
+        event_id: Event whose bookings changed. ``None`` is ignored.
+        change: Differences to add.
+    """
+
+    if event_id is None or change.is_empty():
+        return
+
+    db.session.flush()
+    updated_row_count = db.session.execute(
+        db.update(EventBookingStats)
+        .where(EventBookingStats.event_id == event_id)
+        .values(
+            confirmed_canoe_count=EventBookingStats.confirmed_canoe_count
+            + change.confirmed_canoe_count,
+            paid_order_count=EventBookingStats.paid_order_count
+            + change.paid_order_count,
+            revenue_ore=EventBookingStats.revenue_ore + change.revenue_ore,
+            manual_order_count=EventBookingStats.manual_order_count
+            + change.manual_order_count,
+            stripe_order_count=EventBookingStats.stripe_order_count
+            + change.stripe_order_count,
+            picked_up_count=EventBookingStats.picked_up_count + change.picked_up_count,
+            updated_at=get_current_utc_time(),
+        ),
+        execution_options={"synchronize_session": False},
+    ).rowcount
+    if not updated_row_count:
+        rebuild_event_booking_stats(event_id)
+
+
+def count_event_booking_totals(event_id: int, archived: bool) -> dict[str, int]:
+    """Count one event's totals from the booking or archive tables.
+
+    Two aggregate queries are used: one over the event's orders and one over
+    its canoes.
+    """
+
+    order_model = ArchivedBookingOrder if archived else BookingOrder
+    canoe_model = ArchivedBookedCanoe if archived else BookedCanoe
+    is_paid = order_model.status == "paid"
+
+    order_totals = db.session.execute(
+        db.select(
+            db.func.count().filter(is_paid),
+            db.func.coalesce(db.func.sum(order_model.total_amount).filter(is_paid), 0),
+            db.func.count().filter(
+                is_paid,
+                order_model.payment_provider.startswith(MANUAL_PAYMENT_PROVIDER_PREFIX),
+            ),
+            db.func.count().filter(
+                is_paid, order_model.payment_provider == STRIPE_PAYMENT_PROVIDER
+            ),
+        ).where(order_model.event_id == event_id)
+    ).one()
+    canoe_totals = db.session.execute(
+        db.select(
+            db.func.count(),
+            db.func.count().filter(canoe_model.picked_up.is_(True)),
+        )
+        .join(order_model, canoe_model.booking_order_id == order_model.id)
+        .where(order_model.event_id == event_id, canoe_model.status == "confirmed")
+    ).one()
+
+    return {
+        "paid_order_count": int(order_totals[0]),
+        "revenue_ore": convert_amount_to_ore(order_totals[1]),
+        "manual_order_count": int(order_totals[2]),
+        "stripe_order_count": int(order_totals[3]),
+        "confirmed_canoe_count": int(canoe_totals[0]),
+        "picked_up_count": int(canoe_totals[1]),
+    }
+
+
+def rebuild_event_booking_stats(event_id: int) -> EventBookingStats:
+    """Recompute one event's totals row from its bookings, without committing.
+
+    Args:
+        event_id: Event to recompute.
+
+    Returns:
+        EventBookingStats: The created or refreshed totals row.
+    """
+
+    event = db.session.get(Event, event_id)
+    totals = count_event_booking_totals(
+        event_id, archived=event is not None and event.archived_at is not None
+    )
+    event_booking_stats = db.session.get(EventBookingStats, event_id)
+    if event_booking_stats is None:
+        event_booking_stats = EventBookingStats(event_id=event_id)
+        db.session.add(event_booking_stats)
+    else:
+        # A delta UPDATE earlier in this transaction may have left stale
+        # values loaded in the session.
+        db.session.refresh(event_booking_stats)
+
+    for column_name, value in totals.items():
+        setattr(event_booking_stats, column_name, value)
+    event_booking_stats.updated_at = get_current_utc_time()
+    db.session.flush()
+    return event_booking_stats
+
+
+def ensure_event_booking_stats(event_id: int) -> None:
+    """Create one event's totals row if it does not exist yet, without committing.
+
+    Call this when an event is created, so later booking changes only need the
+    cheap delta ``UPDATE`` instead of a full rebuild.
+    """
+
+    if db.session.get(EventBookingStats, event_id) is None:
+        rebuild_event_booking_stats(event_id)
+
+
+def rebuild_all_event_booking_stats() -> int:
+    """Recompute the totals of every event and commit.
+
+    Returns:
+        int: Number of events whose totals were rebuilt.
+    """
+
+    event_ids = db.session.execute(db.select(Event.id)).scalars().all()
+    for event_id in event_ids:
+        rebuild_event_booking_stats(event_id)
+    db.session.commit()
+    return len(event_ids)
+
+
+def get_event_booking_stats(event_id: int | None) -> EventBookingStats:
+    """Return one event's totals row for display.
+
+    Events without bookings may have no row yet. They get an unsaved row with
+    every total at zero, so templates never need a ``None`` check.
+    """
+
+    event_booking_stats = (
+        db.session.get(EventBookingStats, event_id) if event_id is not None else None
+    )
+    if event_booking_stats is not None:
+        return event_booking_stats
+
+    return EventBookingStats(
+        event_id=event_id,
+        confirmed_canoe_count=0,
+        paid_order_count=0,
+        revenue_ore=0,
+        manual_order_count=0,
+        stripe_order_count=0,
+        picked_up_count=0,
+    )
@@ -13,6 +13,10 @@ from typing import Any, Mapping
 from flask import current_app
 
 from .db_models import BookingOrder, Event, db
+from .event_booking_stats import (
+    ensure_event_booking_stats,
+    rebuild_event_booking_stats,
+)
 
 
 def format_swedish_date_display(event_date: date, include_year: bool = False) -> str:
@@ -202,6 +206,53 @@ def get_active_event() -> Event | None:
     return active_events[0]
 
 
+def bump_event_booking_version(event_id: int | None) -> None:
+    """Mark that one event's bookings changed, without committing.
+
+    Call this before the commit that changes bookings, so the new version and
+    the booking change become visible together. The update runs in SQL, so
+    concurrent bumps from other workers are never lost.
+
+    Args:
+        event_id: Event whose bookings changed. ``None`` is ignored.
+    """
+
+    if event_id is None:
+        return
+
+    db.session.execute(
+        db.update(Event)
+        .where(Event.id == event_id)
+        .values(booking_version=Event.booking_version + 1)
+    )
+
+
+def claim_next_checklist_version(event_id: int) -> int:
+    """Bump one event's checklist version and return the new value.
+
+    The ``UPDATE`` locks the event row until the commit, so concurrent
+    checklist saves get increasing versions in the order they commit. Call
+    this before the checklist rows are changed, without committing.
+
+    Args:
+        event_id: Event whose checklist is about to change.
+
+    Returns:
+        int: Version to store on the canoes changed in this transaction.
+    """
+
+    db.session.execute(
+        db.update(Event)
+        .where(Event.id == event_id)
+        .values(checklist_version=Event.checklist_version + 1)
+    )
+    return int(
+        db.session.execute(
+            db.select(Event.checklist_version).where(Event.id == event_id)
+        ).scalar_one()
+    )
+
+
 def build_event_settings_with_fallback() -> dict[str, Any]:
     """Return the event settings used by the homepage and frontend scripts.
 
@@ -376,10 +427,17 @@ def get_max_canoes_per_booking_with_fallback() -> int:
     return int(current_app.config["MAX_CANOES_PER_BOOKING"])
 
 
-def get_weather_coordinates_with_fallback() -> tuple[float, float]:
-    """Return weather coordinates for the active event with config fallbacks."""
+def get_weather_coordinates_with_fallback(
+    event: Event | None = None,
+) -> tuple[float, float]:
+    """Return weather coordinates for an event with config fallbacks.
 
-    active_event = get_active_event()
+    Args:
+        event: Optional event row to read. When omitted, the active event is
+            used.
+    """
+
+    active_event = event if event is not None else get_active_event()
     if (
         active_event is not None
         and active_event.weather_latitude is not None
@@ -462,5 +520,10 @@ def create_or_update_active_event_from_config() -> tuple[Event, int]:
     ).all()
     for booking_order in missing_event_bookings:
         booking_order.event_id = active_event.id
+    if missing_event_bookings:
+        db.session.flush()
+        rebuild_event_booking_stats(active_event.id)
+    else:
+        ensure_event_booking_stats(active_event.id)
 
     return active_event, len(missing_event_bookings)
@@ -0,0 +1,161 @@
+"""Shared keep-alive HTTP sessions for outbound calls to Stripe and MET.
+
+Creating a new HTTP client for every outbound call means every call can pay a
+fresh TCP and TLS handshake. This module keeps one ``requests.Session`` per app
+process with a connection pool, and both the Stripe client and the weather
+fetcher send their requests through it. Connections can also be opened once at
+worker start so the first visitor does not pay the handshake either.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+
+import requests
+import stripe
+from flask import Flask, current_app
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+OUTBOUND_HTTP_SESSION_EXTENSION_KEY = "paddlingen_outbound_http_session"
+STRIPE_CLIENT_EXTENSION_KEY = "paddlingen_stripe_client"
+
+# Hosts that are contacted during normal operation. Warming opens one pooled
+# connection to each of them so the first real call can reuse it.
+OUTBOUND_HTTP_WARM_URLS = (
+    "https://api.stripe.com/healthcheck",
+    "https://api.met.no/weatherapi/locationforecast/2.0/status",
+)
+
+
+def build_outbound_http_session(
+    pool_connections: int,
+    pool_maxsize: int,
+) -> requests.Session:
+    """Return a ``requests.Session`` with keep-alive connection pools.
+
+    Args:
+        pool_connections: Number of different hosts to keep a pool for.
+        pool_maxsize: Maximum open connections kept per host. This should be at
+            least the number of threads that can call the same host at once.
+
+    Returns:
+        requests.Session: Session that reuses TCP/TLS connections between
+        calls.
+    """
+
+    http_session = requests.Session()
+    http_adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+    )
+    http_session.mount("https://", http_adapter)
+    http_session.mount("http://", http_adapter)
+    return http_session
+
+
+def get_outbound_http_session() -> requests.Session:
+    """Return the pooled HTTP session stored on the current Flask application."""
+
+    extensions = current_app.extensions
+    http_session = extensions.get(OUTBOUND_HTTP_SESSION_EXTENSION_KEY)
+    if http_session is None:
+        configuration = current_app.config
+        http_session = build_outbound_http_session(
+            pool_connections=int(
+                configuration.get("OUTBOUND_HTTP_POOL_CONNECTIONS", 4)
+            ),
+            pool_maxsize=int(configuration.get("OUTBOUND_HTTP_POOL_MAXSIZE", 10)),
+        )
+        extensions[OUTBOUND_HTTP_SESSION_EXTENSION_KEY] = http_session
+
+    return http_session
+
+
+def get_shared_stripe_client(secret_key: str) -> stripe.StripeClient:
+    """Return one reusable Stripe client that sends through the pooled session.
+
+    The client is rebuilt only when the configured secret key or API base
+    changes, so each app process keeps the same client and its open
+    connections to Stripe. ``STRIPE_API_BASE`` points the client at another
+    server, such as ``scripts/fake_stripe_server.py`` in tests and benchmarks.
+
+    Args:
+        secret_key: Stripe secret API key from the app configuration.
+
+    Returns:
+        stripe.StripeClient: Client backed by the shared HTTP session.
+    """
+
+    stripe_api_base = current_app.config.get("STRIPE_API_BASE") or None
+    client_cache_key = (secret_key, stripe_api_base)
+    extensions = current_app.extensions
+    cached_client = extensions.get(STRIPE_CLIENT_EXTENSION_KEY)
+    if cached_client is not None and cached_client[0] == client_cache_key:
+        return cached_client[1]
+
+    stripe_client = stripe.StripeClient(
+        secret_key,
+        base_addresses={"api": stripe_api_base} if stripe_api_base else None,
+        http_client=stripe.RequestsClient(
+            timeout=float(current_app.config.get("STRIPE_API_TIMEOUT_SECONDS", 30)),
+            session=get_outbound_http_session(),
+        ),
+    )
+    extensions[STRIPE_CLIENT_EXTENSION_KEY] = (client_cache_key, stripe_client)
+    return stripe_client
+
+
+def warm_outbound_http_connections(
+    http_session: requests.Session,
+    warm_urls: tuple[str, ...] = OUTBOUND_HTTP_WARM_URLS,
+    *,
+    timeout_seconds: float = 5,
+) -> int:
+    """Open one pooled connection to each outbound host.
+
+    The response body does not matter; completing the request leaves an idle
+    keep-alive connection in the pool. Failures are only logged because a
+    cold connection is still usable later.
+
+    Returns:
+        int: Number of hosts that answered.
+    """
+
+    warmed_host_count = 0
+    for warm_url in warm_urls:
+        try:
+            http_session.head(warm_url, timeout=timeout_seconds).close()
+        except requests.RequestException:
+            logger.info("Could not warm outbound connection to %s.", warm_url)
+            continue
+        warmed_host_count += 1
+
+    return warmed_host_count
+
+
+def start_outbound_http_warmup(flask_application: Flask) -> threading.Thread:
+    """Warm the outbound connection pool in a background thread.
+
+    Gunicorn imports the app once per worker, so calling this from the app
+    factory warms every worker without delaying its startup.
+    """
+
+    with flask_application.app_context():
+        http_session = get_outbound_http_session()
+
+    warm_urls = OUTBOUND_HTTP_WARM_URLS
+    stripe_api_base = flask_application.config.get("STRIPE_API_BASE")
+    if stripe_api_base:
+        warm_urls = (f"{stripe_api_base.rstrip('/')}/healthcheck",) + warm_urls[1:]
+
+    warmup_thread = threading.Thread(
+        target=warm_outbound_http_connections,
+        args=(http_session, warm_urls),
+        name="outbound-http-warmup",
+        daemon=True,
+    )
+    warmup_thread.start()
+    return warmup_thread
@@ -0,0 +1,137 @@
+"""Cache the public participant overview per event and booking version.
+
+The participant list only changes when a booking is confirmed, released, or
+edited by an admin. Each of those paths bumps ``Event.booking_version`` in the
+same transaction (see :func:`bump_event_booking_version`). The homepage
+already loads the active event, so it can compare that version with the cached
+snapshot without an extra query and reuse both the grouped rows and the
+rendered HTML until the version moves.
+
+Each Gunicorn worker keeps its own snapshot. Because the version lives in the
+database, a change made in one worker is seen by all of them on their next
+homepage render.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+
+from flask import current_app, render_template
+from markupsafe import Markup
+
+from .booking_groups import OverviewGroupRow, load_public_booking_overview_rows
+from .db_models import Event
+
+PUBLIC_OVERVIEW_CACHE_EXTENSION_KEY = "paddlingen_public_overview_cache"
+PUBLIC_OVERVIEW_TEMPLATE = "participant_overview.html"
+
+
+@dataclass(frozen=True, slots=True)
+class PublicOverviewSnapshot:
+    """Grouped overview rows and their rendered HTML for one booking version."""
+
+    event_id: int | None
+    booking_version: int
+    overview_rows: tuple[OverviewGroupRow, ...]
+    overview_html: Markup
+
+    @property
+    def confirmed_canoe_count(self) -> int:
+        """Return how many confirmed canoes the snapshot lists."""
+
+        return sum(overview_row.canoe_count for overview_row in self.overview_rows)
+
+
+class PublicOverviewCache:
+    """Keep the newest overview snapshot per event in this process."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._snapshots: dict[int, PublicOverviewSnapshot] = {}
+
+    def get(self, event_id: int, booking_version: int) -> PublicOverviewSnapshot | None:
+        """Return the snapshot for one event when it matches the version."""
+
+        with self._lock:
+            snapshot = self._snapshots.get(event_id)
+        if snapshot is None or snapshot.booking_version != booking_version:
+            return None
+        return snapshot
+
+    def store(self, snapshot: PublicOverviewSnapshot) -> None:
+        """Save a snapshot unless a newer version is already cached."""
+
+        if snapshot.event_id is None:
+            return
+
+        with self._lock:
+            cached_snapshot = self._snapshots.get(snapshot.event_id)
+            if (
+                cached_snapshot is None
+                or cached_snapshot.booking_version <= snapshot.booking_version
+            ):
+                self._snapshots[snapshot.event_id] = snapshot
+
+    def clear(self) -> None:
+        """Forget every cached snapshot."""
+
+        with self._lock:
+            self._snapshots.clear()
+
+
+def get_public_overview_cache() -> PublicOverviewCache:
+    """Return the overview cache stored on the current Flask application."""
+
+    extensions = current_app.extensions
+    public_overview_cache = extensions.get(PUBLIC_OVERVIEW_CACHE_EXTENSION_KEY)
+    if public_overview_cache is None:
+        public_overview_cache = PublicOverviewCache()
+        extensions[PUBLIC_OVERVIEW_CACHE_EXTENSION_KEY] = public_overview_cache
+
+    return public_overview_cache
+
+
+def build_public_overview_snapshot(
+    event_id: int | None,
+    booking_version: int,
+) -> PublicOverviewSnapshot:
+    """Load the grouped overview and render its HTML fragment once."""
+
+    overview_rows = tuple(load_public_booking_overview_rows(event_id))
+    return PublicOverviewSnapshot(
+        event_id=event_id,
+        booking_version=booking_version,
+        overview_rows=overview_rows,
+        overview_html=Markup(
+            render_template(
+                PUBLIC_OVERVIEW_TEMPLATE,
+                grouped_booking_overview_rows=overview_rows,
+            )
+        ),
+    )
+
+
+def get_public_overview_snapshot(active_event: Event | None) -> PublicOverviewSnapshot:
+    """Return the cached overview for the active event, rebuilding if stale.
+
+    Args:
+        active_event: The event shown on the homepage. Without one, the
+            overview lists every confirmed canoe and is not cached.
+
+    Returns:
+        PublicOverviewSnapshot: Rows and HTML matching the event's current
+        booking version.
+    """
+
+    if active_event is None:
+        return build_public_overview_snapshot(None, 0)
+
+    public_overview_cache = get_public_overview_cache()
+    booking_version = int(active_event.booking_version or 0)
+    snapshot = public_overview_cache.get(active_event.id, booking_version)
+    if snapshot is None:
+        snapshot = build_public_overview_snapshot(active_event.id, booking_version)
+        public_overview_cache.store(snapshot)
+
+    return snapshot
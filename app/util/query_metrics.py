@@ -0,0 +1,189 @@
+"""Count the SQL queries each request runs and how long they take.
+
+Lazy relationship loads are easy to miss in route and template code. This
+module listens to SQLAlchemy's cursor events on every engine and adds each
+query to the metrics of the request that ran it:
+
+- In debug mode every response gets a ``Server-Timing`` header such as
+  ``db;desc="12 queries";dur=4.2`` that the browser's network panel shows.
+- Requests above ``SLOW_REQUEST_QUERY_COUNT`` queries or
+  ``SLOW_REQUEST_QUERY_MILLISECONDS`` of query time are logged as warnings.
+
+Tests use :func:`count_queries` to assert query budgets for whole routes.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from flask import Flask, Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Key on the DBAPI connection's ``info`` dict holding query start times.
+QUERY_START_TIMES_INFO_KEY = "paddlingen_query_start_times"
+
+_query_metrics_listeners_lock = threading.Lock()
+_query_metrics_listeners_installed = False
+_thread_recorders = threading.local()
+
+
+@dataclass
+class QueryMetrics:
+    """Number of queries and their combined run time."""
+
+    query_count: int = 0
+    total_seconds: float = 0.0
+
+    def record_query(self, elapsed_seconds: float) -> None:
+        """Add one finished query."""
+
+        self.query_count += 1
+        self.total_seconds += elapsed_seconds
+
+    @property
+    def total_milliseconds(self) -> float:
+        """Return the combined query time in milliseconds."""
+
+        return self.total_seconds * 1000
+
+
+def get_thread_recorders() -> list[QueryMetrics]:
+    """Return the :func:`count_queries` recorders active in this thread."""
+
+    recorders = getattr(_thread_recorders, "recorders", None)
+    if recorders is None:
+        recorders = []
+        _thread_recorders.recorders = recorders
+    return recorders
+
+
+def get_active_query_metrics() -> list[QueryMetrics]:
+    """Return every recorder that should count a query run right now."""
+
+    active_query_metrics = list(get_thread_recorders())
+    if has_request_context():
+        request_query_metrics = g.get("query_metrics")
+        if request_query_metrics is not None:
+            active_query_metrics.append(request_query_metrics)
+    return active_query_metrics
+
+
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    """Remember when a query starts (SQLAlchemy ``before_cursor_execute``)."""
+
+    conn.info.setdefault(QUERY_START_TIMES_INFO_KEY, []).append(time.perf_counter())
+
+
+def stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    """Record a finished query (SQLAlchemy ``after_cursor_execute``)."""
+
+    query_start_times = conn.info.get(QUERY_START_TIMES_INFO_KEY)
+    if not query_start_times:
+        return
+
+    elapsed_seconds = time.perf_counter() - query_start_times.pop()
+    for query_metrics in get_active_query_metrics():
+        query_metrics.record_query(elapsed_seconds)
+
+
+def discard_query_timer(exception_context) -> None:
+    """Drop the start time of a query that failed (``handle_error``)."""
+
+    connection = exception_context.connection
+    if connection is None:
+        return
+
+    query_start_times = connection.info.get(QUERY_START_TIMES_INFO_KEY)
+    if query_start_times:
+        query_start_times.pop()
+
+
+def install_query_metrics_listeners() -> None:
+    """Attach the cursor listeners to every SQLAlchemy engine, once.
+
+    Listening on the ``Engine`` class instead of ``db.engine`` also covers
+    engines created later, for example after tests change the database URI.
+    """
+
+    global _query_metrics_listeners_installed
+
+    with _query_metrics_listeners_lock:
+        if _query_metrics_listeners_installed:
+            return
+        event.listen(Engine, "before_cursor_execute", start_query_timer)
+        event.listen(Engine, "after_cursor_execute", stop_query_timer)
+        event.listen(Engine, "handle_error", discard_query_timer)
+        _query_metrics_listeners_installed = True
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryMetrics]:
+    """Count the queries run by this thread inside a ``with`` block.
+
+    Yields:
+        QueryMetrics: Metrics that fill in while the block runs.
+    """
+
+    install_query_metrics_listeners()
+    query_metrics = QueryMetrics()
+    thread_recorders = get_thread_recorders()
+    thread_recorders.append(query_metrics)
+    try:
+        yield query_metrics
+    finally:
+        thread_recorders.remove(query_metrics)
+
+
+def start_request_query_metrics() -> None:
+    """Give the current request an empty set of query metrics."""
+
+    g.query_metrics = QueryMetrics()
+
+
+def finish_request_query_metrics(response: Response) -> Response:
+    """Expose and log the query metrics of the finished request."""
+
+    query_metrics = g.pop("query_metrics", None)
+    if query_metrics is None:
+        return response
+
+    if current_app.debug:
+        response.headers.add(
+            "Server-Timing",
+            f'db;desc="{query_metrics.query_count} queries";'
+            f"dur={query_metrics.total_milliseconds:.1f}",
+        )
+
+    slow_query_count = int(current_app.config.get("SLOW_REQUEST_QUERY_COUNT", 0))
+    slow_query_milliseconds = float(
+        current_app.config.get("SLOW_REQUEST_QUERY_MILLISECONDS", 0)
+    )
+    if (slow_query_count and query_metrics.query_count > slow_query_count) or (
+        slow_query_milliseconds
+        and query_metrics.total_milliseconds > slow_query_milliseconds
+    ):
+        logger.warning(
+            "%s %s ran %s SQL queries in %.1f ms.",
+            request.method,
+            request.path,
+            query_metrics.query_count,
+            query_metrics.total_milliseconds,
+        )
+
+    return response
+
+
+def init_query_metrics(flask_application: Flask) -> None:
+    """Collect per-request query metrics for one Flask application."""
+
+    install_query_metrics_listeners()
+    flask_application.before_request(start_request_query_metrics)
+    flask_application.after_request(finish_request_query_metrics)
@@ -0,0 +1,354 @@
+"""Create and remove development-only test bookings in bulk.
+
+``flask seed-test-bookings`` uses these helpers to fill the database with
+large, repeatable booking sets for scale testing. Rows are written with
+batched core ``INSERT`` statements instead of one ORM object and one flush per
+order, so tens of thousands of bookings take seconds instead of minutes.
+
+Every seeded order is marked with ``payment_provider='dev_seed'``, so
+:func:`clear_seed_bookings` can remove them again with two set-based
+``DELETE`` statements without touching real bookings.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from .db_models import (
+    ArchivedBookedCanoe,
+    ArchivedBookingOrder,
+    BookedCanoe,
+    BookingOrder,
+    Event,
+    db,
+    get_current_utc_time,
+)
+from .event_booking_stats import rebuild_event_booking_stats
+from .event_settings import (
+    apply_event_template_values,
+    build_event_template_values,
+    bump_event_booking_version,
+)
+
+SEED_PAYMENT_PROVIDER = "dev_seed"
+SEED_INSERT_BATCH_SIZE = 1000
+
+# A short name list on purpose: large seeds then contain many people with the
+# same name, like the grouped overview and checklist see on a real event day.
+SEED_FIRST_NAMES = (
+    "Alice",
+    "Anna",
+    "Astrid",
+    "Erik",
+    "Elsa",
+    "Johan",
+    "Karin",
+    "Lars",
+    "Maja",
+    "Nils",
+    "Olle",
+    "Sara",
+)
+SEED_LAST_NAMES = (
+    "Andersson",
+    "Berg",
+    "Eriksson",
+    "Gustafsson",
+    "Johansson",
+    "Karlsson",
+    "Lind",
+    "Nilsson",
+    "Persson",
+    "Svensson",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class SeedBookingOptions:
+    """What :func:`seed_bookings` should create.
+
+    Attributes:
+        order_count: Number of booking orders to create.
+        canoes_per_order: Canoe rows per order.
+        event_count: Number of events to spread the orders over. The active
+            event is always used; extra events are earlier, inactive events.
+        pending_share: Share of orders left as active unpaid holds.
+        expired_share: Share of orders left as unpaid holds that have already
+            expired, so cleanup code has something to release.
+        with_passengers: Whether canoes get a second (and sometimes a third)
+            named rider.
+        random_seed: Seed for names and statuses, so runs are repeatable.
+    """
+
+    order_count: int
+    canoes_per_order: int = 1
+    event_count: int = 1
+    pending_share: float = 0.0
+    expired_share: float = 0.0
+    with_passengers: bool = False
+    random_seed: int = 2026
+
+
+@dataclass(slots=True)
+class SeedBookingResult:
+    """Counts of the rows created by one :func:`seed_bookings` run."""
+
+    order_counts: dict[str, int] = field(
+        default_factory=lambda: {"paid": 0, "pending": 0, "expired": 0}
+    )
+    canoe_count: int = 0
+    event_ids: list[int] = field(default_factory=list)
+
+    @property
+    def order_count(self) -> int:
+        """Return the total number of created orders."""
+
+        return sum(self.order_counts.values())
+
+
+def clear_seed_bookings() -> int:
+    """Delete every development seed booking and return the order count.
+
+    Returns:
+        int: Number of seeded booking orders removed.
+    """
+
+    seeded_order_filter = BookingOrder.payment_provider == SEED_PAYMENT_PROVIDER
+    seeded_event_ids = (
+        db.session.execute(
+            db.select(BookingOrder.event_id).where(seeded_order_filter).distinct()
+        )
+        .scalars()
+        .all()
+    )
+    for event_id in seeded_event_ids:
+        bump_event_booking_version(event_id)
+    archived_seeded_event_ids = (
+        db.session.execute(
+            db.select(ArchivedBookingOrder.event_id)
+            .where(ArchivedBookingOrder.payment_provider == SEED_PAYMENT_PROVIDER)
+            .distinct()
+        )
+        .scalars()
+        .all()
+    )
+
+    # Canoes first, because their foreign key points at the orders.
+    db.session.execute(
+        db.delete(BookedCanoe).where(
+            BookedCanoe.booking_order_id.in_(
+                db.select(BookingOrder.id).where(seeded_order_filter)
+            )
+        ),
+        execution_options={"synchronize_session": False},
+    )
+    deleted_order_count = (
+        db.session.execute(
+            db.delete(BookingOrder).where(seeded_order_filter),
+            execution_options={"synchronize_session": False},
+        ).rowcount
+        or 0
+    )
+
+    # Seeded orders of archived events live in the archive tables.
+    db.session.execute(
+        db.delete(ArchivedBookedCanoe).where(
+            ArchivedBookedCanoe.booking_order_id.in_(
+                db.select(ArchivedBookingOrder.id).where(
+                    ArchivedBookingOrder.payment_provider == SEED_PAYMENT_PROVIDER
+                )
+            )
+        ),
+        execution_options={"synchronize_session": False},
+    )
+    deleted_order_count += (
+        db.session.execute(
+            db.delete(ArchivedBookingOrder).where(
+                ArchivedBookingOrder.payment_provider == SEED_PAYMENT_PROVIDER
+            ),
+            execution_options={"synchronize_session": False},
+        ).rowcount
+        or 0
+    )
+
+    for event_id in {*seeded_event_ids, *archived_seeded_event_ids}:
+        if event_id is not None:
+            rebuild_event_booking_stats(event_id)
+    db.session.commit()
+    return int(deleted_order_count)
+
+
+def get_or_create_seed_events(active_event: Event, event_count: int) -> list[Event]:
+    """Return the active event plus ``event_count - 1`` earlier events.
+
+    Extra events are placed 52 weeks apart before the active event, so they
+    keep its weekday. Existing events on those dates are reused.
+    """
+
+    seed_events = [active_event]
+    template_values = build_event_template_values(active_event)
+    for years_back in range(1, event_count):
+        event_date = active_event.event_date - timedelta(weeks=52 * years_back)
+        seed_event = Event.query.filter_by(event_date=event_date).first()
+        if seed_event is None:
+            seed_event = Event(event_date=event_date, is_active=False)
+            apply_event_template_values(seed_event, template_values)
+            db.session.add(seed_event)
+        seed_events.append(seed_event)
+
+    db.session.flush()
+    return seed_events
+
+
+def pick_seed_order_kind(
+    random_generator: random.Random, options: SeedBookingOptions
+) -> str:
+    """Return ``paid``, ``pending``, or ``expired`` for one seeded order."""
+
+    roll = random_generator.random()
+    if roll < options.expired_share:
+        return "expired"
+    if roll < options.expired_share + options.pending_share:
+        return "pending"
+    return "paid"
+
+
+def build_seed_canoe_row(
+    random_generator: random.Random,
+    booking_order_id: int,
+    canoe_index: int,
+    order_kind: str,
+    options: SeedBookingOptions,
+    created_at: datetime,
+) -> dict[str, object]:
+    """Return the column values for one seeded canoe row.
+
+    Every row has the same keys, because a batched ``INSERT`` takes its column
+    list from the first row.
+    """
+
+    canoe_row: dict[str, object] = {
+        "booking_order_id": booking_order_id,
+        "participant_first_name": random_generator.choice(SEED_FIRST_NAMES),
+        "participant_last_name": random_generator.choice(SEED_LAST_NAMES),
+        "passenger_two_first_name": None,
+        "passenger_two_last_name": None,
+        "passenger_three_first_name": None,
+        "passenger_three_last_name": None,
+        "status": "confirmed" if order_kind == "paid" else "reserved",
+        "picked_up": False,
+        "created_at": created_at,
+    }
+    if options.with_passengers:
+        canoe_row["passenger_two_first_name"] = random_generator.choice(
+            SEED_FIRST_NAMES
+        )
+        canoe_row["passenger_two_last_name"] = random_generator.choice(SEED_LAST_NAMES)
+        # Every third canoe carries a third rider, as family canoes often do.
+        if canoe_index % 3 == 2:
+            canoe_row["passenger_three_first_name"] = random_generator.choice(
+                SEED_FIRST_NAMES
+            )
+            canoe_row["passenger_three_last_name"] = random_generator.choice(
+                SEED_LAST_NAMES
+            )
+
+    return canoe_row
+
+
+def seed_bookings(
+    active_event: Event, options: SeedBookingOptions
+) -> SeedBookingResult:
+    """Insert a repeatable set of development bookings in batches.
+
+    References are computed up front (``TEST-000001`` and so on), so orders do
+    not need a flush each to learn their ID. Each batch of orders is inserted
+    with one ``INSERT ... RETURNING`` and its canoes with one more ``INSERT``.
+    The database still assigns every ID, which keeps Postgres sequences valid.
+
+    Args:
+        active_event: Active event that always receives seeded bookings.
+        options: Size and shape of the data set.
+
+    Returns:
+        SeedBookingResult: Counts of the created rows.
+    """
+
+    random_generator = random.Random(options.random_seed)
+    seed_events = get_or_create_seed_events(active_event, options.event_count)
+    result = SeedBookingResult(event_ids=[seed_event.id for seed_event in seed_events])
+    current_time = get_current_utc_time()
+    booking_order_table = BookingOrder.__table__
+
+    for batch_start in range(0, options.order_count, SEED_INSERT_BATCH_SIZE):
+        batch_numbers = range(
+            batch_start + 1,
+            min(batch_start + SEED_INSERT_BATCH_SIZE, options.order_count) + 1,
+        )
+        order_rows = []
+        order_kinds: dict[str, str] = {}
+        for booking_number in batch_numbers:
+            seed_event = seed_events[(booking_number - 1) % len(seed_events)]
+            order_kind = pick_seed_order_kind(random_generator, options)
+            public_booking_reference = f"TEST-{booking_number:06d}"
+            order_kinds[public_booking_reference] = order_kind
+            result.order_counts[order_kind] += 1
+
+            # Expired holds were created long enough ago to have run out.
+            created_at = (
+                current_time - timedelta(hours=1)
+                if order_kind == "expired"
+                else current_time
+            )
+            order_rows.append(
+                {
+                    "event_id": seed_event.id,
+                    "public_booking_reference": public_booking_reference,
+                    "status": "paid" if order_kind == "paid" else "pending_payment",
+                    "canoe_count": options.canoes_per_order,
+                    "total_amount": Decimal(seed_event.price_per_canoe_sek)
+                    * options.canoes_per_order,
+                    "currency": "sek",
+                    "payment_provider": SEED_PAYMENT_PROVIDER,
+                    "payer_full_name": f"Testbokning {booking_number:06d}",
+                    "payer_email": f"testbokning{booking_number:06d}@example.invalid",
+                    "paid_at": current_time if order_kind == "paid" else None,
+                    "expires_at": created_at + timedelta(minutes=15),
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                }
+            )
+
+        inserted_orders = db.session.execute(
+            booking_order_table.insert().returning(
+                booking_order_table.c.id,
+                booking_order_table.c.public_booking_reference,
+            ),
+            order_rows,
+        ).all()
+
+        canoe_rows = []
+        for booking_order_id, public_booking_reference in inserted_orders:
+            order_kind = order_kinds[public_booking_reference]
+            for _ in range(options.canoes_per_order):
+                canoe_rows.append(
+                    build_seed_canoe_row(
+                        random_generator,
+                        booking_order_id,
+                        result.canoe_count + len(canoe_rows),
+                        order_kind,
+                        options,
+                        current_time,
+                    )
+                )
+        db.session.execute(BookedCanoe.__table__.insert(), canoe_rows)
+        result.canoe_count += len(canoe_rows)
+
+    for seed_event in seed_events:
+        bump_event_booking_version(seed_event.id)
+        rebuild_event_booking_stats(seed_event.id)
+    db.session.commit()
+    return result
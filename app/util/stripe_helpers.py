@@ -7,14 +7,23 @@ environment variables directly in multiple routes.
 
 from __future__ import annotations
 
+import hashlib
+import threading
+import time
+from collections.abc import Callable, Mapping
 from copy import deepcopy
 from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
-from typing import Any, Mapping, cast
+from datetime import UTC, datetime, timedelta
+from typing import Any, cast
 from urllib.parse import quote, urlsplit
 
-from flask import current_app
 import stripe
+from flask import Flask, current_app
+
+from .outbound_http import get_shared_stripe_client
+
+CHECKOUT_PRODUCT_IMAGE_CACHE_EXTENSION_KEY = "paddlingen_checkout_product_image_cache"
+CHECKOUT_SESSION_CACHE_EXTENSION_KEY = "paddlingen_checkout_session_cache"
 
 
 @dataclass(frozen=True)
@@ -167,10 +176,14 @@ def is_stripe_checkout_configured() -> bool:
 
 
 def build_stripe_client() -> stripe.StripeClient:
-    """Return a Stripe client configured with the current app's secret key."""
+    """Return a Stripe client configured with the current app's secret key.
+
+    The client is shared by the app process and sends its requests through the
+    pooled keep-alive session from :mod:`app.util.outbound_http`.
+    """
 
     stripe_configuration = get_stripe_checkout_configuration()
-    return stripe.StripeClient(stripe_configuration.secret_key)
+    return get_shared_stripe_client(stripe_configuration.secret_key)
 
 
 def build_stripe_checkout_product_image_url(public_base_url: str) -> str:
@@ -211,33 +224,174 @@ def get_catalog_product_image_urls(
     return cleaned_image_urls
 
 
+class CheckoutProductImageCache:
+    """Remember Stripe catalog product images per process for a short time.
+
+    Looking up the Dashboard product on every checkout adds a full Stripe round
+    trip to the "Boka" click. The cache keeps the last known image list per
+    product ID and tracks which products are already being refreshed, so only
+    one background refresh runs at a time.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[list[str], float]] = {}
+        self._refreshing_product_ids: set[str] = set()
+
+    def get(self, checkout_product_id: str) -> list[str] | None:
+        """Return the cached image URLs, even when they are past their TTL."""
+
+        with self._lock:
+            cached_entry = self._entries.get(checkout_product_id)
+        return list(cached_entry[0]) if cached_entry is not None else None
+
+    def is_fresh(self, checkout_product_id: str) -> bool:
+        """Return whether the cached images are younger than the TTL."""
+
+        with self._lock:
+            cached_entry = self._entries.get(checkout_product_id)
+        return (
+            cached_entry is not None
+            and self.clock() - cached_entry[1] < self.ttl_seconds
+        )
+
+    def store(self, checkout_product_id: str, image_urls: list[str]) -> None:
+        """Save a freshly loaded image list for one product."""
+
+        with self._lock:
+            self._entries[checkout_product_id] = (list(image_urls), self.clock())
+
+    def claim_refresh(self, checkout_product_id: str) -> bool:
+        """Mark one product as refreshing, unless a refresh already runs."""
+
+        with self._lock:
+            if checkout_product_id in self._refreshing_product_ids:
+                return False
+            self._refreshing_product_ids.add(checkout_product_id)
+            return True
+
+    def release_refresh(self, checkout_product_id: str) -> None:
+        """Allow a new refresh for one product after the current one ends."""
+
+        with self._lock:
+            self._refreshing_product_ids.discard(checkout_product_id)
+
+    def clear(self) -> None:
+        """Forget every cached image list."""
+
+        with self._lock:
+            self._entries.clear()
+
+
+def get_checkout_product_image_cache() -> CheckoutProductImageCache:
+    """Return the product image cache stored on the current Flask application."""
+
+    extensions = current_app.extensions
+    product_image_cache = extensions.get(CHECKOUT_PRODUCT_IMAGE_CACHE_EXTENSION_KEY)
+    if product_image_cache is None:
+        product_image_cache = CheckoutProductImageCache(
+            ttl_seconds=float(
+                current_app.config.get(
+                    "STRIPE_PRODUCT_IMAGE_CACHE_TTL_SECONDS", 15 * 60
+                )
+            )
+        )
+        extensions[CHECKOUT_PRODUCT_IMAGE_CACHE_EXTENSION_KEY] = product_image_cache
+
+    return product_image_cache
+
+
+def refresh_checkout_product_image_cache(checkout_product_id: str) -> list[str] | None:
+    """Load the Dashboard product images from Stripe and store them in the cache.
+
+    Args:
+        checkout_product_id: Stripe Product ID configured for Checkout images.
+
+    Returns:
+        list[str] | None: The loaded image URLs, or ``None`` when Stripe could
+        not be reached. A failed refresh keeps the previously cached images.
+    """
+
+    try:
+        catalog_image_urls = get_catalog_product_image_urls(
+            build_stripe_client(),
+            checkout_product_id,
+        )
+    except stripe.StripeError:
+        current_app.logger.warning(
+            "Could not load Stripe catalog product image for hosted Checkout.",
+            extra={"stripe_checkout_product_id": checkout_product_id},
+        )
+        return None
+
+    get_checkout_product_image_cache().store(checkout_product_id, catalog_image_urls)
+    return catalog_image_urls
+
+
+def start_checkout_product_image_refresh(
+    flask_application: Flask,
+    checkout_product_id: str,
+) -> threading.Thread | None:
+    """Refresh the cached product images in a background thread.
+
+    Returns:
+        threading.Thread | None: The started thread, or ``None`` when another
+        refresh for the same product is already running.
+    """
+
+    with flask_application.app_context():
+        product_image_cache = get_checkout_product_image_cache()
+
+    if not product_image_cache.claim_refresh(checkout_product_id):
+        return None
+
+    def run_refresh() -> None:
+        try:
+            with flask_application.app_context():
+                refresh_checkout_product_image_cache(checkout_product_id)
+        finally:
+            product_image_cache.release_refresh(checkout_product_id)
+
+    refresh_thread = threading.Thread(
+        target=run_refresh,
+        name="stripe-product-image-refresh",
+        daemon=True,
+    )
+    refresh_thread.start()
+    return refresh_thread
+
+
 def get_checkout_product_image_urls(
-    stripe_client: stripe.StripeClient,
     stripe_configuration: StripeCheckoutConfiguration,
 ) -> list[str]:
     """Return the best available product images for hosted Checkout.
 
     The preferred source is a real Stripe Dashboard product because that lets
-    admins manage the image from Stripe without changing code. If no dashboard
-    product is configured, the app falls back to its own PNG only when the
-    configured public base URL is actually reachable by Stripe.
+    admins manage the image from Stripe without changing code. The product is
+    read from the per-process cache so creating a Checkout Session needs only
+    one Stripe call. Expired or missing cache entries are refreshed in the
+    background. Until the first refresh finishes, the app falls back to its own
+    PNG when the configured public base URL is actually reachable by Stripe.
     """
 
     checkout_product_id = stripe_configuration.checkout_product_id
     if checkout_product_id:
-        try:
-            catalog_image_urls = get_catalog_product_image_urls(
-                stripe_client,
+        product_image_cache = get_checkout_product_image_cache()
+        if not product_image_cache.is_fresh(checkout_product_id):
+            start_checkout_product_image_refresh(
+                current_app._get_current_object(),  # type: ignore[attr-defined]
                 checkout_product_id,
             )
-        except stripe.StripeError:
-            current_app.logger.warning(
-                "Could not load Stripe catalog product image for hosted Checkout.",
-                extra={"stripe_checkout_product_id": checkout_product_id},
-            )
-        else:
-            if catalog_image_urls:
-                return catalog_image_urls
+
+        catalog_image_urls = product_image_cache.get(checkout_product_id)
+        if catalog_image_urls:
+            return catalog_image_urls
 
     if not can_use_public_base_url_for_checkout_product_image(
         stripe_configuration.public_base_url
@@ -274,11 +428,50 @@ def enrich_checkout_line_items_for_hosted_checkout(
     return enriched_line_items
 
 
+def build_checkout_session_expires_at(
+    local_hold_expires_at: datetime | None = None,
+) -> int:
+    """Return the Stripe ``expires_at`` timestamp for a new Checkout Session.
+
+    Stripe needs at least 30 minutes from creation. Counting from the end of
+    the local hold keeps that true for every call made while the hold is
+    active, and gives the same value each time for the same order.
+    """
+
+    if local_hold_expires_at is None:
+        return int((datetime.now(UTC) + timedelta(minutes=30)).timestamp())
+
+    if local_hold_expires_at.tzinfo is None:
+        local_hold_expires_at = local_hold_expires_at.replace(tzinfo=UTC)
+    return int((local_hold_expires_at + timedelta(minutes=30)).timestamp())
+
+
+def build_checkout_session_idempotency_key(
+    idempotency_key: str,
+    product_image_urls: list[str],
+) -> str:
+    """Return the Stripe ``Idempotency-Key`` for one order and image set.
+
+    Product images come from a per-process cache that can warm up or change
+    between two attempts for the same order. Stripe rejects a reused key whose
+    parameters differ, so the image set is part of the key: a retry with the
+    same images gets the first session back, and a retry after the images
+    changed asks for a new session instead of failing.
+    """
+
+    image_set_digest = hashlib.sha256(
+        "\n".join(product_image_urls).encode("utf-8")
+    ).hexdigest()[:16]
+    return f"{idempotency_key}-{image_set_digest}"
+
+
 def create_stripe_checkout_session(
     public_booking_reference: str,
     stripe_line_items: list[dict[str, object]],
     metadata: Mapping[str, str],
     payment_intent_description: str | None = None,
+    idempotency_key: str | None = None,
+    local_hold_expires_at: datetime | None = None,
 ) -> stripe.checkout.Session:
     """Create one hosted Stripe Checkout Session for a local booking attempt.
 
@@ -289,6 +482,13 @@ def create_stripe_checkout_session(
             lookup and webhook handling.
         payment_intent_description: Optional short receipt description shown by
             Stripe in the successful payment receipt email.
+        idempotency_key: The order's key. Together with the product image
+            set it makes Stripe's ``Idempotency-Key`` header, so a repeated
+            create call for the same order returns the same session.
+        local_hold_expires_at: Expiry of the local booking hold. When given,
+            the Stripe session expiry is derived from it instead of from the
+            current time, so a repeated call sends identical parameters, which
+            Stripe requires when an idempotency key is reused.
 
     Returns:
         stripe.checkout.Session: Newly created Stripe Checkout Session.
@@ -296,10 +496,7 @@ def create_stripe_checkout_session(
 
     stripe_configuration = get_stripe_checkout_configuration()
     stripe_client = build_stripe_client()
-    product_image_urls = get_checkout_product_image_urls(
-        stripe_client,
-        stripe_configuration,
-    )
+    product_image_urls = get_checkout_product_image_urls(stripe_configuration)
     hosted_checkout_line_items = enrich_checkout_line_items_for_hosted_checkout(
         stripe_line_items,
         product_image_urls,
@@ -330,25 +527,175 @@ def create_stripe_checkout_session(
         # Stripe only allows expires_at between 30 minutes and 24 hours
         # from session creation. The local booking hold is shorter and is
         # enforced by the app before the visitor enters Stripe Checkout.
-        "expires_at": int(
-            (datetime.now(timezone.utc) + timedelta(minutes=30)).timestamp()
-        ),
+        "expires_at": build_checkout_session_expires_at(local_hold_expires_at),
     }
     if payment_intent_description:
         checkout_payload["payment_intent_data"] = {
             "description": payment_intent_description,
         }
 
-    return stripe_client.v1.checkout.sessions.create(cast(Any, checkout_payload))
+    request_options: dict[str, Any] = {}
+    if idempotency_key:
+        request_options["idempotency_key"] = build_checkout_session_idempotency_key(
+            idempotency_key, product_image_urls
+        )
+
+    return stripe_client.v1.checkout.sessions.create(
+        cast(Any, checkout_payload),
+        cast(Any, request_options),
+    )
+
+
+class CheckoutSessionCache:
+    """Remember retrieved Checkout Sessions per process for a few seconds.
+
+    The payment return page, the status API, and the cancel path can all look
+    up the same session within seconds of each other. Reusing a very recent
+    answer keeps one visitor's repeated requests from turning into repeated
+    Stripe calls. Webhook processing forgets the session as soon as Stripe
+    reports a change, so the next lookup asks Stripe again.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_entries: int = 1000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[stripe.checkout.Session, float]] = {}
+
+    def get(self, checkout_session_id: str) -> stripe.checkout.Session | None:
+        """Return the cached session while it is younger than the TTL."""
+
+        with self._lock:
+            cached_entry = self._entries.get(checkout_session_id)
+            if cached_entry is None:
+                return None
+            if self.clock() - cached_entry[1] >= self.ttl_seconds:
+                del self._entries[checkout_session_id]
+                return None
+            return cached_entry[0]
+
+    def store(
+        self,
+        checkout_session_id: str,
+        checkout_session: stripe.checkout.Session,
+    ) -> None:
+        """Save a session that was just loaded from Stripe."""
+
+        if self.ttl_seconds <= 0:
+            return
+
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                # Drop expired entries first, then the oldest ones, so the
+                # cache stays small even when many visitors pay at once.
+                now = self.clock()
+                self._entries = {
+                    cached_id: cached_entry
+                    for cached_id, cached_entry in self._entries.items()
+                    if now - cached_entry[1] < self.ttl_seconds
+                }
+                while len(self._entries) >= self.max_entries:
+                    del self._entries[next(iter(self._entries))]
+            self._entries[checkout_session_id] = (checkout_session, self.clock())
+
+    def forget(self, checkout_session_id: str) -> None:
+        """Drop one session so the next lookup asks Stripe again."""
+
+        with self._lock:
+            self._entries.pop(checkout_session_id, None)
+
+    def clear(self) -> None:
+        """Forget every cached session."""
+
+        with self._lock:
+            self._entries.clear()
+
+
+def get_checkout_session_cache() -> CheckoutSessionCache:
+    """Return the Checkout Session cache stored on the current Flask application."""
+
+    extensions = current_app.extensions
+    checkout_session_cache = extensions.get(CHECKOUT_SESSION_CACHE_EXTENSION_KEY)
+    if checkout_session_cache is None:
+        checkout_session_cache = CheckoutSessionCache(
+            ttl_seconds=float(
+                current_app.config.get("STRIPE_CHECKOUT_SESSION_CACHE_SECONDS", 10)
+            )
+        )
+        extensions[CHECKOUT_SESSION_CACHE_EXTENSION_KEY] = checkout_session_cache
+
+    return checkout_session_cache
+
+
+def forget_cached_checkout_session(checkout_session_id: str) -> None:
+    """Drop one Checkout Session from the cache after Stripe reports a change."""
+
+    if checkout_session_id:
+        get_checkout_session_cache().forget(checkout_session_id)
 
 
 def retrieve_stripe_checkout_session(
     checkout_session_id: str,
+    *,
+    use_cache: bool = True,
 ) -> stripe.checkout.Session:
-    """Retrieve one Stripe Checkout Session by ID."""
+    """Retrieve one Stripe Checkout Session by ID.
+
+    Args:
+        checkout_session_id: Stripe Checkout Session ID such as ``cs_test_...``.
+        use_cache: Reuse a session retrieved during the last
+            ``STRIPE_CHECKOUT_SESSION_CACHE_SECONDS``. Pass ``False`` when the
+            caller must see Stripe's latest state.
+
+    Returns:
+        stripe.checkout.Session: The cached or freshly retrieved session.
+    """
+
+    checkout_session_cache = get_checkout_session_cache()
+    if use_cache:
+        cached_checkout_session = checkout_session_cache.get(checkout_session_id)
+        if cached_checkout_session is not None:
+            return cached_checkout_session
 
     stripe_client = build_stripe_client()
-    return stripe_client.v1.checkout.sessions.retrieve(checkout_session_id)
+    checkout_session = stripe_client.v1.checkout.sessions.retrieve(checkout_session_id)
+    checkout_session_cache.store(checkout_session_id, checkout_session)
+    return checkout_session
+
+
+def list_stripe_checkout_sessions(
+    created_after: int,
+    *,
+    starting_after: str | None = None,
+    page_size: int = 100,
+) -> stripe.ListObject[stripe.checkout.Session]:
+    """List one page of Checkout Sessions created at or after a timestamp.
+
+    Args:
+        created_after: Unix timestamp used as Stripe's ``created[gte]`` filter.
+        starting_after: Last session ID from the previous page, if any.
+        page_size: Sessions per page. Stripe allows at most 100.
+
+    Returns:
+        stripe.ListObject[stripe.checkout.Session]: One page with ``data`` and
+        ``has_more``.
+    """
+
+    list_params: dict[str, Any] = {
+        "created": {"gte": created_after},
+        "limit": page_size,
+    }
+    if starting_after:
+        list_params["starting_after"] = starting_after
+
+    stripe_client = build_stripe_client()
+    return stripe_client.v1.checkout.sessions.list(cast(Any, list_params))
 
 
 def expire_stripe_checkout_session(
@@ -365,7 +712,13 @@ def expire_stripe_checkout_session(
     """
 
     stripe_client = build_stripe_client()
-    return stripe_client.v1.checkout.sessions.expire(checkout_session_id)
+    expired_checkout_session = stripe_client.v1.checkout.sessions.expire(
+        checkout_session_id
+    )
+    # The expire response is Stripe's newest state, so later lookups can
+    # reuse it instead of the "open" session cached before the call.
+    get_checkout_session_cache().store(checkout_session_id, expired_checkout_session)
+    return expired_checkout_session
 
 
 def construct_stripe_webhook_event(
@@ -0,0 +1,177 @@
+"""Reconcile pending booking orders with Stripe in bulk.
+
+The browser return path checks one Checkout Session per order, and the webhook
+normally confirms the rest. After a webhook outage many orders can be stuck in
+a pending state. ``flask reconcile-stripe`` recovers them by listing recent
+Checkout Sessions page by page with Stripe's list API. That costs one API call
+per 100 sessions instead of one call per order.
+
+Each listed page is matched to local orders with one query on the indexed
+``payment_provider_session_id`` column, and all confirmations and releases for
+that page are saved in one transaction.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy.orm import selectinload
+
+from .booking_status_notifications import publish_booking_status_change
+from .db_models import BookingOrder, db
+from .event_settings import bump_event_booking_version
+from .stripe_helpers import list_stripe_checkout_sessions
+from .stripe_webhooks import (
+    PENDING_WEBHOOK_BOOKING_ORDER_STATUSES,
+    get_stripe_object_value,
+    mark_booking_order_paid,
+)
+
+logger = logging.getLogger(__name__)
+
+# Extra margin before the oldest pending order so a session created a moment
+# before its local order row, or with a slightly different clock, is still
+# listed.
+RECONCILIATION_CREATED_AFTER_MARGIN = timedelta(minutes=5)
+
+
+def get_default_reconciliation_start() -> datetime | None:
+    """Return the creation time of the oldest pending order with a session.
+
+    Returns:
+        datetime | None: Start of the list window, or ``None`` when no order
+        waits on Stripe and nothing needs to be listed.
+    """
+
+    oldest_created_at = (
+        db.session.query(db.func.min(BookingOrder.created_at))
+        .filter(
+            BookingOrder.status.in_(PENDING_WEBHOOK_BOOKING_ORDER_STATUSES),
+            BookingOrder.payment_provider_session_id.isnot(None),
+        )
+        .scalar()
+    )
+    if oldest_created_at is None:
+        return None
+
+    if oldest_created_at.tzinfo is None:
+        # SQLite returns naive datetimes even for timezone-aware columns.
+        oldest_created_at = oldest_created_at.replace(tzinfo=UTC)
+
+    return oldest_created_at - RECONCILIATION_CREATED_AFTER_MARGIN
+
+
+def apply_checkout_session_page(checkout_sessions: list[object]) -> dict[str, int]:
+    """Confirm or release the pending orders matching one page of sessions.
+
+    Args:
+        checkout_sessions: Checkout Sessions from one Stripe list page.
+
+    Returns:
+        dict[str, int]: Number of ``confirmed``, ``released``, and ``pending``
+        orders on this page.
+    """
+
+    page_counts = {"confirmed": 0, "released": 0, "pending": 0}
+    checkout_sessions_by_id = {
+        str(get_stripe_object_value(checkout_session, "id")): checkout_session
+        for checkout_session in checkout_sessions
+    }
+    if not checkout_sessions_by_id:
+        return page_counts
+
+    changed_booking_order_ids: list[int] = []
+    matching_booking_orders = (
+        BookingOrder.query.options(selectinload(BookingOrder.booked_canoes))
+        .filter(
+            BookingOrder.payment_provider_session_id.in_(checkout_sessions_by_id),
+            BookingOrder.status.in_(PENDING_WEBHOOK_BOOKING_ORDER_STATUSES),
+        )
+        .all()
+    )
+    for booking_order in matching_booking_orders:
+        checkout_session = checkout_sessions_by_id[
+            booking_order.payment_provider_session_id
+        ]
+        payment_status = str(
+            get_stripe_object_value(checkout_session, "payment_status") or ""
+        )
+        checkout_status = str(get_stripe_object_value(checkout_session, "status") or "")
+
+        if payment_status == "paid":
+            # False when the webhook or a return page confirmed it meanwhile.
+            if mark_booking_order_paid(booking_order, checkout_session):
+                changed_booking_order_ids.append(booking_order.id)
+                page_counts["confirmed"] += 1
+        elif checkout_status == "expired":
+            bump_event_booking_version(booking_order.event_id)
+            db.session.delete(booking_order)
+            changed_booking_order_ids.append(booking_order.id)
+            page_counts["released"] += 1
+        else:
+            page_counts["pending"] += 1
+
+    db.session.commit()
+    for booking_order_id in changed_booking_order_ids:
+        publish_booking_status_change(booking_order_id)
+    return page_counts
+
+
+def reconcile_pending_orders_with_stripe(
+    created_after: datetime | None = None,
+    *,
+    page_size: int = 100,
+) -> dict[str, int]:
+    """List recent Checkout Sessions and apply them to pending local orders.
+
+    Args:
+        created_after: Only list sessions created at or after this time.
+            Defaults to just before the oldest pending order.
+        page_size: Sessions per Stripe list call and per database batch.
+
+    Returns:
+        dict[str, int]: Totals for ``confirmed``, ``released``, and ``pending``
+        orders plus the number of ``stripe_pages`` that were listed.
+    """
+
+    reconciliation_counts = {
+        "confirmed": 0,
+        "released": 0,
+        "pending": 0,
+        "stripe_pages": 0,
+    }
+    if created_after is None:
+        created_after = get_default_reconciliation_start()
+        if created_after is None:
+            return reconciliation_counts
+
+    starting_after: str | None = None
+    while True:
+        checkout_session_page = list_stripe_checkout_sessions(
+            int(created_after.timestamp()),
+            starting_after=starting_after,
+            page_size=page_size,
+        )
+        reconciliation_counts["stripe_pages"] += 1
+        checkout_sessions = list(
+            get_stripe_object_value(checkout_session_page, "data") or []
+        )
+
+        page_counts = apply_checkout_session_page(checkout_sessions)
+        for count_name, count in page_counts.items():
+            reconciliation_counts[count_name] += count
+
+        if not checkout_sessions or not get_stripe_object_value(
+            checkout_session_page, "has_more"
+        ):
+            break
+        starting_after = str(get_stripe_object_value(checkout_sessions[-1], "id"))
+
+    logger.info(
+        "Stripe reconciliation confirmed %s, released %s, left %s pending.",
+        reconciliation_counts["confirmed"],
+        reconciliation_counts["released"],
+        reconciliation_counts["pending"],
+    )
+    return reconciliation_counts
@@ -0,0 +1,308 @@
+"""Queue verified Stripe webhook events and process them outside the request.
+
+The webhook endpoint should answer Stripe quickly and must not compete with
+visitor traffic when a burst of ``checkout.session.completed`` events arrives.
+It therefore only verifies the signature and stores the event in
+:class:`StripeWebhookInboxEvent`. The events are applied to local bookings by
+``flask process-stripe-webhooks`` or by a small in-process worker thread.
+
+Each drain claims one row at a time with a conditional UPDATE that also pushes
+``next_attempt_at`` forward. That lease keeps several workers from handling the
+same event, and a row whose worker crashed becomes available again once the
+lease runs out. Failed events are retried with exponential backoff.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from datetime import timedelta
+from typing import Any
+
+from flask import Flask, current_app
+from sqlalchemy.exc import IntegrityError
+
+from .db_models import StripeWebhookInboxEvent, db, get_current_utc_time
+from .stripe_webhooks import get_stripe_object_value, process_stripe_webhook_event
+
+logger = logging.getLogger(__name__)
+
+STRIPE_WEBHOOK_INBOX_WORKER_EXTENSION_KEY = "paddlingen_stripe_webhook_inbox_worker"
+DRAINABLE_INBOX_STATUSES = ("pending", "processing")
+
+
+def store_stripe_webhook_event(stripe_event: Any) -> str:
+    """Save one verified Stripe event in the inbox.
+
+    Args:
+        stripe_event: Verified event returned by ``stripe.Webhook.construct_event``
+            or an equivalent mapping.
+
+    Returns:
+        str: ``stored`` for a new event, ``duplicate`` when the event ID was
+        already in the inbox, or ``ignored_missing_event_id``.
+    """
+
+    stripe_event_id = str(get_stripe_object_value(stripe_event, "id") or "").strip()
+    if not stripe_event_id:
+        return "ignored_missing_event_id"
+
+    event_type = str(get_stripe_object_value(stripe_event, "type") or "").strip()
+    db.session.add(
+        StripeWebhookInboxEvent(
+            stripe_event_id=stripe_event_id,
+            event_type=event_type or "unknown",
+            # Stripe event objects are dictionaries, so the verified event can
+            # be stored as JSON and processed later without calling Stripe.
+            payload=json.dumps(stripe_event),
+        )
+    )
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return "duplicate"
+
+    return "stored"
+
+
+def get_retry_delay_seconds(attempt_count: int) -> float:
+    """Return the exponential backoff delay after one failed attempt."""
+
+    configuration = current_app.config
+    base_delay_seconds = float(
+        configuration.get("STRIPE_WEBHOOK_INBOX_RETRY_BASE_SECONDS", 30)
+    )
+    max_delay_seconds = float(
+        configuration.get("STRIPE_WEBHOOK_INBOX_RETRY_MAX_SECONDS", 60 * 60)
+    )
+    return min(max_delay_seconds, base_delay_seconds * 2 ** max(0, attempt_count - 1))
+
+
+def claim_stripe_webhook_inbox_event(stripe_event_id: str) -> bool:
+    """Take the processing lease for one due inbox row.
+
+    Returns:
+        bool: ``True`` when this caller now owns the row.
+    """
+
+    now = get_current_utc_time()
+    lease_seconds = float(
+        current_app.config.get("STRIPE_WEBHOOK_INBOX_LEASE_SECONDS", 5 * 60)
+    )
+    claimed_row_count = StripeWebhookInboxEvent.query.filter(
+        StripeWebhookInboxEvent.stripe_event_id == stripe_event_id,
+        StripeWebhookInboxEvent.status.in_(DRAINABLE_INBOX_STATUSES),
+        StripeWebhookInboxEvent.next_attempt_at <= now,
+    ).update(
+        {
+            "status": "processing",
+            "attempt_count": StripeWebhookInboxEvent.attempt_count + 1,
+            "next_attempt_at": now + timedelta(seconds=lease_seconds),
+        },
+        synchronize_session=False,
+    )
+    db.session.commit()
+    return claimed_row_count == 1
+
+
+def process_stripe_webhook_inbox_event(stripe_event_id: str) -> str:
+    """Apply one claimed inbox event and record the outcome.
+
+    Returns:
+        str: ``processed``, ``retry_scheduled``, ``failed``, or ``not_claimed``.
+    """
+
+    if not claim_stripe_webhook_inbox_event(stripe_event_id):
+        return "not_claimed"
+
+    inbox_event = db.session.get(StripeWebhookInboxEvent, stripe_event_id)
+    try:
+        event_type, processing_result = process_stripe_webhook_event(
+            json.loads(inbox_event.payload)
+        )
+    except Exception as error:
+        db.session.rollback()
+        inbox_event = db.session.get(StripeWebhookInboxEvent, stripe_event_id)
+        max_attempts = int(
+            current_app.config.get("STRIPE_WEBHOOK_INBOX_MAX_ATTEMPTS", 8)
+        )
+        inbox_event.last_error = f"{type(error).__name__}: {error}"
+        if inbox_event.attempt_count >= max_attempts:
+            inbox_event.status = "failed"
+            logger.exception(
+                "Giving up on Stripe webhook event %s after %s attempts.",
+                stripe_event_id,
+                inbox_event.attempt_count,
+            )
+            db.session.commit()
+            return "failed"
+
+        inbox_event.status = "pending"
+        inbox_event.next_attempt_at = get_current_utc_time() + timedelta(
+            seconds=get_retry_delay_seconds(inbox_event.attempt_count)
+        )
+        logger.warning(
+            "Stripe webhook event %s failed on attempt %s; retrying later.",
+            stripe_event_id,
+            inbox_event.attempt_count,
+            exc_info=True,
+        )
+        db.session.commit()
+        return "retry_scheduled"
+
+    inbox_event.status = "processed"
+    inbox_event.processing_result = processing_result
+    inbox_event.processed_at = get_current_utc_time()
+    inbox_event.last_error = None
+    db.session.commit()
+    logger.info(
+        "Processed Stripe webhook event %s (%s) with result %s.",
+        stripe_event_id,
+        event_type,
+        processing_result,
+    )
+    return "processed"
+
+
+def drain_stripe_webhook_inbox(batch_size: int | None = None) -> dict[str, int]:
+    """Process every due inbox event, one batch at a time.
+
+    Args:
+        batch_size: Number of rows read per query. Defaults to
+            ``STRIPE_WEBHOOK_INBOX_BATCH_SIZE``.
+
+    Returns:
+        dict[str, int]: Number of events per outcome label.
+    """
+
+    if batch_size is None:
+        batch_size = int(current_app.config.get("STRIPE_WEBHOOK_INBOX_BATCH_SIZE", 50))
+
+    outcome_counts = {
+        "processed": 0,
+        "retry_scheduled": 0,
+        "failed": 0,
+        "not_claimed": 0,
+    }
+    while True:
+        due_event_ids = [
+            stripe_event_id
+            for (stripe_event_id,) in db.session.query(
+                StripeWebhookInboxEvent.stripe_event_id
+            )
+            .filter(
+                StripeWebhookInboxEvent.status.in_(DRAINABLE_INBOX_STATUSES),
+                StripeWebhookInboxEvent.next_attempt_at <= get_current_utc_time(),
+            )
+            .order_by(StripeWebhookInboxEvent.received_at)
+            .limit(batch_size)
+            .all()
+        ]
+        if not due_event_ids:
+            return outcome_counts
+
+        for stripe_event_id in due_event_ids:
+            outcome = process_stripe_webhook_inbox_event(stripe_event_id)
+            outcome_counts[outcome] += 1
+
+        # Rows that failed now have a later next_attempt_at, so a short batch
+        # means nothing else is due right now.
+        if len(due_event_ids) < batch_size:
+            return outcome_counts
+
+
+class StripeWebhookInboxWorker:
+    """Drain the inbox in one daemon thread inside the web process.
+
+    The worker wakes up right after a new event is stored and otherwise checks
+    for due retries every ``interval_seconds``.
+    """
+
+    def __init__(self, flask_application: Flask, interval_seconds: float) -> None:
+        self.flask_application = flask_application
+        self.interval_seconds = max(1.0, interval_seconds)
+        self.wake_event = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start the background thread once."""
+
+        if self.thread is not None:
+            return
+
+        self.thread = threading.Thread(
+            target=self.run,
+            name="stripe-webhook-inbox-worker",
+            daemon=True,
+        )
+        self.thread.start()
+
+    def wake(self) -> None:
+        """Ask the worker to drain the inbox now."""
+
+        self.wake_event.set()
+
+    def stop(self) -> None:
+        """Ask the background thread to finish after the current drain."""
+
+        self.stop_event.set()
+        self.wake_event.set()
+
+    def run(self) -> None:
+        """Drain the inbox until :meth:`stop` is called."""
+
+        while not self.stop_event.is_set():
+            self.wake_event.clear()
+            with self.flask_application.app_context():
+                try:
+                    drain_stripe_webhook_inbox()
+                except Exception:
+                    db.session.rollback()
+                    logger.exception("Draining the Stripe webhook inbox failed.")
+                finally:
+                    db.session.remove()
+
+            self.wake_event.wait(self.interval_seconds)
+
+
+def start_stripe_webhook_inbox_worker(
+    flask_application: Flask,
+) -> StripeWebhookInboxWorker:
+    """Start the application's inbox worker thread once and return it.
+
+    The app factory calls this for every process that serves requests, so
+    due retries and rows left in ``processing`` by a restarted process are
+    drained without waiting for the next webhook.
+    """
+
+    extensions = flask_application.extensions
+    inbox_worker = extensions.get(STRIPE_WEBHOOK_INBOX_WORKER_EXTENSION_KEY)
+    if inbox_worker is None:
+        inbox_worker = StripeWebhookInboxWorker(
+            flask_application,
+            interval_seconds=float(
+                flask_application.config.get("STRIPE_WEBHOOK_INBOX_POLL_SECONDS", 30)
+            ),
+        )
+        extensions[STRIPE_WEBHOOK_INBOX_WORKER_EXTENSION_KEY] = inbox_worker
+        inbox_worker.start()
+
+    return inbox_worker
+
+
+def notify_stripe_webhook_inbox_worker() -> None:
+    """Wake the in-process inbox worker, starting it if it is not running yet.
+
+    Nothing happens when ``STRIPE_WEBHOOK_INBOX_WORKER_ENABLED`` is off; the
+    inbox is then drained only by ``flask process-stripe-webhooks``.
+    """
+
+    if not current_app.config.get("STRIPE_WEBHOOK_INBOX_WORKER_ENABLED"):
+        return
+
+    start_stripe_webhook_inbox_worker(
+        current_app._get_current_object()  # type: ignore[attr-defined]
+    ).wake()
@@ -10,11 +10,22 @@ from __future__ import annotations
 from collections.abc import Mapping
 
 from flask import current_app
+from sqlalchemy.orm.attributes import set_committed_value
 
+from .booking_status_notifications import publish_booking_status_change
+from .checkout_session_worker import CHECKOUT_SESSION_CREATING_STATUS
 from .db_models import BookingOrder, db, get_current_utc_time
+from .event_booking_stats import (
+    apply_event_booking_stats_change,
+    build_confirmed_canoe_stats_change,
+    build_paid_order_stats_change,
+)
+from .event_settings import bump_event_booking_version
+from .stripe_helpers import forget_cached_checkout_session
 
 PENDING_WEBHOOK_BOOKING_ORDER_STATUSES = {
     "pending_payment",
+    CHECKOUT_SESSION_CREATING_STATUS,
     "checkout_session_created",
 }
 
@@ -100,6 +111,54 @@ def sync_payer_details_from_checkout_session(
         booking_order.payer_full_name = payer_full_name
 
 
+def mark_booking_order_paid(
+    booking_order: BookingOrder,
+    checkout_session: object,
+) -> bool:
+    """Apply a paid Checkout Session to one pending order without committing.
+
+    Callers commit themselves, so bulk reconciliation can confirm many orders
+    in one transaction.
+
+    The inbox worker, the return-page reconcile, and ``flask reconcile-stripe``
+    can confirm the same order at the same time. The pending-to-paid step is
+    therefore one conditional ``UPDATE``: a second confirmation waits on the
+    row lock, then matches no row, so the event totals are only counted once.
+
+    Returns:
+        bool: ``True`` when this call moved the order to paid, ``False`` when
+        it was no longer pending. The order is expired from the session then,
+        so the next access reloads its current state.
+    """
+
+    paid_at = get_current_utc_time()
+    paid_update = db.session.execute(
+        db.update(BookingOrder)
+        .where(
+            BookingOrder.id == booking_order.id,
+            BookingOrder.status.in_(PENDING_WEBHOOK_BOOKING_ORDER_STATUSES),
+        )
+        .values(status="paid", paid_at=paid_at, expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    if paid_update.rowcount != 1:
+        db.session.expire(booking_order)
+        return False
+
+    # Mirror the update on the loaded order without marking it dirty again.
+    set_committed_value(booking_order, "status", "paid")
+    set_committed_value(booking_order, "paid_at", paid_at)
+    set_committed_value(booking_order, "expires_at", None)
+    sync_payer_details_from_checkout_session(booking_order, checkout_session)
+    bump_event_booking_version(booking_order.event_id)
+    stats_change = build_paid_order_stats_change(booking_order)
+    for booked_canoe in booking_order.booked_canoes:
+        booked_canoe.status = "confirmed"
+        stats_change += build_confirmed_canoe_stats_change(booked_canoe)
+    apply_event_booking_stats_change(booking_order.event_id, stats_change)
+    return True
+
+
 def confirm_paid_booking_from_checkout_session(checkout_session: object) -> str:
     """Mark a local booking as paid from a verified Checkout completion event."""
 
@@ -152,14 +211,16 @@ def confirm_paid_booking_from_checkout_session(checkout_session: object) -> str:
         )
         return "ignored_not_pending"
 
-    sync_payer_details_from_checkout_session(booking_order, checkout_session)
-    booking_order.status = "paid"
-    booking_order.paid_at = get_current_utc_time()
-    booking_order.expires_at = None
-    for booked_canoe in booking_order.booked_canoes:
-        booked_canoe.status = "confirmed"
+    if not mark_booking_order_paid(booking_order, checkout_session):
+        # Another worker changed the order since it was read above.
+        db.session.rollback()
+        return (
+            "already_paid" if booking_order.status == "paid" else "ignored_not_pending"
+        )
 
     db.session.commit()
+    # Wake payment return pages that are long-polling this booking.
+    publish_booking_status_change(booking_order.id)
     return "confirmed"
 
 
@@ -192,8 +253,11 @@ def release_expired_booking_from_checkout_session(checkout_session: object) -> s
     if booking_order.status not in PENDING_WEBHOOK_BOOKING_ORDER_STATUSES:
         return "ignored_not_pending"
 
+    booking_order_id = booking_order.id
+    bump_event_booking_version(booking_order.event_id)
     db.session.delete(booking_order)
     db.session.commit()
+    publish_booking_status_change(booking_order_id)
     return "released"
 
 
@@ -202,6 +266,11 @@ def process_stripe_webhook_event(stripe_event: object) -> tuple[str, str]:
 
     event_type = str(get_stripe_object_value(stripe_event, "type") or "").strip()
     checkout_session = get_checkout_session_from_event(stripe_event)
+    if event_type.startswith("checkout.session.") and checkout_session is not None:
+        # Stripe just reported a change, so a cached lookup is now stale.
+        forget_cached_checkout_session(
+            str(get_stripe_object_value(checkout_session, "id") or "")
+        )
 
     if event_type == "checkout.session.completed" and checkout_session is not None:
         return event_type, confirm_paid_booking_from_checkout_session(checkout_session)
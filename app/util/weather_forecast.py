@@ -0,0 +1,589 @@
+"""Helpers for prefetching and storing the MET Norway weather forecast.
+
+The homepage weather widget should never make a visitor wait on an upstream
+service. A CLI command or an optional in-process scheduler fetches the MET
+forecast for every active event inside its forecast window and stores the
+parsed result in :class:`EventWeatherCache`. The public API then only reads
+that local row. A simple circuit breaker stops new outbound MET calls for a
+short cooldown period after repeated failures.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, date, timedelta
+from typing import Any
+
+import requests
+from flask import Flask, current_app
+
+from .db_models import Event, EventWeatherCache, db, get_current_utc_time
+from .event_settings import get_weather_coordinates_with_fallback
+from .outbound_http import get_outbound_http_session
+
+logger = logging.getLogger(__name__)
+
+# MET Norway Weather API endpoint
+MET_API_URL = "https://api.met.no/weatherapi/locationforecast/2.0/compact"
+MET_REQUEST_HEADERS = {
+    "User-Agent": "PaddlingenEventApp/1.0 (contact@example.com)"  # Required by MET API
+}
+WEATHER_FORECAST_FETCHER_EXTENSION_KEY = "paddlingen_weather_forecast_fetcher"
+WEATHER_REFRESH_SCHEDULER_EXTENSION_KEY = "paddlingen_weather_refresh_scheduler"
+WEATHER_FORECAST_INDEX_EXTENSION_KEY = "paddlingen_weather_forecast_index"
+
+# Forecast times in UTC used by the widget (10:00 and fallback 12:00)
+FORECAST_PREFERRED_TIMES = ("10:00:00Z", "12:00:00Z")
+
+# === Simple weather code to emoji mapping ===
+# You can expand or improve this later to match actual weather symbols from MET Norway
+WEATHER_EMOJIS = {
+    "clearsky": "☀️",
+    "cloudy": "☁️",
+    "fair": "🌤️",
+    "fog": "🌫️",
+    "heavyrain": "🌧️",
+    "lightrain": "🌦️",
+    "rain": "🌧️",
+    "snow": "❄️",
+    "heavysnow": "🌨️",
+    "partlycloudy": "⛅",
+    "thunderstorm": "⛈️",
+}
+
+
+@dataclass(frozen=True)
+class ParsedForecastEntry:
+    """Numeric forecast values extracted from one MET timeseries entry."""
+
+    temperature_c: float | None
+    rain_mm: float
+    symbol_code: str
+
+
+class WeatherCircuitBreaker:
+    """Stop calling MET for a cooldown period after repeated failures.
+
+    The breaker starts closed. After ``failure_threshold`` consecutive
+    failures it opens and rejects outbound calls until ``cooldown_seconds``
+    have passed. After the cooldown exactly one trial call is allowed. A
+    successful trial closes the breaker again, while a failed trial starts a
+    new cooldown.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        cooldown_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_seconds = max(0.0, cooldown_seconds)
+        self.clock = clock
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self.trial_call_in_progress = False
+        self.lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """Return whether the breaker has tripped after repeated failures."""
+
+        with self.lock:
+            return self.opened_at is not None
+
+    def is_cooling_down(self) -> bool:
+        """Return whether the breaker is open and its cooldown is still running."""
+
+        with self.lock:
+            return (
+                self.opened_at is not None
+                and self.clock() - self.opened_at < self.cooldown_seconds
+            )
+
+    def allow_request(self) -> bool:
+        """Return whether one outbound MET call may start right now."""
+
+        with self.lock:
+            if self.opened_at is None:
+                return True
+
+            if self.clock() - self.opened_at < self.cooldown_seconds:
+                return False
+
+            if self.trial_call_in_progress:
+                return False
+
+            self.trial_call_in_progress = True
+            return True
+
+    def record_success(self) -> None:
+        """Close the breaker after one successful MET call."""
+
+        with self.lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.trial_call_in_progress = False
+
+    def record_failure(self) -> None:
+        """Count one failed MET call and open the breaker when needed."""
+
+        with self.lock:
+            self.consecutive_failures += 1
+            self.trial_call_in_progress = False
+            if (
+                self.opened_at is not None
+                or self.consecutive_failures >= self.failure_threshold
+            ):
+                self.opened_at = self.clock()
+
+
+class WeatherForecastFetcher:
+    """Call MET through one shared circuit breaker.
+
+    One instance is stored on each Flask application so tests and separate
+    app instances never share breaker state by accident.
+    """
+
+    def __init__(
+        self,
+        circuit_breaker: WeatherCircuitBreaker,
+        http_session: requests.Session,
+    ) -> None:
+        self.circuit_breaker = circuit_breaker
+        self.http_session = http_session
+
+    def fetch(
+        self,
+        location: tuple[float, float],
+        timeout_seconds: float,
+    ) -> dict[str, Any] | None:
+        """Call MET once through the circuit breaker.
+
+        Returns:
+            dict[str, Any] | None: The parsed MET response, or ``None`` when
+            the breaker is open or the call failed.
+        """
+
+        if not self.circuit_breaker.allow_request():
+            return None
+
+        try:
+            payload = fetch_met_forecast_payload(
+                self.http_session,
+                location[0],
+                location[1],
+                timeout_seconds=timeout_seconds,
+            )
+        except (requests.RequestException, ValueError):
+            self.circuit_breaker.record_failure()
+            logger.warning(
+                "MET forecast request failed for lat=%s lon=%s.",
+                location[0],
+                location[1],
+                exc_info=True,
+            )
+            return None
+
+        self.circuit_breaker.record_success()
+        return payload
+
+
+def fetch_met_forecast_payload(
+    http_session: requests.Session,
+    latitude: float,
+    longitude: float,
+    *,
+    timeout_seconds: float,
+) -> dict[str, Any]:
+    """Call MET Norway once and return the parsed JSON response.
+
+    The call goes through the app's pooled HTTP session so repeated refreshes
+    reuse the same TLS connection instead of opening a new one each time.
+
+    Raises:
+        requests.RequestException: If the request fails or times out.
+        ValueError: If the response body is not valid JSON.
+    """
+
+    response = http_session.get(
+        MET_API_URL,
+        headers=MET_REQUEST_HEADERS,
+        params={"lat": latitude, "lon": longitude},
+        timeout=timeout_seconds,
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def get_weather_forecast_fetcher() -> WeatherForecastFetcher:
+    """Return the MET fetcher stored on the current Flask application."""
+
+    extensions = current_app.extensions
+    weather_forecast_fetcher = extensions.get(WEATHER_FORECAST_FETCHER_EXTENSION_KEY)
+    if weather_forecast_fetcher is None:
+        configuration = current_app.config
+        weather_forecast_fetcher = WeatherForecastFetcher(
+            circuit_breaker=WeatherCircuitBreaker(
+                failure_threshold=int(
+                    configuration.get("WEATHER_CIRCUIT_BREAKER_FAILURE_THRESHOLD", 3)
+                ),
+                cooldown_seconds=float(
+                    configuration.get("WEATHER_CIRCUIT_BREAKER_COOLDOWN_SECONDS", 300)
+                ),
+            ),
+            http_session=get_outbound_http_session(),
+        )
+        extensions[WEATHER_FORECAST_FETCHER_EXTENSION_KEY] = weather_forecast_fetcher
+
+    return weather_forecast_fetcher
+
+
+def build_forecast_index(
+    forecast_payload: dict[str, Any],
+) -> dict[str, ParsedForecastEntry]:
+    """Turn one MET response into a compact index keyed by timestamp.
+
+    The widget only ever reads the 10:00 and 12:00 UTC entries, so only those
+    timestamps are kept. Entries that do not have the expected shape are
+    skipped instead of failing the whole refresh.
+
+    Returns:
+        dict[str, ParsedForecastEntry]: Parsed entries keyed by MET timestamp
+        such as ``"2026-06-28T10:00:00Z"``.
+    """
+
+    forecast_index: dict[str, ParsedForecastEntry] = {}
+    for entry in forecast_payload["properties"]["timeseries"]:
+        timestamp = str(entry.get("time", ""))
+        if not timestamp.endswith(FORECAST_PREFERRED_TIMES):
+            continue
+
+        try:
+            forecast_index[timestamp] = parse_forecast_entry(entry)
+        except (KeyError, TypeError, AttributeError, ValueError):
+            continue
+
+    return forecast_index
+
+
+def serialize_forecast_index(forecast_index: dict[str, ParsedForecastEntry]) -> str:
+    """Return a compact JSON string for storing one forecast index."""
+
+    return json.dumps(
+        {
+            timestamp: [
+                parsed_entry.temperature_c,
+                parsed_entry.rain_mm,
+                parsed_entry.symbol_code,
+            ]
+            for timestamp, parsed_entry in forecast_index.items()
+        },
+        separators=(",", ":"),
+    )
+
+
+def deserialize_forecast_index(index_json: str) -> dict[str, ParsedForecastEntry]:
+    """Load one stored forecast index back into parsed entries."""
+
+    return {
+        timestamp: ParsedForecastEntry(
+            temperature_c=temperature_c,
+            rain_mm=rain_mm,
+            symbol_code=symbol_code,
+        )
+        for timestamp, (temperature_c, rain_mm, symbol_code) in json.loads(
+            index_json
+        ).items()
+    }
+
+
+def select_indexed_forecast_entry(
+    forecast_index: dict[str, ParsedForecastEntry],
+    target_date: str,
+) -> ParsedForecastEntry | None:
+    """Return the 10:00 UTC entry for a date, falling back to 12:00 UTC."""
+
+    for time_option in FORECAST_PREFERRED_TIMES:
+        parsed_entry = forecast_index.get(f"{target_date}T{time_option}")
+        if parsed_entry is not None:
+            return parsed_entry
+
+    return None
+
+
+def get_cached_forecast_index(
+    weather_cache: EventWeatherCache,
+) -> dict[str, ParsedForecastEntry]:
+    """Return the stored forecast index, decoding it once per refresh.
+
+    The decoded index is kept on the Flask application and reused until the
+    stored row gets a new ``fetched_at`` value.
+    """
+
+    if not weather_cache.forecast_index_json:
+        return {}
+
+    decoded_indexes = current_app.extensions.setdefault(
+        WEATHER_FORECAST_INDEX_EXTENSION_KEY, {}
+    )
+    cache_key = (weather_cache.event_id, weather_cache.fetched_at)
+    forecast_index = decoded_indexes.get(weather_cache.event_id)
+    if forecast_index is None or forecast_index[0] != cache_key:
+        forecast_index = (
+            cache_key,
+            deserialize_forecast_index(weather_cache.forecast_index_json),
+        )
+        decoded_indexes[weather_cache.event_id] = forecast_index
+
+    return forecast_index[1]
+
+
+def get_stored_forecast_for_date(
+    weather_cache: EventWeatherCache,
+    target_date: str,
+) -> ParsedForecastEntry | None:
+    """Return the stored forecast for one date, if the cache row covers it.
+
+    Rows written before the index column existed still answer for the event
+    date through their single-forecast columns.
+    """
+
+    forecast_index = get_cached_forecast_index(weather_cache)
+    if forecast_index:
+        return select_indexed_forecast_entry(forecast_index, target_date)
+
+    if weather_cache.forecast_for_date.isoformat() != target_date:
+        return None
+
+    return ParsedForecastEntry(
+        temperature_c=weather_cache.temperature_c,
+        rain_mm=weather_cache.rain_mm if weather_cache.rain_mm is not None else 0.0,
+        symbol_code=weather_cache.summary or "cloudy",
+    )
+
+
+def parse_forecast_entry(selected_entry: dict[str, Any]) -> ParsedForecastEntry:
+    """Return the numeric forecast values for one MET timeseries entry."""
+
+    temp = selected_entry["data"]["instant"]["details"].get("air_temperature")
+    rain = (
+        selected_entry["data"]
+        .get("next_6_hours", {})
+        .get("details", {})
+        .get("precipitation_amount", 0)
+    )
+    symbol_code = (
+        selected_entry["data"]
+        .get("next_6_hours", {})
+        .get("summary", {})
+        .get("symbol_code", "cloudy")
+    )
+
+    return ParsedForecastEntry(
+        temperature_c=float(temp) if temp is not None else None,
+        rain_mm=float(rain) if rain is not None else 0.0,
+        symbol_code=str(symbol_code),
+    )
+
+
+def get_weather_icon(symbol_code: str | None) -> str:
+    """Return the widget emoji for one MET symbol code."""
+
+    base_symbol = (symbol_code or "cloudy").split("_")[0]
+    return WEATHER_EMOJIS.get(base_symbol, "☁️")
+
+
+def is_event_inside_forecast_window(event: Event, today: date) -> bool:
+    """Return whether the event date is close enough for a useful forecast."""
+
+    days_until_event = (event.event_date - today).days
+    return 0 <= days_until_event <= event.weather_forecast_days_before_event
+
+
+def is_weather_cache_stale(weather_cache: EventWeatherCache) -> bool:
+    """Return whether one stored forecast is older than its fresh window."""
+
+    if weather_cache.expires_at is None:
+        return False
+
+    expires_at = weather_cache.expires_at
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=UTC)
+
+    return expires_at <= get_current_utc_time()
+
+
+def build_forecast_response(parsed_entry: ParsedForecastEntry) -> dict[str, object]:
+    """Return the simplified widget JSON for one parsed forecast entry."""
+
+    temperature_c = parsed_entry.temperature_c
+    return {
+        "temperature": round(temperature_c) if temperature_c is not None else "N/A",
+        "rainChance": str(parsed_entry.rain_mm).replace(
+            ".", ","
+        ),  # simple approximation
+        "icon": get_weather_icon(parsed_entry.symbol_code),
+    }
+
+
+def refresh_event_weather_cache(event: Event, *, force: bool = False) -> str:
+    """Fetch, parse, and store the forecast for one event.
+
+    Args:
+        event: Event whose forecast should be refreshed.
+        force: Refresh even when the stored forecast was fetched recently.
+            The scheduler leaves this off so several Gunicorn workers do not
+            all call MET for the same event in the same cycle.
+
+    Returns:
+        str: Result label such as ``refreshed``, ``outside_window``,
+        ``recently_refreshed``, ``unavailable``, or ``missing_entry``.
+    """
+
+    now = get_current_utc_time()
+    if not is_event_inside_forecast_window(event, now.date()):
+        return "outside_window"
+
+    configuration = current_app.config
+    weather_cache = event.weather_cache
+    if not force and weather_cache is not None:
+        fetched_at = weather_cache.fetched_at
+        if fetched_at.tzinfo is None:
+            fetched_at = fetched_at.replace(tzinfo=UTC)
+        minimum_age = timedelta(
+            seconds=float(configuration.get("WEATHER_REFRESH_INTERVAL_SECONDS", 1800))
+            / 2
+        )
+        if now - fetched_at < minimum_age:
+            return "recently_refreshed"
+
+    location = get_weather_coordinates_with_fallback(event)
+    forecast_payload = get_weather_forecast_fetcher().fetch(
+        location,
+        float(configuration.get("MET_API_TIMEOUT_SECONDS", 5)),
+    )
+    if forecast_payload is None:
+        return "unavailable"
+
+    try:
+        forecast_index = build_forecast_index(forecast_payload)
+    except (KeyError, TypeError, AttributeError):
+        logger.warning(
+            "MET forecast response had an unexpected shape for event id=%s.",
+            event.id,
+        )
+        return "unavailable"
+
+    parsed_entry = select_indexed_forecast_entry(
+        forecast_index, event.event_date.isoformat()
+    )
+    if parsed_entry is None:
+        return "missing_entry"
+
+    if weather_cache is None:
+        weather_cache = EventWeatherCache(event_id=event.id)
+        db.session.add(weather_cache)
+        event.weather_cache = weather_cache
+
+    weather_cache.source = "met"
+    weather_cache.forecast_for_date = event.event_date
+    weather_cache.summary = parsed_entry.symbol_code
+    weather_cache.temperature_c = parsed_entry.temperature_c
+    weather_cache.rain_mm = parsed_entry.rain_mm
+    weather_cache.icon = get_weather_icon(parsed_entry.symbol_code)
+    weather_cache.forecast_index_json = serialize_forecast_index(forecast_index)
+    weather_cache.fetched_at = now
+    weather_cache.expires_at = now + timedelta(
+        seconds=float(configuration.get("WEATHER_FORECAST_CACHE_TTL_SECONDS", 7200))
+    )
+    db.session.commit()
+    return "refreshed"
+
+
+def refresh_active_event_weather_caches(*, force: bool = False) -> dict[int, str]:
+    """Refresh the stored forecast for every active event.
+
+    Returns:
+        dict[int, str]: One result label per event id.
+    """
+
+    refresh_results: dict[int, str] = {}
+    for active_event in Event.query.filter_by(is_active=True).order_by(Event.id):
+        refresh_results[active_event.id] = refresh_event_weather_cache(
+            active_event,
+            force=force,
+        )
+
+    return refresh_results
+
+
+class WeatherRefreshScheduler:
+    """Refresh stored forecasts on a fixed cadence in one daemon thread.
+
+    Web processes start it by default. Deployments that turn it off must run
+    ``flask refresh-weather`` from cron or a platform scheduled task instead,
+    or the forecast endpoints have nothing to serve.
+    """
+
+    def __init__(self, flask_application: Flask, interval_seconds: float) -> None:
+        self.flask_application = flask_application
+        self.interval_seconds = max(1.0, interval_seconds)
+        self.stop_event = threading.Event()
+        self.thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start the background thread once."""
+
+        if self.thread is not None:
+            return
+
+        self.thread = threading.Thread(
+            target=self.run,
+            name="weather-refresh-scheduler",
+            daemon=True,
+        )
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Ask the background thread to finish after the current cycle."""
+
+        self.stop_event.set()
+
+    def run(self) -> None:
+        """Refresh all active events until :meth:`stop` is called."""
+
+        while not self.stop_event.is_set():
+            with self.flask_application.app_context():
+                try:
+                    refresh_active_event_weather_caches()
+                except Exception:
+                    db.session.rollback()
+                    logger.exception("Scheduled weather refresh failed.")
+                finally:
+                    db.session.remove()
+
+            self.stop_event.wait(self.interval_seconds)
+
+
+def start_weather_refresh_scheduler(
+    flask_application: Flask,
+) -> WeatherRefreshScheduler:
+    """Create, store, and start the in-process weather refresh scheduler."""
+
+    weather_refresh_scheduler = WeatherRefreshScheduler(
+        flask_application,
+        interval_seconds=float(
+            flask_application.config.get("WEATHER_REFRESH_INTERVAL_SECONDS", 1800)
+        ),
+    )
+    flask_application.extensions[WEATHER_REFRESH_SCHEDULER_EXTENSION_KEY] = (
+        weather_refresh_scheduler
+    )
+    weather_refresh_scheduler.start()
+    return weather_refresh_scheduler
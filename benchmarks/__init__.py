@@ -0,0 +1,6 @@
+"""Scale benchmarks for Paddlingen.
+
+Run ``python benchmarks/run_benchmarks.py`` from the project root. See
+``docs/TechnicalOverview.md`` (Monitoring) for what is measured and how the
+results are compared with ``benchmarks/baseline.json``.
+"""
@@ -0,0 +1,124 @@
+"""Build a benchmark app filled with several seasons of synthetic bookings.
+
+One "real season" is roughly what the event sees in a year: about 30 orders
+of two canoes each, a few unpaid checkout holds, and riders with passengers.
+The generator stores ``REAL_SEASON_YEARS`` seasons spread over as many events
+(the active one plus earlier ones) and multiplies the order count by the
+chosen scale factor, so ``100x`` means 100 times a real multi-year database.
+
+Rows are written with :func:`app.util.seed_bookings.seed_bookings`, the same
+batched inserts that ``flask seed-test-bookings`` uses.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+
+from flask import Flask
+from werkzeug.security import generate_password_hash
+
+from app import create_app
+from app.util.db_models import Event, User, db
+from app.util.event_settings import create_or_update_active_event_from_config
+from app.util.seed_bookings import SeedBookingOptions, seed_bookings
+
+SCALE_FACTORS = {"1x": 1, "10x": 10, "100x": 100}
+REAL_SEASON_ORDER_COUNT = 30
+REAL_SEASON_YEARS = 5
+BENCHMARK_PASSWORD = "benchmark"
+BENCHMARK_WEBHOOK_SECRET = "whsec_benchmark"
+
+
+@dataclass(frozen=True, slots=True)
+class BenchmarkDataSet:
+    """Size of the data stored for one benchmark scale."""
+
+    scale_name: str
+    event_count: int
+    order_count: int
+    canoe_count: int
+
+
+def build_season_options(scale_factor: int) -> SeedBookingOptions:
+    """Return the seed options for ``scale_factor`` times the real seasons."""
+
+    return SeedBookingOptions(
+        order_count=REAL_SEASON_ORDER_COUNT * REAL_SEASON_YEARS * scale_factor,
+        canoes_per_order=2,
+        event_count=REAL_SEASON_YEARS,
+        pending_share=0.05,
+        expired_share=0.02,
+        with_passengers=True,
+        random_seed=2026,
+    )
+
+
+def build_benchmark_app(stripe_api_base: str) -> Flask:
+    """Create an app on a fresh in-memory database for one benchmark scale.
+
+    Args:
+        stripe_api_base: Base URL of the local fake Stripe server.
+
+    Returns:
+        Flask: Application configured like production, minus CSRF, with
+        Stripe calls sent to the fake server.
+    """
+
+    flask_application = create_app()
+    flask_application.config.update(
+        TESTING=True,
+        WTF_CSRF_ENABLED=False,
+        SECRET_KEY="benchmark",
+        WTF_CSRF_SECRET_KEY="benchmark",
+        PUBLIC_SITE_PASSWORD_HASH=generate_password_hash(BENCHMARK_PASSWORD),
+        STRIPE_API_BASE=stripe_api_base,
+        STRIPE_SECRET_KEY="sk_test_benchmark",
+        STRIPE_WEBHOOK_SECRET=BENCHMARK_WEBHOOK_SECRET,
+        STRIPE_PUBLIC_BASE_URL="http://127.0.0.1:5000",
+        STRIPE_CHECKOUT_PRODUCT_ID="",
+        CHECKOUT_SESSION_CREATE_INLINE=True,
+        STRIPE_WEBHOOK_INBOX_WORKER_ENABLED=False,
+        # Large data sets are meant to be large; skip the slow-request log.
+        SLOW_REQUEST_QUERY_COUNT=0,
+        SLOW_REQUEST_QUERY_MILLISECONDS=0,
+    )
+    # Per-request INFO lines would drown the results table.
+    logging.getLogger("app").setLevel(logging.WARNING)
+    return flask_application
+
+
+def generate_benchmark_data(scale_name: str) -> BenchmarkDataSet:
+    """Fill the current app's database for one scale.
+
+    Must run inside an application context. Also creates the benchmark admin
+    account and raises the active event's canoe limit, so checkout scenarios
+    never run out of canoes.
+
+    Args:
+        scale_name: One of :data:`SCALE_FACTORS`.
+
+    Returns:
+        BenchmarkDataSet: Counts of the stored rows.
+    """
+
+    db.create_all()
+    active_event, _ = create_or_update_active_event_from_config()
+    admin_user = User(username=BENCHMARK_PASSWORD)
+    admin_user.set_password(BENCHMARK_PASSWORD)
+    db.session.add(admin_user)
+    db.session.commit()
+
+    seed_result = seed_bookings(
+        active_event, build_season_options(SCALE_FACTORS[scale_name])
+    )
+    active_event = Event.query.filter_by(is_active=True).one()
+    active_event.available_canoes = seed_result.canoe_count + 100_000
+    db.session.commit()
+
+    return BenchmarkDataSet(
+        scale_name=scale_name,
+        event_count=len(seed_result.event_ids),
+        order_count=seed_result.order_count,
+        canoe_count=seed_result.canoe_count,
+    )
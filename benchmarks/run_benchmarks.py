@@ -0,0 +1,266 @@
+"""Time the hot request paths at several data sizes and check for regressions.
+
+For every scale (``1x``, ``10x``, ``100x`` real multi-year seasons) the suite
+builds a fresh in-memory database, fills it with
+:mod:`benchmarks.data_generator`, starts the local fake Stripe server, and
+times each scenario from :mod:`benchmarks.scenarios`. Results are written as
+JSON and compared with a stored baseline:
+
+- a scenario regresses when its median is more than ``--threshold`` (30 % by
+  default) slower than the baseline *and* at least ``--min-regression-ms``
+  slower, so sub-millisecond noise does not fail the run;
+- a scenario also regresses when it runs more SQL queries than the baseline.
+
+The exit code is 1 when anything regressed. Baselines are machine-specific;
+refresh them with ``--update-baseline`` on the machine that runs the check.
+
+Run it with ``python benchmarks/run_benchmarks.py [--scales 1x,10x,100x]``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+# Configure the app before it is imported: a throwaway database and no
+# background threads that would compete with the timed requests.
+os.environ["DATABASE_URL"] = "sqlite:///:memory:"
+os.environ["WEATHER_REFRESH_SCHEDULER_ENABLED"] = "False"
+os.environ["OUTBOUND_HTTP_WARM_ON_START"] = "False"
+os.environ["STRIPE_WEBHOOK_INBOX_WORKER_ENABLED"] = "False"
+
+from benchmarks.data_generator import (
+    SCALE_FACTORS,
+    build_benchmark_app,
+    generate_benchmark_data,
+)
+from benchmarks.scenarios import (
+    SCENARIOS,
+    BenchmarkContext,
+    log_in_benchmark_client,
+    measure_scenario,
+)
+from scripts.fake_stripe_server import (
+    FakeStripeSettings,
+    start_fake_stripe_server,
+)
+
+BENCHMARK_DIRECTORY = PROJECT_ROOT / "benchmarks"
+DEFAULT_OUTPUT_PATH = BENCHMARK_DIRECTORY / "results" / "latest.json"
+DEFAULT_BASELINE_PATH = BENCHMARK_DIRECTORY / "baseline.json"
+DEFAULT_SCALES = "1x,10x"
+DEFAULT_ITERATIONS = 20
+DEFAULT_WARMUP_ITERATIONS = 3
+DEFAULT_REGRESSION_THRESHOLD = 0.30
+DEFAULT_MIN_REGRESSION_MILLISECONDS = 2.0
+
+
+def build_argument_parser() -> argparse.ArgumentParser:
+    """Return the command line options of the benchmark runner."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scales",
+        default=DEFAULT_SCALES,
+        help=f"Comma-separated scales from {', '.join(SCALE_FACTORS)}.",
+    )
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP_ITERATIONS)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT_PATH)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE_PATH)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_REGRESSION_THRESHOLD,
+        help="Allowed slowdown of the median as a share, e.g. 0.3 for 30 %%.",
+    )
+    parser.add_argument(
+        "--min-regression-ms",
+        type=float,
+        default=DEFAULT_MIN_REGRESSION_MILLISECONDS,
+        help="Slowdowns smaller than this many milliseconds are ignored.",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Write the results to the baseline file instead of comparing.",
+    )
+    return parser
+
+
+def parse_scales(raw_scales: str) -> list[str]:
+    """Return the requested scale names, rejecting unknown ones."""
+
+    scale_names = [name.strip() for name in raw_scales.split(",") if name.strip()]
+    unknown_scales = [name for name in scale_names if name not in SCALE_FACTORS]
+    if unknown_scales or not scale_names:
+        raise SystemExit(
+            f"Unknown scale(s): {', '.join(unknown_scales) or '(none)'}. "
+            f"Choose from {', '.join(SCALE_FACTORS)}."
+        )
+    return scale_names
+
+
+def run_scale(
+    scale_name: str, iterations: int, warmup_iterations: int
+) -> dict[str, Any]:
+    """Build one data set and time every scenario against it."""
+
+    stripe_server = start_fake_stripe_server(FakeStripeSettings())
+    try:
+        flask_application = build_benchmark_app(stripe_server.base_url)
+        with flask_application.app_context():
+            data_set = generate_benchmark_data(scale_name)
+            with flask_application.test_client() as test_client:
+                log_in_benchmark_client(test_client)
+                context = BenchmarkContext(test_client, stripe_server)
+                scenario_results = {}
+                for scenario in SCENARIOS:
+                    measurement = measure_scenario(
+                        scenario, context, iterations, warmup_iterations
+                    )
+                    scenario_results[scenario.name] = measurement.to_dict()
+    finally:
+        stripe_server.shutdown()
+        stripe_server.server_close()
+
+    return {
+        "events": data_set.event_count,
+        "orders": data_set.order_count,
+        "canoes": data_set.canoe_count,
+        "scenarios": scenario_results,
+    }
+
+
+def find_regressions(
+    results: dict[str, Any],
+    baseline: dict[str, Any],
+    threshold: float,
+    min_regression_milliseconds: float,
+) -> list[str]:
+    """Return one readable line per scenario that got slower than allowed."""
+
+    regressions = []
+    for scale_name, scale_results in results["scales"].items():
+        baseline_scenarios = (
+            baseline.get("scales", {}).get(scale_name, {}).get("scenarios", {})
+        )
+        for scenario_name, measurement in scale_results["scenarios"].items():
+            baseline_measurement = baseline_scenarios.get(scenario_name)
+            if baseline_measurement is None:
+                continue
+
+            allowed_median = baseline_measurement["median_ms"] * (1 + threshold)
+            slowdown = measurement["median_ms"] - baseline_measurement["median_ms"]
+            if (
+                measurement["median_ms"] > allowed_median
+                and slowdown >= min_regression_milliseconds
+            ):
+                regressions.append(
+                    f"{scale_name} {scenario_name}: median "
+                    f"{measurement['median_ms']:.1f} ms vs baseline "
+                    f"{baseline_measurement['median_ms']:.1f} ms"
+                )
+            if measurement["queries"] > baseline_measurement["queries"]:
+                regressions.append(
+                    f"{scale_name} {scenario_name}: {measurement['queries']} "
+                    f"queries vs baseline {baseline_measurement['queries']}"
+                )
+    return regressions
+
+
+def print_results(results: dict[str, Any], baseline: dict[str, Any]) -> None:
+    """Print one table row per scale and scenario."""
+
+    print(
+        f"{'Scale':<6}{'Scenario':<18}{'Median ms':>11}{'p95 ms':>10}"
+        f"{'Queries':>9}{'Baseline ms':>13}"
+    )
+    for scale_name, scale_results in results["scales"].items():
+        baseline_scenarios = (
+            baseline.get("scales", {}).get(scale_name, {}).get("scenarios", {})
+        )
+        for scenario_name, measurement in scale_results["scenarios"].items():
+            baseline_measurement = baseline_scenarios.get(scenario_name)
+            baseline_median = (
+                f"{baseline_measurement['median_ms']:.1f}"
+                if baseline_measurement
+                else "-"
+            )
+            print(
+                f"{scale_name:<6}{scenario_name:<18}"
+                f"{measurement['median_ms']:>11.1f}{measurement['p95_ms']:>10.1f}"
+                f"{measurement['queries']:>9}{baseline_median:>13}"
+            )
+
+
+def write_json(path: Path, content: dict[str, Any]) -> None:
+    """Write ``content`` as indented JSON, creating parent folders."""
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(content, indent=2) + "\n", encoding="utf-8")
+
+
+def main() -> int:
+    """Run the suite, store the results, and compare them with the baseline."""
+
+    arguments = build_argument_parser().parse_args()
+    scale_names = parse_scales(arguments.scales)
+
+    results: dict[str, Any] = {
+        "metadata": {
+            "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": arguments.iterations,
+            "warmup_iterations": arguments.warmup,
+        },
+        "scales": {},
+    }
+    for scale_name in scale_names:
+        print(f"Running {scale_name} ...", flush=True)
+        results["scales"][scale_name] = run_scale(
+            scale_name, arguments.iterations, arguments.warmup
+        )
+
+    if arguments.update_baseline:
+        write_json(arguments.baseline, results)
+        print_results(results, {})
+        print(f"Baseline written to {arguments.baseline}.")
+        return 0
+
+    write_json(arguments.output, results)
+    baseline = (
+        json.loads(arguments.baseline.read_text(encoding="utf-8"))
+        if arguments.baseline.exists()
+        else {}
+    )
+    print_results(results, baseline)
+    print(f"Results written to {arguments.output}.")
+    if not baseline:
+        print("No baseline found; run with --update-baseline to create one.")
+        return 0
+
+    regressions = find_regressions(
+        results, baseline, arguments.threshold, arguments.min_regression_ms
+    )
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        return 1
+    print("No regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
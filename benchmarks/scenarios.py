@@ -0,0 +1,340 @@
+"""Timed request scenarios for the scale benchmark suite.
+
+Each scenario sends one kind of request through Flask's test client, the same
+way the hot paths are used on a real booking day: the homepage, the booking
+count poll, creating a checkout, confirming it from a Stripe webhook, the
+admin dashboard and its bookings search, a checklist save, and one gallery
+image.
+
+A scenario may have a ``prepare`` step that runs before every timed call and
+is not measured, for example creating the pending checkout that the webhook
+scenario then confirms.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import secrets
+import statistics
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from flask.testing import FlaskClient
+
+from app.util.db_models import BookedCanoe, BookingOrder, Event, db
+from app.util.helper_functions import get_previous_year_image_metadata
+from app.util.public_overview_cache import get_public_overview_cache
+from app.util.query_metrics import count_queries
+from app.util.stripe_webhook_inbox import drain_stripe_webhook_inbox
+from scripts.fake_stripe_server import (
+    FakeStripeServer,
+    build_stripe_signature_header,
+)
+
+from .data_generator import BENCHMARK_PASSWORD, BENCHMARK_WEBHOOK_SECRET
+
+XHR_HEADERS = {"X-Requested-With": "XMLHttpRequest"}
+
+
+@dataclass(frozen=True, slots=True)
+class BenchmarkContext:
+    """Objects every scenario needs while it runs."""
+
+    test_client: FlaskClient
+    stripe_server: FakeStripeServer
+
+
+@dataclass(frozen=True, slots=True)
+class BenchmarkScenario:
+    """One named request that the suite times.
+
+    Attributes:
+        name: Short key used in the JSON results and the baseline.
+        description: One line shown in the results table.
+        run: Sends the timed request. Gets the context and the value returned
+            by ``prepare`` and must raise if the request did not succeed.
+        prepare: Optional untimed setup run before every ``run`` call.
+    """
+
+    name: str
+    description: str
+    run: Callable[[BenchmarkContext, Any], None]
+    prepare: Callable[[BenchmarkContext], Any] | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ScenarioMeasurement:
+    """Timing summary for one scenario at one scale."""
+
+    median_ms: float
+    p95_ms: float
+    queries: int
+
+    def to_dict(self) -> dict[str, float | int]:
+        """Return the measurement as JSON-friendly values."""
+
+        return {
+            "median_ms": round(self.median_ms, 3),
+            "p95_ms": round(self.p95_ms, 3),
+            "queries": self.queries,
+        }
+
+
+def expect_status(response, expected_status: int, label: str) -> None:
+    """Raise when a benchmarked request did not answer as expected."""
+
+    if response.status_code != expected_status:
+        raise RuntimeError(
+            f"{label} answered {response.status_code}, expected {expected_status}."
+        )
+
+
+def log_in_benchmark_client(test_client: FlaskClient) -> None:
+    """Unlock the public site and log in as the benchmark admin."""
+
+    test_client.post("/unlock", data={"password": BENCHMARK_PASSWORD})
+    test_client.post(
+        "/login",
+        data={"username": BENCHMARK_PASSWORD, "password": BENCHMARK_PASSWORD},
+    )
+
+
+# Unique rider names keep every benchmark checkout below the same-name limit.
+checkout_number_counter = itertools.count(1)
+
+
+def get_visitor_address(visitor_number: int) -> str:
+    """Return a distinct client IP, so rate limits apply per visitor."""
+
+    return f"10.0.{visitor_number // 250 % 250}.{visitor_number % 250 + 1}"
+
+
+def create_benchmark_checkout(context: BenchmarkContext) -> None:
+    """Book one canoe through the public checkout endpoint."""
+
+    booking_number = next(checkout_number_counter)
+    response = context.test_client.post(
+        "/create-checkout-session",
+        data={
+            "canoeCount": "1",
+            "canoe1_fname": "Bench",
+            "canoe1_lname": f"Checkout {booking_number}",
+        },
+        headers=XHR_HEADERS,
+        environ_base={"REMOTE_ADDR": get_visitor_address(booking_number)},
+    )
+    expect_status(response, 200, "Checkout creation")
+    if not response.get_json().get("ok"):
+        raise RuntimeError(f"Checkout creation failed: {response.get_json()}")
+
+
+def render_homepage_uncached(context: BenchmarkContext, _: Any) -> None:
+    """Render the homepage after dropping the cached booking overview."""
+
+    get_public_overview_cache().clear()
+    expect_status(context.test_client.get("/"), 200, "Homepage")
+
+
+def render_homepage_cached(context: BenchmarkContext, _: Any) -> None:
+    """Render the homepage with the booking overview already cached."""
+
+    expect_status(context.test_client.get("/"), 200, "Homepage")
+
+
+def poll_booking_count(context: BenchmarkContext, _: Any) -> None:
+    """Fetch the live booking count like the homepage script does."""
+
+    expect_status(context.test_client.get("/api/booking-count"), 200, "Count poll")
+
+
+def create_checkout(context: BenchmarkContext, _: Any) -> None:
+    """Time one checkout creation against the fake Stripe API."""
+
+    create_benchmark_checkout(context)
+
+
+def prepare_paid_checkout(context: BenchmarkContext) -> str:
+    """Create a checkout, mark it paid on the fake server, and sign its event.
+
+    Returns:
+        str: JSON payload of the ``checkout.session.completed`` event.
+    """
+
+    create_benchmark_checkout(context)
+    checkout_session_id = db.session.execute(
+        db.select(BookingOrder.payment_provider_session_id)
+        .order_by(BookingOrder.id.desc())
+        .limit(1)
+    ).scalar_one()
+    stripe_state = context.stripe_server.state
+    checkout_session = stripe_state.update_checkout_session(
+        checkout_session_id,
+        status="complete",
+        payment_status="paid",
+        customer_details={
+            "email": "paddlare@example.com",
+            "name": "Bench Paddlare",
+        },
+    )
+    return json.dumps(
+        {
+            "id": f"evt_bench_{secrets.token_hex(12)}",
+            "object": "event",
+            "type": "checkout.session.completed",
+            "created": int(time.time()),
+            "livemode": False,
+            "data": {"object": dict(checkout_session)},
+        }
+    )
+
+
+def confirm_checkout_from_webhook(context: BenchmarkContext, payload: str) -> None:
+    """Deliver a signed webhook and apply it from the inbox."""
+
+    response = context.test_client.post(
+        "/stripe/webhook",
+        data=payload,
+        headers={
+            "Content-Type": "application/json",
+            "Stripe-Signature": build_stripe_signature_header(
+                payload, BENCHMARK_WEBHOOK_SECRET
+            ),
+        },
+    )
+    expect_status(response, 200, "Stripe webhook")
+    if drain_stripe_webhook_inbox()["processed"] != 1:
+        raise RuntimeError("The webhook event was not processed.")
+
+
+def render_admin_dashboard(context: BenchmarkContext, _: Any) -> None:
+    """Render the admin dashboard for the active event."""
+
+    expect_status(context.test_client.get("/admin"), 200, "Admin dashboard")
+
+
+def search_admin_bookings(context: BenchmarkContext, _: Any) -> None:
+    """Fetch the first bookings page matching a common surname fragment."""
+
+    expect_status(
+        context.test_client.get("/admin/api/bookings?q=sson&sort=name"),
+        200,
+        "Bookings search",
+    )
+
+
+def prepare_checklist_change(context: BenchmarkContext) -> dict[str, Any]:
+    """Pick one confirmed canoe of the active event and flip its tick."""
+
+    canoe_id, picked_up = db.session.execute(
+        db.select(BookedCanoe.id, BookedCanoe.picked_up)
+        .join(BookingOrder, BookedCanoe.booking_order_id == BookingOrder.id)
+        .join(Event, BookingOrder.event_id == Event.id)
+        .where(Event.is_active.is_(True), BookedCanoe.status == "confirmed")
+        .order_by(BookedCanoe.id)
+        .limit(1)
+    ).one()
+    return {"changes": [{"id": canoe_id, "picked_up": not picked_up}]}
+
+
+def save_checklist_change(context: BenchmarkContext, payload: dict[str, Any]) -> None:
+    """Send one checklist tick through the JSON endpoint."""
+
+    expect_status(
+        context.test_client.post("/admin/api/checklist", json=payload),
+        200,
+        "Checklist save",
+    )
+
+
+def prepare_gallery_image(context: BenchmarkContext) -> str:
+    """Return the URL of the first previous-years gallery image."""
+
+    image_id = get_previous_year_image_metadata()[0]["id"]
+    return f"/previous-years-images/gallery/{image_id}.webp"
+
+
+def serve_gallery_image(context: BenchmarkContext, image_url: str) -> None:
+    """Fetch one protected gallery image and read its body."""
+
+    response = context.test_client.get(image_url)
+    expect_status(response, 200, "Gallery image")
+    response.get_data()
+    response.close()
+
+
+SCENARIOS = (
+    BenchmarkScenario(
+        "homepage", "Homepage, overview rebuilt", render_homepage_uncached
+    ),
+    BenchmarkScenario(
+        "homepage_cached", "Homepage, overview cached", render_homepage_cached
+    ),
+    BenchmarkScenario("booking_count", "Booking count poll", poll_booking_count),
+    BenchmarkScenario("checkout_create", "Checkout creation", create_checkout),
+    BenchmarkScenario(
+        "webhook_confirm",
+        "Webhook confirmation",
+        confirm_checkout_from_webhook,
+        prepare=prepare_paid_checkout,
+    ),
+    BenchmarkScenario("admin_dashboard", "Admin dashboard", render_admin_dashboard),
+    BenchmarkScenario(
+        "bookings_search", "Admin bookings search", search_admin_bookings
+    ),
+    BenchmarkScenario(
+        "checklist_save",
+        "Checklist save",
+        save_checklist_change,
+        prepare=prepare_checklist_change,
+    ),
+    BenchmarkScenario(
+        "gallery_image",
+        "Gallery image serve",
+        serve_gallery_image,
+        prepare=prepare_gallery_image,
+    ),
+)
+
+
+def get_percentile(sorted_values: list[float], percentile: float) -> float:
+    """Return the nearest-rank percentile of already sorted values."""
+
+    rank = max(1, round(percentile / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def measure_scenario(
+    scenario: BenchmarkScenario,
+    context: BenchmarkContext,
+    iterations: int,
+    warmup_iterations: int,
+) -> ScenarioMeasurement:
+    """Run one scenario repeatedly and summarize its timings.
+
+    Warm-up runs fill caches and connection pools and are not recorded. The
+    query count is the highest count seen in a timed run, so a query that
+    only runs sometimes still shows up.
+    """
+
+    elapsed_milliseconds: list[float] = []
+    highest_query_count = 0
+    for iteration in range(warmup_iterations + iterations):
+        prepared_value = scenario.prepare(context) if scenario.prepare else None
+        started_at = time.perf_counter()
+        with count_queries() as query_metrics:
+            scenario.run(context, prepared_value)
+        elapsed = (time.perf_counter() - started_at) * 1000
+        if iteration < warmup_iterations:
+            continue
+        elapsed_milliseconds.append(elapsed)
+        highest_query_count = max(highest_query_count, query_metrics.query_count)
+
+    elapsed_milliseconds.sort()
+    return ScenarioMeasurement(
+        median_ms=statistics.median(elapsed_milliseconds),
+        p95_ms=get_percentile(elapsed_milliseconds, 95),
+        queries=highest_query_count,
+    )
@@ -116,6 +116,22 @@ EVENT_LATITUDE = 59.866580523479584
 EVENT_LONGITUDE = 14.850996977247622
 WEATHER_FORECAST_DAYS_BEFORE_EVENT = 7
 
+# --- Weather Service Settings ---
+# The MET Norway forecast is prefetched in the background and stored in the
+# database. The in-process scheduler, which runs in each web process by
+# default, refreshes it right after start and then on a fixed cadence while the
+# event is inside its forecast window. `flask refresh-weather` refreshes it
+# once, for deployments that turn the scheduler off and use cron instead. Repeated MET failures open a circuit breaker so the
+# refresh job stops calling an unhealthy upstream service for a while.
+MET_API_TIMEOUT_SECONDS = 5
+WEATHER_FORECAST_CACHE_TTL_SECONDS = 2 * 60 * 60
+WEATHER_CIRCUIT_BREAKER_FAILURE_THRESHOLD = 3
+WEATHER_CIRCUIT_BREAKER_COOLDOWN_SECONDS = 5 * 60
+WEATHER_REFRESH_SCHEDULER_ENABLED = _bool_from_env(
+    "WEATHER_REFRESH_SCHEDULER_ENABLED", default=True
+)
+WEATHER_REFRESH_INTERVAL_SECONDS = 30 * 60
+
 
 # Total number of canoes available for booking this year and price per canoe.
 AVAILABLE_CANOES = 50
@@ -160,6 +176,59 @@ STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY")
 STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET")
 STRIPE_PUBLIC_BASE_URL = os.getenv("STRIPE_PUBLIC_BASE_URL")
 STRIPE_CHECKOUT_PRODUCT_ID = os.getenv("STRIPE_CHECKOUT_PRODUCT_ID")
+# Leave unset to talk to the real Stripe API. Point it at the local stand-in
+# from `scripts/fake_stripe_server.py`, for example http://127.0.0.1:12111, to
+# run checkout flows and benchmarks offline.
+STRIPE_API_BASE = os.getenv("STRIPE_API_BASE")
+# Dashboard product images are cached per app process so creating a Checkout
+# Session needs only one Stripe call. Expired images are refreshed in the
+# background; admins can force a refresh from the event panel.
+STRIPE_PRODUCT_IMAGE_CACHE_TTL_SECONDS = 15 * 60
+# Checkout Session lookups from the payment return, status, and cancel paths
+# are reused for a few seconds so one visitor's repeated requests do not each
+# call Stripe. Webhooks drop the cached session as soon as it changes.
+STRIPE_CHECKOUT_SESSION_CACHE_SECONDS = 10
+
+# Checkout Sessions are created by a small per-process background worker so
+# the booking request returns as soon as the local hold is saved. The pay step
+# waits up to CHECKOUT_SESSION_WAIT_SECONDS for the session before it asks the
+# visitor to try again. CHECKOUT_SESSION_CREATE_INLINE creates the session in
+# the booking request instead, which the tests use. A thread that is creating
+# a session holds a claim on the order; a claim older than
+# CHECKOUT_SESSION_CLAIM_TIMEOUT_SECONDS is treated as abandoned (for example
+# after a worker was killed) and the next pay step takes the order over.
+CHECKOUT_SESSION_WORKER_THREADS = 4
+CHECKOUT_SESSION_WAIT_SECONDS = 10
+CHECKOUT_SESSION_CREATE_INLINE = False
+CHECKOUT_SESSION_CLAIM_TIMEOUT_SECONDS = 90
+
+# Verified Stripe webhooks are saved in the `stripe_webhook_inbox` table and
+# acknowledged right away. A worker thread in each web process (or
+# `flask process-stripe-webhooks`) applies them in batches. Failed events are
+# retried with exponential backoff starting at RETRY_BASE_SECONDS and capped at
+# RETRY_MAX_SECONDS, and are marked "failed" after MAX_ATTEMPTS tries. The lease
+# is how long one worker owns an event before another may take it over.
+STRIPE_WEBHOOK_INBOX_WORKER_ENABLED = _bool_from_env(
+    "STRIPE_WEBHOOK_INBOX_WORKER_ENABLED", default=True
+)
+STRIPE_WEBHOOK_INBOX_BATCH_SIZE = 50
+STRIPE_WEBHOOK_INBOX_MAX_ATTEMPTS = 8
+STRIPE_WEBHOOK_INBOX_RETRY_BASE_SECONDS = 30
+STRIPE_WEBHOOK_INBOX_RETRY_MAX_SECONDS = 60 * 60
+STRIPE_WEBHOOK_INBOX_LEASE_SECONDS = 5 * 60
+STRIPE_WEBHOOK_INBOX_POLL_SECONDS = 30
+
+# --- Outbound HTTP Settings ---
+# Stripe and MET calls share one keep-alive connection pool per app process so
+# repeated calls skip the TCP and TLS handshake. The pool size per host should
+# cover the Gunicorn threads plus the background jobs that call the same host.
+# Warming opens those connections once when each worker starts.
+OUTBOUND_HTTP_POOL_CONNECTIONS = 4
+OUTBOUND_HTTP_POOL_MAXSIZE = 10
+OUTBOUND_HTTP_WARM_ON_START = _bool_from_env(
+    "OUTBOUND_HTTP_WARM_ON_START", default=False
+)
+STRIPE_API_TIMEOUT_SECONDS = 30
 
 # Flask-Limiter can store rate-limit counters in different backends. The local
 # development default remains in-memory, but deployed environments should use a
@@ -168,6 +237,26 @@ STRIPE_CHECKOUT_PRODUCT_ID = os.getenv("STRIPE_CHECKOUT_PRODUCT_ID")
 RAW_RATELIMIT_STORAGE_URI = os.getenv("RATELIMIT_STORAGE_URI")
 RATELIMIT_STORAGE_URI = RAW_RATELIMIT_STORAGE_URI or "memory://"
 
+# The payment return page asks /api/checkout-status to hold the request open
+# ("long-poll") until the Stripe webhook has confirmed the booking. The
+# webhook wakes waiting requests in the same process directly and those in
+# other Gunicorn workers through a Redis channel. Without Redis, waiting
+# requests re-read the database every BOOKING_STATUS_DB_POLL_SECONDS instead.
+# Every waiting visitor keeps one Gunicorn thread busy, so keep the maximum
+# well below the worker timeout. CHECKOUT_STATUS_MAX_WAITERS caps how many
+# requests may wait at once in each process; keep it below GUNICORN_THREADS
+# so public pages always have a free thread. Requests over the cap answer
+# straight away and the page polls again.
+BOOKING_STATUS_REDIS_URL = os.getenv("BOOKING_STATUS_REDIS_URL") or (
+    RAW_RATELIMIT_STORAGE_URI
+    if RAW_RATELIMIT_STORAGE_URI
+    and RAW_RATELIMIT_STORAGE_URI.startswith(("redis://", "rediss://"))
+    else None
+)
+CHECKOUT_STATUS_LONG_POLL_MAX_SECONDS = 25
+CHECKOUT_STATUS_MAX_WAITERS = int(os.getenv("CHECKOUT_STATUS_MAX_WAITERS", "1"))
+BOOKING_STATUS_DB_POLL_SECONDS = 2
+
 # Credentials for creating the first administrator account.
 # Storing them here is a simple way to get started. In a larger application,
 # you might create the first admin using a separate command-line script.
@@ -232,6 +321,13 @@ else:
 # Disabling it is a common practice and helps avoid a deprecation warning.
 SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+# Every request counts its SQL queries and their total time. In debug mode the
+# numbers are sent as a ``Server-Timing`` header (see the browser's network
+# panel). Requests above either limit are logged as warnings so hidden lazy
+# loads show up in production logs too. Set a limit to 0 to turn it off.
+SLOW_REQUEST_QUERY_COUNT = 40
+SLOW_REQUEST_QUERY_MILLISECONDS = 500
+
 # --- Form & CSRF Protection Configuration (Flask-WTF) ---
 
 # This globally enables CSRF (Cross-Site Request Forgery) protection for all forms.
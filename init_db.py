@@ -17,8 +17,9 @@ the Flask CLI is inconvenient.
 from app import create_app, init_db_command, seed_admin_command
 
 # Build the application so that the CLI command functions have access to
-# the configured extensions (database, etc.).
-flask_application = create_app()
+# the configured extensions (database, etc.). Seeding must never start the
+# webhook inbox worker or the weather scheduler.
+flask_application = create_app(start_background_workers=False)
 
 
 if __name__ == "__main__":
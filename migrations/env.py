@@ -18,8 +18,9 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 from app import create_app, db  # noqa: E402
 
 # Load the Flask application and push an application context.  This gives
-# Alembic access to the SQLAlchemy metadata and database configuration.
-app = create_app()
+# Alembic access to the SQLAlchemy metadata and database configuration. No
+# background workers: their tables may not exist until this migration runs.
+app = create_app(start_background_workers=False)
 app.app_context().push()
 
 # Alembic Config object, which provides access to the values within the
@@ -36,6 +37,25 @@ config.set_main_option("sqlalchemy.url", str(app.config["SQLALCHEMY_DATABASE_URI
 # Set target metadata for 'autogenerate'.
 target_metadata = db.metadata
 
+# The admin booking search index is created with raw DDL next to the models
+# (FTS5 table on SQLite, trigram indexes on Postgres), so autogenerate must not
+# offer to drop it.
+BOOKING_SEARCH_OBJECT_NAMES = (
+    "booked_canoe_search",
+    "ix_booked_canoes_pickup_name_trgm",
+    "ix_booking_orders_reference_trgm",
+)
+
+
+def include_object(object_, name, type_, reflected, compare_to) -> bool:
+    """Skip reflected booking search objects that have no model counterpart."""
+
+    return not (
+        reflected
+        and compare_to is None
+        and (name or "").startswith(BOOKING_SEARCH_OBJECT_NAMES)
+    )
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
@@ -46,6 +66,7 @@ def run_migrations_offline() -> None:
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -61,6 +82,7 @@ def run_migrations_online() -> None:
             connection=connection,
             target_metadata=target_metadata,
             compare_type=True,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
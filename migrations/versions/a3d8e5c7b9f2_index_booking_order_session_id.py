@@ -0,0 +1,35 @@
+"""index booking order payment provider session id
+
+Revision ID: a3d8e5c7b9f2
+Revises: f1c7a9d2b4e6
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "a3d8e5c7b9f2"
+down_revision = "f1c7a9d2b4e6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Index Checkout Session IDs so reconciliation can match them in bulk."""
+
+    op.create_index(
+        "ix_booking_orders_payment_provider_session_id",
+        "booking_orders",
+        ["payment_provider_session_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Drop the Checkout Session ID index."""
+
+    op.drop_index(
+        "ix_booking_orders_payment_provider_session_id",
+        table_name="booking_orders",
+    )
@@ -0,0 +1,36 @@
+"""add checkout session claim timestamp to booking orders
+
+Revision ID: a3e8d5f2c7b1
+Revises: c9d6f2a4b8e3
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "a3e8d5f2c7b1"
+down_revision = "c9d6f2a4b8e3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add the timestamp that lets a stale Checkout Session claim expire."""
+
+    with op.batch_alter_table("booking_orders", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "checkout_session_claimed_at",
+                sa.DateTime(timezone=True),
+                nullable=True,
+            )
+        )
+
+
+def downgrade() -> None:
+    """Remove the Checkout Session claim timestamp."""
+
+    with op.batch_alter_table("booking_orders", schema=None) as batch_op:
+        batch_op.drop_column("checkout_session_claimed_at")
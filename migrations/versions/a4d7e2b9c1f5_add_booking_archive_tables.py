@@ -0,0 +1,97 @@
+"""add archive tables for finished events' bookings
+
+Revision ID: a4d7e2b9c1f5
+Revises: e2b7c9d4a6f1
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "a4d7e2b9c1f5"
+down_revision = "e2b7c9d4a6f1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the archive tables and the event's archived marker."""
+
+    with op.batch_alter_table("events", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("archived_at", sa.DateTime(timezone=True), nullable=True)
+        )
+
+    op.create_table(
+        "archived_booking_orders",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("event_id", sa.Integer(), nullable=True),
+        sa.Column("public_booking_reference", sa.String(length=40), nullable=False),
+        sa.Column("status", sa.String(length=30), nullable=False),
+        sa.Column("canoe_count", sa.Integer(), nullable=False),
+        sa.Column("total_amount", sa.Numeric(10, 2), nullable=False),
+        sa.Column("currency", sa.String(length=10), nullable=False),
+        sa.Column("payer_full_name", sa.String(length=120), nullable=True),
+        sa.Column("payer_email", sa.String(length=255), nullable=True),
+        sa.Column("payment_provider", sa.String(length=50), nullable=False),
+        sa.Column("payment_provider_session_id", sa.String(length=255), nullable=True),
+        sa.Column("checkout_idempotency_key", sa.String(length=64), nullable=True),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("paid_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["event_id"], ["events.id"], ondelete="RESTRICT"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("public_booking_reference"),
+    )
+    op.create_index(
+        "ix_archived_booking_orders_event_id",
+        "archived_booking_orders",
+        ["event_id"],
+        unique=False,
+    )
+
+    op.create_table(
+        "archived_booked_canoes",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("booking_order_id", sa.Integer(), nullable=False),
+        sa.Column("participant_first_name", sa.String(length=120), nullable=False),
+        sa.Column("participant_last_name", sa.String(length=120), nullable=False),
+        sa.Column("normalized_pickup_name", sa.String(length=255), nullable=False),
+        sa.Column("passenger_two_first_name", sa.String(length=120), nullable=True),
+        sa.Column("passenger_two_last_name", sa.String(length=120), nullable=True),
+        sa.Column("passenger_three_first_name", sa.String(length=120), nullable=True),
+        sa.Column("passenger_three_last_name", sa.String(length=120), nullable=True),
+        sa.Column("status", sa.String(length=30), nullable=False),
+        sa.Column("picked_up", sa.Boolean(), nullable=False),
+        sa.Column("checklist_version", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["booking_order_id"], ["archived_booking_orders.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_archived_booked_canoes_booking_order_id",
+        "archived_booked_canoes",
+        ["booking_order_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Drop the archive tables and the event's archived marker."""
+
+    op.drop_index(
+        "ix_archived_booked_canoes_booking_order_id",
+        table_name="archived_booked_canoes",
+    )
+    op.drop_table("archived_booked_canoes")
+    op.drop_index(
+        "ix_archived_booking_orders_event_id",
+        table_name="archived_booking_orders",
+    )
+    op.drop_table("archived_booking_orders")
+
+    with op.batch_alter_table("events", schema=None) as batch_op:
+        batch_op.drop_column("archived_at")
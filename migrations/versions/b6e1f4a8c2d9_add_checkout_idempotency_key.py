@@ -0,0 +1,38 @@
+"""add checkout idempotency key to booking orders
+
+Revision ID: b6e1f4a8c2d9
+Revises: a3d8e5c7b9f2
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "b6e1f4a8c2d9"
+down_revision = "a3d8e5c7b9f2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Store the browser's idempotency key with a unique index."""
+
+    with op.batch_alter_table("booking_orders", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("checkout_idempotency_key", sa.String(length=64), nullable=True)
+        )
+        batch_op.create_index(
+            "ix_booking_orders_checkout_idempotency_key",
+            ["checkout_idempotency_key"],
+            unique=True,
+        )
+
+
+def downgrade() -> None:
+    """Remove the checkout idempotency key column and its index."""
+
+    with op.batch_alter_table("booking_orders", schema=None) as batch_op:
+        batch_op.drop_index("ix_booking_orders_checkout_idempotency_key")
+        batch_op.drop_column("checkout_idempotency_key")
@@ -0,0 +1,175 @@
+"""add per-event booking totals table
+
+Revision ID: b8c5e3f1a7d2
+Revises: a4d7e2b9c1f5
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import UTC, datetime
+from decimal import Decimal
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "b8c5e3f1a7d2"
+down_revision = "a4d7e2b9c1f5"
+branch_labels = None
+depends_on = None
+
+# Copies of ``app.util.event_booking_stats`` constants at this revision.
+MANUAL_PAYMENT_PROVIDER_PREFIX = "admin_manual"
+STRIPE_PAYMENT_PROVIDER = "stripe_checkout"
+
+events_table = sa.table("events", sa.column("id", sa.Integer()))
+event_booking_stats_table = sa.table(
+    "event_booking_stats",
+    sa.column("event_id", sa.Integer()),
+    sa.column("confirmed_canoe_count", sa.Integer()),
+    sa.column("paid_order_count", sa.Integer()),
+    sa.column("revenue_ore", sa.BigInteger()),
+    sa.column("manual_order_count", sa.Integer()),
+    sa.column("stripe_order_count", sa.Integer()),
+    sa.column("picked_up_count", sa.Integer()),
+    sa.column("updated_at", sa.DateTime(timezone=True)),
+)
+
+
+def build_order_table(table_name: str) -> sa.TableClause:
+    """Return the order columns the backfill reads from one order table."""
+
+    return sa.table(
+        table_name,
+        sa.column("id", sa.Integer()),
+        sa.column("event_id", sa.Integer()),
+        sa.column("status", sa.String()),
+        sa.column("total_amount", sa.Numeric(10, 2)),
+        sa.column("payment_provider", sa.String()),
+    )
+
+
+def build_canoe_table(table_name: str) -> sa.TableClause:
+    """Return the canoe columns the backfill reads from one canoe table."""
+
+    return sa.table(
+        table_name,
+        sa.column("booking_order_id", sa.Integer()),
+        sa.column("status", sa.String()),
+        sa.column("picked_up", sa.Boolean()),
+    )
+
+
+def add_event_totals(
+    connection, order_table, canoe_table, totals_by_event: dict[int, dict[str, int]]
+) -> None:
+    """Add one order/canoe table pair's totals to ``totals_by_event``."""
+
+    is_paid = order_table.c.status == "paid"
+    order_rows = connection.execute(
+        sa.select(
+            order_table.c.event_id,
+            order_table.c.total_amount,
+            order_table.c.payment_provider,
+        ).where(is_paid, order_table.c.event_id.is_not(None))
+    ).all()
+    for event_id, total_amount, payment_provider in order_rows:
+        event_totals = totals_by_event[event_id]
+        event_totals["paid_order_count"] += 1
+        event_totals["revenue_ore"] += int(Decimal(str(total_amount or 0)) * 100)
+        if (payment_provider or "").startswith(MANUAL_PAYMENT_PROVIDER_PREFIX):
+            event_totals["manual_order_count"] += 1
+        if payment_provider == STRIPE_PAYMENT_PROVIDER:
+            event_totals["stripe_order_count"] += 1
+
+    canoe_rows = connection.execute(
+        sa.select(
+            order_table.c.event_id,
+            sa.func.count(),
+            sa.func.sum(sa.case((canoe_table.c.picked_up.is_(True), 1), else_=0)),
+        )
+        .select_from(canoe_table)
+        .join(order_table, canoe_table.c.booking_order_id == order_table.c.id)
+        .where(canoe_table.c.status == "confirmed", order_table.c.event_id.is_not(None))
+        .group_by(order_table.c.event_id)
+    ).all()
+    for event_id, confirmed_canoe_count, picked_up_count in canoe_rows:
+        event_totals = totals_by_event[event_id]
+        event_totals["confirmed_canoe_count"] += int(confirmed_canoe_count)
+        event_totals["picked_up_count"] += int(picked_up_count or 0)
+
+
+def backfill_event_booking_stats() -> None:
+    """Insert one totals row per existing event from its current bookings."""
+
+    connection = op.get_bind()
+    totals_by_event: dict[int, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    add_event_totals(
+        connection,
+        build_order_table("booking_orders"),
+        build_canoe_table("booked_canoes"),
+        totals_by_event,
+    )
+    # Archived events keep their bookings in the archive tables.
+    add_event_totals(
+        connection,
+        build_order_table("archived_booking_orders"),
+        build_canoe_table("archived_booked_canoes"),
+        totals_by_event,
+    )
+
+    event_ids = connection.execute(sa.select(events_table.c.id)).scalars().all()
+    if not event_ids:
+        return
+
+    updated_at = datetime.now(UTC)
+    op.bulk_insert(
+        event_booking_stats_table,
+        [
+            {
+                "event_id": event_id,
+                "confirmed_canoe_count": totals_by_event[event_id][
+                    "confirmed_canoe_count"
+                ],
+                "paid_order_count": totals_by_event[event_id]["paid_order_count"],
+                "revenue_ore": totals_by_event[event_id]["revenue_ore"],
+                "manual_order_count": totals_by_event[event_id]["manual_order_count"],
+                "stripe_order_count": totals_by_event[event_id]["stripe_order_count"],
+                "picked_up_count": totals_by_event[event_id]["picked_up_count"],
+                "updated_at": updated_at,
+            }
+            for event_id in event_ids
+        ],
+    )
+
+
+def upgrade() -> None:
+    """Create and backfill the per-event booking totals table."""
+
+    op.create_table(
+        "event_booking_stats",
+        sa.Column("event_id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column(
+            "confirmed_canoe_count", sa.Integer(), server_default="0", nullable=False
+        ),
+        sa.Column("paid_order_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("revenue_ore", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column(
+            "manual_order_count", sa.Integer(), server_default="0", nullable=False
+        ),
+        sa.Column(
+            "stripe_order_count", sa.Integer(), server_default="0", nullable=False
+        ),
+        sa.Column("picked_up_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["event_id"], ["events.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("event_id"),
+    )
+    backfill_event_booking_stats()
+
+
+def downgrade() -> None:
+    """Drop the per-event booking totals table."""
+
+    op.drop_table("event_booking_stats")
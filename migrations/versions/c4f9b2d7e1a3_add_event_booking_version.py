@@ -0,0 +1,37 @@
+"""add booking version counter to events
+
+Revision ID: c4f9b2d7e1a3
+Revises: b6e1f4a8c2d9
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "c4f9b2d7e1a3"
+down_revision = "b6e1f4a8c2d9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add the counter that cached booking views are keyed on."""
+
+    with op.batch_alter_table("events", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "booking_version",
+                sa.Integer(),
+                nullable=False,
+                server_default="0",
+            )
+        )
+
+
+def downgrade() -> None:
+    """Remove the booking version counter."""
+
+    with op.batch_alter_table("events", schema=None) as batch_op:
+        batch_op.drop_column("booking_version")
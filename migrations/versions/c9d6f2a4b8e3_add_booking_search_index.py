@@ -0,0 +1,95 @@
+"""add search index for the admin bookings list
+
+Revision ID: c9d6f2a4b8e3
+Revises: b8c5e3f1a7d2
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "c9d6f2a4b8e3"
+down_revision = "b8c5e3f1a7d2"
+branch_labels = None
+depends_on = None
+
+# Copies of ``app.util.db_models`` search DDL at this revision.
+SQLITE_BOOKING_SEARCH_DDL = (
+    (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS booked_canoe_search "
+        "USING fts5(pickup_name, booking_reference, tokenize='trigram')"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS booked_canoe_search_insert "
+        "AFTER INSERT ON booked_canoes BEGIN "
+        "INSERT INTO booked_canoe_search "
+        "(rowid, pickup_name, booking_reference) "
+        "SELECT new.id, new.normalized_pickup_name, public_booking_reference "
+        "FROM booking_orders WHERE id = new.booking_order_id; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS booked_canoe_search_update "
+        "AFTER UPDATE OF normalized_pickup_name ON booked_canoes BEGIN "
+        "UPDATE booked_canoe_search "
+        "SET pickup_name = new.normalized_pickup_name WHERE rowid = new.id; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS booked_canoe_search_delete "
+        "AFTER DELETE ON booked_canoes BEGIN "
+        "DELETE FROM booked_canoe_search WHERE rowid = old.id; END"
+    ),
+)
+SQLITE_BOOKING_SEARCH_BACKFILL = (
+    "INSERT INTO booked_canoe_search (rowid, pickup_name, booking_reference) "
+    "SELECT booked_canoes.id, booked_canoes.normalized_pickup_name, "
+    "booking_orders.public_booking_reference "
+    "FROM booked_canoes "
+    "JOIN booking_orders ON booking_orders.id = booked_canoes.booking_order_id"
+)
+POSTGRES_BOOKING_SEARCH_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    (
+        "CREATE INDEX IF NOT EXISTS ix_booked_canoes_pickup_name_trgm "
+        "ON booked_canoes USING gin (normalized_pickup_name gin_trgm_ops)"
+    ),
+    (
+        "CREATE INDEX IF NOT EXISTS ix_booking_orders_reference_trgm "
+        "ON booking_orders USING gin (public_booking_reference gin_trgm_ops)"
+    ),
+)
+
+
+def upgrade() -> None:
+    """Create and fill the booking search index for this database type.
+
+    SQLite builds without FTS5 and other databases get no index; the admin
+    search then falls back to a plain ``LIKE``.
+    """
+
+    connection = op.get_bind()
+    if connection.dialect.name == "sqlite":
+        has_fts5 = connection.exec_driver_sql(
+            "SELECT sqlite_compileoption_used('ENABLE_FTS5')"
+        ).scalar()
+        if not has_fts5:
+            return
+        for statement in SQLITE_BOOKING_SEARCH_DDL:
+            op.execute(statement)
+        op.execute(SQLITE_BOOKING_SEARCH_BACKFILL)
+    elif connection.dialect.name == "postgresql":
+        for statement in POSTGRES_BOOKING_SEARCH_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    """Drop the booking search index. The ``pg_trgm`` extension is kept."""
+
+    connection = op.get_bind()
+    if connection.dialect.name == "sqlite":
+        for trigger_name in ("insert", "update", "delete"):
+            op.execute(f"DROP TRIGGER IF EXISTS booked_canoe_search_{trigger_name}")
+        op.execute("DROP TABLE IF EXISTS booked_canoe_search")
+    elif connection.dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_booked_canoes_pickup_name_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_booking_orders_reference_trgm")
@@ -0,0 +1,104 @@
+"""add indexed normalized pickup name to booked canoes
+
+Revision ID: d8a3f6c1b5e9
+Revises: c4f9b2d7e1a3
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "d8a3f6c1b5e9"
+down_revision = "c4f9b2d7e1a3"
+branch_labels = None
+depends_on = None
+
+# Rows are backfilled in chunks so large tables do not build one huge UPDATE.
+BACKFILL_BATCH_SIZE = 1000
+
+booked_canoes_table = sa.table(
+    "booked_canoes",
+    sa.column("id", sa.Integer()),
+    sa.column("participant_first_name", sa.String()),
+    sa.column("participant_last_name", sa.String()),
+    sa.column("normalized_pickup_name", sa.String()),
+)
+
+
+def normalize_pickup_name(first_name: str | None, last_name: str | None) -> str:
+    """Copy of ``app.util.db_models.normalize_pickup_name`` at this revision.
+
+    Python's ``casefold`` is used instead of SQL ``lower()`` so the stored
+    values match what the application writes for new rows.
+    """
+
+    return (
+        f"{(first_name or '').strip()} {(last_name or '').strip()}".strip().casefold()
+    )
+
+
+def backfill_normalized_pickup_names() -> None:
+    """Fill the new column for every existing canoe row."""
+
+    connection = op.get_bind()
+    last_seen_id = 0
+    while True:
+        canoe_rows = connection.execute(
+            sa.select(
+                booked_canoes_table.c.id,
+                booked_canoes_table.c.participant_first_name,
+                booked_canoes_table.c.participant_last_name,
+            )
+            .where(booked_canoes_table.c.id > last_seen_id)
+            .order_by(booked_canoes_table.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not canoe_rows:
+            return
+
+        connection.execute(
+            booked_canoes_table.update()
+            .where(booked_canoes_table.c.id == sa.bindparam("canoe_id"))
+            .values(normalized_pickup_name=sa.bindparam("normalized_name")),
+            [
+                {
+                    "canoe_id": canoe_id,
+                    "normalized_name": normalize_pickup_name(first_name, last_name),
+                }
+                for canoe_id, first_name, last_name in canoe_rows
+            ],
+        )
+        last_seen_id = canoe_rows[-1].id
+
+
+def upgrade() -> None:
+    """Add, backfill, and index the normalized pickup name column."""
+
+    with op.batch_alter_table("booked_canoes", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("normalized_pickup_name", sa.String(length=255), nullable=True)
+        )
+
+    backfill_normalized_pickup_names()
+
+    with op.batch_alter_table("booked_canoes", schema=None) as batch_op:
+        batch_op.alter_column(
+            "normalized_pickup_name",
+            existing_type=sa.String(length=255),
+            nullable=False,
+        )
+        batch_op.create_index(
+            "ix_booked_canoes_normalized_pickup_name",
+            ["normalized_pickup_name"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    """Remove the normalized pickup name column and its index."""
+
+    with op.batch_alter_table("booked_canoes", schema=None) as batch_op:
+        batch_op.drop_index("ix_booked_canoes_normalized_pickup_name")
+        batch_op.drop_column("normalized_pickup_name")
@@ -0,0 +1,56 @@
+"""add checklist version counters to events and booked canoes
+
+Revision ID: e2b7c9d4a6f1
+Revises: d8a3f6c1b5e9
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "e2b7c9d4a6f1"
+down_revision = "d8a3f6c1b5e9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add the counters the live checklist feed reads its changes from."""
+
+    with op.batch_alter_table("events", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "checklist_version",
+                sa.Integer(),
+                nullable=False,
+                server_default="0",
+            )
+        )
+
+    with op.batch_alter_table("booked_canoes", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "checklist_version",
+                sa.Integer(),
+                nullable=False,
+                server_default="0",
+            )
+        )
+        batch_op.create_index(
+            "ix_booked_canoes_checklist_version",
+            ["checklist_version"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    """Remove the checklist version counters."""
+
+    with op.batch_alter_table("booked_canoes", schema=None) as batch_op:
+        batch_op.drop_index("ix_booked_canoes_checklist_version")
+        batch_op.drop_column("checklist_version")
+
+    with op.batch_alter_table("events", schema=None) as batch_op:
+        batch_op.drop_column("checklist_version")
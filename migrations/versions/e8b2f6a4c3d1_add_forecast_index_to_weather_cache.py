@@ -0,0 +1,31 @@
+"""add forecast index to event weather cache
+
+Revision ID: e8b2f6a4c3d1
+Revises: d5a4c2b1e8f7
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "e8b2f6a4c3d1"
+down_revision = "d5a4c2b1e8f7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Store the parsed forecast index next to the cached event forecast."""
+
+    op.add_column(
+        "event_weather_cache",
+        sa.Column("forecast_index_json", sa.Text(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Remove the stored forecast index column."""
+
+    op.drop_column("event_weather_cache", "forecast_index_json")
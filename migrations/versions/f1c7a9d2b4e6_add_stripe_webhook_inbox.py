@@ -0,0 +1,51 @@
+"""add stripe webhook inbox
+
+Revision ID: f1c7a9d2b4e6
+Revises: e8b2f6a4c3d1
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "f1c7a9d2b4e6"
+down_revision = "e8b2f6a4c3d1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the inbox table that queues verified Stripe webhook events."""
+
+    op.create_table(
+        "stripe_webhook_inbox",
+        sa.Column("stripe_event_id", sa.String(length=255), nullable=False),
+        sa.Column("event_type", sa.String(length=100), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("attempt_count", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("processing_result", sa.String(length=50), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("received_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("processed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("stripe_event_id"),
+    )
+    op.create_index(
+        "ix_stripe_webhook_inbox_status_next_attempt_at",
+        "stripe_webhook_inbox",
+        ["status", "next_attempt_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Drop the Stripe webhook inbox table."""
+
+    op.drop_index(
+        "ix_stripe_webhook_inbox_status_next_attempt_at",
+        table_name="stripe_webhook_inbox",
+    )
+    op.drop_table("stripe_webhook_inbox")
@@ -0,0 +1,580 @@
+"""Run a local stand-in for the parts of the Stripe API that Paddlingen uses.
+
+The real checkout flow needs Stripe for every step, which makes latency
+numbers depend on the network and makes soak tests touch a real Stripe
+account. This server answers the same endpoints locally:
+
+- ``POST /v1/checkout/sessions`` and ``GET /v1/checkout/sessions`` (list)
+- ``GET /v1/checkout/sessions/<id>`` and ``POST .../<id>/expire``
+- ``GET /v1/products/<id>`` for the Checkout product image
+- ``HEAD /healthcheck`` for connection warming
+
+Every API response can be delayed (``--latency-ms`` plus random
+``--jitter-ms``) and a share of them can fail on purpose (``--error-rate``).
+The hosted Checkout URL points back at this server: opening it marks the
+session as paid, sends a signed ``checkout.session.completed`` webhook to
+``--webhook-url``, and redirects to the session's ``success_url``. Expiring a
+session sends ``checkout.session.expired`` the same way.
+
+Point the app at it with ``STRIPE_API_BASE``::
+
+    python scripts/fake_stripe_server.py --port 12111 --latency-ms 150 \\
+        --webhook-url http://127.0.0.1:5000/stripe/webhook \\
+        --webhook-secret whsec_fake_local
+    STRIPE_API_BASE=http://127.0.0.1:12111 STRIPE_SECRET_KEY=sk_test_fake \\
+        STRIPE_WEBHOOK_SECRET=whsec_fake_local flask --app app run
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import hmac
+import json
+import random
+import re
+import secrets
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+
+CHECKOUT_SESSION_PATH_PATTERN = re.compile(
+    r"^/v1/checkout/sessions/(?P<session_id>[^/]+)(?P<expire>/expire)?$"
+)
+PRODUCT_PATH_PATTERN = re.compile(r"^/v1/products/(?P<product_id>[^/]+)$")
+HOSTED_CHECKOUT_PATH_PATTERN = re.compile(r"^/c/pay/(?P<session_id>[^/]+)$")
+
+
+@dataclass
+class FakeStripeSettings:
+    """Behaviour switches for one fake Stripe server.
+
+    Attributes:
+        latency_ms: Fixed delay added to every ``/v1`` API response.
+        jitter_ms: Extra random delay between zero and this value.
+        error_rate: Share of ``/v1`` requests, from 0 to 1, that fail on purpose.
+        error_status: HTTP status used for injected failures. Stripe's client
+            retries 429 and 5xx answers, so those also exercise retry cost.
+        webhook_url: Where signed webhook events are sent. ``None`` disables
+            webhook emission.
+        webhook_secret: Secret used to sign webhook events.
+        webhook_delay_ms: Delay before each webhook is sent.
+        seed: Seed for the latency and error randomness, for repeatable runs.
+    """
+
+    latency_ms: float = 0
+    jitter_ms: float = 0
+    error_rate: float = 0
+    error_status: int = 500
+    webhook_url: str | None = None
+    webhook_secret: str = "whsec_fake_local"
+    webhook_delay_ms: float = 0
+    seed: int | None = None
+
+
+def build_stripe_signature_header(
+    payload: str,
+    webhook_secret: str,
+    timestamp: int | None = None,
+) -> str:
+    """Return a ``Stripe-Signature`` header for one webhook payload.
+
+    The format matches what ``stripe.Webhook.construct_event`` verifies:
+    ``t=<unix time>,v1=<HMAC-SHA256 of "<t>.<payload>">``.
+    """
+
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    signature = hmac.new(
+        webhook_secret.encode("utf-8"),
+        msg=f"{timestamp}.{payload}".encode(),
+        digestmod=hashlib.sha256,
+    ).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+
+def parse_stripe_form_body(form_body: str) -> dict[str, str]:
+    """Return the flat ``key[sub]=value`` pairs sent by Stripe's client."""
+
+    return dict(parse_qsl(form_body, keep_blank_values=True))
+
+
+def get_bracketed_values(form_fields: dict[str, str], prefix: str) -> dict[str, str]:
+    """Collect ``prefix[name]`` fields such as ``metadata[...]`` into a dict."""
+
+    return {
+        field_name[len(prefix) + 1 : -1]: field_value
+        for field_name, field_value in form_fields.items()
+        if field_name.startswith(f"{prefix}[")
+        and field_name.endswith("]")
+        and "][" not in field_name
+    }
+
+
+def get_line_item_amount_total(form_fields: dict[str, str]) -> int:
+    """Return the order total in öre from the submitted ``line_items``."""
+
+    amount_total = 0
+    line_item_index = 0
+    while f"line_items[{line_item_index}][quantity]" in form_fields:
+        quantity = int(form_fields[f"line_items[{line_item_index}][quantity]"])
+        unit_amount = int(
+            form_fields.get(
+                f"line_items[{line_item_index}][price_data][unit_amount]", "0"
+            )
+        )
+        amount_total += quantity * unit_amount
+        line_item_index += 1
+    return amount_total
+
+
+class FakeStripeState:
+    """Thread-safe in-memory store of Checkout Sessions and request counts."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.checkout_sessions: dict[str, dict[str, Any]] = {}
+        self.request_count = 0
+        self.injected_error_count = 0
+        self.sent_webhook_count = 0
+
+    def create_checkout_session(
+        self, form_fields: dict[str, str], server_base_url: str
+    ) -> dict[str, Any]:
+        """Store and return a new open Checkout Session."""
+
+        session_id = f"cs_test_fake_{secrets.token_hex(12)}"
+        checkout_session: dict[str, Any] = {
+            "id": session_id,
+            "object": "checkout.session",
+            "created": int(time.time()),
+            "status": "open",
+            "payment_status": "unpaid",
+            "mode": form_fields.get("mode", "payment"),
+            "currency": form_fields.get("line_items[0][price_data][currency]", "sek"),
+            "amount_total": get_line_item_amount_total(form_fields),
+            "client_reference_id": form_fields.get("client_reference_id"),
+            "customer_email": form_fields.get("customer_email"),
+            "customer_details": None,
+            "metadata": get_bracketed_values(form_fields, "metadata"),
+            "success_url": form_fields.get("success_url"),
+            "cancel_url": form_fields.get("cancel_url"),
+            "expires_at": int(form_fields.get("expires_at") or time.time() + 1800),
+            "url": f"{server_base_url}/c/pay/{session_id}",
+        }
+        with self.lock:
+            self.checkout_sessions[session_id] = checkout_session
+        return checkout_session
+
+    def get_checkout_session(self, session_id: str) -> dict[str, Any] | None:
+        """Return one stored session, or ``None`` when it does not exist."""
+
+        with self.lock:
+            return self.checkout_sessions.get(session_id)
+
+    def update_checkout_session(
+        self, session_id: str, **session_fields: Any
+    ) -> dict[str, Any] | None:
+        """Change fields on one stored session and return it."""
+
+        with self.lock:
+            checkout_session = self.checkout_sessions.get(session_id)
+            if checkout_session is not None:
+                checkout_session.update(session_fields)
+            return checkout_session
+
+    def list_checkout_sessions(
+        self,
+        created_after: int,
+        starting_after: str | None,
+        limit: int,
+    ) -> tuple[list[dict[str, Any]], bool]:
+        """Return one page of sessions, newest first like Stripe's list API."""
+
+        with self.lock:
+            matching_sessions = [
+                checkout_session
+                for checkout_session in reversed(self.checkout_sessions.values())
+                if checkout_session["created"] >= created_after
+            ]
+
+        if starting_after:
+            session_ids = [session["id"] for session in matching_sessions]
+            if starting_after in session_ids:
+                matching_sessions = matching_sessions[
+                    session_ids.index(starting_after) + 1 :
+                ]
+
+        return matching_sessions[:limit], len(matching_sessions) > limit
+
+
+class FakeStripeServer(ThreadingHTTPServer):
+    """HTTP server that holds the fake Stripe settings and state."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        server_address: tuple[str, int],
+        settings: FakeStripeSettings,
+    ) -> None:
+        super().__init__(server_address, FakeStripeRequestHandler)
+        self.settings = settings
+        self.state = FakeStripeState()
+        self.random_generator = random.Random(settings.seed)
+        self.random_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        """Return the URL to use as ``STRIPE_API_BASE``."""
+
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def draw_api_delay_and_error(self) -> tuple[float, bool]:
+        """Return the delay in seconds and whether this request should fail."""
+
+        with self.random_lock:
+            jitter_ms = self.random_generator.uniform(0, self.settings.jitter_ms)
+            should_fail = self.random_generator.random() < self.settings.error_rate
+        return (self.settings.latency_ms + jitter_ms) / 1000, should_fail
+
+    def emit_webhook(self, event_type: str, checkout_session: dict[str, Any]) -> None:
+        """Send one signed Checkout Session event in a background thread."""
+
+        if not self.settings.webhook_url:
+            return
+
+        stripe_event = {
+            "id": f"evt_fake_{secrets.token_hex(12)}",
+            "object": "event",
+            "type": event_type,
+            "created": int(time.time()),
+            "livemode": False,
+            "data": {"object": dict(checkout_session)},
+        }
+        payload = json.dumps(stripe_event)
+        threading.Thread(
+            target=self.deliver_webhook,
+            args=(payload,),
+            name="fake-stripe-webhook",
+            daemon=True,
+        ).start()
+
+    def deliver_webhook(self, payload: str) -> None:
+        """POST one signed webhook payload to the configured URL."""
+
+        time.sleep(self.settings.webhook_delay_ms / 1000)
+        try:
+            requests.post(
+                str(self.settings.webhook_url),
+                data=payload.encode("utf-8"),
+                headers={
+                    "Content-Type": "application/json",
+                    "Stripe-Signature": build_stripe_signature_header(
+                        payload, self.settings.webhook_secret
+                    ),
+                },
+                timeout=10,
+            )
+        except requests.RequestException as error:
+            print(f"Webhook delivery failed: {error}")
+            return
+
+        with self.state.lock:
+            self.state.sent_webhook_count += 1
+
+
+class FakeStripeRequestHandler(BaseHTTPRequestHandler):
+    """Route requests to the fake Stripe endpoints."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: FakeStripeServer
+
+    def log_message(self, format, *args) -> None:
+        return None
+
+    def send_json(self, status_code: int, response_body: dict[str, Any]) -> None:
+        """Write one JSON response with keep-alive headers."""
+
+        encoded_body = json.dumps(response_body).encode("utf-8")
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded_body)))
+        self.send_header("Request-Id", f"req_fake_{secrets.token_hex(6)}")
+        self.end_headers()
+        self.wfile.write(encoded_body)
+
+    def send_stripe_error(
+        self, status_code: int, message: str, error_type: str = "api_error"
+    ) -> None:
+        """Write an error body in Stripe's ``{"error": {...}}`` format."""
+
+        self.send_json(status_code, {"error": {"type": error_type, "message": message}})
+
+    def read_form_fields(self) -> dict[str, str]:
+        """Read the form-encoded request body sent by Stripe's client."""
+
+        content_length = int(self.headers.get("Content-Length") or 0)
+        form_body = self.rfile.read(content_length).decode("utf-8")
+        return parse_stripe_form_body(form_body)
+
+    def prepare_api_request(self) -> bool:
+        """Apply latency and error injection to one ``/v1`` request.
+
+        Returns:
+            bool: ``False`` when an injected error was already sent.
+        """
+
+        with self.server.state.lock:
+            self.server.state.request_count += 1
+
+        delay_seconds, should_fail = self.server.draw_api_delay_and_error()
+        if delay_seconds > 0:
+            time.sleep(delay_seconds)
+        if not should_fail:
+            return True
+
+        with self.server.state.lock:
+            self.server.state.injected_error_count += 1
+        self.send_stripe_error(
+            self.server.settings.error_status,
+            "Injected failure from the fake Stripe server.",
+        )
+        return False
+
+    def do_HEAD(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self) -> None:
+        request_url = urlsplit(self.path)
+        request_path = request_url.path
+
+        hosted_checkout_match = HOSTED_CHECKOUT_PATH_PATTERN.match(request_path)
+        if hosted_checkout_match:
+            self.handle_hosted_checkout(
+                hosted_checkout_match["session_id"],
+                cancel="cancel=1" in request_url.query,
+            )
+            return
+
+        if request_path == "/_fake/stats":
+            state = self.server.state
+            with state.lock:
+                stats = {
+                    "request_count": state.request_count,
+                    "injected_error_count": state.injected_error_count,
+                    "sent_webhook_count": state.sent_webhook_count,
+                    "checkout_session_count": len(state.checkout_sessions),
+                }
+            self.send_json(200, stats)
+            return
+
+        if not request_path.startswith("/v1/"):
+            self.send_stripe_error(404, "Unknown path.", "invalid_request_error")
+            return
+        if not self.prepare_api_request():
+            return
+
+        if request_path == "/v1/checkout/sessions":
+            query_fields = dict(parse_qsl(request_url.query))
+            checkout_sessions, has_more = self.server.state.list_checkout_sessions(
+                created_after=int(query_fields.get("created[gte]", 0)),
+                starting_after=query_fields.get("starting_after"),
+                limit=int(query_fields.get("limit", 10)),
+            )
+            self.send_json(
+                200,
+                {
+                    "object": "list",
+                    "url": "/v1/checkout/sessions",
+                    "data": checkout_sessions,
+                    "has_more": has_more,
+                },
+            )
+            return
+
+        checkout_session_match = CHECKOUT_SESSION_PATH_PATTERN.match(request_path)
+        if checkout_session_match and not checkout_session_match["expire"]:
+            self.send_checkout_session(checkout_session_match["session_id"])
+            return
+
+        product_match = PRODUCT_PATH_PATTERN.match(request_path)
+        if product_match:
+            self.send_json(
+                200,
+                {
+                    "id": product_match["product_id"],
+                    "object": "product",
+                    "name": "Kanot",
+                    "images": [f"{self.server.base_url}/images/fake-canoe.png"],
+                },
+            )
+            return
+
+        self.send_stripe_error(404, "Unknown path.", "invalid_request_error")
+
+    def do_POST(self) -> None:
+        request_path = urlsplit(self.path).path
+        if not request_path.startswith("/v1/"):
+            self.send_stripe_error(404, "Unknown path.", "invalid_request_error")
+            return
+
+        form_fields = self.read_form_fields()
+        if not self.prepare_api_request():
+            return
+
+        if request_path == "/v1/checkout/sessions":
+            self.send_json(
+                200,
+                self.server.state.create_checkout_session(
+                    form_fields, self.server.base_url
+                ),
+            )
+            return
+
+        checkout_session_match = CHECKOUT_SESSION_PATH_PATTERN.match(request_path)
+        if checkout_session_match and checkout_session_match["expire"]:
+            self.expire_checkout_session(checkout_session_match["session_id"])
+            return
+
+        self.send_stripe_error(404, "Unknown path.", "invalid_request_error")
+
+    def send_checkout_session(self, session_id: str) -> None:
+        """Answer a Checkout Session retrieve request."""
+
+        checkout_session = self.server.state.get_checkout_session(session_id)
+        if checkout_session is None:
+            self.send_stripe_error(
+                404,
+                f"No such checkout.session: '{session_id}'",
+                "invalid_request_error",
+            )
+            return
+        self.send_json(200, checkout_session)
+
+    def expire_checkout_session(self, session_id: str) -> None:
+        """Expire one open session and emit the matching webhook."""
+
+        checkout_session = self.server.state.get_checkout_session(session_id)
+        if checkout_session is None:
+            self.send_stripe_error(
+                404,
+                f"No such checkout.session: '{session_id}'",
+                "invalid_request_error",
+            )
+            return
+        if checkout_session["status"] != "open":
+            self.send_stripe_error(
+                400,
+                "Only Checkout Sessions with a status of open can be expired.",
+                "invalid_request_error",
+            )
+            return
+
+        checkout_session = self.server.state.update_checkout_session(
+            session_id, status="expired"
+        )
+        assert checkout_session is not None
+        self.server.emit_webhook("checkout.session.expired", checkout_session)
+        self.send_json(200, checkout_session)
+
+    def handle_hosted_checkout(self, session_id: str, cancel: bool) -> None:
+        """Simulate the visitor finishing (or cancelling) hosted Checkout."""
+
+        checkout_session = self.server.state.get_checkout_session(session_id)
+        if checkout_session is None or checkout_session["status"] != "open":
+            self.send_stripe_error(
+                404, "This Checkout Session is no longer open.", "invalid_request_error"
+            )
+            return
+
+        if cancel:
+            redirect_url = str(checkout_session["cancel_url"])
+        else:
+            checkout_session = self.server.state.update_checkout_session(
+                session_id,
+                status="complete",
+                payment_status="paid",
+                customer_details={
+                    "email": checkout_session.get("customer_email")
+                    or "paddlare@example.com",
+                    "name": "Fake Paddlare",
+                },
+            )
+            assert checkout_session is not None
+            self.server.emit_webhook("checkout.session.completed", checkout_session)
+            redirect_url = str(checkout_session["success_url"])
+
+        self.send_response(303)
+        self.send_header(
+            "Location", redirect_url.replace("{CHECKOUT_SESSION_ID}", session_id)
+        )
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+def start_fake_stripe_server(
+    settings: FakeStripeSettings,
+    host: str = "127.0.0.1",
+    port: int = 0,
+) -> FakeStripeServer:
+    """Start the fake Stripe server in a daemon thread and return it."""
+
+    server = FakeStripeServer((host, port), settings)
+    threading.Thread(
+        target=server.serve_forever, name="fake-stripe-server", daemon=True
+    ).start()
+    return server
+
+
+def build_argument_parser() -> argparse.ArgumentParser:
+    """Return the command line options for running the server directly."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=12111)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--webhook-url", default=None)
+    parser.add_argument("--webhook-secret", default="whsec_fake_local")
+    parser.add_argument("--webhook-delay-ms", type=float, default=0)
+    parser.add_argument("--seed", type=int, default=None)
+    return parser
+
+
+def main() -> None:
+    """Run the fake Stripe server until interrupted."""
+
+    arguments = build_argument_parser().parse_args()
+    settings = FakeStripeSettings(
+        latency_ms=arguments.latency_ms,
+        jitter_ms=arguments.jitter_ms,
+        error_rate=arguments.error_rate,
+        error_status=arguments.error_status,
+        webhook_url=arguments.webhook_url,
+        webhook_secret=arguments.webhook_secret,
+        webhook_delay_ms=arguments.webhook_delay_ms,
+        seed=arguments.seed,
+    )
+    server = FakeStripeServer((arguments.host, arguments.port), settings)
+    print(f"Fake Stripe API listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
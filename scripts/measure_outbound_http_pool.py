@@ -0,0 +1,142 @@
+"""Compare per-call latency with and without the pooled outbound HTTP session.
+
+The script starts a local HTTPS stand-in server with a throwaway self-signed
+certificate, then times the same number of calls twice: once with a new
+session per call (a fresh TCP and TLS handshake every time) and once through
+the pooled session used by the app for Stripe and MET.
+
+Run it with ``python scripts/measure_outbound_http_pool.py``. It needs the
+``openssl`` command to create the temporary certificate.
+"""
+
+from __future__ import annotations
+
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.util.outbound_http import build_outbound_http_session
+
+CALL_COUNT = 50
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answer every request with a tiny keep-alive JSON response."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, Nagle plus
+    # delayed ACKs add ~40 ms to every keep-alive response on loopback.
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        body = b'{"ok":true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        return None
+
+
+def create_self_signed_certificate(target_directory: Path) -> tuple[Path, Path]:
+    """Create a temporary certificate and key for ``localhost``."""
+
+    certificate_path = target_directory / "stand_in_cert.pem"
+    key_path = target_directory / "stand_in_key.pem"
+    subprocess.run(
+        [
+            "openssl",
+            "req",
+            "-x509",
+            "-newkey",
+            "rsa:2048",
+            "-nodes",
+            "-days",
+            "1",
+            "-subj",
+            "/CN=localhost",
+            "-addext",
+            "subjectAltName=DNS:localhost",
+            "-keyout",
+            str(key_path),
+            "-out",
+            str(certificate_path),
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return certificate_path, key_path
+
+
+def start_tls_stand_in_server(
+    certificate_path: Path,
+    key_path: Path,
+) -> ThreadingHTTPServer:
+    """Start the HTTPS stand-in server on a free local port."""
+
+    server = ThreadingHTTPServer(("localhost", 0), StandInHandler)
+    server.daemon_threads = True
+    tls_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    tls_context.load_cert_chain(certificate_path, key_path)
+    server.socket = tls_context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def time_calls(server_url: str, certificate_path: Path, pooled: bool) -> float:
+    """Return the average milliseconds per call for one strategy."""
+
+    pooled_session = build_outbound_http_session(pool_connections=1, pool_maxsize=1)
+    started_at = time.perf_counter()
+    for _ in range(CALL_COUNT):
+        if pooled:
+            response = pooled_session.get(
+                server_url, verify=str(certificate_path), timeout=5
+            )
+        else:
+            with requests.Session() as fresh_session:
+                response = fresh_session.get(
+                    server_url, verify=str(certificate_path), timeout=5
+                )
+        response.raise_for_status()
+    elapsed_seconds = time.perf_counter() - started_at
+    pooled_session.close()
+    return elapsed_seconds / CALL_COUNT * 1000
+
+
+def main() -> None:
+    """Run both strategies against the stand-in and print the results."""
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        certificate_path, key_path = create_self_signed_certificate(
+            Path(temporary_directory)
+        )
+        server = start_tls_stand_in_server(certificate_path, key_path)
+        server_url = f"https://localhost:{server.server_address[1]}/"
+        try:
+            fresh_milliseconds = time_calls(server_url, certificate_path, False)
+            pooled_milliseconds = time_calls(server_url, certificate_path, True)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    print(f"Calls per strategy: {CALL_COUNT}")
+    print(f"New connection per call: {fresh_milliseconds:.2f} ms/call")
+    print(f"Pooled keep-alive session: {pooled_milliseconds:.2f} ms/call")
+
+
+if __name__ == "__main__":
+    main()
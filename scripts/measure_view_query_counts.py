@@ -0,0 +1,173 @@
+"""Show how many SQL queries the start page and admin dashboard run.
+
+The script builds the app on a throwaway in-memory SQLite database, stores a
+small and a large set of bookings (5,000 canoes by default), and renders both
+views through Flask's test client. The query count per view should be the
+same for both sizes; only the query time is allowed to grow.
+
+Run it with ``python scripts/measure_view_query_counts.py [canoe_count]``.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+os.environ["DATABASE_URL"] = "sqlite:///:memory:"
+
+from werkzeug.security import generate_password_hash
+
+from app import create_app
+from app.util.db_models import (
+    BookedCanoe,
+    BookingOrder,
+    Event,
+    User,
+    db,
+    get_current_utc_time,
+)
+from app.util.event_settings import (
+    bump_event_booking_version,
+    create_or_update_active_event_from_config,
+)
+from app.util.query_metrics import count_queries
+
+SMALL_CANOE_COUNT = 10
+DEFAULT_LARGE_CANOE_COUNT = 5000
+CANOES_PER_ORDER = 2
+VIEW_PATHS = ("/", "/admin")
+
+
+def add_paid_orders(canoe_count: int) -> None:
+    """Store paid two-canoe orders with batched core inserts."""
+
+    active_event = Event.query.filter_by(is_active=True).one()
+    first_order_id = (db.session.query(db.func.max(BookingOrder.id)).scalar() or 0) + 1
+    order_count = canoe_count // CANOES_PER_ORDER
+    created_at = get_current_utc_time()
+
+    db.session.execute(
+        BookingOrder.__table__.insert(),
+        [
+            {
+                "id": order_id,
+                "event_id": active_event.id,
+                "public_booking_reference": f"PAD-MEASURE-{order_id:06d}",
+                "status": "paid",
+                "canoe_count": CANOES_PER_ORDER,
+                "total_amount": 2400,
+                "currency": "sek",
+                "payment_provider": "stripe_checkout",
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+            for order_id in range(first_order_id, first_order_id + order_count)
+        ],
+    )
+    db.session.execute(
+        BookedCanoe.__table__.insert(),
+        [
+            {
+                "booking_order_id": order_id,
+                "participant_first_name": f"Deltagare{order_id}",
+                "participant_last_name": f"Kanot{canoe_number}",
+                "status": "confirmed",
+                "picked_up": False,
+                "created_at": created_at,
+            }
+            for order_id in range(first_order_id, first_order_id + order_count)
+            for canoe_number in range(CANOES_PER_ORDER)
+        ],
+    )
+    bump_event_booking_version(active_event.id)
+    db.session.commit()
+
+
+def measure_views(test_client) -> dict[str, tuple[int, float]]:
+    """Return the query count and render time in milliseconds per view."""
+
+    view_measurements = {}
+    for view_path in VIEW_PATHS:
+        started_at = time.perf_counter()
+        with count_queries() as query_metrics:
+            response = test_client.get(view_path)
+        elapsed_milliseconds = (time.perf_counter() - started_at) * 1000
+        if response.status_code != 200:
+            raise RuntimeError(f"{view_path} answered {response.status_code}.")
+        view_measurements[view_path] = (query_metrics.query_count, elapsed_milliseconds)
+    return view_measurements
+
+
+def main() -> int:
+    """Measure both views at a small and a large booking count."""
+
+    large_canoe_count = (
+        int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_LARGE_CANOE_COUNT
+    )
+    flask_application = create_app()
+    flask_application.config.update(
+        TESTING=True,
+        WTF_CSRF_ENABLED=False,
+        PUBLIC_SITE_PASSWORD_HASH=generate_password_hash("measure"),
+        RATELIMIT_ENABLED=False,
+        # Large test lists are meant to be large; skip the slow-request log.
+        SLOW_REQUEST_QUERY_COUNT=0,
+        SLOW_REQUEST_QUERY_MILLISECONDS=0,
+    )
+
+    with flask_application.app_context():
+        db.create_all()
+        create_or_update_active_event_from_config()
+        admin_user = User(username="measure")
+        admin_user.set_password("measure")
+        db.session.add(admin_user)
+        db.session.commit()
+
+        test_client = flask_application.test_client()
+        test_client.post("/unlock", data={"password": "measure"})
+        test_client.post("/login", data={"username": "measure", "password": "measure"})
+
+        add_paid_orders(SMALL_CANOE_COUNT)
+        small_measurements = measure_views(test_client)
+        add_paid_orders(large_canoe_count - SMALL_CANOE_COUNT)
+        large_measurements = measure_views(test_client)
+        # Nothing changed since the last render, so the cached overview is used.
+        cached_measurements = measure_views(test_client)
+
+    print(f"{'View':<10}{'Canoes':>8}{'Queries':>10}{'Time (ms)':>12}")
+    for view_path in VIEW_PATHS:
+        for canoe_count, view_measurements in (
+            (SMALL_CANOE_COUNT, small_measurements),
+            (large_canoe_count, large_measurements),
+        ):
+            query_count, elapsed_milliseconds = view_measurements[view_path]
+            print(
+                f"{view_path:<10}{canoe_count:>8}{query_count:>10}"
+                f"{elapsed_milliseconds:>12.1f}"
+            )
+    cached_query_count, cached_milliseconds = cached_measurements["/"]
+    print(
+        f"{'/ (cached)':<10}{large_canoe_count:>8}{cached_query_count:>10}"
+        f"{cached_milliseconds:>12.1f}"
+    )
+
+    query_counts_match = all(
+        small_measurements[view_path][0] == large_measurements[view_path][0]
+        for view_path in VIEW_PATHS
+    )
+    print(
+        "Query counts are constant."
+        if query_counts_match
+        else "Query counts grew with the booking count."
+    )
+    return 0 if query_counts_match else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,9 @@ File: static/js/admin_dashboard.js
 What it does:
   - Opens and closes the admin booking and event panels.
   - Restores the requested panel after a server-side redirect.
+  - Loads, searches, and sorts the bookings list one page at a time.
+  - Saves checklist ticks in small batches without reloading the page.
+  - Shows ticks saved on other volunteers' devices through a long-poll feed.
 
 Why it is separate:
   - Keeps the admin interaction logic away from the public-site scripts.
@@ -126,6 +129,210 @@ document.addEventListener("DOMContentLoaded", () => {
     });
   });
 
+  // Checklist ticks are collected for a short moment and then sent together,
+  // so several quick ticks become one small request instead of one form post
+  // with the whole list each time.
+  const checklistForm = document.querySelector("[data-checklist-api-url]");
+  const checklistSaveStatus = checklistForm?.querySelector(
+    "[data-checklist-save-status]"
+  );
+  const checklistBatchDelayMs = 400;
+  const pendingChecklistChanges = new Map();
+  let inFlightChecklistChanges = new Map();
+  let checklistFlushTimer = null;
+  let isSavingChecklist = false;
+
+  function setChecklistSaveStatus(message) {
+    if (checklistSaveStatus) {
+      checklistSaveStatus.textContent = message;
+    }
+  }
+
+  function applyChecklistRowCounts(rowCounts) {
+    const checklistRows = checklistForm.querySelectorAll("[data-checklist-row-name]");
+    rowCounts.forEach((rowCount) => {
+      checklistRows.forEach((checklistRow) => {
+        if (checklistRow.dataset.checklistRowName !== rowCount.name) {
+          return;
+        }
+
+        const countElement = checklistRow.querySelector("[data-checklist-row-count]");
+        if (countElement) {
+          countElement.textContent =
+            `${rowCount.picked_up_count}/${rowCount.total_canoes} kanoter avprickade`;
+        }
+        checklistRow.classList.toggle(
+          "admin-checklist-row--complete",
+          rowCount.total_canoes > 0 &&
+            rowCount.picked_up_count === rowCount.total_canoes
+        );
+      });
+    });
+  }
+
+  function scheduleChecklistFlush() {
+    window.clearTimeout(checklistFlushTimer);
+    checklistFlushTimer = window.setTimeout(flushChecklistChanges, checklistBatchDelayMs);
+  }
+
+  async function flushChecklistChanges() {
+    if (isSavingChecklist || pendingChecklistChanges.size === 0) {
+      return;
+    }
+
+    const sentChanges = new Map(pendingChecklistChanges);
+    inFlightChecklistChanges = sentChanges;
+    pendingChecklistChanges.clear();
+    isSavingChecklist = true;
+    let saveSucceeded = false;
+    setChecklistSaveStatus("Sparar...");
+
+    try {
+      const response = await fetch(checklistForm.dataset.checklistApiUrl, {
+        method: "POST",
+        headers: {
+          Accept: "application/json",
+          "Content-Type": "application/json",
+          "X-CSRFToken": checklistForm.querySelector('[name="csrf_token"]').value,
+        },
+        credentials: "same-origin",
+        body: JSON.stringify({
+          changes: Array.from(sentChanges, ([bookingId, pickedUp]) => ({
+            id: Number(bookingId),
+            picked_up: pickedUp,
+          })),
+        }),
+      });
+      const payload = await response.json();
+      if (!response.ok) {
+        throw new Error(payload.error || "Checklistan kunde inte sparas.");
+      }
+
+      applyChecklistRowCounts(payload.rows || []);
+      setChecklistSaveStatus("Sparat.");
+      saveSucceeded = true;
+    } catch (error) {
+      // Keep the failed ticks unless a newer tick replaced them, and let the
+      // next tick (or the save button) try again.
+      sentChanges.forEach((pickedUp, bookingId) => {
+        if (!pendingChecklistChanges.has(bookingId)) {
+          pendingChecklistChanges.set(bookingId, pickedUp);
+        }
+      });
+      setChecklistSaveStatus(
+        error.message || "Checklistan kunde inte sparas. Försök igen."
+      );
+    } finally {
+      isSavingChecklist = false;
+      inFlightChecklistChanges = new Map();
+      // Ticks made while this request was running are sent next.
+      if (saveSucceeded && pendingChecklistChanges.size > 0) {
+        scheduleChecklistFlush();
+      }
+    }
+  }
+
+  // The live feed asks the server for checklist changes newer than the
+  // version this page shows. The server answers at once, with an empty 304
+  // while nothing changed, so open checklists never hold a server thread.
+  const checklistPanel = document.getElementById("checklistPanel");
+  const checklistBookingVersion = Number(
+    checklistForm?.dataset.checklistBookingVersion || 0
+  );
+  const checklistFeedPollDelayMs = 3000;
+  const checklistFeedIdleDelayMs = 1000;
+  const checklistFeedRetryDelayMs = 5000;
+  let checklistVersion = Number(checklistForm?.dataset.checklistVersion || 0);
+  let checklistFeedEtag = "";
+
+  function applyChecklistDeltas(changes) {
+    changes.forEach((change) => {
+      const bookingId = String(change.id);
+      // Local ticks that are not saved yet win over older server states.
+      if (
+        pendingChecklistChanges.has(bookingId) ||
+        inFlightChecklistChanges.has(bookingId)
+      ) {
+        return;
+      }
+
+      document
+        .querySelectorAll(`[data-booking-checkbox-id="${bookingId}"]`)
+        .forEach((matchingCheckbox) => {
+          matchingCheckbox.checked = change.picked_up;
+          matchingCheckbox
+            .closest(".admin-checklist-detail-row")
+            ?.classList.toggle("admin-checklist-detail-row--complete", change.picked_up);
+        });
+    });
+  }
+
+  function isChecklistVisible() {
+    return !document.hidden && Boolean(checklistPanel) && !checklistPanel.hidden;
+  }
+
+  async function pollChecklistChanges() {
+    // Only poll while someone is looking at the checklist. The first request
+    // after reopening catches up on everything missed.
+    if (!isChecklistVisible()) {
+      window.setTimeout(pollChecklistChanges, checklistFeedIdleDelayMs);
+      return;
+    }
+
+    try {
+      const feedUrl = new URL(
+        checklistForm.dataset.checklistChangesUrl,
+        window.location.origin
+      );
+      feedUrl.searchParams.set("since", String(checklistVersion));
+      const feedHeaders = { Accept: "application/json" };
+      if (checklistFeedEtag) {
+        feedHeaders["If-None-Match"] = checklistFeedEtag;
+      }
+      const response = await fetch(feedUrl, {
+        headers: feedHeaders,
+        credentials: "same-origin",
+        cache: "no-store",
+      });
+      if (response.status !== 304) {
+        if (!response.ok) {
+          throw new Error(`Unexpected status ${response.status}`);
+        }
+
+        const payload = await response.json();
+        applyChecklistDeltas(payload.changes || []);
+        applyChecklistRowCounts(payload.rows || []);
+        checklistVersion = payload.version;
+        checklistFeedEtag = response.headers.get("ETag") || "";
+        if (payload.booking_version !== checklistBookingVersion) {
+          setChecklistSaveStatus(
+            "Bokningarna har ändrats. Ladda om sidan för att se alla kanoter."
+          );
+        }
+      }
+      window.setTimeout(pollChecklistChanges, checklistFeedPollDelayMs);
+    } catch (error) {
+      // Flaky mobile connections are expected at the river; try again soon.
+      window.setTimeout(pollChecklistChanges, checklistFeedRetryDelayMs);
+    }
+  }
+
+  if (checklistForm) {
+    pollChecklistChanges();
+
+    groupedChecklistCheckboxes.forEach((checkboxElement) => {
+      checkboxElement.addEventListener("change", () => {
+        const bookingId = checkboxElement.getAttribute("data-booking-checkbox-id");
+        if (!bookingId) {
+          return;
+        }
+
+        pendingChecklistChanges.set(bookingId, checkboxElement.checked);
+        scheduleChecklistFlush();
+      });
+    });
+  }
+
   function setupAdminBookingEditor(bookingEditor) {
     const secondRiderSection = bookingEditor.querySelector(
       '[data-admin-rider-section="2"]'
@@ -240,6 +447,139 @@ document.addEventListener("DOMContentLoaded", () => {
     .querySelectorAll(".admin-booking-editor")
     .forEach((bookingEditor) => setupAdminBookingEditor(bookingEditor));
 
+  // The bookings list is loaded one page at a time from a JSON endpoint, so
+  // the dashboard stays quick on phones however many bookings there are.
+  // Each page ends with a cursor that the "show more" button sends back.
+  const bookingsList = document.querySelector("[data-admin-bookings-list]");
+  const bookingCardTemplate = document.getElementById("adminBookingCardTemplate");
+  const bookingsSearchInput = document.querySelector("[data-admin-bookings-search]");
+  const bookingsSortSelect = document.querySelector("[data-admin-bookings-sort]");
+  const bookingsEmptyState = document.querySelector("[data-admin-bookings-empty]");
+  const bookingsMoreButton = document.querySelector("[data-admin-bookings-more]");
+  const bookingsSearchDelayMs = 300;
+  let bookingsNextCursor = null;
+  let bookingsRequestNumber = 0;
+  let bookingsSearchTimer = null;
+
+  function fillBookingCard(booking) {
+    const bookingCard = bookingCardTemplate.content.firstElementChild.cloneNode(true);
+    const updateForm = bookingCard.querySelector("[data-admin-booking-update-form]");
+    const deleteForm = bookingCard.querySelector("[data-admin-booking-delete-form]");
+    const saveButton = bookingCard.querySelector(".admin-booking-save-button");
+
+    bookingCard.querySelectorAll("[data-booking-field]").forEach((fieldElement) => {
+      fieldElement.textContent = String(booking[fieldElement.dataset.bookingField]);
+    });
+    updateForm.id = `adminEditBooking${booking.id}`;
+    updateForm.action = booking.update_url;
+    saveButton.setAttribute("form", updateForm.id);
+    deleteForm.action = booking.delete_url;
+    deleteForm.addEventListener("submit", (event) => {
+      if (!window.confirm(`Ta bort bokning #${booking.id}?`)) {
+        event.preventDefault();
+      }
+    });
+
+    [
+      "participant_first_name",
+      "participant_last_name",
+      "passenger_two_first_name",
+      "passenger_two_last_name",
+      "passenger_three_first_name",
+      "passenger_three_last_name",
+    ].forEach((fieldName) => {
+      updateForm.elements[fieldName].value = booking[fieldName] || "";
+    });
+    const hasThirdRider = Boolean(
+      booking.passenger_three_first_name || booking.passenger_three_last_name
+    );
+    const hasSecondRider = Boolean(
+      booking.passenger_two_first_name ||
+        booking.passenger_two_last_name ||
+        hasThirdRider
+    );
+    updateForm.querySelector('[data-admin-rider-section="2"]').hidden = !hasSecondRider;
+    updateForm.querySelector('[data-admin-rider-section="3"]').hidden = !hasThirdRider;
+    setupAdminBookingEditor(updateForm);
+    return bookingCard;
+  }
+
+  async function loadBookingsPage({ append }) {
+    const requestNumber = ++bookingsRequestNumber;
+    const [sort, direction] = bookingsSortSelect.value.split(":");
+    const pageUrl = new URL(
+      bookingsList.dataset.adminBookingsUrl,
+      window.location.origin
+    );
+    pageUrl.searchParams.set("sort", sort);
+    pageUrl.searchParams.set("direction", direction);
+    if (bookingsSearchInput.value.trim()) {
+      pageUrl.searchParams.set("q", bookingsSearchInput.value.trim());
+    }
+    if (append && bookingsNextCursor) {
+      pageUrl.searchParams.set("cursor", bookingsNextCursor);
+    }
+
+    bookingsMoreButton.disabled = true;
+    try {
+      const response = await fetch(pageUrl, {
+        headers: {
+          Accept: "application/json",
+        },
+        credentials: "same-origin",
+      });
+      if (!response.ok) {
+        throw new Error(`Unexpected status ${response.status}`);
+      }
+
+      const payload = await response.json();
+      // A newer search or sort was started while this page was loading.
+      if (requestNumber !== bookingsRequestNumber) {
+        return;
+      }
+
+      if (!append) {
+        bookingsList.replaceChildren();
+      }
+      payload.bookings.forEach((booking) => {
+        bookingsList.appendChild(fillBookingCard(booking));
+      });
+      bookingsNextCursor = payload.next_cursor;
+      bookingsMoreButton.hidden = !bookingsNextCursor;
+
+      const listIsEmpty = bookingsList.childElementCount === 0;
+      bookingsEmptyState.hidden = !listIsEmpty;
+      bookingsEmptyState.textContent = bookingsSearchInput.value.trim()
+        ? bookingsEmptyState.dataset.noMatchText
+        : bookingsEmptyState.dataset.emptyText;
+    } catch (error) {
+      if (requestNumber === bookingsRequestNumber) {
+        bookingsEmptyState.hidden = false;
+        bookingsEmptyState.textContent =
+          "Bokningarna kunde inte hämtas. Försök igen om en stund.";
+      }
+    } finally {
+      bookingsMoreButton.disabled = false;
+    }
+  }
+
+  if (bookingsList && bookingCardTemplate) {
+    loadBookingsPage({ append: false });
+
+    bookingsSearchInput.addEventListener("input", () => {
+      window.clearTimeout(bookingsSearchTimer);
+      bookingsSearchTimer = window.setTimeout(() => {
+        loadBookingsPage({ append: false });
+      }, bookingsSearchDelayMs);
+    });
+    bookingsSortSelect.addEventListener("change", () => {
+      loadBookingsPage({ append: false });
+    });
+    bookingsMoreButton.addEventListener("click", () => {
+      loadBookingsPage({ append: true });
+    });
+  }
+
   panelOverlays.forEach((panelOverlay) => {
     panelOverlay.addEventListener("click", (event) => {
       if (event.target === panelOverlay) {
@@ -121,6 +121,25 @@
     };
   }
 
+  /**
+   * Create a random key that identifies one reservation attempt.
+   *
+   * The server stores it on the booking order. If the same request is sent
+   * twice (double-click or a retry after a network error), the server finds
+   * the first order and returns it instead of reserving the canoes again.
+   */
+  function buildCheckoutIdempotencyKey() {
+    if (window.crypto && typeof window.crypto.randomUUID === "function") {
+      return window.crypto.randomUUID();
+    }
+
+    const randomBytes = new Uint8Array(16);
+    window.crypto.getRandomValues(randomBytes);
+    return Array.from(randomBytes, (randomByte) =>
+      randomByte.toString(16).padStart(2, "0")
+    ).join("");
+  }
+
   /**
    * Register the booking modal and participant field generation.
    */
@@ -208,6 +227,7 @@
     let selectedCanoeCount = 0;
     let countdownIntervalId = 0;
     let isSubmittingReservation = false;
+    let checkoutIdempotencyKey = "";
 
     function hasActivePendingBooking() {
       return Boolean(
@@ -773,6 +793,7 @@
       selectedCanoeCount = 0;
       pendingBooking = null;
       isSubmittingReservation = false;
+      checkoutIdempotencyKey = "";
       formElement.reset();
       canoeCountInput.value = "";
       nameFieldsContainer.innerHTML = "";
@@ -843,6 +864,9 @@
         }
 
         currentBookingStep = 2;
+        // Each visit to Step 2 is a new reservation attempt. Retries from
+        // this step reuse the key so they cannot create a second hold.
+        checkoutIdempotencyKey = buildCheckoutIdempotencyKey();
         updateBookingSummary();
         updateStepVisibility();
 
@@ -858,10 +882,19 @@
         submitButton.disabled = true;
         submitButton.textContent = "Reserverar...";
 
+        if (!checkoutIdempotencyKey) {
+          checkoutIdempotencyKey = buildCheckoutIdempotencyKey();
+        }
+        const reservationFormData = new FormData(formElement);
+        reservationFormData.set(
+          "checkout_idempotency_key",
+          checkoutIdempotencyKey
+        );
+
         window
           .fetch(formElement.action, {
             method: "POST",
-            body: new FormData(formElement),
+            body: reservationFormData,
             headers: {
               "X-Requested-With": "XMLHttpRequest",
             },
@@ -2,7 +2,10 @@
  * File: static/js/payment_return.js
  *
  * What it does:
- *   - Polls the local booking state after Stripe redirects back.
+ *   - Long-polls the local booking state after Stripe redirects back. The
+ *     server holds each request open until the webhook confirms the booking
+ *     or the wait runs out, so the page usually updates right away. When the
+ *     server has no free waiting slot it answers at once and the page polls.
  *   - Redirects to the final confirmed success page only after the local
  *     booking is marked as paid by the verified webhook.
  *
@@ -35,7 +38,12 @@
   let isFinished = false;
   let timedOut = false;
   const pollIntervalMs = 1500;
+  // After a long-poll answers "pending" the server has already waited, so
+  // the next request can start almost immediately.
+  const longPollRepeatDelayMs = 100;
+  const longPollMaxSeconds = 25;
   const timeoutMs = 45000;
+  const pollingStartedAt = Date.now();
 
   function showPrimaryLink(label, url) {
     if (!primaryLinkElement) {
@@ -100,13 +108,29 @@
     return `${paymentStatusUrl}${separator}finalize_failed=1`;
   }
 
+  function getLongPollWaitSeconds() {
+    // Stop waiting a second before the overall timeout so the reconciliation
+    // fallback below is never delayed by an open request.
+    const remainingSeconds = Math.floor(
+      (timeoutMs - (Date.now() - pollingStartedAt)) / 1000
+    );
+    return Math.max(0, Math.min(longPollMaxSeconds, remainingSeconds - 1));
+  }
+
+  function buildLongPollUrl(waitSeconds) {
+    const separator = paymentStatusUrl.includes("?") ? "&" : "?";
+    return `${paymentStatusUrl}${separator}wait=${waitSeconds}`;
+  }
+
   async function pollBookingStatus() {
     if (isFinished || timedOut) {
       return;
     }
 
+    const waitSeconds = getLongPollWaitSeconds();
+    const requestStartedAt = Date.now();
     try {
-      const response = await fetch(paymentStatusUrl, {
+      const response = await fetch(buildLongPollUrl(waitSeconds), {
         headers: {
           Accept: "application/json",
         },
@@ -134,7 +158,14 @@
       }
 
       if (bookingStatus === "pending") {
-        window.setTimeout(pollBookingStatus, pollIntervalMs);
+        // A quick "pending" means the server did not hold the request (its
+        // waiting slots were taken), so fall back to plain polling.
+        const serverWaited =
+          waitSeconds > 0 && Date.now() - requestStartedAt >= pollIntervalMs;
+        window.setTimeout(
+          pollBookingStatus,
+          serverWaited ? longPollRepeatDelayMs : pollIntervalMs
+        );
         return;
       }
 
@@ -5,6 +5,8 @@
  *   - Controls the homepage weather widget.
  *   - Shows either a countdown until the forecast is available or the
  *     forecast itself when the backend can return it.
+ *   - Loads the event day and the days around it in one batch request and
+ *     renders them as a small multi-day strip.
  *
  * Why it is here:
  *   - Keeping weather logic in its own file makes the public JavaScript
@@ -19,6 +21,8 @@
   );
   const forecastDaysBeforeEvent =
     eventSettings.weather_forecast_days_before_event || 7;
+  // Days relative to the event shown in the strip (day before, event, after).
+  const forecastStripDayOffsets = [-1, 0, 1];
 
   /**
    * Write the returned forecast data into the weather widget.
@@ -59,18 +63,83 @@
   }
 
   /**
-   * Fetch the weather forecast from the backend for the configured event date.
+   * Return the event date moved by a number of days as ``YYYY-MM-DD``.
+   *
+   * Args:
+   *   dayOffset: Number of days to move from the event date.
+   */
+  function getOffsetDateString(dayOffset) {
+    const millisecondsPerDay = 1000 * 60 * 60 * 24;
+    const offsetDate = new Date(eventDate.getTime() + dayOffset * millisecondsPerDay);
+    return offsetDate.toISOString().split("T")[0];
+  }
+
+  /**
+   * Render the days around the event as a compact forecast strip.
+   *
+   * Args:
+   *   forecastsByDate: Forecast data keyed by ``YYYY-MM-DD`` date. Dates the
+   *     backend could not cover are ``null`` and are skipped.
+   */
+  function updateForecastStrip(forecastsByDate) {
+    const forecastStripElement = document.getElementById("weatherForecastStrip");
+    if (!forecastStripElement) {
+      return;
+    }
+
+    forecastStripElement.replaceChildren();
+    forecastStripDayOffsets.forEach((dayOffset) => {
+      const dateString = getOffsetDateString(dayOffset);
+      const forecastData = forecastsByDate[dateString];
+      if (!forecastData) {
+        return;
+      }
+
+      const stripItemElement = document.createElement("li");
+      stripItemElement.className = "widget-forecast-strip-day";
+      if (dayOffset === 0) {
+        stripItemElement.classList.add("is-event-day");
+      }
+
+      const dayLabelElement = document.createElement("span");
+      dayLabelElement.className = "widget-forecast-strip-label";
+      dayLabelElement.textContent = new Date(
+        `${dateString}T12:00:00Z`
+      ).toLocaleDateString("sv-SE", { weekday: "short", day: "numeric" });
+
+      const dayValueElement = document.createElement("span");
+      dayValueElement.textContent =
+        `${forecastData.icon} ${forecastData.temperature} °C`;
+
+      stripItemElement.append(dayLabelElement, dayValueElement);
+      forecastStripElement.append(stripItemElement);
+    });
+
+    forecastStripElement.hidden = forecastStripElement.childElementCount < 2;
+  }
+
+  /**
+   * Fetch the forecasts for the event day and its neighbours in one request.
    */
   async function fetchWeatherForecast() {
-    const formattedDate = eventDate.toISOString().split("T")[0];
-    const response = await fetch(`/api/forecast?date=${formattedDate}`);
-    const forecastData = await response.json();
+    const formattedDate = getOffsetDateString(0);
+    const stripDates = forecastStripDayOffsets.map(getOffsetDateString);
+    const response = await fetch(
+      `/api/forecast/batch?dates=${stripDates.join(",")}`
+    );
+    const forecastBatch = await response.json();
+
+    if (forecastBatch.error) {
+      throw new Error(forecastBatch.error);
+    }
 
-    if (forecastData.error) {
-      throw new Error(forecastData.error);
+    const eventDayForecast = forecastBatch.forecasts[formattedDate];
+    if (!eventDayForecast) {
+      throw new Error("No forecast available for the event date.");
     }
 
-    updateWeatherWidget(forecastData);
+    updateWeatherWidget(eventDayForecast);
+    updateForecastStrip(forecastBatch.forecasts);
   }
 
   /**
@@ -1,14 +1,16 @@
 """Common pytest fixtures for the Paddlingen test suite."""
 
-from datetime import datetime, timedelta, timezone
+import os
 import sys
+from contextlib import contextmanager
+from datetime import UTC, datetime, timedelta
 
 import pytest
-import os
 from werkzeug.security import generate_password_hash
 
-from app import create_app, db, User
+from app import User, create_app, db
 from app.util.event_settings import create_or_update_active_event_from_config
+from app.util.query_metrics import count_queries
 
 # Ensure the instance directory exists so the app's SQLite database can be created
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -35,7 +37,7 @@ class FakeStripeCheckoutSession:
         self.payment_status = payment_status
         self.status = status
         self.expires_at = expires_at or int(
-            (datetime.now(timezone.utc) + timedelta(minutes=30)).timestamp()
+            (datetime.now(UTC) + timedelta(minutes=30)).timestamp()
         )
 
 
@@ -54,6 +56,8 @@ def client():
     """
 
     os.environ["DATABASE_URL"] = "sqlite:///:memory:"
+    # Tests drain the webhook inbox themselves instead of in a worker thread.
+    os.environ["STRIPE_WEBHOOK_INBOX_WORKER_ENABLED"] = "False"
     # The config module reads environment variables at import time. When tests
     # run in one shared process, removing the cached module keeps each app
     # instance aligned with the environment values set in this fixture.
@@ -69,6 +73,8 @@ def client():
         STRIPE_WEBHOOK_SECRET="whsec_test_123",
         STRIPE_PUBLIC_BASE_URL="http://127.0.0.1:5000",
         STRIPE_CHECKOUT_PRODUCT_ID="",
+        CHECKOUT_SESSION_CREATE_INLINE=True,
+        STRIPE_WEBHOOK_INBOX_WORKER_ENABLED=False,
     )
     with flask_application.app_context():
         db.drop_all()
@@ -87,11 +93,12 @@ def fake_stripe_checkout(monkeypatch):
     """Replace Stripe Checkout API calls with a predictable local fake."""
 
     from app import routes
+    from app.util import checkout_session_worker
 
     fake_checkout_session = FakeStripeCheckoutSession()
 
     monkeypatch.setattr(
-        routes,
+        checkout_session_worker,
         "create_stripe_checkout_session",
         lambda **_: fake_checkout_session,
     )
@@ -112,3 +119,27 @@ def fake_stripe_checkout(monkeypatch):
             url=None,
         ),
     )
+
+
+@pytest.fixture
+def query_budget():
+    """Fail a test when a block of code runs more SQL queries than allowed.
+
+    Usage::
+
+        with query_budget(5):
+            client.get("/")
+
+    Yields:
+        Callable: Context manager factory taking the maximum query count.
+    """
+
+    @contextmanager
+    def assert_query_budget(max_queries: int):
+        with count_queries() as query_metrics:
+            yield query_metrics
+        assert query_metrics.query_count <= max_queries, (
+            f"Ran {query_metrics.query_count} SQL queries, " f"budget is {max_queries}."
+        )
+
+    return assert_query_budget
@@ -1,9 +1,28 @@
 """Tests for CRUD operations in the admin interface."""
 
 from html import unescape
+import base64
+import csv
 from datetime import date
+import io
+import json
+from xml.etree import ElementTree
+import zipfile
 
 from app import BookedCanoe, BookingOrder, Event, db
+from app.routes import finish_checklist_update, set_checklist_picked_up
+from app.util.event_archive import archive_event_bookings
+from app.util.event_booking_stats import (
+    count_event_booking_totals,
+    get_event_booking_stats,
+    rebuild_event_booking_stats,
+)
+from app.util.event_settings import (
+    apply_event_template_values,
+    build_event_template_values,
+    claim_next_checklist_version,
+)
+from app.util.stripe_helpers import get_checkout_product_image_cache
 
 
 def unlock_public_site(client):
@@ -85,7 +104,10 @@ def test_admin_crud_flow(client):
     assert booking.passenger_two_last_name == "Berg"
     assert booking.passenger_three_first_name == "Clara"
     assert booking.passenger_three_last_name == "Carlsson"
-    assert response.get_data(as_text=True).count(f"/admin/update/{booking.id}") == 1
+    bookings_page = client.get("/admin/api/bookings").get_json()
+    assert [row["update_url"] for row in bookings_page["bookings"]] == [
+        f"/admin/update/{booking.id}"
+    ]
 
     # Update the booking
     response = client.post(
@@ -286,6 +308,59 @@ def test_admin_can_create_update_and_activate_events(client):
     assert refreshed_original_event.is_active is False
 
 
+def test_admin_shows_archived_event_bookings_read_only(client):
+    """List an archived event's bookings and refuse to activate the event."""
+
+    login(client)
+    active_event = Event.query.filter_by(is_active=True).one()
+    past_event = Event(event_date=date(2025, 3, 21), is_active=False)
+    apply_event_template_values(past_event, build_event_template_values(active_event))
+    db.session.add(past_event)
+    db.session.flush()
+    past_order = BookingOrder(
+        event_id=past_event.id,
+        public_booking_reference="PAD-2025-00001",
+        status="paid",
+        canoe_count=1,
+        total_amount=1200,
+        currency="sek",
+        payment_provider="admin_manual_swish",
+    )
+    db.session.add(past_order)
+    db.session.flush()
+    db.session.add(
+        BookedCanoe(
+            booking_order_id=past_order.id,
+            participant_first_name="Arkiv",
+            participant_last_name="Paddlare",
+            passenger_two_first_name="Bo",
+            passenger_two_last_name="Berg",
+            status="confirmed",
+            picked_up=True,
+        )
+    )
+    db.session.commit()
+    archive_event_bookings(past_event)
+    past_event_id, active_event_id = past_event.id, active_event.id
+
+    dashboard_html = unescape(
+        client.get(f"/admin?panel=events&event_id={past_event_id}").get_data(
+            as_text=True
+        )
+    )
+    assert "Arkiverade bokningar" in dashboard_html
+    assert "PAD-2025-00001" in dashboard_html
+    assert "Arkiv Paddlare & Bo Berg" in dashboard_html
+    assert "Manuell: Swish" in dashboard_html
+
+    activate_response = client.post(
+        f"/admin/events/activate/{past_event_id}", follow_redirects=True
+    )
+    assert "Eventet är arkiverat" in unescape(activate_response.get_data(as_text=True))
+    assert db.session.get(Event, past_event_id).is_active is False
+    assert db.session.get(Event, active_event_id).is_active is True
+
+
 def test_admin_can_create_first_event_from_code_template_when_db_is_empty(client):
     """Allow the admin dashboard to create the first event without a source row."""
 
@@ -364,6 +439,11 @@ def test_admin_checklist_persists_partial_pickup_status_and_sorts_checked_first(
     partial_response = client.post(
         "/admin/checklist",
         data={
+            "checklist_booking_ids": [
+                str(first_canoe_id),
+                str(second_canoe_id),
+                str(third_canoe_id),
+            ],
             "picked_up_booking_ids": [str(first_canoe_id), str(second_canoe_id)],
         },
         follow_redirects=True,
@@ -390,6 +470,11 @@ def test_admin_checklist_persists_partial_pickup_status_and_sorts_checked_first(
     complete_response = client.post(
         "/admin/checklist",
         data={
+            "checklist_booking_ids": [
+                str(first_canoe_id),
+                str(second_canoe_id),
+                str(third_canoe_id),
+            ],
             "picked_up_booking_ids": [
                 str(first_canoe_id),
                 str(second_canoe_id),
@@ -402,3 +487,511 @@ def test_admin_checklist_persists_partial_pickup_status_and_sorts_checked_first(
     complete_page = complete_response.get_data(as_text=True)
     assert "3/3 kanoter avprickade" in complete_page
     assert "admin-checklist-row--complete" in complete_page
+
+
+def test_admin_checklist_pages_by_pickup_person(client, monkeypatch):
+    """Show one page of pickup people and save only the canoes on that page."""
+
+    monkeypatch.setattr("app.util.booking_groups.ADMIN_CHECKLIST_PAGE_SIZE", 1)
+    login(client)
+
+    active_event = Event.query.filter_by(is_active=True).first()
+    assert active_event is not None
+    booking_order = BookingOrder(
+        event_id=active_event.id,
+        public_booking_reference="PAD-TEST-PAGES",
+        status="paid",
+        canoe_count=2,
+        total_amount=2400,
+        currency="sek",
+        payment_provider="simulated",
+    )
+    db.session.add(booking_order)
+    db.session.flush()
+    first_page_canoe = BookedCanoe(
+        booking_order_id=booking_order.id,
+        participant_first_name="Klara",
+        participant_last_name="Karlsson",
+        status="confirmed",
+    )
+    second_page_canoe = BookedCanoe(
+        booking_order_id=booking_order.id,
+        participant_first_name="Olle",
+        participant_last_name="Olsson",
+        status="confirmed",
+        picked_up=True,
+    )
+    db.session.add_all([first_page_canoe, second_page_canoe])
+    rebuild_event_booking_stats(active_event.id)
+    db.session.commit()
+    active_event_id = active_event.id
+    first_page_canoe_id = first_page_canoe.id
+    second_page_canoe_id = second_page_canoe.id
+
+    first_page = client.get("/admin?panel=checklist").get_data(as_text=True)
+    assert 'data-checklist-row-name="Klara Karlsson"' in first_page
+    assert 'data-checklist-row-name="Olle Olsson"' not in first_page
+    assert "Sida 1 av 2" in first_page
+
+    second_page = client.get("/admin?panel=checklist&checklist_page=2").get_data(
+        as_text=True
+    )
+    assert 'data-checklist-row-name="Olle Olsson"' in second_page
+    assert "Sida 2 av 2" in second_page
+    assert "Sida 2 av 2" in client.get("/admin?checklist_page=9").get_data(as_text=True)
+
+    # Saving the first page must not untick the canoe shown on the second.
+    save_response = client.post(
+        "/admin/checklist",
+        data={
+            "checklist_page": "1",
+            "checklist_booking_ids": [str(first_page_canoe_id)],
+            "picked_up_booking_ids": [str(first_page_canoe_id)],
+        },
+    )
+    assert save_response.status_code == 302
+    assert "checklist_page=1" in save_response.headers["Location"]
+
+    db.session.expire_all()
+    assert db.session.get(BookedCanoe, first_page_canoe_id).picked_up is True
+    assert db.session.get(BookedCanoe, second_page_canoe_id).picked_up is True
+    assert get_event_booking_stats(active_event_id).picked_up_count == 2
+
+
+def test_admin_checklist_api_updates_only_changed_canoes(client, query_budget):
+    """Apply batched checklist ticks and return fresh counts per changed row."""
+
+    login(client)
+
+    active_event = Event.query.filter_by(is_active=True).first()
+    booking_order = BookingOrder(
+        event_id=active_event.id,
+        public_booking_reference="PAD-TEST-CHECKLIST-API",
+        status="paid",
+        canoe_count=3,
+        total_amount=3600,
+        currency="sek",
+        payment_provider="simulated",
+    )
+    db.session.add(booking_order)
+    db.session.flush()
+    klara_canoes = [
+        BookedCanoe(
+            booking_order_id=booking_order.id,
+            participant_first_name="Klara",
+            participant_last_name="Karlsson",
+            status="confirmed",
+        )
+        for _ in range(2)
+    ]
+    other_canoe = BookedCanoe(
+        booking_order_id=booking_order.id,
+        participant_first_name="Olle",
+        participant_last_name="Olsson",
+        status="confirmed",
+        picked_up=True,
+    )
+    db.session.add_all([*klara_canoes, other_canoe])
+    # Rows inserted directly skip the running totals, so build them once.
+    rebuild_event_booking_stats(active_event.id)
+    db.session.commit()
+    klara_canoe_ids = [booked_canoe.id for booked_canoe in klara_canoes]
+    other_canoe_id = other_canoe.id
+
+    with query_budget(8):
+        response = client.post(
+            "/admin/api/checklist",
+            json={
+                "changes": [
+                    {"id": klara_canoe_ids[0], "picked_up": True},
+                    {"id": 999999, "picked_up": True},
+                ]
+            },
+        )
+
+    assert response.status_code == 200
+    assert response.get_json() == {
+        "updated_count": 1,
+        "rows": [{"name": "Klara Karlsson", "total_canoes": 2, "picked_up_count": 1}],
+    }
+    db.session.expire_all()
+    assert db.session.get(BookedCanoe, klara_canoe_ids[0]).picked_up is True
+    assert db.session.get(BookedCanoe, klara_canoe_ids[1]).picked_up is False
+    assert db.session.get(BookedCanoe, other_canoe_id).picked_up is True
+
+    repeated_response = client.post(
+        "/admin/api/checklist",
+        json={"changes": [{"id": klara_canoe_ids[0], "picked_up": True}]},
+    )
+    assert repeated_response.get_json()["updated_count"] == 0
+
+    invalid_response = client.post(
+        "/admin/api/checklist",
+        json={"changes": [{"id": "abc", "picked_up": True}]},
+    )
+    assert invalid_response.status_code == 400
+    assert invalid_response.get_json() == {
+        "error": "Checklistan innehöll ett ogiltigt boknings-id."
+    }
+
+
+def test_admin_booking_changes_keep_event_booking_stats_in_sync(client):
+    """Adjust the event's running totals on add, tick, and delete."""
+
+    login(client)
+    active_event_id = Event.query.filter_by(is_active=True).one().id
+
+    def assert_stats_match_bookings():
+        db.session.expire_all()
+        event_booking_stats = get_event_booking_stats(active_event_id)
+        stored_totals = {
+            column_name: getattr(event_booking_stats, column_name)
+            for column_name in count_event_booking_totals(active_event_id, False)
+        }
+        assert stored_totals == count_event_booking_totals(active_event_id, False)
+        return event_booking_stats
+
+    for first_name in ("Alice", "Bo"):
+        client.post(
+            "/admin/add",
+            data={
+                "participant_first_name": first_name,
+                "participant_last_name": "Andersson",
+                "manual_payment_method": "swish",
+            },
+        )
+    alice_canoe_id = (
+        BookedCanoe.query.filter_by(participant_first_name="Alice").one().id
+    )
+    client.post(
+        "/admin/api/checklist",
+        json={"changes": [{"id": alice_canoe_id, "picked_up": True}]},
+    )
+
+    event_booking_stats = assert_stats_match_bookings()
+    assert event_booking_stats.confirmed_canoe_count == 2
+    assert event_booking_stats.paid_order_count == 2
+    assert event_booking_stats.manual_order_count == 2
+    assert event_booking_stats.stripe_order_count == 0
+    assert event_booking_stats.picked_up_count == 1
+    assert event_booking_stats.revenue_ore > 0
+
+    client.post(f"/admin/delete/{alice_canoe_id}")
+    event_booking_stats = assert_stats_match_bookings()
+    assert event_booking_stats.confirmed_canoe_count == 1
+    assert event_booking_stats.picked_up_count == 0
+
+    page = client.get(f"/admin?panel=events&event_id={active_event_id}").get_data(
+        as_text=True
+    )
+    assert "Bokningsstatistik" in page
+    assert f"{event_booking_stats.revenue_sek} kr" in page
+
+
+def add_confirmed_canoes(event_id, riders):
+    """Store one paid order per ``(first name, last name)`` rider pair."""
+
+    for rider_number, (first_name, last_name) in enumerate(riders, start=1):
+        booking_order = BookingOrder(
+            event_id=event_id,
+            public_booking_reference=f"PAD-LIST-{rider_number:03d}",
+            status="paid",
+            canoe_count=1,
+            total_amount=1200,
+            currency="sek",
+            payment_provider="simulated",
+        )
+        db.session.add(booking_order)
+        db.session.flush()
+        db.session.add(
+            BookedCanoe(
+                booking_order_id=booking_order.id,
+                participant_first_name=first_name,
+                participant_last_name=last_name,
+                status="confirmed",
+            )
+        )
+    db.session.commit()
+
+
+def test_admin_bookings_api_pages_with_keyset_cursor(client):
+    """Walk every booking page by cursor without skipping or repeating rows."""
+
+    login(client)
+    active_event_id = Event.query.filter_by(is_active=True).one().id
+    add_confirmed_canoes(
+        active_event_id,
+        [
+            ("Örjan", "Berg"),
+            ("Anna", "Ek"),
+            ("Bo", "Lind"),
+            ("Anna", "Ek"),
+            ("Cia", "Ny"),
+        ],
+    )
+
+    def collect_pages(sort, direction):
+        collected_rows = []
+        cursor = ""
+        while True:
+            page = client.get(
+                "/admin/api/bookings",
+                query_string={
+                    "sort": sort,
+                    "direction": direction,
+                    "limit": 2,
+                    "cursor": cursor,
+                },
+            ).get_json()
+            assert len(page["bookings"]) <= 2
+            collected_rows.extend(page["bookings"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return collected_rows
+
+    id_rows = collect_pages("id", "asc")
+    assert [row["id"] for row in id_rows] == sorted(row["id"] for row in id_rows)
+    assert len(id_rows) == 5
+    assert id_rows[0]["payment_method_label"] == "Simulerad betalning"
+    assert id_rows[0]["booking_source_label"] == "Checkout"
+
+    name_rows = collect_pages("name", "desc")
+    assert [row["participant_first_name"] for row in name_rows] == [
+        "Örjan",
+        "Cia",
+        "Bo",
+        "Anna",
+        "Anna",
+    ]
+    # Equal names are ordered by ID, so both rows appear exactly once.
+    assert name_rows[3]["id"] > name_rows[4]["id"]
+
+    first_id_page = client.get("/admin/api/bookings?limit=2").get_json()
+    mismatched_response = client.get(
+        "/admin/api/bookings",
+        query_string={"sort": "name", "cursor": first_id_page["next_cursor"]},
+    )
+    assert mismatched_response.status_code == 400
+    assert client.get("/admin/api/bookings?cursor=not-a-cursor").status_code == 400
+    assert client.get("/admin/api/bookings?sort=price").status_code == 400
+
+
+def test_admin_bookings_api_rejects_malformed_cursor_values(client):
+    """Answer 400 for cursors whose sort values have the wrong shape or type."""
+
+    login(client)
+
+    def build_cursor(sort, sort_values):
+        cursor_json = json.dumps(
+            {"sort": sort, "direction": "asc", "after": sort_values}
+        )
+        return base64.urlsafe_b64encode(cursor_json.encode("utf-8")).decode("ascii")
+
+    for sort, sort_values in [
+        ("name", [["anna ek"], 1]),
+        ("name", [None, 1]),
+        ("name", [5, 1]),
+        ("name", ["anna ek", True]),
+        ("reference", ["PAD-1", "2"]),
+        ("reference", [1]),
+        ("id", ["1"]),
+    ]:
+        response = client.get(
+            "/admin/api/bookings",
+            query_string={"sort": sort, "cursor": build_cursor(sort, sort_values)},
+        )
+        assert response.status_code == 400, sort_values
+
+
+def test_admin_bookings_api_searches_names_and_references(client):
+    """Match pickup names and references, and follow renames and deletes."""
+
+    login(client)
+    active_event_id = Event.query.filter_by(is_active=True).one().id
+    add_confirmed_canoes(
+        active_event_id, [("Åsa", "Öberg"), ("Bo", "Berg"), ("Cia", "Ny")]
+    )
+
+    def search_first_names(search_text):
+        page = client.get(
+            "/admin/api/bookings", query_string={"q": search_text}
+        ).get_json()
+        return sorted(row["participant_first_name"] for row in page["bookings"])
+
+    assert search_first_names("BERG") == ["Bo", "Åsa"]
+    assert search_first_names("åsa öb") == ["Åsa"]
+    # Terms shorter than one trigram use the LIKE fallback.
+    assert search_first_names("ny") == ["Cia"]
+    assert search_first_names("pad-list-002") == ["Bo"]
+    assert search_first_names("100%") == []
+
+    bo_canoe_id = BookedCanoe.query.filter_by(participant_first_name="Bo").one().id
+    client.post(
+        f"/admin/update/{bo_canoe_id}",
+        data={"participant_first_name": "Bosse", "participant_last_name": "Holm"},
+    )
+    assert search_first_names("berg") == ["Åsa"]
+    assert search_first_names("holm") == ["Bosse"]
+
+    client.post(f"/admin/delete/{bo_canoe_id}")
+    assert search_first_names("holm") == []
+
+
+def test_admin_export_streams_grouped_csv_and_xlsx(client):
+    """Export one row per canoe, grouped by pickup person, in both formats."""
+
+    login(client)
+    active_event = Event.query.filter_by(is_active=True).one()
+    active_event_id = active_event.id
+    event_date = active_event.event_date.isoformat()
+    add_confirmed_canoes(
+        active_event_id,
+        [("Anna", "Ek"), ("=cmd", "Berg"), ("Anna", "Ek"), ("Åsa", "Öberg")],
+    )
+
+    csv_response = client.get("/admin/export")
+    assert csv_response.status_code == 200
+    assert csv_response.is_streamed
+    assert csv_response.headers["Content-Disposition"] == (
+        f'attachment; filename="paddlingen-bokningar-{event_date}.csv"'
+    )
+    csv_text = csv_response.get_data().decode("utf-8-sig")
+    csv_rows = list(csv.reader(io.StringIO(csv_text), delimiter=";"))
+    assert csv_rows[0][:3] == ["Ansvarig vid uthämtning", "Antal kanoter", "Kanot"]
+    assert [row[:3] for row in csv_rows[1:]] == [
+        ["Anna Ek", "2", "Kanot 1"],
+        ["Anna Ek", "2", "Kanot 2"],
+        # Names starting with "=" must not run as spreadsheet formulas.
+        ["'=cmd Berg", "1", "Kanot 1"],
+        ["Åsa Öberg", "1", "Kanot 1"],
+    ]
+    assert csv_rows[1][3:] == [
+        "Anna Ek & ?",
+        "PAD-LIST-001",
+        "Simulerad betalning",
+        "Nej",
+    ]
+
+    xlsx_response = client.get(
+        "/admin/export",
+        query_string={"format": "xlsx", "event_id": active_event_id},
+    )
+    assert xlsx_response.status_code == 200
+    assert xlsx_response.mimetype == (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+    with zipfile.ZipFile(io.BytesIO(xlsx_response.get_data())) as workbook:
+        assert workbook.testzip() is None
+        sheet_root = ElementTree.fromstring(workbook.read("xl/worksheets/sheet1.xml"))
+    namespace = {"s": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+    sheet_rows = [
+        ["".join(cell.itertext()) for cell in row.findall("s:c", namespace)]
+        for row in sheet_root.iterfind("s:sheetData/s:row", namespace)
+    ]
+    assert len(sheet_rows) == 5
+    assert sheet_rows[2][:3] == ["Anna Ek", "2", "Kanot 2"]
+    assert sheet_rows[4][0] == "Åsa Öberg"
+
+    assert client.get("/admin/export?format=pdf").status_code == 400
+    assert client.get("/admin/export?event_id=9999").status_code == 404
+
+
+def test_admin_checklist_feed_returns_changes_since_version(client):
+    """Send other devices only the checklist ticks newer than their version."""
+
+    login(client)
+
+    active_event = Event.query.filter_by(is_active=True).first()
+    active_event_id = active_event.id
+    booking_order = BookingOrder(
+        event_id=active_event_id,
+        public_booking_reference="PAD-TEST-CHECKLIST-FEED",
+        status="paid",
+        canoe_count=2,
+        total_amount=2400,
+        currency="sek",
+        payment_provider="simulated",
+    )
+    db.session.add(booking_order)
+    db.session.flush()
+    booked_canoes = [
+        BookedCanoe(
+            booking_order_id=booking_order.id,
+            participant_first_name="Klara",
+            participant_last_name="Karlsson",
+            status="confirmed",
+        )
+        for _ in range(2)
+    ]
+    db.session.add_all(booked_canoes)
+    db.session.commit()
+    first_canoe_id, second_canoe_id = (canoe.id for canoe in booked_canoes)
+
+    client.post(
+        "/admin/api/checklist",
+        json={"changes": [{"id": first_canoe_id, "picked_up": True}]},
+    )
+    first_feed = client.get("/admin/api/checklist/changes?since=0").get_json()
+    assert first_feed["version"] == 1
+    assert first_feed["changes"] == [{"id": first_canoe_id, "picked_up": True}]
+    assert first_feed["rows"] == [
+        {"name": "Klara Karlsson", "total_canoes": 2, "picked_up_count": 1}
+    ]
+
+    first_etag = client.get("/admin/api/checklist/changes?since=0").headers["ETag"]
+    unchanged_response = client.get(
+        "/admin/api/checklist/changes?since=1",
+        headers={"If-None-Match": first_etag},
+    )
+    assert unchanged_response.status_code == 304
+    assert unchanged_response.get_data() == b""
+
+    # A tick on another device changes the ETag, so the next poll gets it.
+    checklist_version = claim_next_checklist_version(active_event_id)
+    updated_count = set_checklist_picked_up(
+        active_event_id, {second_canoe_id}, True, checklist_version
+    )
+    finish_checklist_update(active_event_id, updated_count)
+
+    changed_response = client.get(
+        "/admin/api/checklist/changes?since=1",
+        headers={"If-None-Match": first_etag},
+    )
+    assert changed_response.status_code == 200
+    changed_feed = changed_response.get_json()
+    assert changed_feed["version"] == 2
+    assert changed_feed["changes"] == [{"id": second_canoe_id, "picked_up": True}]
+    assert changed_feed["rows"][0]["picked_up_count"] == 2
+    assert changed_response.headers["ETag"] != first_etag
+
+
+def test_admin_can_refresh_cached_stripe_product_images(client, monkeypatch):
+    """Reload the Checkout product image immediately from the admin page."""
+
+    loaded_product_ids: list[str] = []
+
+    def fake_get_catalog_product_image_urls(stripe_client, checkout_product_id):
+        loaded_product_ids.append(checkout_product_id)
+        return ["https://files.stripe.com/new-canoe.png"]
+
+    monkeypatch.setattr(
+        "app.util.stripe_helpers.get_catalog_product_image_urls",
+        fake_get_catalog_product_image_urls,
+    )
+    client.application.config["STRIPE_CHECKOUT_PRODUCT_ID"] = "prod_checkout_123"
+    login(client)
+
+    response = client.post(
+        "/admin/stripe-product-images/refresh",
+        follow_redirects=True,
+    )
+
+    assert response.status_code == 200
+    assert "Checkout-bilden har hämtats på nytt från Stripe." in unescape(
+        response.get_data(as_text=True)
+    )
+    assert loaded_product_ids == ["prod_checkout_123"]
+    with client.application.app_context():
+        assert get_checkout_product_image_cache().get("prod_checkout_123") == [
+            "https://files.stripe.com/new-canoe.png"
+        ]
@@ -5,10 +5,13 @@ successful responses and common error conditions so that the frontend can
 rely on stable and predictable behavior.
 """
 
-from datetime import timedelta
+from datetime import date, timedelta
+
+import requests
 
 from app import BookedCanoe, BookingOrder, Event, db
 from app.util.db_models import get_current_utc_time
+from app.util.weather_forecast import refresh_active_event_weather_caches
 
 
 def unlock_public_site(client):
@@ -145,29 +148,16 @@ def test_booking_count_api_ignores_expired_pending_reservations(client):
         assert BookedCanoe.query.count() == 1
 
 
-def test_forecast_api_returns_data(client, monkeypatch):
-    """Fetch weather information for a given date.
-
-    The real endpoint contacts an external weather API. To keep the test fast
-    and deterministic, we monkeypatch :func:`requests.get` to return a small
-    JSON payload. The endpoint should parse this data and respond with a
-    dictionary containing temperature, rain chance and an emoji icon.
+def build_met_forecast_payload(forecast_date, temperature=15, time_of_day="10:00"):
+    """Return a small MET-style payload with one timeseries entry."""
 
-    Args:
-        client (FlaskClient): Fixture providing a Flask test client.
-        monkeypatch (pytest.MonkeyPatch): Utility to replace ``requests.get``.
-
-    Returns:
-        None: Assertions confirm correct parsing of the mocked data.
-
-    """
-    sample_payload = {
+    return {
         "properties": {
             "timeseries": [
                 {
-                    "time": "2024-07-01T10:00:00Z",
+                    "time": f"{forecast_date}T{time_of_day}:00Z",
                     "data": {
-                        "instant": {"details": {"air_temperature": 15}},
+                        "instant": {"details": {"air_temperature": temperature}},
                         "next_6_hours": {
                             "details": {"precipitation_amount": 0.1},
                             "summary": {"symbol_code": "fair_day"},
@@ -178,25 +168,68 @@ def test_forecast_api_returns_data(client, monkeypatch):
         }
     }
 
-    def fake_get(url, headers=None, params=None, timeout=None):
+
+def move_active_event_into_forecast_window(client):
+    """Move the active event two days ahead and return its ISO date."""
+
+    with client.application.app_context():
+        active_event = Event.query.filter_by(is_active=True).first()
+        active_event.event_date = get_current_utc_time().date() + timedelta(days=2)
+        db.session.commit()
+        return active_event.event_date.isoformat()
+
+
+def patch_met_response(monkeypatch, payload):
+    """Replace ``requests.Session.get`` with a fake MET response for refresh tests."""
+
+    def fake_get(self, url, headers=None, params=None, timeout=None):
         class FakeResponse:
             def raise_for_status(self):
                 return None
 
             def json(self):
-                return sample_payload
+                return payload
 
         return FakeResponse()
 
-    monkeypatch.setattr("requests.get", fake_get)
+    monkeypatch.setattr("requests.Session.get", fake_get)
+
+
+def test_forecast_api_returns_data(client, monkeypatch):
+    """Return the forecast stored by the background weather refresh.
+
+    The refresh job contacts an external weather API. To keep the test fast
+    and deterministic, we monkeypatch :meth:`requests.Session.get` to return a small
+    JSON payload. After the refresh, the endpoint should respond with the
+    stored temperature, rain chance and emoji icon without calling MET again.
+
+    Args:
+        client (FlaskClient): Fixture providing a Flask test client.
+        monkeypatch (pytest.MonkeyPatch): Utility to replace ``requests.Session.get``.
+
+    Returns:
+        None: Assertions confirm correct parsing of the mocked data.
+
+    """
+    event_date_iso = move_active_event_into_forecast_window(client)
+    patch_met_response(monkeypatch, build_met_forecast_payload(event_date_iso))
+
+    with client.application.app_context():
+        assert list(refresh_active_event_weather_caches().values()) == ["refreshed"]
+
+    def fail_if_called(*args, **kwargs):
+        raise AssertionError("The forecast route must only read local data.")
+
+    monkeypatch.setattr("requests.Session.get", fail_if_called)
 
     unlock_public_site(client)
-    response = client.get("/api/forecast?date=2024-07-01")
+    response = client.get(f"/api/forecast?date={event_date_iso}")
     assert response.status_code == 200
     data = response.get_json()
     assert data["temperature"] == 15
     assert data["rainChance"] == "0,1"
     assert data["icon"] == "🌤️"
+    assert data["stale"] is False
 
 
 def test_forecast_api_missing_date(client):
@@ -220,42 +253,100 @@ def test_forecast_api_missing_date(client):
 
 
 def test_forecast_api_no_data(client, monkeypatch):
-    """Return 404 when the weather API lacks the requested timestamp.
+    """Return an error when no forecast was stored for the requested date.
 
     The mocked API response omits the 10:00 and 12:00 UTC entries that the
-    application expects. In this case the endpoint should indicate that no
-    forecast is available by responding with HTTP 404.
+    application expects, so the refresh stores nothing and the endpoint
+    reports that no forecast exists yet. Asking for another date than the
+    stored event date responds with HTTP 404.
 
     Args:
         client (FlaskClient): Fixture providing a Flask test client.
-        monkeypatch (pytest.MonkeyPatch): Utility to stub out ``requests.get``.
+        monkeypatch (pytest.MonkeyPatch): Utility to stub out ``requests.Session.get``.
 
     Returns:
-        None: Assertions verify the 404 behavior.
+        None: Assertions verify the error behavior.
 
     """
-    sample_payload = {
-        "properties": {"timeseries": [{"time": "2024-07-01T09:00:00Z", "data": {}}]}
-    }
-
-    def fake_get(url, headers=None, params=None, timeout=None):
-        class FakeResponse:
-            def raise_for_status(self):
-                return None
+    event_date_iso = move_active_event_into_forecast_window(client)
+    patch_met_response(
+        monkeypatch,
+        build_met_forecast_payload(event_date_iso, time_of_day="09:00"),
+    )
 
-            def json(self):
-                return sample_payload
+    with client.application.app_context():
+        assert list(refresh_active_event_weather_caches().values()) == ["missing_entry"]
 
-        return FakeResponse()
+    unlock_public_site(client)
+    response = client.get(f"/api/forecast?date={event_date_iso}")
+    assert response.status_code == 503
+    assert "error" in response.get_json()
 
-    monkeypatch.setattr("requests.get", fake_get)
+    patch_met_response(monkeypatch, build_met_forecast_payload(event_date_iso))
+    with client.application.app_context():
+        refresh_active_event_weather_caches()
 
-    unlock_public_site(client)
     response = client.get("/api/forecast?date=2024-07-01")
     assert response.status_code == 404
     assert "error" in response.get_json()
 
 
+def test_forecast_batch_api_returns_several_dates_from_one_refresh(client, monkeypatch):
+    """Serve the days around the event from the single stored forecast index."""
+
+    event_date_iso = move_active_event_into_forecast_window(client)
+    event_date = date.fromisoformat(event_date_iso)
+    day_before_iso = (event_date - timedelta(days=1)).isoformat()
+    day_after_iso = (event_date + timedelta(days=1)).isoformat()
+    payload = build_met_forecast_payload(day_before_iso, temperature=11)
+    payload["properties"]["timeseries"].extend(
+        build_met_forecast_payload(event_date_iso, temperature=14)["properties"][
+            "timeseries"
+        ]
+        + build_met_forecast_payload(
+            day_after_iso, temperature=16, time_of_day="12:00"
+        )["properties"]["timeseries"]
+    )
+    patch_met_response(monkeypatch, payload)
+
+    with client.application.app_context():
+        refresh_active_event_weather_caches()
+
+    def fail_if_called(*args, **kwargs):
+        raise AssertionError("The forecast route must only read local data.")
+
+    monkeypatch.setattr("requests.Session.get", fail_if_called)
+
+    unlock_public_site(client)
+    response = client.get(
+        "/api/forecast/batch?dates="
+        f"{day_before_iso},{event_date_iso},{day_after_iso},2024-07-01"
+    )
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["stale"] is False
+    assert data["forecasts"][day_before_iso]["temperature"] == 11
+    assert data["forecasts"][event_date_iso]["temperature"] == 14
+    assert data["forecasts"][day_after_iso]["temperature"] == 16
+    assert data["forecasts"]["2024-07-01"] is None
+
+    single_response = client.get(f"/api/forecast?date={day_after_iso}")
+    assert single_response.status_code == 200
+    assert single_response.get_json()["temperature"] == 16
+
+
+def test_forecast_batch_api_rejects_invalid_date_lists(client):
+    """Return HTTP 400 for missing, malformed, or too many dates."""
+
+    unlock_public_site(client)
+
+    assert client.get("/api/forecast/batch").status_code == 400
+    assert client.get("/api/forecast/batch?dates=2026-13-01").status_code == 400
+    too_many_dates = ",".join(f"2026-07-{day:02d}" for day in range(1, 12))
+    assert client.get(f"/api/forecast/batch?dates={too_many_dates}").status_code == 400
+
+
 def test_public_api_requires_unlock(client):
     """Reject locked visitors that call a protected public API directly."""
 
@@ -263,3 +354,69 @@ def test_public_api_requires_unlock(client):
 
     assert response.status_code == 403
     assert response.get_json() == {"error": "Åtkomst nekad."}
+
+
+def test_forecast_api_marks_expired_forecast_as_stale(client, monkeypatch):
+    """Keep serving the last stored forecast with a stale flag after it expires."""
+
+    event_date_iso = move_active_event_into_forecast_window(client)
+    patch_met_response(
+        monkeypatch, build_met_forecast_payload(event_date_iso, temperature=12)
+    )
+
+    with client.application.app_context():
+        refresh_active_event_weather_caches()
+        active_event = Event.query.filter_by(is_active=True).first()
+        active_event.weather_cache.expires_at = get_current_utc_time() - timedelta(
+            minutes=1
+        )
+        db.session.commit()
+
+    unlock_public_site(client)
+    response = client.get(f"/api/forecast?date={event_date_iso}")
+
+    assert response.status_code == 200
+    assert response.get_json()["temperature"] == 12
+    assert response.get_json()["stale"] is True
+
+
+def test_weather_refresh_stops_calling_met_after_repeated_failures(client, monkeypatch):
+    """Skip outbound MET calls once the circuit breaker has opened."""
+
+    move_active_event_into_forecast_window(client)
+    outbound_call_count = 0
+
+    def failing_get(self, url, headers=None, params=None, timeout=None):
+        nonlocal outbound_call_count
+        outbound_call_count += 1
+        raise requests.Timeout("MET timed out")
+
+    monkeypatch.setattr("requests.Session.get", failing_get)
+    client.application.config["WEATHER_CIRCUIT_BREAKER_FAILURE_THRESHOLD"] = 2
+
+    with client.application.app_context():
+        for _ in range(4):
+            assert list(refresh_active_event_weather_caches(force=True).values()) == [
+                "unavailable"
+            ]
+
+    assert outbound_call_count == 2
+
+
+def test_weather_refresh_skips_events_outside_forecast_window(client, monkeypatch):
+    """Avoid calling MET for events that are still too far away."""
+
+    def fail_if_called(*args, **kwargs):
+        raise AssertionError("MET should not be called outside the window.")
+
+    monkeypatch.setattr("requests.Session.get", fail_if_called)
+
+    with client.application.app_context():
+        active_event = Event.query.filter_by(is_active=True).first()
+        active_event.event_date = get_current_utc_time().date() + timedelta(days=30)
+        db.session.commit()
+
+        assert list(refresh_active_event_weather_caches().values()) == [
+            "outside_window"
+        ]
+        assert active_event.weather_cache is None
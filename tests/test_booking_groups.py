@@ -1,45 +1,58 @@
 """Tests for grouped overview and checklist helper data."""
 
 from app.util.booking_groups import (
+    OverviewCanoeLine,
+    OverviewGroupRow,
     build_admin_checklist_rows,
-    build_grouped_booking_overview_rows,
+    load_public_booking_overview_rows,
 )
-from app.util.db_models import BookedCanoe
+from app.util.db_models import BookedCanoe, BookingOrder, Event, db
 
 
-def test_grouped_booking_overview_rows_include_canoe_detail_data() -> None:
-    """Keep grouped overview rows compact while still preparing canoe details."""
+def test_public_booking_overview_rows_include_canoe_detail_data(client) -> None:
+    """Number the canoes of one pickup person by canoe ID, not insert order."""
 
-    bookings = [
-        BookedCanoe(
-            id=14,
-            participant_first_name="Marcus",
-            participant_last_name="Gustafsson",
-            passenger_two_first_name="Mathias",
-            passenger_two_last_name="Axelsson",
-        ),
-        BookedCanoe(
-            id=21,
-            participant_first_name="Marcus",
-            participant_last_name="Gustafsson",
-        ),
-    ]
+    with client.application.app_context():
+        active_event_id = Event.query.filter_by(is_active=True).one().id
+        booking_order = BookingOrder(
+            event_id=active_event_id,
+            public_booking_reference="PAD-OVERVIEW-2",
+            status="paid",
+            canoe_count=2,
+            total_amount=2400,
+        )
+        db.session.add(booking_order)
+        db.session.flush()
+        db.session.add_all(
+            [
+                BookedCanoe(
+                    id=21,
+                    booking_order_id=booking_order.id,
+                    participant_first_name="Marcus",
+                    participant_last_name="Gustafsson",
+                    status="confirmed",
+                ),
+                BookedCanoe(
+                    id=14,
+                    booking_order_id=booking_order.id,
+                    participant_first_name="Marcus",
+                    participant_last_name="Gustafsson",
+                    passenger_two_first_name="Mathias",
+                    passenger_two_last_name="Axelsson",
+                    status="confirmed",
+                ),
+            ]
+        )
+        db.session.commit()
 
-    overview_rows = build_grouped_booking_overview_rows(bookings)
+        overview_rows = load_public_booking_overview_rows(active_event_id)
 
     assert len(overview_rows) == 1
     assert overview_rows[0].name == "Marcus Gustafsson"
-    assert overview_rows[0].pickup_person_name == "Marcus Gustafsson"
     assert overview_rows[0].canoe_count == 2
-    assert len(overview_rows[0].canoe_details) == 2
-    assert overview_rows[0].canoe_details[0].canoe_label == "Kanot 1"
-    assert (
-        overview_rows[0].canoe_details[0].display_rider_names
-        == "Marcus Gustafsson & Mathias Axelsson"
-    )
-    assert overview_rows[0].canoe_details[1].canoe_label == "Kanot 2"
-    assert overview_rows[0].canoe_details[1].display_rider_names == (
-        "Marcus Gustafsson & ?"
+    assert overview_rows[0].canoe_details == (
+        OverviewCanoeLine("Kanot 1", "Marcus Gustafsson & Mathias Axelsson"),
+        OverviewCanoeLine("Kanot 2", "Marcus Gustafsson & ?"),
     )
 
 
@@ -85,3 +98,54 @@ def test_admin_checklist_rows_keep_checkbox_order_and_prepare_detail_rows() -> N
     assert checklist_rows[0].canoe_details[0].picked_up is True
     assert checklist_rows[0].canoe_details[1].canoe_label == "Kanot 2"
     assert checklist_rows[0].canoe_details[1].picked_up is False
+
+
+def test_public_booking_overview_rows_are_grouped_and_ordered_in_sql(client) -> None:
+    """Group confirmed canoes by pickup person in first-booked order."""
+
+    canoe_rows = [
+        ("Marcus", "Gustafsson", "Mathias", "Axelsson", "confirmed"),
+        ("Anna", "Berg", None, None, "confirmed"),
+        (" Marcus ", "Gustafsson", None, None, "confirmed"),
+        ("Anna", "Berg", None, None, "reserved"),
+    ]
+    with client.application.app_context():
+        active_event = Event.query.filter_by(is_active=True).one()
+        booking_order = BookingOrder(
+            event_id=active_event.id,
+            public_booking_reference="PAD-OVERVIEW-1",
+            status="paid",
+            canoe_count=len(canoe_rows),
+            total_amount=4800,
+        )
+        db.session.add(booking_order)
+        db.session.flush()
+        for first_name, last_name, second_first, second_last, status in canoe_rows:
+            db.session.add(
+                BookedCanoe(
+                    booking_order_id=booking_order.id,
+                    participant_first_name=first_name,
+                    participant_last_name=last_name,
+                    passenger_two_first_name=second_first,
+                    passenger_two_last_name=second_last,
+                    status=status,
+                )
+            )
+        db.session.commit()
+
+        overview_rows = load_public_booking_overview_rows(active_event.id)
+        other_event_rows = load_public_booking_overview_rows(active_event.id + 1)
+
+    assert [(row.name, row.canoe_count) for row in overview_rows] == [
+        ("Marcus Gustafsson", 2),
+        ("Anna Berg", 1),
+    ]
+    assert [
+        (detail.canoe_label, detail.display_rider_names)
+        for detail in overview_rows[0].canoe_details
+    ] == [
+        ("Kanot 1", "Marcus Gustafsson & Mathias Axelsson"),
+        ("Kanot 2", "Marcus Gustafsson & ?"),
+    ]
+    assert other_event_rows == []
+    assert not hasattr(OverviewGroupRow("x", 0, ()), "__dict__")
@@ -0,0 +1,188 @@
+"""Tests for the background Stripe Checkout Session creation."""
+
+import threading
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+import stripe
+
+from app.util.checkout_session_worker import create_checkout_session_for_booking_order
+from app.util.db_models import BookingOrder, db, get_current_utc_time
+
+
+def unlock_public_site(client):
+    """Unlock the shared public-site gate for one test-client session."""
+
+    return client.post(
+        "/unlock",
+        data={"password": "eventpass"},
+        follow_redirects=True,
+    )
+
+
+def post_one_canoe_booking(client):
+    """Create one pending booking through the Step 2 XHR request."""
+
+    return client.post(
+        "/create-checkout-session",
+        data={
+            "canoeCount": "1",
+            "canoe1_fname": "Alice",
+            "canoe1_lname": "Andersson",
+        },
+        headers={"X-Requested-With": "XMLHttpRequest"},
+    )
+
+
+def get_only_booking_order(client) -> BookingOrder:
+    """Return the single booking order created by the test."""
+
+    with client.application.app_context():
+        return BookingOrder.query.one()
+
+
+def test_booking_returns_before_stripe_session_is_created(client, monkeypatch):
+    """Answer the booking request while Stripe is still working in the background."""
+
+    client.application.config["CHECKOUT_SESSION_CREATE_INLINE"] = False
+    stripe_may_answer = threading.Event()
+
+    def slow_create_stripe_checkout_session(**_):
+        assert stripe_may_answer.wait(timeout=5)
+        return SimpleNamespace(id="cs_test_background")
+
+    monkeypatch.setattr(
+        "app.util.checkout_session_worker.create_stripe_checkout_session",
+        slow_create_stripe_checkout_session,
+    )
+    unlock_public_site(client)
+
+    response = post_one_canoe_booking(client)
+
+    assert response.status_code == 200
+    assert response.get_json()["ok"] is True
+    booking_order = get_only_booking_order(client)
+    assert booking_order.payment_provider_session_id is None
+    assert booking_order.status in {"pending_payment", "creating_checkout_session"}
+
+    stripe_may_answer.set()
+    pay_response = client.get(f"/checkout/{booking_order.public_booking_reference}/pay")
+
+    assert pay_response.status_code == 302
+    assert "checkout.stripe.test" in pay_response.headers["Location"]
+    booking_order = get_only_booking_order(client)
+    assert booking_order.status == "checkout_session_created"
+    assert booking_order.payment_provider_session_id == "cs_test_background"
+
+
+def test_pay_step_creates_session_when_no_worker_picked_up_the_order(
+    client, monkeypatch
+):
+    """Create the session in the pay request when the queued job never ran."""
+
+    client.application.config["CHECKOUT_SESSION_CREATE_INLINE"] = False
+    monkeypatch.setattr(
+        "app.routes.queue_checkout_session_creation",
+        lambda booking_order_id: None,
+    )
+    unlock_public_site(client)
+    post_one_canoe_booking(client)
+    booking_order = get_only_booking_order(client)
+    assert booking_order.status == "pending_payment"
+
+    pay_response = client.get(f"/checkout/{booking_order.public_booking_reference}/pay")
+
+    assert pay_response.status_code == 302
+    assert "checkout.stripe.test" in pay_response.headers["Location"]
+    assert get_only_booking_order(client).status == "checkout_session_created"
+
+
+def test_pay_step_releases_hold_when_stripe_session_cannot_be_created(
+    client, monkeypatch
+):
+    """Release the local hold and explain the error when Stripe keeps failing."""
+
+    def failing_create_stripe_checkout_session(**_):
+        raise stripe.APIConnectionError("Stripe is unreachable")
+
+    monkeypatch.setattr(
+        "app.util.checkout_session_worker.create_stripe_checkout_session",
+        failing_create_stripe_checkout_session,
+    )
+    unlock_public_site(client)
+    post_one_canoe_booking(client)
+    booking_order = get_only_booking_order(client)
+    assert booking_order.status == "pending_payment"
+
+    pay_response = client.get(
+        f"/checkout/{booking_order.public_booking_reference}/pay",
+        follow_redirects=True,
+    )
+
+    assert pay_response.status_code == 200
+    assert "Det gick inte att starta betalningen just nu." in pay_response.get_data(
+        as_text=True
+    )
+    with client.application.app_context():
+        assert BookingOrder.query.count() == 0
+
+
+def test_unexpected_error_releases_the_checkout_session_claim(client, monkeypatch):
+    """Put the order back to pending when the Stripe call fails in any way."""
+
+    def broken_create_stripe_checkout_session(**_):
+        raise RuntimeError("unexpected bug")
+
+    client.application.config["CHECKOUT_SESSION_CREATE_INLINE"] = False
+    monkeypatch.setattr(
+        "app.routes.queue_checkout_session_creation",
+        lambda booking_order_id: None,
+    )
+    monkeypatch.setattr(
+        "app.util.checkout_session_worker.create_stripe_checkout_session",
+        broken_create_stripe_checkout_session,
+    )
+    unlock_public_site(client)
+    post_one_canoe_booking(client)
+    booking_order_id = get_only_booking_order(client).id
+
+    with client.application.app_context(), pytest.raises(RuntimeError):
+        create_checkout_session_for_booking_order(booking_order_id)
+
+    booking_order = get_only_booking_order(client)
+    assert booking_order.status == "pending_payment"
+    assert booking_order.checkout_session_claimed_at is None
+
+
+def test_pay_step_takes_over_a_stale_checkout_session_claim(client, monkeypatch):
+    """Create the session when the thread that claimed the order never finished."""
+
+    client.application.config["CHECKOUT_SESSION_CREATE_INLINE"] = False
+    client.application.config["CHECKOUT_SESSION_WAIT_SECONDS"] = 5
+    monkeypatch.setattr(
+        "app.routes.queue_checkout_session_creation",
+        lambda booking_order_id: None,
+    )
+    unlock_public_site(client)
+    post_one_canoe_booking(client)
+    with client.application.app_context():
+        booking_order = BookingOrder.query.one()
+        booking_order.status = "creating_checkout_session"
+        booking_order.checkout_session_claimed_at = get_current_utc_time() - timedelta(
+            seconds=client.application.config["CHECKOUT_SESSION_CLAIM_TIMEOUT_SECONDS"]
+            + 1
+        )
+        db.session.commit()
+        public_booking_reference = booking_order.public_booking_reference
+
+    started_at = time.monotonic()
+    pay_response = client.get(f"/checkout/{public_booking_reference}/pay")
+
+    assert time.monotonic() - started_at < 5
+    assert pay_response.status_code == 302
+    assert "checkout.stripe.test" in pay_response.headers["Location"]
+    booking_order = get_only_booking_order(client)
+    assert booking_order.status == "checkout_session_created"
+    assert booking_order.checkout_session_claimed_at is None
@@ -1,9 +1,37 @@
 """Tests for custom Flask command line interface commands."""
 
-from app import BookedCanoe, BookingOrder, Event, User, db
-from app.util.db_models import PublicSiteAccessSetting
+import sys
+from datetime import timedelta
+
+import click
 from werkzeug.security import check_password_hash
 
+from app import (
+    BookedCanoe,
+    BookingOrder,
+    Event,
+    EventWeatherCache,
+    User,
+    create_app,
+    db,
+)
+from app.util.db_models import (
+    ArchivedBookedCanoe,
+    ArchivedBookingOrder,
+    PublicSiteAccessSetting,
+    StripeWebhookInboxEvent,
+    get_current_utc_time,
+)
+from app.util.event_booking_stats import get_event_booking_stats
+from app.util.stripe_webhook_inbox import (
+    STRIPE_WEBHOOK_INBOX_WORKER_EXTENSION_KEY,
+    store_stripe_webhook_event,
+)
+from app.util.weather_forecast import (
+    WEATHER_REFRESH_SCHEDULER_EXTENSION_KEY,
+    WeatherRefreshScheduler,
+)
+
 
 def test_init_db_command_resets_tables(client):
     """Invoke ``flask init-db`` and ensure tables are recreated.
@@ -218,6 +246,70 @@ def test_seed_test_bookings_command_creates_marked_bookings(client):
         assert BookedCanoe.query.filter_by(status="confirmed").count() == 3
 
 
+def test_seed_test_bookings_command_builds_mixed_multi_event_data(client):
+    """Seed paid, pending, and expired orders with riders across events."""
+
+    runner = client.application.test_cli_runner()
+
+    with client.application.app_context():
+        result = runner.invoke(
+            args=[
+                "seed-test-bookings",
+                "--count",
+                "40",
+                "--canoes-per-order",
+                "2",
+                "--events",
+                "2",
+                "--pending-share",
+                "0.3",
+                "--expired-share",
+                "0.2",
+                "--with-passengers",
+            ]
+        )
+
+        assert result.exit_code == 0
+        assert "Created 40 seeded test booking(s)." in result.output
+        assert Event.query.count() == 2
+        assert (
+            db.session.query(BookingOrder.event_id)
+            .filter_by(payment_provider="dev_seed")
+            .distinct()
+            .count()
+            == 2
+        )
+        assert BookedCanoe.query.count() == 80
+        order_statuses = {
+            booking_order.status
+            for booking_order in BookingOrder.query.filter_by(
+                payment_provider="dev_seed"
+            )
+        }
+        assert order_statuses == {"paid", "pending_payment"}
+        expired_order_count = BookingOrder.query.filter(
+            BookingOrder.status == "pending_payment",
+            BookingOrder.expires_at < get_current_utc_time(),
+        ).count()
+        assert 0 < expired_order_count < 40
+        assert (
+            BookedCanoe.query.filter(
+                BookedCanoe.passenger_two_first_name.is_(None)
+            ).count()
+            == 0
+        )
+        assert (
+            BookedCanoe.query.filter(BookedCanoe.normalized_pickup_name == "").count()
+            == 0
+        )
+
+        repeated_result = runner.invoke(
+            args=["seed-test-bookings", "--count", "3", "--events", "2"]
+        )
+        assert "Removed 40 old seeded booking order(s)." in repeated_result.output
+        assert Event.query.count() == 2
+
+
 def test_clear_test_bookings_command_removes_only_seeded_bookings(client):
     """Delete only seeded development bookings and leave real ones intact."""
 
@@ -252,3 +344,253 @@ def test_clear_test_bookings_command_removes_only_seeded_bookings(client):
         assert "Removed 2 seeded test booking order(s)." in result.output
         assert BookingOrder.query.filter_by(payment_provider="dev_seed").count() == 0
         assert BookingOrder.query.filter_by(payment_provider="simulated").count() == 1
+
+
+def test_refresh_weather_command_stores_forecast_for_active_event(client, monkeypatch):
+    """Prefetch the active event forecast and store it in the weather cache."""
+
+    runner = client.application.test_cli_runner()
+
+    with client.application.app_context():
+        active_event = Event.query.filter_by(is_active=True).first()
+        active_event.event_date = get_current_utc_time().date() + timedelta(days=1)
+        db.session.commit()
+        event_date_iso = active_event.event_date.isoformat()
+
+    def fake_get(self, url, headers=None, params=None, timeout=None):
+        class FakeResponse:
+            def raise_for_status(self):
+                return None
+
+            def json(self):
+                return {
+                    "properties": {
+                        "timeseries": [
+                            {
+                                "time": f"{event_date_iso}T12:00:00Z",
+                                "data": {
+                                    "instant": {"details": {"air_temperature": 9.6}},
+                                    "next_6_hours": {
+                                        "details": {"precipitation_amount": 2.5},
+                                        "summary": {"symbol_code": "rain"},
+                                    },
+                                },
+                            }
+                        ]
+                    }
+                }
+
+        return FakeResponse()
+
+    monkeypatch.setattr("requests.Session.get", fake_get)
+
+    with client.application.app_context():
+        result = runner.invoke(args=["refresh-weather"])
+
+        assert result.exit_code == 0
+        assert f"Event {active_event.id}: refreshed" in result.output
+
+        weather_cache = EventWeatherCache.query.filter_by(
+            event_id=active_event.id
+        ).first()
+        assert weather_cache is not None
+        assert weather_cache.temperature_c == 9.6
+        assert weather_cache.rain_mm == 2.5
+        assert weather_cache.icon == "🌧️"
+
+        second_result = runner.invoke(args=["refresh-weather"])
+        assert f"Event {active_event.id}: recently_refreshed" in second_result.output
+
+
+def test_process_stripe_webhooks_command_drains_inbox_once(client):
+    """Apply stored webhook events with ``flask process-stripe-webhooks --once``."""
+
+    runner = client.application.test_cli_runner()
+
+    with client.application.app_context():
+        store_stripe_webhook_event(
+            {"id": "evt_test_cli", "type": "customer.created", "data": {}}
+        )
+
+        result = runner.invoke(args=["process-stripe-webhooks", "--once"])
+
+        assert result.exit_code == 0
+        assert "Processed 1" in result.output
+        inbox_event = db.session.get(StripeWebhookInboxEvent, "evt_test_cli")
+        assert inbox_event.status == "processed"
+
+
+def test_archive_event_command_moves_finished_event_bookings(client):
+    """Move a past event's orders and canoes out of the hot booking tables."""
+
+    runner = client.application.test_cli_runner()
+
+    with client.application.app_context():
+        runner.invoke(
+            args=[
+                "seed-test-bookings",
+                "--count",
+                "10",
+                "--canoes-per-order",
+                "2",
+                "--events",
+                "2",
+            ]
+        )
+        active_event = Event.query.filter_by(is_active=True).one()
+        past_event = Event.query.filter_by(is_active=False).one()
+        past_event_date = past_event.event_date.isoformat()
+
+        result = runner.invoke(args=["archive-event", past_event_date])
+
+        assert result.exit_code == 0
+        assert (
+            f"Archived 5 order(s) and 10 canoe(s) for {past_event_date}."
+            in result.output
+        )
+        assert past_event.archived_at is not None
+        assert {booking_order.event_id for booking_order in BookingOrder.query} == {
+            active_event.id
+        }
+        assert BookedCanoe.query.count() == 10
+        assert ArchivedBookingOrder.query.filter_by(event_id=past_event.id).count() == 5
+        assert ArchivedBookedCanoe.query.count() == 10
+
+        repeated_result = runner.invoke(args=["archive-event", past_event_date])
+        assert repeated_result.exit_code != 0
+        assert "already archived" in repeated_result.output
+
+        active_result = runner.invoke(
+            args=["archive-event", active_event.event_date.isoformat()]
+        )
+        assert active_result.exit_code != 0
+        assert "active event cannot be archived" in active_result.output
+        assert BookedCanoe.query.count() == 10
+
+
+def test_export_bookings_command_streams_archived_event_to_file(client, tmp_path):
+    """Export an archived event's canoes from the archive tables."""
+
+    runner = client.application.test_cli_runner()
+
+    with client.application.app_context():
+        runner.invoke(
+            args=[
+                "seed-test-bookings",
+                "--count",
+                "3",
+                "--canoes-per-order",
+                "2",
+                "--events",
+                "2",
+            ]
+        )
+        past_event_date = (
+            Event.query.filter_by(is_active=False).one().event_date.isoformat()
+        )
+        runner.invoke(args=["archive-event", past_event_date])
+        output_path = tmp_path / "export.csv"
+
+        result = runner.invoke(
+            args=[
+                "export-bookings",
+                "--event-date",
+                past_event_date,
+                "--output",
+                str(output_path),
+            ]
+        )
+
+        assert result.exit_code == 0
+        assert f"Exported bookings for {past_event_date} as csv." in result.output
+        export_lines = output_path.read_text(encoding="utf-8-sig").splitlines()
+        assert export_lines[0].startswith("Ansvarig vid uthämtning;")
+        assert len(export_lines) == 1 + ArchivedBookedCanoe.query.count()
+
+        missing_result = runner.invoke(
+            args=["export-bookings", "--event-date", "1999-01-01"]
+        )
+        assert missing_result.exit_code != 0
+        assert "No event found on 1999-01-01." in missing_result.output
+
+
+def test_rebuild_event_stats_command_recounts_booking_totals(client):
+    """Recompute event totals after bookings were changed behind their back."""
+
+    runner = client.application.test_cli_runner()
+
+    with client.application.app_context():
+        runner.invoke(
+            args=[
+                "seed-test-bookings",
+                "--count",
+                "4",
+                "--canoes-per-order",
+                "2",
+                "--pending-share",
+                "0",
+                "--expired-share",
+                "0",
+            ]
+        )
+        active_event = Event.query.filter_by(is_active=True).one()
+        assert get_event_booking_stats(active_event.id).confirmed_canoe_count == 8
+
+        # A direct SQL update bypasses the running totals.
+        db.session.execute(db.update(BookedCanoe).values(picked_up=True))
+        db.session.commit()
+        assert get_event_booking_stats(active_event.id).picked_up_count == 0
+
+        result = runner.invoke(args=["rebuild-event-stats"])
+
+        assert result.exit_code == 0
+        assert "Rebuilt booking totals for 1 event(s)." in result.output
+        event_booking_stats = get_event_booking_stats(active_event.id)
+        assert event_booking_stats.picked_up_count == 8
+        assert event_booking_stats.paid_order_count == 4
+
+
+def test_non_web_callers_do_not_start_background_workers(monkeypatch):
+    """Start no worker threads for CLI commands, Alembic, or scripts."""
+
+    monkeypatch.setenv("DATABASE_URL", "sqlite:///:memory:")
+    monkeypatch.setenv("WEATHER_REFRESH_SCHEDULER_ENABLED", "True")
+    monkeypatch.setenv("STRIPE_WEBHOOK_INBOX_WORKER_ENABLED", "True")
+    monkeypatch.setenv("OUTBOUND_HTTP_WARM_ON_START", "False")
+    sys.modules.pop("config", None)
+    try:
+        with click.Context(click.Command("export-bookings")):
+            cli_application = create_app()
+        # ``migrations/env.py`` and the scripts call the factory directly.
+        script_application = create_app()
+    finally:
+        sys.modules.pop("config", None)
+
+    for flask_application in (cli_application, script_application):
+        assert WEATHER_REFRESH_SCHEDULER_EXTENSION_KEY not in (
+            flask_application.extensions
+        )
+        assert STRIPE_WEBHOOK_INBOX_WORKER_EXTENSION_KEY not in (
+            flask_application.extensions
+        )
+
+
+def test_web_process_starts_weather_scheduler_by_default(monkeypatch):
+    """Fill the forecast cache from web processes without extra setup."""
+
+    monkeypatch.setenv("DATABASE_URL", "sqlite:///:memory:")
+    monkeypatch.delenv("WEATHER_REFRESH_SCHEDULER_ENABLED", raising=False)
+    monkeypatch.setenv("STRIPE_WEBHOOK_INBOX_WORKER_ENABLED", "False")
+    monkeypatch.setenv("OUTBOUND_HTTP_WARM_ON_START", "False")
+    # Keep the thread from calling MET Norway during the test.
+    monkeypatch.setattr(WeatherRefreshScheduler, "start", lambda self: None)
+    sys.modules.pop("config", None)
+    try:
+        web_application = create_app(start_background_workers=True)
+    finally:
+        sys.modules.pop("config", None)
+
+    assert isinstance(
+        web_application.extensions.get(WEATHER_REFRESH_SCHEDULER_EXTENSION_KEY),
+        WeatherRefreshScheduler,
+    )
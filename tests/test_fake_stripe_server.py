@@ -0,0 +1,178 @@
+"""Tests for the local fake Stripe server used in offline benchmarks."""
+
+import queue
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from importlib.util import module_from_spec, spec_from_file_location
+from pathlib import Path
+from types import ModuleType
+
+import pytest
+import requests
+import stripe
+
+from app.util import stripe_helpers
+from app.util.db_models import BookingOrder
+from app.util.stripe_webhook_inbox import drain_stripe_webhook_inbox
+
+
+def load_fake_stripe_server_module() -> ModuleType:
+    """Load the fake server script by file path, like the other script tests."""
+
+    script_path = (
+        Path(__file__).resolve().parents[1] / "scripts" / "fake_stripe_server.py"
+    )
+    script_spec = spec_from_file_location("fake_stripe_server_for_test", script_path)
+    if script_spec is None or script_spec.loader is None:
+        raise RuntimeError("Could not load the fake Stripe server script.")
+
+    script_module = module_from_spec(script_spec)
+    # Dataclasses look their module up in ``sys.modules`` while being built.
+    sys.modules[script_spec.name] = script_module
+    script_spec.loader.exec_module(script_module)
+    return script_module
+
+
+fake_stripe_server = load_fake_stripe_server_module()
+
+
+def start_webhook_capture_server() -> tuple[ThreadingHTTPServer, queue.Queue]:
+    """Start a tiny server that records every webhook delivery it receives."""
+
+    received_webhooks: queue.Queue = queue.Queue()
+
+    class WebhookCaptureHandler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            content_length = int(self.headers["Content-Length"])
+            received_webhooks.put(
+                (self.rfile.read(content_length), self.headers["Stripe-Signature"])
+            )
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format, *args) -> None:
+            return None
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), WebhookCaptureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, received_webhooks
+
+
+def use_real_stripe_helpers(monkeypatch) -> None:
+    """Undo the autouse Stripe fakes so calls go to the configured API base."""
+
+    from app import routes
+    from app.util import checkout_session_worker
+
+    monkeypatch.setattr(
+        checkout_session_worker,
+        "create_stripe_checkout_session",
+        stripe_helpers.create_stripe_checkout_session,
+    )
+    monkeypatch.setattr(
+        routes,
+        "retrieve_stripe_checkout_session",
+        stripe_helpers.retrieve_stripe_checkout_session,
+    )
+
+
+def test_booking_flow_runs_end_to_end_against_fake_stripe(client, monkeypatch):
+    """Book, pay on the fake hosted page, and confirm from its signed webhook."""
+
+    webhook_server, received_webhooks = start_webhook_capture_server()
+    stripe_server = fake_stripe_server.start_fake_stripe_server(
+        fake_stripe_server.FakeStripeSettings(
+            latency_ms=5,
+            webhook_url=f"http://127.0.0.1:{webhook_server.server_address[1]}/",
+            webhook_secret="whsec_test_123",
+        )
+    )
+    client.application.config["STRIPE_API_BASE"] = stripe_server.base_url
+    use_real_stripe_helpers(monkeypatch)
+    try:
+        client.post("/unlock", data={"password": "eventpass"})
+        booking_response = client.post(
+            "/create-checkout-session",
+            data={
+                "canoeCount": "2",
+                "canoe1_fname": "Alice",
+                "canoe1_lname": "Andersson",
+                "canoe2_fname": "Bo",
+                "canoe2_lname": "Berg",
+            },
+            headers={"X-Requested-With": "XMLHttpRequest"},
+        )
+        assert booking_response.get_json()["ok"] is True
+
+        with client.application.app_context():
+            booking_order = BookingOrder.query.one()
+            public_booking_reference = booking_order.public_booking_reference
+            checkout_session_id = booking_order.payment_provider_session_id
+        assert checkout_session_id.startswith("cs_test_fake_")
+
+        pay_response = client.get(f"/checkout/{public_booking_reference}/pay")
+        hosted_checkout_url = pay_response.headers["Location"]
+        assert hosted_checkout_url.startswith(stripe_server.base_url)
+
+        hosted_checkout_response = requests.get(
+            hosted_checkout_url, allow_redirects=False, timeout=5
+        )
+        assert hosted_checkout_response.status_code == 303
+        assert checkout_session_id in hosted_checkout_response.headers["Location"]
+
+        webhook_payload, stripe_signature_header = received_webhooks.get(timeout=5)
+        webhook_response = client.post(
+            "/stripe/webhook",
+            data=webhook_payload,
+            headers={"Stripe-Signature": stripe_signature_header},
+        )
+        assert webhook_response.status_code == 200
+
+        with client.application.app_context():
+            assert drain_stripe_webhook_inbox()["processed"] == 1
+            booking_order = BookingOrder.query.one()
+            assert booking_order.status == "paid"
+            assert booking_order.payer_email == "paddlare@example.com"
+            assert stripe_helpers.retrieve_stripe_checkout_session(
+                checkout_session_id
+            ).amount_total == (2 * 1200 * 100)
+    finally:
+        stripe_server.shutdown()
+        stripe_server.server_close()
+        webhook_server.shutdown()
+        webhook_server.server_close()
+
+
+def test_fake_stripe_server_injects_errors_and_pages_session_lists(client):
+    """Fail requests on purpose and page through listed sessions."""
+
+    stripe_server = fake_stripe_server.start_fake_stripe_server(
+        fake_stripe_server.FakeStripeSettings(error_rate=1.0, error_status=402)
+    )
+    client.application.config["STRIPE_API_BASE"] = stripe_server.base_url
+    try:
+        with client.application.app_context():
+            with pytest.raises(stripe.StripeError):
+                stripe_helpers.retrieve_stripe_checkout_session("cs_test_missing")
+
+            stripe_server.settings.error_rate = 0
+            for session_number in range(3):
+                stripe_server.state.create_checkout_session(
+                    {"metadata[n]": str(session_number)}, stripe_server.base_url
+                )
+
+            first_page = stripe_helpers.list_stripe_checkout_sessions(0, page_size=2)
+            second_page = stripe_helpers.list_stripe_checkout_sessions(
+                0, starting_after=first_page.data[-1].id, page_size=2
+            )
+
+        assert first_page.has_more is True
+        assert second_page.has_more is False
+        assert [session.metadata["n"] for session in first_page.data] == ["2", "1"]
+        assert [session.metadata["n"] for session in second_page.data] == ["0"]
+        assert stripe_server.state.injected_error_count == 1
+    finally:
+        stripe_server.shutdown()
+        stripe_server.server_close()
@@ -0,0 +1,109 @@
+"""Tests for the shared outbound HTTP session and Stripe client."""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.util.outbound_http import (
+    build_outbound_http_session,
+    get_outbound_http_session,
+    get_shared_stripe_client,
+    warm_outbound_http_connections,
+)
+from app.util.stripe_helpers import build_stripe_client
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Answer every request with a tiny keep-alive JSON response."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_HEAD(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args) -> None:
+        return None
+
+
+class ConnectionCountingServer(ThreadingHTTPServer):
+    """Local stand-in server that counts accepted TCP connections."""
+
+    daemon_threads = True
+    accepted_connection_count = 0
+
+    def get_request(self):
+        self.accepted_connection_count += 1
+        return super().get_request()
+
+
+def start_stand_in_server() -> ConnectionCountingServer:
+    """Start the stand-in server on a free local port."""
+
+    server = ConnectionCountingServer(("127.0.0.1", 0), KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_pooled_session_reuses_one_connection_for_repeated_calls() -> None:
+    """Send several calls over one kept-alive TCP connection."""
+
+    server = start_stand_in_server()
+    server_url = f"http://127.0.0.1:{server.server_address[1]}/"
+    try:
+        http_session = build_outbound_http_session(pool_connections=1, pool_maxsize=2)
+
+        assert warm_outbound_http_connections(http_session, (server_url,)) == 1
+        for _ in range(5):
+            assert http_session.get(server_url, timeout=5).json() == {}
+
+        assert server.accepted_connection_count == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_warm_outbound_http_connections_ignores_unreachable_hosts() -> None:
+    """Keep warming the other hosts when one of them cannot be reached."""
+
+    server = start_stand_in_server()
+    server_url = f"http://127.0.0.1:{server.server_address[1]}/"
+    try:
+        http_session = build_outbound_http_session(pool_connections=2, pool_maxsize=1)
+
+        warmed_host_count = warm_outbound_http_connections(
+            http_session,
+            ("http://127.0.0.1:9/", server_url),
+            timeout_seconds=1,
+        )
+
+        assert warmed_host_count == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_build_stripe_client_reuses_one_client_per_secret_key(client) -> None:
+    """Share the Stripe client and its HTTP pool between helper calls."""
+
+    with client.application.app_context():
+        client.application.config.update(
+            STRIPE_SECRET_KEY="sk_test_first",
+            STRIPE_WEBHOOK_SECRET="whsec_test",
+            STRIPE_PUBLIC_BASE_URL="https://example.com",
+        )
+        first_client = build_stripe_client()
+
+        assert build_stripe_client() is first_client
+        assert get_shared_stripe_client("sk_test_first") is first_client
+        assert get_shared_stripe_client("sk_test_second") is not first_client
+        assert get_outbound_http_session() is get_outbound_http_session()
@@ -1,19 +1,36 @@
 """Tests for public-facing routes and booking flow."""
 
+import json
+import sys
+import threading
+import time
 from datetime import timedelta
 from types import SimpleNamespace
 
 import stripe
 
-from app import db
+from app import create_app, db
+from app.util.booking_status_notifications import get_booking_status_notifier
 from app.util.db_models import (
     BookedCanoe,
     BookingOrder,
     Event,
     PublicSiteAccessSetting,
+    StripeWebhookInboxEvent,
     get_current_utc_time,
 )
+from app.util.event_booking_stats import get_event_booking_stats
+from app.util.event_settings import bump_event_booking_version
 from app.util.helper_functions import get_previous_year_image_metadata
+from app.util.stripe_webhook_inbox import (
+    STRIPE_WEBHOOK_INBOX_WORKER_EXTENSION_KEY,
+    drain_stripe_webhook_inbox,
+)
+from app.util.stripe_webhooks import (
+    confirm_paid_booking_from_checkout_session,
+    mark_booking_order_paid,
+    process_stripe_webhook_event,
+)
 
 
 def unlock_public_site(client):
@@ -26,6 +43,13 @@ def unlock_public_site(client):
     )
 
 
+def drain_webhook_inbox(client) -> dict[str, int]:
+    """Apply stored Stripe webhook events the way the inbox worker would."""
+
+    with client.application.app_context():
+        return drain_stripe_webhook_inbox()
+
+
 def build_stripe_success_return_path(client) -> str:
     """Return the success URL that Stripe would redirect back to in tests."""
 
@@ -83,6 +107,7 @@ def mark_latest_pending_booking_as_paid_for_test(client) -> None:
             booking_order.payer_email = "testbetalning@example.com"
         for booked_canoe in booking_order.booked_canoes:
             booked_canoe.status = "confirmed"
+        bump_event_booking_version(booking_order.event_id)
         db.session.commit()
 
 
@@ -444,6 +469,96 @@ def test_successful_booking_returns_pending_booking_data_for_modal_step_three(cl
         ]
 
 
+def test_booking_replay_with_same_idempotency_key_returns_original_hold(
+    client, monkeypatch
+):
+    """Answer a double-submitted reservation with the first pending booking."""
+
+    stripe_create_calls = []
+
+    def record_create_stripe_checkout_session(**kwargs):
+        stripe_create_calls.append(kwargs)
+        return SimpleNamespace(id="cs_test_idempotent", url="https://checkout.test")
+
+    monkeypatch.setattr(
+        "app.util.checkout_session_worker.create_stripe_checkout_session",
+        record_create_stripe_checkout_session,
+    )
+    unlock_public_site(client)
+    booking_data = {
+        "canoeCount": "2",
+        "canoe1_fname": "Alice",
+        "canoe1_lname": "Andersson",
+        "canoe2_fname": "Bob",
+        "canoe2_lname": "Berg",
+        "checkout_idempotency_key": "6f1c2a4e-9b1d-4f7a-8c3e-2d5b7a9e0f11",
+    }
+
+    first_response = client.post(
+        "/create-checkout-session",
+        data=booking_data,
+        headers={"X-Requested-With": "XMLHttpRequest"},
+    )
+    second_response = client.post(
+        "/create-checkout-session",
+        data=booking_data,
+        headers={"X-Requested-With": "XMLHttpRequest"},
+    )
+
+    first_booking = first_response.get_json()["pending_booking"]
+    second_booking = second_response.get_json()["pending_booking"]
+    assert second_response.status_code == 200
+    assert (
+        second_booking["public_booking_reference"]
+        == first_booking["public_booking_reference"]
+    )
+    assert [call["idempotency_key"] for call in stripe_create_calls] == [
+        "6f1c2a4e-9b1d-4f7a-8c3e-2d5b7a9e0f11"
+    ]
+    with client.application.app_context():
+        assert BookingOrder.query.count() == 1
+        assert BookedCanoe.query.count() == 2
+
+
+def test_booking_replay_of_released_hold_does_not_return_it(client, monkeypatch):
+    """Refuse to hand back a canceled order for a repeated idempotency key."""
+
+    monkeypatch.setattr(
+        "app.util.checkout_session_worker.create_stripe_checkout_session",
+        lambda **kwargs: SimpleNamespace(
+            id="cs_test_released", url="https://checkout.test"
+        ),
+    )
+    unlock_public_site(client)
+    booking_data = {
+        "canoeCount": "1",
+        "canoe1_fname": "Alice",
+        "canoe1_lname": "Andersson",
+        "checkout_idempotency_key": "0b7e6d2c-41a9-4c3f-9e58-7f2a1d6c3b90",
+    }
+
+    first_response = client.post(
+        "/create-checkout-session",
+        data=booking_data,
+        headers={"X-Requested-With": "XMLHttpRequest"},
+    )
+    assert first_response.status_code == 200
+    with client.application.app_context():
+        BookingOrder.query.one().status = "canceled"
+        db.session.commit()
+
+    second_response = client.post(
+        "/create-checkout-session",
+        data=booking_data,
+        headers={"X-Requested-With": "XMLHttpRequest"},
+    )
+
+    assert second_response.status_code == 409
+    assert second_response.get_json()["ok"] is False
+    with client.application.app_context():
+        assert BookingOrder.query.count() == 1
+
+
 def test_review_page_can_redirect_into_real_stripe_checkout(client):
     """Use the Step 3 payment action to redirect into Stripe."""
 
@@ -563,6 +678,127 @@ def test_checkout_status_api_reports_pending_and_paid_states(client):
     assert paid_response.get_json() == {"ok": True, "booking_status": "paid"}
 
 
+def test_checkout_status_api_long_poll_returns_when_webhook_confirms(client):
+    """Hold a waiting status request open and answer as soon as payment lands."""
+
+    unlock_public_site(client)
+    client.post(
+        "/create-checkout-session",
+        data={
+            "canoeCount": "1",
+            "canoe1_fname": "Alice",
+            "canoe1_lname": "Andersson",
+        },
+        headers={"X-Requested-With": "XMLHttpRequest"},
+    )
+    payment_status_path = build_stripe_payment_status_path(client)
+    with client.application.app_context():
+        checkout_session_id = BookingOrder.query.one().payment_provider_session_id
+    # A slow database re-check proves the wake-up came from the webhook signal.
+    client.application.config["BOOKING_STATUS_DB_POLL_SECONDS"] = 30
+
+    def confirm_payment_from_webhook() -> None:
+        time.sleep(0.2)
+        with client.application.app_context():
+            confirm_paid_booking_from_checkout_session(
+                {
+                    "id": checkout_session_id,
+                    "payment_status": "paid",
+                    "customer_details": {"email": "alice@example.com"},
+                }
+            )
+
+    webhook_thread = threading.Thread(target=confirm_payment_from_webhook)
+    webhook_thread.start()
+    started_at = time.monotonic()
+    response = client.get(f"{payment_status_path}&wait=20")
+    elapsed_seconds = time.monotonic() - started_at
+    webhook_thread.join()
+
+    assert response.get_json() == {"ok": True, "booking_status": "paid"}
+    assert elapsed_seconds < 5
+
+
+def test_concurrent_payment_confirmations_count_the_order_once(client):
+    """Let only one of two workers holding the pending order confirm it."""
+
+    unlock_public_site(client)
+    client.post(
+        "/create-checkout-session",
+        data={
+            "canoeCount": "1",
+            "canoe1_fname": "Alice",
+            "canoe1_lname": "Andersson",
+        },
+        headers={"X-Requested-With": "XMLHttpRequest"},
+    )
+
+    with client.application.app_context():
+        stale_booking_order = BookingOrder.query.one()
+        event_id = stale_booking_order.event_id
+        paid_checkout_session = {
+            "id": stale_booking_order.payment_provider_session_id,
+            "payment_status": "paid",
+        }
+        assert stale_booking_order.status == "checkout_session_created"
+
+        # The webhook worker confirms the order in its own session first.
+        with client.application.app_context():
+            assert (
+                confirm_paid_booking_from_checkout_session(paid_checkout_session)
+                == "confirmed"
+            )
+
+        # The reconcile run still holds the pending copy it read earlier.
+        assert not mark_booking_order_paid(stale_booking_order, paid_checkout_session)
+        db.session.commit()
+
+        assert stale_booking_order.status == "paid"
+        booking_stats = get_event_booking_stats(event_id)
+        assert booking_stats.paid_order_count == 1
+        assert booking_stats.confirmed_canoe_count == 1
+        assert (
+            confirm_paid_booking_from_checkout_session(paid_checkout_session)
+            == "already_paid"
+        )
+
+
+def test_checkout_status_api_answers_at_once_when_waiters_are_capped(client):
+    """Skip the long-poll while this process already holds its waiting requests."""
+
+    unlock_public_site(client)
+    client.post(
+        "/create-checkout-session",
+        data={
+            "canoeCount": "1",
+            "canoe1_fname": "Alice",
+            "canoe1_lname": "Andersson",
+        },
+        headers={"X-Requested-With": "XMLHttpRequest"},
+    )
+    payment_status_path = build_stripe_payment_status_path(client)
+    client.application.config["CHECKOUT_STATUS_MAX_WAITERS"] = 1
+
+    with client.application.app_context():
+        booking_order_id = BookingOrder.query.one().id
+        booking_status_notifier = get_booking_status_notifier()
+
+    # Another visitor's request takes the only waiting slot.
+    with booking_status_notifier.watch(booking_order_id + 1) as is_admitted:
+        assert is_admitted
+        started_at = time.monotonic()
+        response = client.get(f"{payment_status_path}&wait=20")
+        elapsed_seconds = time.monotonic() - started_at
+
+    assert response.get_json() == {"ok": True, "booking_status": "pending"}
+    assert elapsed_seconds < 2
+
+    # Nobody waits any more, so changes are not remembered.
+    booking_status_notifier.publish(booking_order_id)
+    assert booking_status_notifier.current_version(booking_order_id) == 0
+    assert booking_status_notifier._versions == {}
+
+
 def test_checkout_status_api_redirects_home_when_local_hold_has_expired(client):
     """Return a home redirect payload when the local Stripe hold has expired."""
 
@@ -929,6 +1165,7 @@ def test_completed_webhook_finalizes_pending_booking(client, monkeypatch):
         checkout_session_id = booking_order.payment_provider_session_id
         assert checkout_session_id is not None
         stripe_event = {
+            "id": "evt_test_paid",
             "type": "checkout.session.completed",
             "data": {
                 "object": {
@@ -959,8 +1196,17 @@ def test_completed_webhook_finalizes_pending_booking(client, monkeypatch):
     )
 
     assert response.status_code == 200
+    with client.application.app_context():
+        # The webhook is only stored and acknowledged; the worker applies it.
+        assert BookingOrder.query.one().status == "checkout_session_created"
+        assert StripeWebhookInboxEvent.query.one().status == "pending"
+
+    assert drain_webhook_inbox(client)["processed"] == 1
 
     with client.application.app_context():
+        inbox_event = StripeWebhookInboxEvent.query.one()
+        assert inbox_event.status == "processed"
+        assert inbox_event.processing_result == "confirmed"
         booking_order = BookingOrder.query.one()
         assert booking_order.status == "paid"
         assert booking_order.paid_at is not None
@@ -991,6 +1237,7 @@ def test_completed_webhook_is_idempotent_for_paid_booking(client, monkeypatch):
         checkout_session_id = booking_order.payment_provider_session_id
         assert checkout_session_id is not None
         stripe_event = {
+            "id": "evt_test_paid",
             "type": "checkout.session.completed",
             "data": {
                 "object": {
@@ -1010,21 +1257,36 @@ def test_completed_webhook_is_idempotent_for_paid_booking(client, monkeypatch):
         lambda payload, signature_header: stripe_event,
     )
 
+    processed_event_ids = []
+
+    def record_processed_event(stripe_event):
+        processed_event_ids.append(stripe_event["id"])
+        return process_stripe_webhook_event(stripe_event)
+
+    monkeypatch.setattr(
+        "app.util.stripe_webhook_inbox.process_stripe_webhook_event",
+        record_processed_event,
+    )
+
     first_response = client.post(
         "/stripe/webhook",
         data=b'{"id":"evt_test_paid"}',
         headers={"Stripe-Signature": "t=1,v1=valid"},
     )
+    drain_webhook_inbox(client)
     second_response = client.post(
         "/stripe/webhook",
-        data=b'{"id":"evt_test_paid_duplicate"}',
+        data=b'{"id":"evt_test_paid"}',
         headers={"Stripe-Signature": "t=1,v1=valid"},
     )
+    drain_webhook_inbox(client)
 
     assert first_response.status_code == 200
     assert second_response.status_code == 200
+    assert processed_event_ids == ["evt_test_paid"]
 
     with client.application.app_context():
+        assert StripeWebhookInboxEvent.query.count() == 1
         booking_order = BookingOrder.query.one()
         assert booking_order.status == "paid"
         assert BookingOrder.query.count() == 1
@@ -1052,6 +1314,7 @@ def test_expired_webhook_releases_pending_booking(client, monkeypatch):
         checkout_session_id = booking_order.payment_provider_session_id
         assert checkout_session_id is not None
         stripe_event = {
+            "id": "evt_test_expired",
             "type": "checkout.session.expired",
             "data": {
                 "object": {
@@ -1077,12 +1340,58 @@ def test_expired_webhook_releases_pending_booking(client, monkeypatch):
     )
 
     assert response.status_code == 200
+    drain_webhook_inbox(client)
 
     with client.application.app_context():
         assert BookingOrder.query.count() == 0
         assert BookedCanoe.query.count() == 0
 
 
+def test_inbox_worker_drains_due_retry_after_restart(tmp_path, monkeypatch):
+    """Process a stored retry when the web process starts, without a new webhook."""
+
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'inbox.db'}")
+    monkeypatch.setenv("STRIPE_WEBHOOK_INBOX_WORKER_ENABLED", "False")
+    sys.modules.pop("config", None)
+    previous_application = create_app()
+    with previous_application.app_context():
+        db.create_all()
+        # The previous process failed once and scheduled a retry before exiting.
+        db.session.add(
+            StripeWebhookInboxEvent(
+                stripe_event_id="evt_due_retry",
+                event_type="customer.created",
+                payload=json.dumps({"id": "evt_due_retry", "type": "customer.created"}),
+                status="pending",
+                attempt_count=1,
+                next_attempt_at=get_current_utc_time() - timedelta(seconds=1),
+            )
+        )
+        db.session.commit()
+
+    monkeypatch.setenv("STRIPE_WEBHOOK_INBOX_WORKER_ENABLED", "True")
+    sys.modules.pop("config", None)
+    restarted_application = create_app(start_background_workers=True)
+    inbox_worker = restarted_application.extensions[
+        STRIPE_WEBHOOK_INBOX_WORKER_EXTENSION_KEY
+    ]
+    try:
+        wait_deadline = time.monotonic() + 5
+        inbox_status = "pending"
+        while inbox_status != "processed" and time.monotonic() < wait_deadline:
+            time.sleep(0.05)
+            with restarted_application.app_context():
+                inbox_status = db.session.get(
+                    StripeWebhookInboxEvent, "evt_due_retry"
+                ).status
+    finally:
+        inbox_worker.stop()
+        inbox_worker.thread.join(timeout=5)
+        sys.modules.pop("config", None)
+
+    assert inbox_status == "processed"
+
+
 def test_start_stripe_checkout_keeps_original_local_hold_expiry(client):
     """Keep the same local expiry when the visitor continues into Stripe."""
 
@@ -1321,6 +1630,60 @@ def test_booking_rejects_same_name_above_total_canoe_limit(client):
         assert BookingOrder.query.count() == 1
 
 
+def test_same_name_limit_uses_normalized_pickup_name_column(client):
+    """Keep the indexed name column in sync and count renamed rows by it."""
+
+    with client.application.app_context():
+        active_event = Event.query.filter_by(is_active=True).first()
+        booking_order = BookingOrder(
+            event_id=active_event.id,
+            public_booking_reference="PAD-TEST-NORMALIZED-NAME",
+            status="paid",
+            canoe_count=5,
+            total_amount=6000,
+            currency="sek",
+            payment_provider="simulated",
+        )
+        db.session.add(booking_order)
+        db.session.flush()
+        db.session.execute(
+            BookedCanoe.__table__.insert(),
+            [
+                {
+                    "booking_order_id": booking_order.id,
+                    "participant_first_name": " Åsa ",
+                    "participant_last_name": "Nilsson",
+                    "status": "confirmed",
+                }
+                for _ in range(5)
+            ],
+        )
+        renamed_canoe = BookedCanoe.query.order_by(BookedCanoe.id).first()
+        renamed_canoe.participant_last_name = "Berg"
+        db.session.commit()
+
+        normalized_names = sorted(
+            booked_canoe.normalized_pickup_name
+            for booked_canoe in BookedCanoe.query.all()
+        )
+        assert normalized_names == ["åsa berg", *["åsa nilsson"] * 4]
+
+    unlock_public_site(client)
+    response = client.post(
+        "/create-checkout-session",
+        data={
+            "canoeCount": "2",
+            "canoe1_fname": "ÅSA",
+            "canoe1_lname": "nilsson",
+            "canoe2_fname": "Åsa",
+            "canoe2_lname": "Nilsson ",
+        },
+        follow_redirects=True,
+    )
+
+    assert "ÅSA nilsson har redan 4 bokade kanoter." in response.get_data(as_text=True)
+
+
 def test_home_page_includes_active_pending_reservations_in_progress_count(client):
     """Render the current blocked-canoe count including active unpaid holds."""
 
@@ -0,0 +1,258 @@
+"""Query budgets for the busiest routes, so hidden lazy loads show up early."""
+
+import logging
+
+from app import db
+from app.util.db_models import BookedCanoe, BookingOrder, Event
+from app.util.event_settings import bump_event_booking_version
+from app.util.stripe_webhook_inbox import drain_stripe_webhook_inbox
+
+
+def unlock_public_site(client):
+    """Unlock the shared public-site gate for one test-client session."""
+
+    return client.post("/unlock", data={"password": "eventpass"})
+
+
+def login(client):
+    """Log the test client in as the administrator."""
+
+    unlock_public_site(client)
+    return client.post("/login", data={"username": "admin", "password": "password"})
+
+
+def add_booking_orders(client, order_count: int, *, status: str = "paid") -> None:
+    """Store several two-canoe orders for the active event."""
+
+    with client.application.app_context():
+        active_event = Event.query.filter_by(is_active=True).one()
+        first_order_number = BookingOrder.query.count()
+        for order_number in range(first_order_number, first_order_number + order_count):
+            booking_order = BookingOrder(
+                event_id=active_event.id,
+                public_booking_reference=f"PAD-BUDGET-{status}-{order_number}",
+                status=status,
+                canoe_count=2,
+                total_amount=2400,
+                currency="sek",
+                payment_provider="stripe_checkout",
+                payment_provider_session_id=f"cs_test_budget_{status}_{order_number}",
+            )
+            db.session.add(booking_order)
+            db.session.flush()
+            for canoe_number in range(2):
+                db.session.add(
+                    BookedCanoe(
+                        booking_order_id=booking_order.id,
+                        participant_first_name=f"Namn{order_number}",
+                        participant_last_name=f"Efternamn{canoe_number}",
+                        status="confirmed" if status == "paid" else "reserved",
+                    )
+                )
+        bump_event_booking_version(active_event.id)
+        db.session.commit()
+
+
+def create_pending_checkout(client) -> tuple[str, str]:
+    """Reserve two canoes and return the order reference and session ID."""
+
+    unlock_public_site(client)
+    client.post(
+        "/create-checkout-session",
+        data={
+            "canoeCount": "2",
+            "canoe1_fname": "Alice",
+            "canoe1_lname": "Andersson",
+            "canoe2_fname": "Bo",
+            "canoe2_lname": "Berg",
+        },
+        headers={"X-Requested-With": "XMLHttpRequest"},
+    )
+    with client.application.app_context():
+        booking_order = BookingOrder.query.one()
+        return (
+            booking_order.public_booking_reference,
+            booking_order.payment_provider_session_id,
+        )
+
+
+def test_index_stays_within_query_budget(client, query_budget):
+    """Render the public start page with a fixed number of queries."""
+
+    add_booking_orders(client, 3)
+    add_booking_orders(client, 2, status="checkout_session_created")
+    unlock_public_site(client)
+
+    with query_budget(9):
+        response = client.get("/")
+
+    assert response.status_code == 200
+
+
+def test_admin_dashboard_stays_within_query_budget(client, query_budget):
+    """Render the admin dashboard without one query per booking row."""
+
+    add_booking_orders(client, 3)
+    add_booking_orders(client, 2, status="checkout_session_created")
+    login(client)
+
+    # One of these reads the event's booking totals row for the summary cards.
+    with query_budget(10):
+        response = client.get("/admin")
+
+    assert response.status_code == 200
+
+
+def test_admin_bookings_api_stays_within_query_budget(client, query_budget):
+    """Load and search a bookings page with one column-only query."""
+
+    add_booking_orders(client, 30)
+    login(client)
+
+    with query_budget(4):
+        first_page = client.get("/admin/api/bookings").get_json()
+    # Searching adds one lookup for the SQLite search table.
+    with query_budget(5):
+        client.get(
+            "/admin/api/bookings",
+            query_string={"q": "namn", "cursor": first_page["next_cursor"]},
+        )
+
+
+def test_view_query_counts_do_not_grow_with_booking_count(client, query_budget):
+    """Run the same number of queries for a handful and many bookings."""
+
+    add_booking_orders(client, 2)
+    add_booking_orders(client, 1, status="checkout_session_created")
+    login(client)
+
+    def count_view_queries() -> dict[str, int]:
+        view_query_counts = {}
+        for view_path in ("/", "/admin"):
+            with query_budget(20) as query_metrics:
+                assert client.get(view_path).status_code == 200
+            view_query_counts[view_path] = query_metrics.query_count
+        return view_query_counts
+
+    small_query_counts = count_view_queries()
+    add_booking_orders(client, 40)
+    add_booking_orders(client, 10, status="checkout_session_created")
+
+    assert count_view_queries() == small_query_counts
+
+
+def test_index_reuses_cached_overview_until_booking_version_changes(
+    client, query_budget
+):
+    """Skip the overview query on repeat renders and rebuild after a change."""
+
+    add_booking_orders(client, 3)
+    unlock_public_site(client)
+    with query_budget(20) as first_render_metrics:
+        client.get("/")
+
+    with query_budget(first_render_metrics.query_count - 1):
+        cached_page = client.get("/").get_data(as_text=True)
+    assert "Namn0 Efternamn0" in cached_page
+
+    add_booking_orders(client, 1)
+    with query_budget(first_render_metrics.query_count):
+        refreshed_page = client.get("/").get_data(as_text=True)
+    assert "Namn3 Efternamn0" in refreshed_page
+
+
+def test_payment_stays_within_query_budget(client, query_budget):
+    """Reserve canoes and create the Checkout Session in a fixed number of queries."""
+
+    add_booking_orders(client, 3)
+    unlock_public_site(client)
+
+    # The tests create the Checkout Session inline, so this also covers the
+    # claim and the stored session ID that the background worker writes.
+    with query_budget(21):
+        response = client.post(
+            "/create-checkout-session",
+            data={
+                "canoeCount": "2",
+                "canoe1_fname": "Alice",
+                "canoe1_lname": "Andersson",
+                "canoe2_fname": "Bo",
+                "canoe2_lname": "Berg",
+            },
+            headers={"X-Requested-With": "XMLHttpRequest"},
+        )
+
+    assert response.status_code == 200
+    assert response.get_json()["ok"] is True
+
+
+def test_payment_return_routes_stay_within_query_budget(client, query_budget):
+    """Poll the checkout status and show the paid success page cheaply."""
+
+    public_booking_reference, checkout_session_id = create_pending_checkout(client)
+    return_query = (
+        f"?order_ref={public_booking_reference}&session_id={checkout_session_id}"
+    )
+
+    with query_budget(3):
+        status_response = client.get(f"/api/checkout-status{return_query}")
+    assert status_response.get_json()["booking_status"] == "pending"
+
+    with client.application.app_context():
+        booking_order = BookingOrder.query.one()
+        booking_order.status = "paid"
+        for booked_canoe in booking_order.booked_canoes:
+            booked_canoe.status = "confirmed"
+        db.session.commit()
+
+    with query_budget(4):
+        success_response = client.get(f"/payment-success{return_query}")
+    assert success_response.status_code == 200
+
+
+def test_stripe_webhook_stays_within_query_budget(client, monkeypatch, query_budget):
+    """Store a webhook cheaply and confirm the booking in a small batch."""
+
+    from app import routes
+
+    _, checkout_session_id = create_pending_checkout(client)
+    stripe_event = {
+        "id": "evt_test_budget",
+        "type": "checkout.session.completed",
+        "data": {"object": {"id": checkout_session_id, "payment_status": "paid"}},
+    }
+    monkeypatch.setattr(
+        routes,
+        "construct_stripe_webhook_event",
+        lambda payload, signature_header: stripe_event,
+    )
+
+    with query_budget(2):
+        webhook_response = client.post(
+            "/stripe/webhook",
+            data=b"{}",
+            headers={"Stripe-Signature": "t=1,v1=test"},
+        )
+    assert webhook_response.status_code == 200
+
+    with client.application.app_context():
+        # One of these adds the paid order to the event's booking totals.
+        with query_budget(12):
+            drain_counts = drain_stripe_webhook_inbox()
+        assert drain_counts["processed"] == 1
+        assert BookingOrder.query.one().status == "paid"
+
+
+def test_debug_responses_report_query_metrics_and_log_slow_requests(client, caplog):
+    """Send a Server-Timing header in debug mode and log requests over budget."""
+
+    unlock_public_site(client)
+    client.application.debug = True
+    client.application.config["SLOW_REQUEST_QUERY_COUNT"] = 1
+
+    with caplog.at_level(logging.WARNING, logger="app.util.query_metrics"):
+        response = client.get("/")
+
+    assert response.headers["Server-Timing"].startswith('db;desc="')
+    assert "queries" in response.headers["Server-Timing"]
+    assert "GET / ran" in caplog.text
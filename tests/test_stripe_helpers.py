@@ -1,5 +1,6 @@
 """Tests for Stripe configuration helpers."""
 
+from datetime import UTC, datetime
 from types import SimpleNamespace
 from typing import cast
 
@@ -7,6 +8,7 @@ import pytest
 import stripe
 
 from app.util.stripe_helpers import (
+    CheckoutProductImageCache,
     build_stripe_checkout_product_image_url,
     can_use_public_base_url_for_checkout_product_image,
     construct_stripe_webhook_event,
@@ -14,11 +16,16 @@ from app.util.stripe_helpers import (
     enrich_checkout_line_items_for_hosted_checkout,
     expire_stripe_checkout_session,
     get_catalog_product_image_urls,
+    get_checkout_product_image_cache,
+    get_checkout_product_image_urls,
     get_stripe_checkout_configuration,
     get_stripe_checkout_configuration_from_mapping,
     is_stripe_checkout_configured,
     normalize_stripe_public_base_url,
+    refresh_checkout_product_image_cache,
+    retrieve_stripe_checkout_session,
 )
+from app.util.stripe_webhooks import process_stripe_webhook_event
 
 
 def test_normalize_stripe_public_base_url_removes_trailing_slash() -> None:
@@ -189,7 +196,11 @@ def test_create_stripe_checkout_session_uses_card_only_swedish_checkout(
     captured_payload: dict[str, object] = {}
 
     class FakeCheckoutSessionsApi:
-        def create(self, payload: dict[str, object]) -> SimpleNamespace:
+        def create(
+            self,
+            payload: dict[str, object],
+            options: dict[str, object] | None = None,
+        ) -> SimpleNamespace:
             captured_payload.update(payload)
             return SimpleNamespace(id="cs_test_123", url="https://checkout.stripe.test")
 
@@ -265,6 +276,106 @@ def test_create_stripe_checkout_session_uses_card_only_swedish_checkout(
     }
 
 
+def test_create_stripe_checkout_session_sends_idempotency_key_with_stable_payload(
+    client, monkeypatch
+) -> None:
+    """Send the order's key to Stripe and repeat the exact same parameters."""
+
+    create_calls: list[tuple[dict[str, object], dict[str, object] | None]] = []
+
+    class FakeCheckoutSessionsApi:
+        def create(
+            self,
+            payload: dict[str, object],
+            options: dict[str, object] | None = None,
+        ) -> SimpleNamespace:
+            create_calls.append((payload, options))
+            return SimpleNamespace(id="cs_test_123", url="https://checkout.stripe.test")
+
+    monkeypatch.setattr(
+        "app.util.stripe_helpers.build_stripe_client",
+        lambda: SimpleNamespace(
+            v1=SimpleNamespace(
+                checkout=SimpleNamespace(sessions=FakeCheckoutSessionsApi()),
+            )
+        ),
+    )
+    local_hold_expires_at = datetime(2026, 6, 1, 10, 15, tzinfo=UTC)
+
+    with client.application.app_context():
+        for _ in range(2):
+            create_stripe_checkout_session(
+                public_booking_reference="PAD-2026-00001",
+                stripe_line_items=[{"quantity": 1, "price_data": {}}],
+                metadata={"booking_order_id": "1"},
+                idempotency_key="booking-key-123",
+                local_hold_expires_at=local_hold_expires_at,
+            )
+
+    first_payload, first_options = create_calls[0]
+    assert first_options is not None
+    assert str(first_options["idempotency_key"]).startswith("booking-key-123-")
+    assert first_payload["expires_at"] == int(
+        datetime(2026, 6, 1, 10, 45, tzinfo=UTC).timestamp()
+    )
+    assert create_calls[1] == create_calls[0]
+
+
+def test_checkout_idempotency_key_changes_when_product_images_change(
+    client, monkeypatch
+) -> None:
+    """Use a new Stripe key when the image cache warms up between two attempts."""
+
+    create_calls: list[tuple[dict[str, object], dict[str, object] | None]] = []
+
+    class FakeCheckoutSessionsApi:
+        def create(
+            self,
+            payload: dict[str, object],
+            options: dict[str, object] | None = None,
+        ) -> SimpleNamespace:
+            create_calls.append((payload, options))
+            return SimpleNamespace(id="cs_test_123", url="https://checkout.stripe.test")
+
+    monkeypatch.setattr(
+        "app.util.stripe_helpers.build_stripe_client",
+        lambda: SimpleNamespace(
+            v1=SimpleNamespace(
+                checkout=SimpleNamespace(sessions=FakeCheckoutSessionsApi()),
+            )
+        ),
+    )
+    monkeypatch.setattr(
+        "app.util.stripe_helpers.start_checkout_product_image_refresh",
+        lambda flask_application, product_id: None,
+    )
+
+    def create_session_for_same_order() -> None:
+        create_stripe_checkout_session(
+            public_booking_reference="PAD-2026-00001",
+            stripe_line_items=[{"quantity": 1, "price_data": {"product_data": {}}}],
+            metadata={"booking_order_id": "1"},
+            idempotency_key="booking-key-123",
+            local_hold_expires_at=datetime(2026, 6, 1, 10, 15, tzinfo=UTC),
+        )
+
+    with client.application.app_context():
+        client.application.config.update(
+            STRIPE_CHECKOUT_PRODUCT_ID="prod_checkout_123",
+            STRIPE_PUBLIC_BASE_URL="https://example.com",
+        )
+        create_session_for_same_order()
+        get_checkout_product_image_cache().store(
+            "prod_checkout_123", ["https://files.stripe.com/canoe.png"]
+        )
+        create_session_for_same_order()
+
+    (first_payload, first_options), (second_payload, second_options) = create_calls
+    assert first_payload["line_items"] != second_payload["line_items"]
+    assert first_options is not None and second_options is not None
+    assert first_options["idempotency_key"] != second_options["idempotency_key"]
+
+
 def test_create_stripe_checkout_session_uses_catalog_product_image_when_configured(
     client, monkeypatch
 ) -> None:
@@ -273,13 +384,20 @@ def test_create_stripe_checkout_session_uses_catalog_product_image_when_configur
     captured_payload: dict[str, object] = {}
 
     class FakeCheckoutSessionsApi:
-        def create(self, payload: dict[str, object]) -> SimpleNamespace:
+        def create(
+            self,
+            payload: dict[str, object],
+            options: dict[str, object] | None = None,
+        ) -> SimpleNamespace:
             captured_payload.update(payload)
             return SimpleNamespace(id="cs_test_123", url="https://checkout.stripe.test")
 
+    product_retrieve_calls: list[str] = []
+
     class FakeProductsApi:
         def retrieve(self, product_id: str) -> SimpleNamespace:
             assert product_id == "prod_checkout_123"
+            product_retrieve_calls.append(product_id)
             return SimpleNamespace(
                 id=product_id,
                 images=["https://files.stripe.com/canoe-dashboard-image.png"],
@@ -299,6 +417,8 @@ def test_create_stripe_checkout_session_uses_catalog_product_image_when_configur
 
     with client.application.app_context():
         client.application.config["STRIPE_CHECKOUT_PRODUCT_ID"] = "prod_checkout_123"
+        refresh_checkout_product_image_cache("prod_checkout_123")
+        product_retrieve_calls.clear()
         create_stripe_checkout_session(
             public_booking_reference="PAD-2026-00001",
             stripe_line_items=[
@@ -336,6 +456,62 @@ def test_create_stripe_checkout_session_uses_catalog_product_image_when_configur
             "Paddlingen - 2 kanoter - 20 mars 2026 - " "Bokningsreferens PAD-2026-00001"
         )
     }
+    assert product_retrieve_calls == []
+
+
+def test_checkout_product_images_refresh_in_background_when_cache_is_cold(
+    client, monkeypatch
+) -> None:
+    """Use the fallback image right away and load the catalog image later."""
+
+    started_refreshes: list[str] = []
+    monkeypatch.setattr(
+        "app.util.stripe_helpers.start_checkout_product_image_refresh",
+        lambda flask_application, product_id: started_refreshes.append(product_id),
+    )
+
+    with client.application.app_context():
+        client.application.config.update(
+            STRIPE_CHECKOUT_PRODUCT_ID="prod_checkout_123",
+            STRIPE_PUBLIC_BASE_URL="https://example.com",
+        )
+        stripe_configuration = get_stripe_checkout_configuration()
+
+        assert get_checkout_product_image_urls(stripe_configuration) == [
+            "https://example.com/static/images/canoe_checkout_icon_png.png"
+        ]
+        assert started_refreshes == ["prod_checkout_123"]
+
+        get_checkout_product_image_cache().store(
+            "prod_checkout_123", ["https://files.stripe.com/canoe.png"]
+        )
+        assert get_checkout_product_image_urls(stripe_configuration) == [
+            "https://files.stripe.com/canoe.png"
+        ]
+        assert started_refreshes == ["prod_checkout_123"]
+
+
+def test_checkout_product_image_cache_expires_and_allows_one_refresh() -> None:
+    """Report stale entries after the TTL and reject overlapping refreshes."""
+
+    current_time = [0.0]
+    product_image_cache = CheckoutProductImageCache(
+        ttl_seconds=60, clock=lambda: current_time[0]
+    )
+    product_image_cache.store("prod_123", ["https://files.stripe.com/a.png"])
+
+    assert product_image_cache.is_fresh("prod_123") is True
+    current_time[0] = 61
+    assert product_image_cache.is_fresh("prod_123") is False
+    assert product_image_cache.get("prod_123") == ["https://files.stripe.com/a.png"]
+
+    assert product_image_cache.claim_refresh("prod_123") is True
+    assert product_image_cache.claim_refresh("prod_123") is False
+    product_image_cache.release_refresh("prod_123")
+    assert product_image_cache.claim_refresh("prod_123") is True
+
+    product_image_cache.clear()
+    assert product_image_cache.get("prod_123") is None
 
 
 def test_expire_stripe_checkout_session_calls_stripe_expire_api(
@@ -368,6 +544,51 @@ def test_expire_stripe_checkout_session_calls_stripe_expire_api(
     assert expired_session.status == "expired"
 
 
+def test_retrieve_stripe_checkout_session_reuses_recent_lookups_until_webhook(
+    client, monkeypatch
+) -> None:
+    """Serve repeated lookups from the cache and ask Stripe again after a webhook."""
+
+    retrieved_session_ids: list[str] = []
+
+    class FakeCheckoutSessionsApi:
+        def retrieve(self, checkout_session_id: str) -> SimpleNamespace:
+            retrieved_session_ids.append(checkout_session_id)
+            return SimpleNamespace(id=checkout_session_id, status="open")
+
+        def expire(self, checkout_session_id: str) -> SimpleNamespace:
+            return SimpleNamespace(id=checkout_session_id, status="expired")
+
+    fake_stripe_client = SimpleNamespace(
+        v1=SimpleNamespace(
+            checkout=SimpleNamespace(sessions=FakeCheckoutSessionsApi()),
+        )
+    )
+    monkeypatch.setattr(
+        "app.util.stripe_helpers.build_stripe_client",
+        lambda: fake_stripe_client,
+    )
+
+    with client.application.app_context():
+        retrieve_stripe_checkout_session("cs_test_123")
+        retrieve_stripe_checkout_session("cs_test_123")
+        assert retrieved_session_ids == ["cs_test_123"]
+
+        process_stripe_webhook_event(
+            {
+                "type": "checkout.session.async_payment_failed",
+                "data": {"object": {"id": "cs_test_123"}},
+            }
+        )
+        retrieve_stripe_checkout_session("cs_test_123")
+        retrieve_stripe_checkout_session("cs_test_123", use_cache=False)
+        assert retrieved_session_ids == ["cs_test_123"] * 3
+
+        expire_stripe_checkout_session("cs_test_123")
+        assert retrieve_stripe_checkout_session("cs_test_123").status == "expired"
+        assert len(retrieved_session_ids) == 3
+
+
 def test_construct_stripe_webhook_event_uses_configured_webhook_secret(
     client, monkeypatch
 ) -> None:
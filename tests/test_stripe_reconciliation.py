@@ -0,0 +1,124 @@
+"""Tests for bulk Stripe reconciliation of pending booking orders."""
+
+from types import SimpleNamespace
+
+from app.util.db_models import BookedCanoe, BookingOrder, Event, db
+
+
+def add_pending_checkout_order(booking_number: int) -> None:
+    """Store one pending order that waits on a Stripe Checkout Session."""
+
+    active_event = Event.query.filter_by(is_active=True).one()
+    booking_order = BookingOrder(
+        event_id=active_event.id,
+        public_booking_reference=f"PAD-RECONCILE-{booking_number}",
+        status="checkout_session_created",
+        canoe_count=1,
+        total_amount=1200,
+        currency="sek",
+        payment_provider="stripe_checkout",
+        payment_provider_session_id=f"cs_test_reconcile_{booking_number}",
+    )
+    db.session.add(booking_order)
+    db.session.flush()
+    db.session.add(
+        BookedCanoe(
+            booking_order_id=booking_order.id,
+            participant_first_name="Alice",
+            participant_last_name="Andersson",
+            status="reserved",
+        )
+    )
+    db.session.commit()
+
+
+def build_checkout_session(booking_number: int, **session_fields) -> dict:
+    """Return a Checkout Session as Stripe's list API would include it."""
+
+    return {
+        "id": f"cs_test_reconcile_{booking_number}",
+        "status": "open",
+        "payment_status": "unpaid",
+        **session_fields,
+    }
+
+
+def test_reconcile_stripe_command_applies_listed_sessions_page_by_page(
+    client, monkeypatch
+):
+    """Confirm paid, release expired, and keep open orders with few API calls."""
+
+    listed_pages = [
+        SimpleNamespace(
+            data=[
+                build_checkout_session(
+                    1,
+                    status="complete",
+                    payment_status="paid",
+                    customer_details={"email": "alice@example.com"},
+                ),
+                build_checkout_session(2, status="expired"),
+            ],
+            has_more=True,
+        ),
+        SimpleNamespace(
+            data=[build_checkout_session(3), build_checkout_session(99)],
+            has_more=False,
+        ),
+    ]
+    list_calls = []
+
+    def fake_list_stripe_checkout_sessions(created_after, *, starting_after, page_size):
+        list_calls.append(starting_after)
+        return listed_pages[len(list_calls) - 1]
+
+    monkeypatch.setattr(
+        "app.util.stripe_reconciliation.list_stripe_checkout_sessions",
+        fake_list_stripe_checkout_sessions,
+    )
+
+    with client.application.app_context():
+        for booking_number in (1, 2, 3):
+            add_pending_checkout_order(booking_number)
+
+        result = client.application.test_cli_runner().invoke(args=["reconcile-stripe"])
+
+        assert result.exit_code == 0
+        assert (
+            "Confirmed 1, released 1, left 1 pending after 2 Stripe list call(s)."
+            in result.output
+        )
+        assert list_calls == [None, "cs_test_reconcile_2"]
+
+        orders_by_reference = {
+            booking_order.public_booking_reference: booking_order
+            for booking_order in BookingOrder.query.all()
+        }
+        paid_order = orders_by_reference["PAD-RECONCILE-1"]
+        assert paid_order.status == "paid"
+        assert paid_order.payer_email == "alice@example.com"
+        assert [canoe.status for canoe in paid_order.booked_canoes] == ["confirmed"]
+        assert "PAD-RECONCILE-2" not in orders_by_reference
+        assert (
+            orders_by_reference["PAD-RECONCILE-3"].status == "checkout_session_created"
+        )
+
+
+def test_reconcile_stripe_command_skips_stripe_without_pending_orders(
+    client, monkeypatch
+):
+    """Make no Stripe calls when no order is waiting on a Checkout Session."""
+
+    def fail_list_stripe_checkout_sessions(*args, **kwargs):
+        raise AssertionError("Stripe should not be called.")
+
+    monkeypatch.setattr(
+        "app.util.stripe_reconciliation.list_stripe_checkout_sessions",
+        fail_list_stripe_checkout_sessions,
+    )
+
+    with client.application.app_context():
+        result = client.application.test_cli_runner().invoke(args=["reconcile-stripe"])
+
+    assert result.exit_code == 0
+    assert "after 0 Stripe list call(s)." in result.output
@@ -0,0 +1,93 @@
+"""Tests for the Stripe webhook inbox and its retry handling."""
+
+from datetime import timedelta
+
+from app.util.db_models import StripeWebhookInboxEvent, db, get_current_utc_time
+from app.util.stripe_webhook_inbox import (
+    drain_stripe_webhook_inbox,
+    store_stripe_webhook_event,
+)
+
+
+def build_unknown_stripe_event(stripe_event_id: str) -> dict:
+    """Return a small verified-looking event that the app ignores."""
+
+    return {
+        "id": stripe_event_id,
+        "type": "customer.created",
+        "data": {"object": {"id": "cus_test"}},
+    }
+
+
+def test_store_stripe_webhook_event_deduplicates_by_event_id(client):
+    """Keep one inbox row when Stripe delivers the same event twice."""
+
+    with client.application.app_context():
+        stripe_event = build_unknown_stripe_event("evt_test_duplicate")
+
+        assert store_stripe_webhook_event(stripe_event) == "stored"
+        assert store_stripe_webhook_event(stripe_event) == "duplicate"
+        assert StripeWebhookInboxEvent.query.count() == 1
+
+
+def test_drain_retries_failed_event_with_backoff_and_then_gives_up(client, monkeypatch):
+    """Schedule retries further apart and mark the event failed at the limit."""
+
+    client.application.config.update(
+        STRIPE_WEBHOOK_INBOX_MAX_ATTEMPTS=2,
+        STRIPE_WEBHOOK_INBOX_RETRY_BASE_SECONDS=60,
+    )
+
+    def failing_process_stripe_webhook_event(stripe_event):
+        raise RuntimeError("database is busy")
+
+    monkeypatch.setattr(
+        "app.util.stripe_webhook_inbox.process_stripe_webhook_event",
+        failing_process_stripe_webhook_event,
+    )
+
+    with client.application.app_context():
+        store_stripe_webhook_event(build_unknown_stripe_event("evt_test_retry"))
+
+        before_first_attempt = get_current_utc_time()
+        assert drain_stripe_webhook_inbox()["retry_scheduled"] == 1
+
+        inbox_event = db.session.get(StripeWebhookInboxEvent, "evt_test_retry")
+        assert inbox_event.status == "pending"
+        assert inbox_event.attempt_count == 1
+        assert inbox_event.last_error == "RuntimeError: database is busy"
+        next_attempt_at = inbox_event.next_attempt_at.replace(tzinfo=None)
+        assert next_attempt_at >= (
+            before_first_attempt + timedelta(seconds=60)
+        ).replace(tzinfo=None)
+
+        # Nothing is due until the backoff has passed.
+        assert drain_stripe_webhook_inbox()["retry_scheduled"] == 0
+
+        inbox_event.next_attempt_at = get_current_utc_time() - timedelta(seconds=1)
+        db.session.commit()
+        assert drain_stripe_webhook_inbox()["failed"] == 1
+
+        inbox_event = db.session.get(StripeWebhookInboxEvent, "evt_test_retry")
+        assert inbox_event.status == "failed"
+        assert inbox_event.attempt_count == 2
+        assert drain_stripe_webhook_inbox()["failed"] == 0
+
+
+def test_drain_processes_events_in_batches(client):
+    """Drain more events than one batch holds in a single call."""
+
+    with client.application.app_context():
+        for event_number in range(5):
+            store_stripe_webhook_event(
+                build_unknown_stripe_event(f"evt_test_batch_{event_number}")
+            )
+
+        outcome_counts = drain_stripe_webhook_inbox(batch_size=2)
+
+        assert outcome_counts["processed"] == 5
+        assert StripeWebhookInboxEvent.query.filter_by(status="processed").count() == 5
+        assert {
+            inbox_event.processing_result
+            for inbox_event in StripeWebhookInboxEvent.query.all()
+        } == {"ignored_unhandled_event"}
@@ -0,0 +1,164 @@
+"""Tests for the MET forecast parsing and circuit breaker helpers."""
+
+import requests
+
+from app.util.weather_forecast import (
+    WeatherCircuitBreaker,
+    WeatherForecastFetcher,
+    build_forecast_index,
+    deserialize_forecast_index,
+    get_weather_icon,
+    parse_forecast_entry,
+    select_indexed_forecast_entry,
+    serialize_forecast_index,
+)
+
+
+class FakeClock:
+    """Manual clock used to move time forward without sleeping."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_circuit_breaker_opens_after_threshold_and_allows_one_trial() -> None:
+    """Reject calls during the cooldown, then allow exactly one trial call."""
+
+    clock = FakeClock()
+    circuit_breaker = WeatherCircuitBreaker(
+        failure_threshold=2,
+        cooldown_seconds=60,
+        clock=clock,
+    )
+
+    circuit_breaker.record_failure()
+    assert circuit_breaker.allow_request() is True
+
+    circuit_breaker.record_failure()
+    assert circuit_breaker.is_open is True
+    assert circuit_breaker.allow_request() is False
+
+    clock.now = 61
+    assert circuit_breaker.allow_request() is True
+    assert circuit_breaker.allow_request() is False
+
+    circuit_breaker.record_success()
+    assert circuit_breaker.is_open is False
+    assert circuit_breaker.allow_request() is True
+
+
+def test_circuit_breaker_restarts_cooldown_after_failed_trial() -> None:
+    """Keep the breaker open when the single trial call also fails."""
+
+    clock = FakeClock()
+    circuit_breaker = WeatherCircuitBreaker(
+        failure_threshold=1,
+        cooldown_seconds=60,
+        clock=clock,
+    )
+
+    circuit_breaker.record_failure()
+    clock.now = 61
+    assert circuit_breaker.allow_request() is True
+
+    circuit_breaker.record_failure()
+    clock.now = 100
+    assert circuit_breaker.allow_request() is False
+
+
+def test_weather_fetcher_skips_outbound_calls_while_breaker_cools_down(
+    monkeypatch,
+) -> None:
+    """Avoid new MET calls while the breaker reports an unhealthy upstream."""
+
+    clock = FakeClock()
+    weather_forecast_fetcher = WeatherForecastFetcher(
+        circuit_breaker=WeatherCircuitBreaker(
+            failure_threshold=1,
+            cooldown_seconds=60,
+            clock=clock,
+        ),
+        http_session=requests.Session(),
+    )
+    outbound_calls: list[tuple[float, float]] = []
+
+    def failing_get(self, url, headers=None, params=None, timeout=None):
+        outbound_calls.append((params["lat"], params["lon"]))
+        raise requests.ConnectionError("MET is down")
+
+    monkeypatch.setattr("requests.Session.get", failing_get)
+
+    assert weather_forecast_fetcher.fetch((59.0, 14.0), 5) is None
+    assert weather_forecast_fetcher.fetch((59.0, 14.0), 5) is None
+    assert outbound_calls == [(59.0, 14.0)]
+
+
+def test_parse_forecast_entry_reads_numeric_values() -> None:
+    """Extract temperature, rain amount, and symbol code from one entry."""
+
+    parsed_entry = parse_forecast_entry(
+        {
+            "time": "2026-06-28T10:00:00Z",
+            "data": {
+                "instant": {"details": {"air_temperature": 18.4}},
+                "next_6_hours": {
+                    "details": {"precipitation_amount": 1.2},
+                    "summary": {"symbol_code": "lightrain_day"},
+                },
+            },
+        }
+    )
+
+    assert parsed_entry.temperature_c == 18.4
+    assert parsed_entry.rain_mm == 1.2
+    assert parsed_entry.symbol_code == "lightrain_day"
+    assert get_weather_icon(parsed_entry.symbol_code) == "🌦️"
+
+
+def test_forecast_index_keeps_preferred_times_and_round_trips() -> None:
+    """Index only the 10:00/12:00 UTC entries and survive JSON storage."""
+
+    def build_entry(timestamp: str, temperature: float) -> dict:
+        return {
+            "time": timestamp,
+            "data": {
+                "instant": {"details": {"air_temperature": temperature}},
+                "next_6_hours": {
+                    "details": {"precipitation_amount": 0.0},
+                    "summary": {"symbol_code": "cloudy"},
+                },
+            },
+        }
+
+    forecast_index = build_forecast_index(
+        {
+            "properties": {
+                "timeseries": [
+                    build_entry("2026-06-28T09:00:00Z", 10.0),
+                    build_entry("2026-06-28T10:00:00Z", 12.0),
+                    build_entry("2026-06-28T12:00:00Z", 14.0),
+                    build_entry("2026-06-29T12:00:00Z", 16.0),
+                    {"time": "2026-06-30T10:00:00Z", "data": {}},
+                ]
+            }
+        }
+    )
+
+    assert sorted(forecast_index) == [
+        "2026-06-28T10:00:00Z",
+        "2026-06-28T12:00:00Z",
+        "2026-06-29T12:00:00Z",
+    ]
+
+    stored_index = deserialize_forecast_index(serialize_forecast_index(forecast_index))
+    assert stored_index == forecast_index
+    assert (
+        select_indexed_forecast_entry(stored_index, "2026-06-28").temperature_c == 12.0
+    )
+    assert (
+        select_indexed_forecast_entry(stored_index, "2026-06-29").temperature_c == 16.0
+    )
+    assert select_indexed_forecast_entry(stored_index, "2026-06-30") is None
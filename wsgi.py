@@ -2,9 +2,10 @@
 
 This module exposes a variable named :data:`application` so that WSGI
 servers (Gunicorn, uWSGI, etc.) can run the Flask app created by
-:func:`app.create_app`.
+:func:`app.create_app`. Only this entry point (and ``flask run``) starts
+the background workers, such as the Stripe webhook inbox worker.
 """
 
 from app import create_app
 
-application = create_app()
+application = create_app(start_background_workers=True)